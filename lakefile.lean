@@ -66,6 +66,8 @@ lean_lib crypto_round_felt where
 @[default_target]
 lean_exe «leancairo-gen» where
   root := `LeanCairo.CLI.Main
+  supportInterpreter := true
 
 lean_exe «leancairo-sierra-gen» where
   root := `LeanCairo.SierraCLI.Main
+  supportInterpreter := true
@@ -39,11 +39,14 @@ python3 "$ROOT_DIR/scripts/bench/optimize_artifacts.py" \
   --passes strip_sierra_debug_info >/tmp/leancairo_artifact_opt_report.json
 
 optimized_index="$OPT_DIR/optimized.starknet_artifacts.json"
-source_metrics="$(python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" --index "$source_index" --contract-name "$CONTRACT_NAME")"
-optimized_metrics="$(python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" --index "$optimized_index" --contract-name "$CONTRACT_NAME")"
-
-source_score="$(printf '%s' "$source_metrics" | python3 -c 'import json,sys; print(json.load(sys.stdin)["score"])')"
-optimized_score="$(printf '%s' "$optimized_metrics" | python3 -c 'import json,sys; print(json.load(sys.stdin)["score"])')"
+metrics_file="$OUT_BASE/metrics.jsonl"
+python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" \
+  --batch "$source_index" "$optimized_index" \
+  --contract-name "$CONTRACT_NAME" \
+  --out "$metrics_file"
+read -r source_score optimized_score < <(
+  python3 -c 'import json,sys; print(*(json.loads(line)["score"] for line in open(sys.argv[1])))' "$metrics_file"
+)
 
 if (( optimized_score != source_score )); then
   echo "artifact pass semantics regression: score changed from $source_score to $optimized_score" >&2
@@ -17,26 +17,32 @@ mkdir -p "$OUT_BASE"
 cd "$ROOT_DIR"
 export PATH="$HOME/.elan/bin:$PATH"
 
-lake exe leancairo-gen --module "$MODULE_NAME" --out "$BASELINE_DIR" --emit-casm true --optimize false --inlining-strategy "$INLINE_STRATEGY"
-lake exe leancairo-gen --module "$MODULE_NAME" --out "$OPTIMIZED_DIR" --emit-casm true --optimize true --inlining-strategy "$INLINE_STRATEGY"
-
-(
-  cd "$BASELINE_DIR"
-  scarb build
-)
-(
-  cd "$OPTIMIZED_DIR"
-  scarb build
-)
+BUILD_WITH_STORE="$ROOT_DIR/scripts/workflow/build-with-store.sh"
+"$BUILD_WITH_STORE" --scarb-build "$BASELINE_DIR" leancairo-gen \
+  --module "$MODULE_NAME" --emit-casm true --optimize false --inlining-strategy "$INLINE_STRATEGY"
+"$BUILD_WITH_STORE" --scarb-build "$OPTIMIZED_DIR" leancairo-gen \
+  --module "$MODULE_NAME" --emit-casm true --optimize true --inlining-strategy "$INLINE_STRATEGY"
 
 baseline_index="$(find "$BASELINE_DIR/target/dev" -maxdepth 1 -name '*.starknet_artifacts.json' | head -n 1)"
 optimized_index="$(find "$OPTIMIZED_DIR/target/dev" -maxdepth 1 -name '*.starknet_artifacts.json' | head -n 1)"
 
-baseline_metrics="$(python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" --index "$baseline_index" --contract-name "$CONTRACT_NAME")"
-optimized_metrics="$(python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" --index "$optimized_index" --contract-name "$CONTRACT_NAME")"
+baseline_program="$(find "$BASELINE_DIR/target/dev" -maxdepth 1 -name '*.sierra.json' | head -n 1)"
+optimized_program="$(find "$OPTIMIZED_DIR/target/dev" -maxdepth 1 -name '*.sierra.json' | head -n 1)"
 
-baseline_score="$(printf '%s' "$baseline_metrics" | python3 -c 'import json,sys; print(json.load(sys.stdin)["score"])')"
-optimized_score="$(printf '%s' "$optimized_metrics" | python3 -c 'import json,sys; print(json.load(sys.stdin)["score"])')"
+cost_args=(--batch "$baseline_index" "$optimized_index" --contract-name "$CONTRACT_NAME")
+# Score with the static gas estimate when both lanes emitted a Sierra program; otherwise, or when either
+# program loops or recurses and so has no static bound, fall back to the length proxy.
+if [[ -n "$baseline_program" && -n "$optimized_program" ]]; then
+  cost_args+=(--pair-sierra-program)
+fi
+
+metrics_file="$OUT_BASE/metrics.jsonl"
+python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" "${cost_args[@]}" --out "$metrics_file"
+baseline_metrics="$(sed -n 1p "$metrics_file")"
+optimized_metrics="$(sed -n 2p "$metrics_file")"
+read -r baseline_score optimized_score < <(
+  python3 -c 'import json,sys; print(*(json.loads(line)["score"] for line in open(sys.argv[1])))' "$metrics_file"
+)
 
 echo "Benchmark target: module=$MODULE_NAME contract=$CONTRACT_NAME inlining=$INLINE_STRATEGY"
 echo "Baseline metrics:"
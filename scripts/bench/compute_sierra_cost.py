@@ -1,22 +1,65 @@
 #!/usr/bin/env python3
-"""Compute simple contract cost metrics from Scarb Starknet artifacts."""
+"""Compute contract cost metrics from Scarb Starknet artifacts and Sierra programs."""
 
 from __future__ import annotations
 
 import argparse
+import glob
 import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "sierra"))
+
+from estimate_static_gas import (  # noqa: E402
+    DEFAULT_COST_TABLE,
+    UnboundedGasError,
+    estimate_program,
+    load_cost_table,
+)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--index", required=True, help="Path to *.starknet_artifacts.json")
+    parser.add_argument("--index", default=None, help="Path to *.starknet_artifacts.json")
     parser.add_argument(
         "--contract-name",
         default=None,
         help="Optional contract_name selector. Defaults to first contract if omitted.",
     )
+    parser.add_argument(
+        "--sierra-program",
+        default=None,
+        help=(
+            "Optional direct Sierra program JSON. When set, score is the static worst-case gas estimate, "
+            "unless the program loops or recurses."
+        ),
+    )
+    parser.add_argument(
+        "--cost-table",
+        default=str(DEFAULT_COST_TABLE),
+        help="Versioned per-libfunc cost table used by the static gas estimate.",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        default=None,
+        help="Artifact index paths or globs; writes one JSON Lines metrics row per index, in input order.",
+    )
+    parser.add_argument(
+        "--pair-sierra-program",
+        action="store_true",
+        help=(
+            "In --batch mode, also score each index with the Sierra program next to it that belongs to the "
+            "selected contract: <contract class stem>.sierra.json, else the package's <package>.sierra.json."
+        ),
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for --batch")
+    parser.add_argument("--out", default=None, help="Optional JSON Lines output path for --batch")
     return parser.parse_args()
 
 
@@ -51,13 +94,10 @@ def abi_function_count(contract_class_payload: dict[str, Any]) -> int:
     return count
 
 
-def main() -> int:
-    args = parse_args()
-    index_path = Path(args.index)
+def artifact_metrics(index_path: Path, contract_name: str | None) -> dict[str, Any]:
     index_payload = load_json(index_path)
 
-    selected = select_contract(index_payload, args.contract_name)
-    contract_name = selected.get("contract_name")
+    selected = select_contract(index_payload, contract_name)
     artifacts = selected.get("artifacts", {})
     sierra_rel = artifacts.get("sierra")
     casm_rel = artifacts.get("casm")
@@ -71,7 +111,7 @@ def main() -> int:
     entry_points = contract_class.get("entry_points_by_type", {})
 
     metrics = {
-        "contract_name": contract_name,
+        "contract_name": selected.get("contract_name"),
         "contract_class": str(contract_path),
         "sierra_program_len": len(sierra_program),
         "entry_points_external": len(entry_points.get("EXTERNAL", [])),
@@ -86,14 +126,145 @@ def main() -> int:
         metrics["casm_contract_class"] = str(casm_path)
         metrics["casm_bytecode_len"] = len(casm_class.get("bytecode", []))
         metrics["casm_hint_count"] = len(casm_class.get("hints", []))
-        # Prefer CASM bytecode length when available; use Sierra length as fallback tie-breaker.
-        metrics["score"] = metrics["casm_bytecode_len"] * 10_000 + metrics["sierra_program_len"]
     else:
         # Fallback for Sierra-only builds.
         metrics["casm_contract_class"] = None
         metrics["casm_bytecode_len"] = None
         metrics["casm_hint_count"] = None
-        metrics["score"] = metrics["sierra_program_len"]
+    metrics["score"] = length_score(metrics)
+    metrics["score_model"] = "length_v1"
+    return metrics
+
+
+def length_score(metrics: dict[str, Any]) -> int:
+    # Prefer CASM bytecode length when available; use Sierra length as fallback tie-breaker.
+    if metrics["casm_bytecode_len"] is not None:
+        return metrics["casm_bytecode_len"] * 10_000 + metrics["sierra_program_len"]
+    return metrics["sierra_program_len"]
+
+
+@lru_cache(maxsize=None)
+def cached_cost_table(path: Path) -> dict[str, Any]:
+    return load_cost_table(path)
+
+
+def static_gas_metrics(program_path: Path, cost_table_path: Path) -> dict[str, Any]:
+    try:
+        estimate = estimate_program(load_json(program_path), cached_cost_table(cost_table_path))
+    except UnboundedGasError as exc:
+        # Loops and recursion have no static worst case; the length proxy stays the score.
+        return {
+            "sierra_program": str(program_path),
+            "static_worst_case_gas": None,
+            "static_unbounded": str(exc),
+        }
+    return {
+        "sierra_program": str(program_path),
+        "static_worst_case_gas": estimate["total_worst_case_gas"],
+        "static_unknown_libfuncs": estimate["unknown_libfuncs"],
+        "static_functions": {fn["name"]: fn["worst_case"]["gas"] for fn in estimate["functions"]},
+        # The static estimate models runtime cost directly, so it supersedes the length proxy.
+        "score": estimate["total_worst_case_gas"],
+        "score_model": estimate["cost_model"],
+    }
+
+
+def expand_batch_inputs(patterns: list[str]) -> list[Path]:
+    paths: list[Path] = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                raise ValueError(f"batch pattern matched no artifact indexes: {pattern}")
+            paths.extend(Path(match).resolve() for match in matches)
+        else:
+            paths.append(Path(pattern).resolve())
+    return paths
+
+
+def paired_sierra_program(index_path: Path, contract_name: str | None) -> Path | None:
+    # Never fall back to an arbitrary program in target/dev: it may belong to another contract.
+    selected = select_contract(load_json(index_path), contract_name)
+    sierra_rel = selected.get("artifacts", {}).get("sierra")
+    candidates = []
+    if sierra_rel:
+        candidates.append(index_path.parent / f"{Path(sierra_rel).name.split('.', 1)[0]}.sierra.json")
+    candidates.append(index_path.parent / f"{index_path.name.removesuffix('.starknet_artifacts.json')}.sierra.json")
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def batch_row(task: tuple[Path, str | None, bool, Path]) -> dict[str, Any]:
+    index_path, contract_name, pair_sierra_program, cost_table_path = task
+    row: dict[str, Any] = {"index": str(index_path)}
+    try:
+        row.update(artifact_metrics(index_path, contract_name))
+        program_path = paired_sierra_program(index_path, contract_name) if pair_sierra_program else None
+        if program_path is not None:
+            row.update(static_gas_metrics(program_path, cost_table_path))
+    except (OSError, ValueError) as exc:
+        row["error"] = str(exc)
+    return row
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    if args.index is not None or args.sierra_program is not None:
+        raise SystemExit("--batch cannot be combined with --index or --sierra-program")
+    cost_table_path = Path(args.cost_table).resolve()
+    tasks = [
+        (path, args.contract_name, args.pair_sierra_program, cost_table_path)
+        for path in expand_batch_inputs(args.batch)
+    ]
+    jobs = max(1, min(args.jobs, len(tasks)))
+    if jobs == 1:
+        rows = [batch_row(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rows = list(pool.map(batch_row, tasks))
+
+    if len({row["score_model"] for row in rows if "error" not in row}) > 1:
+        # Static gas and length scores are not comparable, so score the whole batch by length. This covers
+        # unbounded programs and candidates without a paired Sierra program alike.
+        for row in rows:
+            if "error" not in row and row["score_model"] != "length_v1":
+                row["score"] = length_score(row)
+                row["score_model"] = "length_v1"
+
+    rendered = "".join(json.dumps(row, sort_keys=True) + "\n" for row in rows)
+    if args.out:
+        out_path = Path(args.out).resolve()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(rendered, encoding="utf-8")
+    else:
+        sys.stdout.write(rendered)
+    failed = [row for row in rows if "error" in row]
+    for row in failed:
+        print(f"{row['index']}: {row['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main() -> int:
+    args = parse_args()
+    if args.batch is not None:
+        return run_batch(args)
+    if args.index is None and args.sierra_program is None:
+        raise SystemExit("at least one of --index or --sierra-program is required")
+
+    metrics: dict[str, Any] = {}
+    if args.index is not None:
+        metrics.update(artifact_metrics(Path(args.index), args.contract_name))
+    if args.sierra_program is not None:
+        metrics.update(
+            static_gas_metrics(Path(args.sierra_program).resolve(), Path(args.cost_table).resolve())
+        )
+    if "score" not in metrics:
+        # Without --index there is no length proxy to fall back to.
+        raise SystemExit(
+            f"{args.sierra_program}: no static gas bound ({metrics['static_unbounded']}); "
+            "pass --index to score by artifact length"
+        )
 
     print(json.dumps(metrics, indent=2, sort_keys=True))
     return 0
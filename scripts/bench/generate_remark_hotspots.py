@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Roll `--emit-remarks` JSON Lines streams up into per-function and per-pass hotspot reports."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+REQUIRED_FIELDS = (
+    "contract",
+    "function",
+    "pass",
+    "ir_nodes_before",
+    "ir_nodes_after",
+    "sierra_statements",
+    "static_cost",
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate hotspot reports from optimization remarks")
+    parser.add_argument("--remarks", action="append", required=True, help="JSON Lines remarks file (repeatable)")
+    parser.add_argument("--out-json", required=True)
+    parser.add_argument("--out-md", required=True)
+    return parser.parse_args()
+
+
+def load_remarks(path: Path) -> List[Dict[str, object]]:
+    records: List[Dict[str, object]] = []
+    for line_no, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        ctx = f"{path}:{line_no}"
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{ctx}: invalid JSON: {exc}") from exc
+        if not isinstance(record, dict):
+            raise ValueError(f"{ctx}: expected object")
+        for key in REQUIRED_FIELDS:
+            if key not in record:
+                raise ValueError(f"{ctx}: missing key '{key}'")
+        for key in ("ir_nodes_before", "ir_nodes_after"):
+            if not isinstance(record[key], int):
+                raise ValueError(f"{ctx}.{key}: expected integer")
+        statements = record["sierra_statements"]
+        if statements is not None and not isinstance(statements, int):
+            raise ValueError(f"{ctx}.sierra_statements: expected integer or null")
+        cost = record["static_cost"]
+        if not isinstance(cost, dict) or not isinstance(cost.get("gas"), int):
+            raise ValueError(f"{ctx}.static_cost.gas: expected integer")
+        records.append(record)
+    return records
+
+
+def main() -> int:
+    args = parse_args()
+    remark_paths = [Path(raw).resolve() for raw in args.remarks]
+    out_json = Path(args.out_json).resolve()
+    out_md = Path(args.out_md).resolve()
+
+    functions: Dict[Tuple[str, str], Dict[str, object]] = {}
+    passes: Dict[str, Dict[str, int]] = {}
+    for path in remark_paths:
+        # A later stream for the same function (e.g. a rerun) replaces the earlier pass chain.
+        seen: Set[Tuple[str, str]] = set()
+        for record in load_remarks(path):
+            key = (str(record["contract"]), str(record["function"]))
+            before = int(record["ir_nodes_before"])
+            after = int(record["ir_nodes_after"])
+            static_gas = int(record["static_cost"]["gas"])
+            if key not in seen:
+                functions.pop(key, None)
+                seen.add(key)
+            row = functions.setdefault(
+                key,
+                {
+                    "contract": key[0],
+                    "function": key[1],
+                    "passes": [],
+                    "ir_nodes_input": before,
+                    "ir_nodes_output": after,
+                },
+            )
+            row["passes"].append({"pass": record["pass"], "ir_node_delta": after - before, "static_gas": static_gas})
+            # Each record describes the function after its pass, so the last one is the final program.
+            row["ir_nodes_output"] = after
+            row["sierra_statements"] = record["sierra_statements"]
+            row["static_gas"] = static_gas
+
+            bucket = passes.setdefault(
+                str(record["pass"]),
+                {"applications": 0, "functions_shrunk": 0, "functions_grown": 0, "ir_node_delta": 0},
+            )
+            bucket["applications"] += 1
+            bucket["ir_node_delta"] += after - before
+            if after < before:
+                bucket["functions_shrunk"] += 1
+            elif after > before:
+                bucket["functions_grown"] += 1
+
+    hotspots = sorted(
+        functions.values(),
+        key=lambda row: (-int(row["static_gas"]), str(row["contract"]), str(row["function"])),
+    )
+    pass_rows = [{"pass": name, **bucket} for name, bucket in sorted(passes.items())]
+
+    payload = {
+        "version": 1,
+        "remark_sources": [str(path) for path in remark_paths],
+        "function_count": len(hotspots),
+        "hotspots": hotspots,
+        "passes": pass_rows,
+    }
+
+    out_json.parent.mkdir(parents=True, exist_ok=True)
+    out_json.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    lines: List[str] = []
+    lines.append("# Optimization Remark Hotspots")
+    lines.append("")
+    lines.append(f"- Remark streams: `{len(remark_paths)}`")
+    lines.append(f"- Functions: `{len(hotspots)}`")
+    lines.append("")
+    lines.append("## Function Hotspots")
+    lines.append("")
+    lines.append("| Contract | Function | Static gas | Sierra statements | IR nodes in | IR nodes out | Pass deltas |")
+    lines.append("| --- | --- | ---: | ---: | ---: | ---: | --- |")
+    for row in hotspots:
+        statements = "n/a" if row["sierra_statements"] is None else row["sierra_statements"]
+        deltas = ", ".join(f"{step['pass']} {step['ir_node_delta']:+d}" for step in row["passes"])
+        lines.append(
+            f"| `{row['contract']}` | `{row['function']}` | `{row['static_gas']}` | `{statements}` | `{row['ir_nodes_input']}` | `{row['ir_nodes_output']}` | {deltas} |"
+        )
+    lines.append("")
+    lines.append("## Pass Summary")
+    lines.append("")
+    lines.append("| Pass | Applications | Shrunk | Grown | IR node delta |")
+    lines.append("| --- | ---: | ---: | ---: | ---: |")
+    for row in pass_rows:
+        lines.append(
+            f"| `{row['pass']}` | `{row['applications']}` | `{row['functions_shrunk']}` | `{row['functions_grown']}` | `{row['ir_node_delta']}` |"
+        )
+    lines.append("")
+
+    out_md.parent.mkdir(parents=True, exist_ok=True)
+    out_md.write_text("\n".join(lines), encoding="utf-8")
+
+    print(f"wrote: {out_json}")
+    print(f"wrote: {out_md}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,15 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-if [[ "$#" -lt 1 || "$#" -gt 2 ]]; then
-  echo "usage: $0 <generated-project-dir> [contract-name]" >&2
+if [[ "$#" -lt 1 || "$#" -gt 3 ]]; then
+  echo "usage: $0 <generated-project-dir> [contract-name] [baseline-sierra-program]" >&2
   exit 1
 fi
 
 ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
 GENERATED_DIR="$(cd "$1" && pwd)"
 CONTRACT_NAME="${2:-HelloContract}"
+BASELINE_PROGRAM="${3:-}"
 
 (
   cd "$GENERATED_DIR"
@@ -46,3 +47,18 @@ python3 "$ROOT_DIR/scripts/bench/optimize_artifacts.py" \
 
 echo "  optimized artifacts index: $optimized_artifacts_dir/optimized.starknet_artifacts.json"
 echo "  optimization report: $optimized_artifacts_dir/artifact_optimization_report.json"
+
+if [[ -n "$BASELINE_PROGRAM" ]]; then
+  program_file="$(find "$GENERATED_DIR/target/dev" -maxdepth 1 -name '*.sierra.json' | head -n 1)"
+  if [[ -z "$program_file" ]]; then
+    echo "baseline Sierra program given but no *.sierra.json found in $GENERATED_DIR/target/dev" >&2
+    exit 1
+  fi
+  function_diff_path="$GENERATED_DIR/target/dev/${CONTRACT_NAME}_sierra_function_diff"
+  python3 "$ROOT_DIR/scripts/sierra/diff_sierra_functions.py" \
+    --before "$BASELINE_PROGRAM" \
+    --after "$program_file" \
+    --out "$function_diff_path.json" \
+    --markdown "$function_diff_path.md" >/dev/null
+  echo "  sierra function diff: $function_diff_path.md"
+fi
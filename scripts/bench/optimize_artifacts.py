@@ -21,6 +21,16 @@ def parse_args() -> argparse.Namespace:
         default="strip_sierra_debug_info",
         help="Comma-separated pass names. Supported: strip_sierra_debug_info",
     )
+    parser.add_argument(
+        "--no-signature-cache",
+        action="store_true",
+        help="Recompute semantic signatures instead of reusing *.semsig.json next to the artifacts",
+    )
+    parser.add_argument(
+        "--sierra-layout-report",
+        default=None,
+        help="Block layout report (scripts/sierra/layout_blocks.py --report) to record in the report",
+    )
     return parser.parse_args()
 
 
@@ -45,18 +55,141 @@ def sha256_json(value: Any) -> str:
     return hashlib.sha256(encoded).hexdigest()
 
 
-def artifact_semantics_signature(
-    sierra_class: dict[str, Any], casm_class: dict[str, Any] | None
-) -> dict[str, str]:
-    signature = {
-        "sierra_program_hash": sha256_json(sierra_class.get("sierra_program", [])),
-        "sierra_entry_points_hash": sha256_json(sierra_class.get("entry_points_by_type", {})),
-        "sierra_abi_hash": sha256_json(sierra_class.get("abi", [])),
+SIGNATURE_SCHEMA = 1
+SIERRA_PROGRAM_CHUNK = 256
+
+
+def node_hash(children: dict[str, str]) -> str:
+    encoded = "".join(f"{name}\0{digest}\n" for name, digest in sorted(children.items())).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def entry_point_leaves(entry_points_by_type: dict[str, Any]) -> dict[str, Any]:
+    """Entry points keyed by `<TYPE>:<selector>`; the selector identifies an entry point across builds."""
+    leaves: dict[str, Any] = {}
+    for kind, entries in sorted(entry_points_by_type.items()):
+        for position, entry in enumerate(entries):
+            leaves[f"{kind}:{entry.get('selector', position)}"] = entry
+    return leaves
+
+
+def abi_leaves(abi: list[Any]) -> dict[str, Any]:
+    leaves: dict[str, Any] = {}
+    for item in abi:
+        key = f"{item.get('type')}:{item.get('name')}"
+        suffix = 1
+        while key in leaves:
+            suffix += 1
+            key = f"{item.get('type')}:{item.get('name')}#{suffix}"
+        leaves[key] = item
+    return leaves
+
+
+def casm_bytecode_leaves(casm_class: dict[str, Any]) -> dict[str, Any]:
+    """Split CASM bytecode at entry-point offsets so each entry point owns the code laid out after it.
+
+    Code before the first entry point is the `prelude` leaf; shared helpers placed after the last
+    entry point are attributed to that entry point.
+    """
+    bytecode = casm_class.get("bytecode", [])
+    offsets = entry_point_leaves(casm_class.get("entry_points_by_type", {}))
+    ordered = sorted({int(entry.get("offset", 0)) for entry in offsets.values()})
+    ends = dict(zip(ordered, ordered[1:] + [len(bytecode)]))
+    leaves: dict[str, Any] = {"prelude": bytecode[: ordered[0]] if ordered else bytecode}
+    for key, entry in offsets.items():
+        offset = int(entry.get("offset", 0))
+        leaves[key] = bytecode[offset : ends[offset]]
+    return leaves
+
+
+def semantics_tree(sierra_class: dict[str, Any], casm_class: dict[str, Any] | None) -> dict[str, Any]:
+    """Merkle tree over the semantic fields: one leaf per entry point, ABI item and program chunk.
+
+    The compressed `sierra_program` felts carry no function boundaries, so it is split into
+    fixed-size chunks; CASM bytecode is split per entry point.
+    """
+    program = sierra_class.get("sierra_program", [])
+    groups_raw: dict[str, dict[str, Any]] = {
+        "sierra_program": {
+            f"chunk:{start // SIERRA_PROGRAM_CHUNK:05d}": program[start : start + SIERRA_PROGRAM_CHUNK]
+            for start in range(0, len(program), SIERRA_PROGRAM_CHUNK)
+        },
+        "sierra_entry_points": entry_point_leaves(sierra_class.get("entry_points_by_type", {})),
+        "sierra_abi": abi_leaves(sierra_class.get("abi", [])),
     }
     if casm_class is not None:
-        signature["casm_bytecode_hash"] = sha256_json(casm_class.get("bytecode", []))
-        signature["casm_entry_points_hash"] = sha256_json(casm_class.get("entry_points_by_type", {}))
-    return signature
+        groups_raw["casm_entry_points"] = entry_point_leaves(casm_class.get("entry_points_by_type", {}))
+        groups_raw["casm_bytecode"] = casm_bytecode_leaves(casm_class)
+
+    groups: dict[str, Any] = {}
+    for name, leaves in groups_raw.items():
+        leaf_hashes = {key: sha256_json(value) for key, value in leaves.items()}
+        groups[name] = {"hash": node_hash(leaf_hashes), "leaves": leaf_hashes}
+    return {
+        "schema": SIGNATURE_SCHEMA,
+        "root": node_hash({name: group["hash"] for name, group in groups.items()}),
+        "groups": groups,
+    }
+
+
+def signature_summary(tree: dict[str, Any]) -> dict[str, str]:
+    summary = {f"{name}_hash": group["hash"] for name, group in tree["groups"].items()}
+    summary["root"] = tree["root"]
+    return summary
+
+
+def diverged_paths(before: dict[str, Any], after: dict[str, Any]) -> list[str]:
+    """Leaf paths whose hashes differ, descending only into subtrees whose hashes differ."""
+    if before["root"] == after["root"]:
+        return []
+    paths: list[str] = []
+    for name in sorted(set(before["groups"]) | set(after["groups"])):
+        lhs = before["groups"].get(name)
+        rhs = after["groups"].get(name)
+        if lhs is None or rhs is None:
+            paths.append(f"{name} ({'added' if lhs is None else 'removed'})")
+            continue
+        if lhs["hash"] == rhs["hash"]:
+            continue
+        for leaf in sorted(set(lhs["leaves"]) | set(rhs["leaves"])):
+            if leaf not in rhs["leaves"]:
+                paths.append(f"{name}/{leaf} (removed)")
+            elif leaf not in lhs["leaves"]:
+                paths.append(f"{name}/{leaf} (added)")
+            elif lhs["leaves"][leaf] != rhs["leaves"][leaf]:
+                paths.append(f"{name}/{leaf}")
+    return paths
+
+
+def file_digest(path: Path | None) -> str | None:
+    return None if path is None else hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def signature_cache_path(sierra_path: Path) -> Path:
+    return sierra_path.with_name(sierra_path.name + ".semsig.json")
+
+
+def cached_semantics_tree(
+    sierra_path: Path,
+    casm_path: Path | None,
+    sierra_class: dict[str, Any],
+    casm_class: dict[str, Any] | None,
+    use_cache: bool,
+) -> tuple[dict[str, Any], bool]:
+    """Return (tree, cache_hit); the cache sits next to the Sierra artifact, keyed by file digests."""
+    key = {"schema": SIGNATURE_SCHEMA, "sierra_sha256": file_digest(sierra_path), "casm_sha256": file_digest(casm_path)}
+    cache_path = signature_cache_path(sierra_path)
+    if use_cache and cache_path.is_file():
+        try:
+            cached = json.loads(cache_path.read_text())
+        except json.JSONDecodeError:
+            cached = {}
+        if cached.get("key") == key:
+            return cached["tree"], True
+    tree = semantics_tree(sierra_class, casm_class)
+    if use_cache:
+        dump_json(cache_path, {"key": key, "tree": tree})
+    return tree, False
 
 
 def apply_pass_strip_sierra_debug_info(
@@ -134,13 +267,15 @@ def main() -> int:
     casm_path = (index_path.parent / casm_rel).resolve() if casm_rel else None
     casm_class = load_json(casm_path) if casm_path else None
 
-    before_sig = artifact_semantics_signature(sierra_class, casm_class)
+    use_cache = not args.no_signature_cache
+    before_tree, cache_hit = cached_semantics_tree(sierra_path, casm_path, sierra_class, casm_class, use_cache)
     optimized_sierra, optimized_casm, pass_reports = apply_passes(sierra_class, casm_class, passes)
-    after_sig = artifact_semantics_signature(optimized_sierra, optimized_casm)
+    after_tree = semantics_tree(optimized_sierra, optimized_casm)
 
-    if before_sig != after_sig:
+    diverged = diverged_paths(before_tree, after_tree)
+    if diverged:
         raise ValueError(
-            "semantic invariants violated by artifact pass pipeline: critical Sierra/CASM fields changed"
+            "semantic invariants violated by artifact pass pipeline; diverged: " + ", ".join(diverged)
         )
 
     optimized_sierra_name = sierra_path.name.replace(".contract_class.json", ".optimized.contract_class.json")
@@ -155,6 +290,13 @@ def main() -> int:
         )
         optimized_casm_path = out_dir / optimized_casm_name
         dump_json(optimized_casm_path, optimized_casm)
+    if use_cache:
+        key = {
+            "schema": SIGNATURE_SCHEMA,
+            "sierra_sha256": file_digest(optimized_sierra_path),
+            "casm_sha256": file_digest(optimized_casm_path),
+        }
+        dump_json(signature_cache_path(optimized_sierra_path), {"key": key, "tree": after_tree})
 
     optimized_index = deepcopy(index_payload)
     optimized_contract = deepcopy(optimized_index["contracts"][selected_index])
@@ -170,13 +312,25 @@ def main() -> int:
     report = {
         "contract_name": args.contract_name,
         "passes": pass_reports,
-        "semantic_signature": {"before": before_sig, "after": after_sig},
+        "semantic_signature": {
+            "before": signature_summary(before_tree),
+            "after": signature_summary(after_tree),
+            "source_cache_hit": cache_hit,
+        },
         "source_metrics": build_metrics(sierra_class, casm_class, sierra_path),
         "optimized_metrics": build_metrics(optimized_sierra, optimized_casm, optimized_sierra_path),
         "source_index": str(index_path),
         "optimized_index": str(optimized_index_path),
     }
 
+    if args.sierra_layout_report:
+        layout = load_json(Path(args.sierra_layout_report).resolve())
+        report["sierra_layout"] = {
+            "profile": layout.get("profile"),
+            "functions": layout["functions"],
+            "profiled_jump_steps": layout["profiled_jump_steps"],
+        }
+
     report_path = out_dir / "artifact_optimization_report.json"
     dump_json(report_path, report)
 
@@ -6,10 +6,15 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import shlex
 import subprocess
+import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "sierra"))
+
+from optimize_tails import tail_merge_summary  # noqa: E402
 
 KEY_VALUE_RE = re.compile(r"^([a-zA-Z0-9_]+)\s*=\s*(.+)$")
 
@@ -20,6 +25,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--out-json", required=True)
     parser.add_argument("--out-md", required=True)
     parser.add_argument("--logs-dir", required=True)
+    parser.add_argument(
+        "--examples-manifest",
+        default="config/examples-manifest.json",
+        help="Examples manifest mapping case ids to the Lean modules measured for static gas.",
+    )
+    parser.add_argument(
+        "--sierra-gen",
+        default="lake exe leancairo-sierra-gen",
+        help="Sierra generator command used to compile the measured modules in one --batch run.",
+    )
     return parser.parse_args()
 
 
@@ -46,6 +61,86 @@ def parse_metrics(output: str) -> Dict[str, float]:
     return metrics
 
 
+def direct_sierra_program(root: Path, case_id: str) -> Path:
+    return root / "examples" / "Sierra" / case_id / "sierra" / "program.sierra.json"
+
+
+def tail_merge_metrics(root: Path, case_id: str) -> Optional[Dict[str, int]]:
+    """Statement-count delta of tail merging the case's direct Sierra program, when it has one."""
+    program = direct_sierra_program(root, case_id)
+    if not program.is_file():
+        return None
+    return tail_merge_summary(program)
+
+
+def load_direct_sierra_modules(manifest_path: Path) -> Dict[str, str]:
+    """Lean module of every example that has a direct Sierra mirror, keyed by example id."""
+    payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+    modules: Dict[str, str] = {}
+    for example in payload.get("examples", []):
+        if example.get("mirrors", {}).get("sierra_dir"):
+            modules[str(example["id"])] = str(example["module"])
+    return modules
+
+
+def compile_cost_reports(
+    root: Path, sierra_gen: List[str], modules: Dict[str, str], work_dir: Path
+) -> Dict[str, Path]:
+    """Compile every module cost-driven in one batch and return each case's optimization report."""
+    if not modules:
+        return {}
+    work_dir.mkdir(parents=True, exist_ok=True)
+    entries = [
+        {
+            "id": case_id,
+            "args": ["--module", module, "--out", str(work_dir / case_id), "--optimize-strategy", "cost-driven"],
+        }
+        for case_id, module in sorted(modules.items())
+    ]
+    manifest = work_dir / "manifest.json"
+    manifest.write_text(json.dumps({"entries": entries}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    proc = subprocess.run(
+        [*sierra_gen, "--batch", str(manifest), "--summary", str(work_dir / "summary.json")],
+        cwd=root,
+        text=True,
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        print((proc.stdout or "") + (proc.stderr or ""))
+        raise SystemExit(f"static gas compilation failed (see {work_dir / 'summary.json'})")
+    return {case_id: work_dir / case_id / "optimization-report.json" for case_id in modules}
+
+
+def static_gas_metrics(report_path: Optional[Path]) -> Optional[Dict[str, int]]:
+    """Static gas of the fixed pipeline against the same pipeline with constant propagation removed."""
+    if report_path is None:
+        return None
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    gas = 0
+    without_const_prop = 0
+    for function in report["functions"]:
+        costs = {candidate["label"]: int(candidate["cost"]["gas"]) for candidate in function["candidates"]}
+        gas += costs["fixed"]
+        without_const_prop += costs["no-const-prop"]
+    return {"gas": gas, "without_const_prop_gas": without_const_prop, "delta": gas - without_const_prop}
+
+
+def family_tail_merge(rows: List[Dict[str, object]]) -> Dict[str, int]:
+    measured = [row["tail_merge"] for row in rows if row["tail_merge"] is not None]
+    return {
+        "tail_merge_statements_before": sum(int(item["statements_before"]) for item in measured),
+        "tail_merge_statement_delta": sum(int(item["delta"]) for item in measured),
+    }
+
+
+def family_static_gas(rows: List[Dict[str, object]]) -> Dict[str, int]:
+    measured = [row["static_gas"] for row in rows if row["static_gas"] is not None]
+    return {
+        "static_gas": sum(int(item["gas"]) for item in measured),
+        "static_gas_delta": sum(int(item["delta"]) for item in measured),
+    }
+
+
 def main() -> int:
     args = parse_args()
     root = Path(__file__).resolve().parents[2]
@@ -60,6 +155,15 @@ def main() -> int:
         raise SystemExit(f"invalid benchmark harness config (no cases): {config_path}")
 
     logs_dir.mkdir(parents=True, exist_ok=True)
+    direct_sierra_modules = load_direct_sierra_modules((root / args.examples_manifest).resolve())
+    measured_modules = {
+        str(case.get("id", "")).strip(): direct_sierra_modules[str(case.get("id", "")).strip()]
+        for case in cases
+        if isinstance(case, dict) and str(case.get("id", "")).strip() in direct_sierra_modules
+    }
+    cost_reports = compile_cost_reports(
+        root, shlex.split(args.sierra_gen), measured_modules, logs_dir / "static_gas"
+    )
 
     summary_cases: List[Dict[str, object]] = []
     family_buckets: Dict[str, List[Dict[str, object]]] = {}
@@ -125,6 +229,8 @@ def main() -> int:
                 "generated_fn_avg_gas": metrics.get("generated_fn_avg_gas", 0.0),
                 "fn_improvement_pct": metrics.get("fn_improvement_pct", 0.0),
             },
+            "tail_merge": tail_merge_metrics(root, case_id),
+            "static_gas": static_gas_metrics(cost_reports.get(case_id)),
         }
         summary_cases.append(row)
         family_buckets.setdefault(family, []).append(row)
@@ -142,6 +248,8 @@ def main() -> int:
                 "case_count": len(rows),
                 "avg_sierra_improvement_pct": round(avg_sierra, 6),
                 "avg_l2_improvement_pct": round(avg_l2, 6),
+                **family_tail_merge(rows),
+                **family_static_gas(rows),
             }
         )
 
@@ -181,6 +289,31 @@ def main() -> int:
             f"| `{family_row['family']}` | `{family_row['case_count']}` | `{family_row['avg_sierra_improvement_pct']}` | `{family_row['avg_l2_improvement_pct']}` |"
         )
     lines.append("")
+    lines.append("## Tail Merge Size Deltas")
+    lines.append("")
+    lines.append("| Family | Sierra statements | Statement delta |")
+    lines.append("| --- | ---: | ---: |")
+    for family_row in family_summary:
+        lines.append(
+            f"| `{family_row['family']}` | `{family_row['tail_merge_statements_before']}` | `{family_row['tail_merge_statement_delta']}` |"
+        )
+    lines.append("")
+
+    lines.append("## Static Sierra Gas Deltas")
+    lines.append("")
+    lines.append("- Gas is the optimizer's static Sierra cost of the fixed pass pipeline.")
+    lines.append("- Delta is against the same pipeline with `constPropPass` removed, on the same source.")
+    lines.append("")
+    lines.append("| Case | Family | Static gas | Without const-prop | Delta |")
+    lines.append("| --- | --- | ---: | ---: | ---: |")
+    for row in summary_cases:
+        static_gas = row["static_gas"]
+        if static_gas is None:
+            continue
+        lines.append(
+            f"| `{row['id']}` | `{row['family']}` | `{static_gas['gas']}` | `{static_gas['without_const_prop_gas']}` | `{static_gas['delta']}` |"
+        )
+    lines.append("")
 
     out_md.parent.mkdir(parents=True, exist_ok=True)
     out_md.write_text("\n".join(lines), encoding="utf-8")
@@ -11,44 +11,51 @@ export PATH="$HOME/.elan/bin:$PATH"
 rm -rf "$OUT_BASE"
 mkdir -p "$OUT_BASE"
 
-best_strategy=""
-best_score=""
-
-printf "%-12s %-10s %-10s %-10s\n" "strategy" "score" "sierra" "casm"
-
+# Every strategy compiles the same module, so one resident generator imports it once.
+DAEMON_PY="$ROOT_DIR/scripts/workflow/compiler_daemon.py"
+daemon_status=0
+python3 "$DAEMON_PY" start || daemon_status=$?
+if [[ "$daemon_status" -eq 0 ]]; then
+  trap 'python3 "$DAEMON_PY" stop >/dev/null' EXIT
+elif [[ "$daemon_status" -ne 4 ]]; then
+  echo "compiler daemon failed to start; compiling with one process per strategy"
+fi
+
+index_files=()
 for strategy in "${STRATEGIES[@]}"; do
   strategy_safe="$(printf '%s' "$strategy" | tr -c 'a-zA-Z0-9' '_')"
   out_dir="$OUT_BASE/$strategy_safe"
   mkdir -p "$out_dir"
 
-  (
-    cd "$ROOT_DIR"
-    lake exe leancairo-gen \
-      --module "$MODULE_NAME" \
-      --out "$out_dir" \
-      --emit-casm true \
-      --optimize true \
-      --inlining-strategy "$strategy"
-  )
-
-  (
-    cd "$out_dir"
-    scarb build
-  )
-
-  index_file="$(find "$out_dir/target/dev" -maxdepth 1 -name '*.starknet_artifacts.json' | head -n 1)"
-  metrics="$(python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" --index "$index_file" --contract-name "$CONTRACT_NAME")"
-  score="$(printf '%s' "$metrics" | python3 -c 'import json,sys; print(json.load(sys.stdin)["score"])')"
-  sierra_len="$(printf '%s' "$metrics" | python3 -c 'import json,sys; print(json.load(sys.stdin)["sierra_program_len"])')"
-  casm_len="$(printf '%s' "$metrics" | python3 -c 'import json,sys; print(json.load(sys.stdin)["casm_bytecode_len"])')"
-
-  printf "%-12s %-10s %-10s %-10s\n" "$strategy" "$score" "$sierra_len" "$casm_len"
-
-  if [[ -z "$best_strategy" ]] || (( score < best_score )); then
-    best_strategy="$strategy"
-    best_score="$score"
-  fi
+  "$ROOT_DIR/scripts/workflow/build-with-store.sh" --scarb-build "$out_dir" leancairo-gen \
+    --module "$MODULE_NAME" \
+    --emit-casm true \
+    --optimize true \
+    --inlining-strategy "$strategy"
+
+  index_files+=("$(find "$out_dir/target/dev" -maxdepth 1 -name '*.starknet_artifacts.json' | head -n 1)")
 done
 
+# One batch invocation scores every candidate; rows come back in candidate order.
+python3 "$ROOT_DIR/scripts/bench/compute_sierra_cost.py" \
+  --batch "${index_files[@]}" \
+  --contract-name "$CONTRACT_NAME" \
+  --pair-sierra-program \
+  --out "$OUT_BASE/metrics.jsonl"
+
 echo
-echo "best inlining strategy: $best_strategy (score=$best_score)"
+python3 - "$OUT_BASE/metrics.jsonl" "${STRATEGIES[@]}" <<'PY'
+import json
+import sys
+
+rows = [json.loads(line) for line in open(sys.argv[1], encoding="utf-8") if line.strip()]
+strategies = sys.argv[2:]
+print(f"{'strategy':<12} {'score':<10} {'sierra':<10} {'casm':<10}")
+best = None
+for strategy, row in zip(strategies, rows):
+    print(f"{strategy:<12} {row['score']!s:<10} {row['sierra_program_len']!s:<10} {row['casm_bytecode_len']!s:<10}")
+    if best is None or row["score"] < best[1]:
+        best = (strategy, row["score"])
+print()
+print(f"best inlining strategy: {best[0]} (score={best[1]})")
+PY
@@ -51,6 +51,27 @@ for root_target in $module_roots; do
   )
 done
 
+# Store misses are compiled afterwards with one `--batch` run per generator.
+MISSES_FILE="$(mktemp)"
+trap 'rm -f "$ROWS_FILE" "$MISSES_FILE"' EXIT
+BATCH_DIR="$ROOT_DIR/.artifacts/examples_batch"
+rm -rf "$BATCH_DIR"
+mkdir -p "$BATCH_DIR"
+
+# Materializes a stored output into <out-dir>, or records the generator invocation as a batch entry.
+fetch_or_queue() {
+  local out_dir="$1" lake_exe="$2" example_id="$3"
+  shift 3
+  local status=0
+  # Mirrors are tracked files, so store hits are copied rather than hard-linked.
+  "$ROOT_DIR/scripts/workflow/build-with-store.sh" --copy --fetch-only "$out_dir" "$lake_exe" "$@" || status=$?
+  if [[ "$status" -eq 3 ]]; then
+    printf '%s\t%s\t%s\t%s\n' "$lake_exe" "$example_id" "$out_dir" "$*" >>"$MISSES_FILE"
+  elif [[ "$status" -ne 0 ]]; then
+    exit "$status"
+  fi
+}
+
 while IFS=$'\t' read -r example_id module_name lean_dir_rel sierra_dir_rel cairo_dir_rel baseline_dir_rel benchmark_dir_rel sources_csv; do
   [[ -z "$example_id" ]] && continue
   [[ "$baseline_dir_rel" == "-" ]] && baseline_dir_rel=""
@@ -112,11 +133,42 @@ while IFS=$'\t' read -r example_id module_name lean_dir_rel sierra_dir_rel cairo
 Lean source in this directory is canonical for this example.
 EOF
 
+  fetch_or_queue "$sierra_dir" leancairo-sierra-gen "$example_id" --module "$module_name" --optimize true
+  fetch_or_queue "$cairo_dir" leancairo-gen "$example_id" --module "$module_name" --emit-casm false --optimize true
+done <"$ROWS_FILE"
+
+for lake_exe in leancairo-sierra-gen leancairo-gen; do
+  manifest="$BATCH_DIR/$lake_exe.manifest.json"
+  entry_count="$(python3 - "$MISSES_FILE" "$lake_exe" "$manifest" <<'PY'
+import json
+import sys
+
+misses_path, lake_exe, manifest_path = sys.argv[1:4]
+entries = []
+for line in open(misses_path, encoding="utf-8"):
+    exe, example_id, out_dir, args = line.rstrip("\n").split("\t")
+    if exe == lake_exe:
+        entries.append({"id": example_id, "args": args.split(" ") + ["--out", out_dir]})
+with open(manifest_path, "w", encoding="utf-8") as handle:
+    handle.write(json.dumps({"entries": entries}, indent=2, sort_keys=True) + "\n")
+print(len(entries))
+PY
+)"
+  if [[ "$entry_count" -eq 0 ]]; then
+    echo "all $lake_exe outputs restored from the artifact store"
+    continue
+  fi
+  echo "compiling $entry_count $lake_exe store misses in one batch"
   (
     cd "$ROOT_DIR"
-    lake exe leancairo-sierra-gen --module "$module_name" --out "$sierra_dir" --optimize true
-    lake exe leancairo-gen --module "$module_name" --out "$cairo_dir" --emit-casm false --optimize true
+    lake exe "$lake_exe" --batch "$manifest" --summary "$BATCH_DIR/$lake_exe.summary.json"
   )
-done <"$ROWS_FILE"
+done
+
+while IFS=$'\t' read -r lake_exe example_id out_dir args; do
+  [[ -z "$lake_exe" ]] && continue
+  read -r -a generator_args <<<"$args"
+  "$ROOT_DIR/scripts/workflow/build-with-store.sh" --put-only "$out_dir" "$lake_exe" "${generator_args[@]}"
+done <"$MISSES_FILE"
 
 echo "examples generation completed"
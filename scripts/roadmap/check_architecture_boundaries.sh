@@ -44,6 +44,9 @@ layer_for_rel_path() {
     src/LeanCairo/Pipeline/Generation/*)
       echo "pipeline_generation"
       ;;
+    src/LeanCairo/Pipeline/Resident.lean)
+      echo "pipeline_resident"
+      ;;
     src/LeanCairo/CLI/*)
       echo "cli_generation"
       ;;
@@ -99,9 +102,11 @@ LeanCairo.Compiler.Proof.
 EOF
       ;;
     backend_sierra)
+      # The u128 interval analysis picks the felt252 multiplication route during emission.
       cat <<'EOF'
 LeanCairo.Core.
 LeanCairo.Compiler.IR.
+LeanCairo.Compiler.Optimize.Interval
 LeanCairo.Backend.Sierra.
 EOF
       ;;
@@ -137,6 +142,11 @@ LeanCairo.Compiler.Optimize.
 LeanCairo.Backend.Cairo.
 LeanCairo.Backend.Scarb.
 LeanCairo.Pipeline.Generation.
+EOF
+      ;;
+    pipeline_resident)
+      cat <<'EOF'
+LeanCairo.Core.
 EOF
       ;;
     cli_generation)
@@ -144,6 +154,7 @@ EOF
 LeanCairo.Core.
 LeanCairo.CLI.
 LeanCairo.Pipeline.Generation.
+LeanCairo.Pipeline.Resident
 EOF
       ;;
     cli_sierra)
@@ -151,6 +162,7 @@ EOF
 LeanCairo.Core.
 LeanCairo.SierraCLI.
 LeanCairo.Pipeline.Sierra.
+LeanCairo.Pipeline.Resident
 EOF
       ;;
     root_aggregate)
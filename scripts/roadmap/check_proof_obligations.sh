@@ -10,11 +10,16 @@ RELATION_FILE="$ROOT_DIR/src/LeanCairo/Compiler/Proof/TranslationRelation.lean"
 REQUIRED_THEOREMS=(
   "optimizeExprSound"
   "cseLetNormExprSound"
+  "gvnExprSound"
+  "constPropExprSound"
+  "selectIRContractSound"
   "optimizeExprPipelineSound"
   "sourceMIRRoundTrip_holds"
   "mirSourceRoundTrip_holds"
   "readVar_bindVar_type_non_interference"
   "readStorage_bindStorage_type_non_interference"
+  "evalExprMapRefinesEvalExpr"
+  "evalFuncMapRefinesEvalFunc"
   "readVarStrict_unsupported_failfast"
   "evalExprState_success_transition"
   "evalExprState_failure_channel"
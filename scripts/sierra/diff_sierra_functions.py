@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Function- and block-level structural diff of two direct Sierra programs with static cost attribution."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any
+
+from estimate_static_gas import DEFAULT_COST_TABLE, StaticGasEstimator, load_cost_table
+from model import ControlFlowGraph, Function, SierraProgram, load_program
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diff two direct Sierra programs function by function")
+    parser.add_argument("--before", required=True, help="Baseline Sierra program JSON")
+    parser.add_argument("--after", required=True, help="Candidate Sierra program JSON")
+    parser.add_argument("--cost-table", default=str(DEFAULT_COST_TABLE), help="Static gas cost table JSON")
+    parser.add_argument("--out", default=None, help="JSON report path (stdout when omitted)")
+    parser.add_argument("--markdown", default=None, help="Optional Markdown summary path")
+    return parser.parse_args()
+
+
+class ProgramView:
+    """Per-function blocks, libfunc names and static costs of one program."""
+
+    def __init__(self, program: SierraProgram, cost_table: dict[str, Any]) -> None:
+        self.program = program
+        self.cfg = ControlFlowGraph(program)
+        self.estimator = StaticGasEstimator(program, cost_table)
+        self.functions = {func.name: func for func in program.functions}
+
+    def libfunc_name(self, stmt_idx: int) -> str:
+        decl = self.program.libfunc(stmt_idx)
+        if decl is None:
+            return "return"
+        return decl.debug_name if decl.debug_name != "unknown" else decl.generic_id
+
+    def blocks(self, func: Function) -> list[int]:
+        return self.cfg.function_blocks(func.entry_point)
+
+    def block_signature(self, block_idx: int) -> tuple[str, ...]:
+        return tuple(self.libfunc_name(stmt_idx) for stmt_idx in self.cfg.blocks[block_idx].statements())
+
+    def block_cost(self, block_idx: int) -> int:
+        """Worst branch of each statement, excluding callee bodies so calls are not double counted."""
+        total = 0
+        for stmt_idx in self.cfg.blocks[block_idx].statements():
+            branches = max(1, len(self.program.branches(stmt_idx)))
+            total += max(self.estimator.gas(self.estimator.base_cost(stmt_idx, b)) for b in range(branches))
+        return total
+
+    def block_label(self, block_idx: int) -> str:
+        return f"block@{self.cfg.blocks[block_idx].start}"
+
+    def worst_case_gas(self, func: Function) -> int:
+        return self.estimator.gas(self.estimator.path_costs(func.entry_point)[0])
+
+    def libfunc_counts(self, func: Function) -> Counter[str]:
+        counts: Counter[str] = Counter()
+        for block_idx in self.blocks(func):
+            counts.update(self.block_signature(block_idx))
+        return counts
+
+
+def counter_delta(before: Counter[str], after: Counter[str]) -> dict[str, dict[str, int]]:
+    return {"added": dict(sorted((after - before).items())), "removed": dict(sorted((before - after).items()))}
+
+
+def delta(before: int | None, after: int | None) -> dict[str, int | None]:
+    change = None if before is None or after is None else after - before
+    return {"before": before, "after": after, "delta": change}
+
+
+def diff_blocks(lhs: ProgramView, lhs_func: Function, rhs: ProgramView, rhs_func: Function) -> dict[str, Any]:
+    lhs_blocks, rhs_blocks = lhs.blocks(lhs_func), rhs.blocks(rhs_func)
+    lhs_sigs = [lhs.block_signature(block) for block in lhs_blocks]
+    rhs_sigs = [rhs.block_signature(block) for block in rhs_blocks]
+    report: dict[str, Any] = {"unchanged": 0, "changed": [], "added": [], "removed": []}
+    matcher = SequenceMatcher(None, lhs_sigs, rhs_sigs, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            report["unchanged"] += i2 - i1
+            continue
+        paired = min(i2 - i1, j2 - j1)
+        for offset in range(paired):
+            lhs_block, rhs_block = lhs_blocks[i1 + offset], rhs_blocks[j1 + offset]
+            report["changed"].append(
+                {
+                    "before_block": lhs.block_label(lhs_block),
+                    "after_block": rhs.block_label(rhs_block),
+                    "static_cost": delta(lhs.block_cost(lhs_block), rhs.block_cost(rhs_block)),
+                    "libfuncs": counter_delta(Counter(lhs_sigs[i1 + offset]), Counter(rhs_sigs[j1 + offset])),
+                }
+            )
+        for kind, view, blocks, sigs in (
+            ("removed", lhs, lhs_blocks[i1 + paired : i2], lhs_sigs[i1 + paired : i2]),
+            ("added", rhs, rhs_blocks[j1 + paired : j2], rhs_sigs[j1 + paired : j2]),
+        ):
+            for block, sig in zip(blocks, sigs):
+                report[kind].append(
+                    {
+                        "block": view.block_label(block),
+                        "static_cost": view.block_cost(block),
+                        "libfuncs": dict(sorted(Counter(sig).items())),
+                    }
+                )
+    return report
+
+
+def diff_programs(lhs: ProgramView, rhs: ProgramView) -> dict[str, Any]:
+    functions: list[dict[str, Any]] = []
+    for name in sorted(set(lhs.functions) | set(rhs.functions)):
+        lhs_func, rhs_func = lhs.functions.get(name), rhs.functions.get(name)
+        row: dict[str, Any] = {
+            "name": name,
+            "worst_case_gas": delta(
+                lhs.worst_case_gas(lhs_func) if lhs_func else None,
+                rhs.worst_case_gas(rhs_func) if rhs_func else None,
+            ),
+            "libfuncs": counter_delta(
+                lhs.libfunc_counts(lhs_func) if lhs_func else Counter(),
+                rhs.libfunc_counts(rhs_func) if rhs_func else Counter(),
+            ),
+        }
+        if lhs_func is None or rhs_func is None:
+            row["status"] = "added" if lhs_func is None else "removed"
+        else:
+            row["blocks"] = diff_blocks(lhs, lhs_func, rhs, rhs_func)
+            changed = row["blocks"]["changed"] or row["blocks"]["added"] or row["blocks"]["removed"]
+            row["status"] = "changed" if changed or row["worst_case_gas"]["delta"] else "unchanged"
+        functions.append(row)
+    before = sum(row["worst_case_gas"]["before"] or 0 for row in functions)
+    after = sum(row["worst_case_gas"]["after"] or 0 for row in functions)
+    return {
+        "cost_model": lhs.estimator.cost_table["model"],
+        "total_worst_case_gas": delta(before, after),
+        "statements": delta(len(lhs.program), len(rhs.program)),
+        "functions": functions,
+    }
+
+
+def render_counts(counts: dict[str, int]) -> str:
+    return ", ".join(f"{name} x{count}" for name, count in counts.items()) or "-"
+
+
+def render_markdown(report: dict[str, Any]) -> str:
+    total = report["total_worst_case_gas"]
+    lines = [
+        "# Sierra Function Diff",
+        "",
+        f"- Before: `{report['before']}`",
+        f"- After: `{report['after']}`",
+        f"- Cost model: `{report['cost_model']}`",
+        f"- Static worst-case gas: `{total['before']}` -> `{total['after']}` (`{total['delta']:+d}`)",
+        "",
+        "## Function Cost Attribution",
+        "",
+        "| Function | Status | Gas before | Gas after | Delta | Libfuncs added | Libfuncs removed |",
+        "| --- | --- | ---: | ---: | ---: | --- | --- |",
+    ]
+    ranked = sorted(report["functions"], key=lambda row: (-abs(row["worst_case_gas"]["delta"] or 0), row["name"]))
+    for row in ranked:
+        gas = row["worst_case_gas"]
+        lines.append(
+            f"| `{row['name']}` | `{row['status']}` | `{gas['before']}` | `{gas['after']}` | "
+            f"`{gas['delta'] if gas['delta'] is not None else '-'}` | "
+            f"{render_counts(row['libfuncs']['added'])} | {render_counts(row['libfuncs']['removed'])} |"
+        )
+    block_rows = []
+    for row in ranked:
+        for block in row.get("blocks", {}).get("changed", []):
+            block_rows.append(
+                f"| `{row['name']}` | `{block['before_block']}` | `{block['after_block']}` | "
+                f"`{block['static_cost']['delta']}` | {render_counts(block['libfuncs']['added'])} | "
+                f"{render_counts(block['libfuncs']['removed'])} |"
+            )
+        for block in row.get("blocks", {}).get("added", []):
+            block_rows.append(
+                f"| `{row['name']}` | - | `{block['block']}` | `{block['static_cost']}` | "
+                f"{render_counts(block['libfuncs'])} | - |"
+            )
+        for block in row.get("blocks", {}).get("removed", []):
+            block_rows.append(
+                f"| `{row['name']}` | `{block['block']}` | - | `{-block['static_cost']}` | "
+                f"- | {render_counts(block['libfuncs'])} |"
+            )
+    if block_rows:
+        lines += [
+            "",
+            "## Changed Blocks",
+            "",
+            "| Function | Block before | Block after | Static cost delta | Added | Removed |",
+            "| --- | --- | --- | ---: | --- | --- |",
+            *block_rows,
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    args = parse_args()
+    cost_table = load_cost_table(Path(args.cost_table).resolve())
+    before_path, after_path = Path(args.before).resolve(), Path(args.after).resolve()
+    report = diff_programs(
+        ProgramView(load_program(before_path), cost_table), ProgramView(load_program(after_path), cost_table)
+    )
+    report = {"before": str(before_path), "after": str(after_path), **report}
+
+    rendered = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.out:
+        out_path = Path(args.out).resolve()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(rendered, encoding="utf-8")
+        print(f"wrote: {out_path}")
+    else:
+        print(rendered, end="")
+    if args.markdown:
+        md_path = Path(args.markdown).resolve()
+        md_path.parent.mkdir(parents=True, exist_ok=True)
+        md_path.write_text(render_markdown(report), encoding="utf-8")
+        print(f"wrote: {md_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Estimate worst-case Sierra gas per function from a static control-flow graph."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from model import Declaration, Function, SierraProgram, id_key
+
+DEFAULT_COST_TABLE = Path(__file__).resolve().parents[2] / "config" / "sierra-libfunc-costs.json"
+MULTI_CELL_TYPES = {"Array": 2, "Span": 2}
+
+
+class UnboundedGasError(ValueError):
+    """Raised when recursion or a control-flow cycle leaves the worst case without a static bound."""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Static worst-case Sierra gas estimate")
+    parser.add_argument("--input", required=True, help="Direct Sierra program JSON path")
+    parser.add_argument(
+        "--cost-table",
+        default=str(DEFAULT_COST_TABLE),
+        help="Versioned per-libfunc cost table JSON",
+    )
+    parser.add_argument("--out", default=None, help="Optional output report path")
+    return parser.parse_args()
+
+
+def load_cost_table(path: Path) -> dict[str, Any]:
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict):
+        raise ValueError(f"{path}: cost table must be a JSON object")
+    if payload.get("version") != 1:
+        raise ValueError(f"{path}: unsupported cost table version {payload.get('version')!r}")
+    for key in ("model", "weights", "default", "return", "libfuncs"):
+        if key not in payload:
+            raise ValueError(f"{path}: missing cost table key '{key}'")
+    return payload
+
+
+class StaticGasEstimator:
+    """Longest-path gas over the acyclic statement graph of a direct Sierra program."""
+
+    def __init__(self, program: SierraProgram, cost_table: dict[str, Any]) -> None:
+        self.program = program
+        self.cost_table = cost_table
+        self.type_sizes: dict[Any, int] = {}
+        self.function_worst: dict[Any, tuple[int, int]] = {}
+        self.functions_in_progress: set[Any] = set()
+        self.unknown_libfuncs: set[str] = set()
+
+    def type_size(self, type_id: Any) -> int:
+        type_key = id_key(type_id)
+        if type_key in self.type_sizes:
+            return self.type_sizes[type_key]
+        decl = self.program.type_decl(type_id)
+        generic_id = decl.generic_id if decl is not None else None
+        member_sizes = [self.type_size(arg) for arg in decl.type_args()] if decl is not None else []
+        if generic_id == "Struct":
+            size = sum(member_sizes)
+        elif generic_id == "Enum":
+            size = 1 + max(member_sizes, default=0)
+        else:
+            size = MULTI_CELL_TYPES.get(generic_id, 1)
+        self.type_sizes[type_key] = size
+        return size
+
+    def libfunc_cost(self, stmt_idx: int, branch_idx: int) -> tuple[int, int]:
+        steps, range_checks = self.base_cost(stmt_idx, branch_idx)
+        decl = self.program.libfunc(stmt_idx)
+        if decl.generic_id == "function_call":
+            callee_steps, callee_rc = self.callee_worst(decl)
+            steps += callee_steps
+            range_checks += callee_rc
+        return steps, range_checks
+
+    def base_cost(self, stmt_idx: int, branch_idx: int) -> tuple[int, int]:
+        """Cost of taking `branch_idx` of one statement, excluding the body of a called function."""
+        if self.program.is_return(stmt_idx):
+            ret = self.cost_table["return"]
+            return int(ret.get("steps", 0)), int(ret.get("range_checks", 0))
+        decl = self.program.libfunc(stmt_idx)
+        generic_id = decl.generic_id
+        entry = self.cost_table["libfuncs"].get(generic_id)
+        if entry is None:
+            self.unknown_libfuncs.add(generic_id or decl.debug_name)
+            entry = self.cost_table["default"]
+        branch_costs = entry.get("branches")
+        if isinstance(branch_costs, list) and branch_costs:
+            entry = branch_costs[min(branch_idx, len(branch_costs) - 1)]
+        steps = int(entry.get("steps", 0))
+        if "steps_per_cell" in entry:
+            type_args = decl.type_args()
+            cells = self.type_size(type_args[0]) if type_args else 1
+            steps += int(entry["steps_per_cell"]) * cells
+        return steps, int(entry.get("range_checks", 0))
+
+    def callee_worst(self, decl: Declaration) -> tuple[int, int]:
+        user_funcs = [arg["UserFunc"] for arg in decl.generic_args if isinstance(arg, dict) and "UserFunc" in arg]
+        if not user_funcs:
+            raise ValueError("function_call libfunc declaration is missing its UserFunc argument")
+        callee = self.program.function_by_ident(user_funcs[0])
+        if callee is None:
+            raise ValueError(f"function_call targets unknown function {user_funcs[0]!r}")
+        callee_key = id_key(user_funcs[0])
+        if callee_key not in self.function_worst:
+            if callee_key in self.functions_in_progress:
+                raise UnboundedGasError(f"recursive call cycle through {callee.name!r} has no static bound")
+            self.functions_in_progress.add(callee_key)
+            self.function_worst[callee_key] = self.path_costs(callee.entry_point)[0]
+            self.functions_in_progress.discard(callee_key)
+        return self.function_worst[callee_key]
+
+    def successors(self, stmt_idx: int) -> list[tuple[int, int]]:
+        return list(enumerate(self.program.successors(stmt_idx)))
+
+    def path_costs(self, entry_point: int) -> tuple[tuple[int, int], tuple[int, int], dict[int, tuple[int, int]]]:
+        """Return (worst, best, worst-from-statement) for the region rooted at `entry_point`."""
+        worst: dict[int, tuple[int, int]] = {}
+        best: dict[int, tuple[int, int]] = {}
+        on_stack: set[int] = set()
+        stack: list[tuple[int, bool]] = [(entry_point, False)]
+        while stack:
+            stmt_idx, expanded = stack.pop()
+            if stmt_idx in worst:
+                continue
+            if not 0 <= stmt_idx < len(self.program):
+                raise ValueError(f"control flow reaches out-of-range statement {stmt_idx}")
+            succs = self.successors(stmt_idx)
+            if not expanded:
+                if stmt_idx in on_stack:
+                    raise UnboundedGasError(f"cyclic control flow through statement {stmt_idx} has no static bound")
+                on_stack.add(stmt_idx)
+                stack.append((stmt_idx, True))
+                for _, succ in succs:
+                    if succ in on_stack:
+                        raise UnboundedGasError(f"cyclic control flow through statement {succ} has no static bound")
+                    if succ not in worst:
+                        stack.append((succ, False))
+                continue
+            on_stack.discard(stmt_idx)
+            if not succs:
+                worst[stmt_idx] = best[stmt_idx] = self.base_cost(stmt_idx, 0)
+                continue
+            arms = []
+            for branch_idx, succ in succs:
+                steps, rcs = self.libfunc_cost(stmt_idx, branch_idx)
+                arms.append(
+                    (
+                        (steps + worst[succ][0], rcs + worst[succ][1]),
+                        (steps + best[succ][0], rcs + best[succ][1]),
+                    )
+                )
+            worst[stmt_idx] = max((arm[0] for arm in arms), key=self.gas)
+            best[stmt_idx] = min((arm[1] for arm in arms), key=self.gas)
+        return worst[entry_point], best[entry_point], worst
+
+    def gas(self, cost: tuple[int, int]) -> int:
+        weights = self.cost_table["weights"]
+        return cost[0] * int(weights["step"]) + cost[1] * int(weights["range_check"])
+
+    def render_cost(self, cost: tuple[int, int]) -> dict[str, int]:
+        return {"steps": cost[0], "range_checks": cost[1], "gas": self.gas(cost)}
+
+    def branch_report(self, worst_from: dict[int, tuple[int, int]]) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        for stmt_idx in sorted(worst_from):
+            succs = self.successors(stmt_idx)
+            if len(succs) < 2:
+                continue
+            arms = []
+            for branch_idx, succ in succs:
+                steps, rcs = self.libfunc_cost(stmt_idx, branch_idx)
+                arm_cost = (steps + worst_from[succ][0], rcs + worst_from[succ][1])
+                arms.append({"branch": branch_idx, "target": succ, "worst_case_gas": self.gas(arm_cost)})
+            rows.append(
+                {
+                    "statement": stmt_idx,
+                    "libfunc": self.program.libfunc(stmt_idx).debug_name,
+                    "arms": arms,
+                }
+            )
+        return rows
+
+    def function_report(self, func: Function) -> dict[str, Any]:
+        worst, best, worst_from = self.path_costs(func.entry_point)
+        self.function_worst[id_key(func.raw["id"])] = worst
+        return {
+            "name": func.name,
+            "entry_point": func.entry_point,
+            "reachable_statements": len(worst_from),
+            "worst_case": self.render_cost(worst),
+            "best_case": self.render_cost(best),
+            "branches": self.branch_report(worst_from),
+        }
+
+
+def estimate_program(payload: dict[str, Any], cost_table: dict[str, Any]) -> dict[str, Any]:
+    program = SierraProgram(payload)
+    estimator = StaticGasEstimator(program, cost_table)
+    functions = [estimator.function_report(func) for func in program.functions]
+    return {
+        "cost_model": cost_table["model"],
+        "statement_count": len(program),
+        "function_count": len(functions),
+        "total_worst_case_gas": sum(fn["worst_case"]["gas"] for fn in functions),
+        "unknown_libfuncs": sorted(estimator.unknown_libfuncs),
+        "functions": functions,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    input_path = Path(args.input).resolve()
+    program = json.loads(input_path.read_text(encoding="utf-8"))
+    if not isinstance(program, dict):
+        raise SystemExit("input Sierra payload must be a JSON object")
+    report = estimate_program(program, load_cost_table(Path(args.cost_table).resolve()))
+    report["program"] = str(input_path)
+    rendered = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.out:
+        out_path = Path(args.out).resolve()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(rendered, encoding="utf-8")
+    print(rendered, end="")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
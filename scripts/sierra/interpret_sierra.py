@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Run direct Sierra functions on concrete inputs with the reference interpreter."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+from estimate_static_gas import DEFAULT_COST_TABLE, StaticGasEstimator, load_cost_table
+from model import EnumValue, ExecutionError, SierraInterpreter, SierraProgram, load_program, profile_payload
+from model.interpreter import FELT252_PRIME, U128_MODULUS
+
+EDGE_U128 = [0, 1, 2, U128_MODULUS - 1, U128_MODULUS - 2, 2**64, 2**64 - 1, 2**127]
+EDGE_FELT = [0, 1, 2, FELT252_PRIME - 1, 2**128, 2**128 - 1]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reference interpreter for direct Sierra programs")
+    parser.add_argument("--input", required=True, help="Direct Sierra program JSON path")
+    parser.add_argument("--cost-table", default=str(DEFAULT_COST_TABLE), help="Per-libfunc cost table JSON")
+    parser.add_argument("--function", default=None, help="Function debug name for a single run")
+    parser.add_argument("--args", default="[]", help="JSON list of non-builtin arguments for --function")
+    parser.add_argument("--vectors", default=None, help="JSON Lines file of {function, args} vectors")
+    parser.add_argument("--compare", default=None, help="Second program; run random vectors on both and diff")
+    parser.add_argument("--random", type=int, default=200, help="Random vectors per function for --compare")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --compare vectors")
+    parser.add_argument("--out", default=None, help="Optional output path (JSON Lines or JSON)")
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Write a branch-frequency profile of the runs; alone, it profiles --random vectors per function",
+    )
+    return parser.parse_args()
+
+
+class ValueCodec:
+    """Converts between JSON inputs/outputs and interpreter values by Sierra type."""
+
+    def __init__(self, program: SierraProgram) -> None:
+        self.program = program
+
+    def decl(self, type_idx: int) -> Any:
+        if type_idx >= len(self.program.types):
+            raise ExecutionError(f"undeclared type {self.program.type_name(type_idx)!r}")
+        return self.program.types[type_idx]
+
+    def members(self, type_idx: int) -> list[int]:
+        members = [self.program.type_ids.lookup(arg) for arg in self.decl(type_idx).type_args()]
+        if None in members:
+            raise ExecutionError(f"type {self.program.type_name(type_idx)!r} has an undeclared member type")
+        return members
+
+    def is_bool(self, type_idx: int) -> bool:
+        decl = self.decl(type_idx)
+        return decl.generic_id == "Enum" and decl.debug_name == "core::bool"
+
+    def from_json(self, type_idx: int, value: Any) -> Any:
+        generic_id = self.decl(type_idx).generic_id
+        if generic_id == "felt252":
+            return int(value, 0) % FELT252_PRIME if isinstance(value, str) else int(value) % FELT252_PRIME
+        if generic_id == "u128":
+            number = int(value, 0) if isinstance(value, str) else int(value)
+            if not 0 <= number < U128_MODULUS:
+                raise ExecutionError(f"u128 argument out of range: {value!r}")
+            return number
+        if self.is_bool(type_idx):
+            return EnumValue(1 if value else 0, ())
+        if generic_id == "Enum":
+            variant = int(value["variant"])
+            return EnumValue(variant, self.from_json(self.members(type_idx)[variant], value["value"]))
+        if generic_id == "Struct":
+            return tuple(self.from_json(member, item) for member, item in zip(self.members(type_idx), value))
+        if generic_id in {"Array", "Span"}:
+            return tuple(self.from_json(self.members(type_idx)[0], item) for item in value)
+        if generic_id in {"Box", "Nullable", "NonZero", "Snapshot"}:
+            return self.from_json(self.members(type_idx)[0], value)
+        raise ExecutionError(f"cannot build argument of type {self.program.type_name(type_idx)!r}")
+
+    def to_json(self, type_idx: int, value: Any) -> Any:
+        generic_id = self.decl(type_idx).generic_id
+        if self.is_bool(type_idx):
+            return value.variant == 1
+        if generic_id == "Enum":
+            return {"variant": value.variant, "value": self.to_json(self.members(type_idx)[value.variant], value.value)}
+        if generic_id == "Struct":
+            return [self.to_json(member, item) for member, item in zip(self.members(type_idx), value)]
+        if generic_id in {"Array", "Span"}:
+            return [self.to_json(self.members(type_idx)[0], item) for item in value]
+        if generic_id in {"Box", "Nullable", "NonZero", "Snapshot"}:
+            return self.to_json(self.members(type_idx)[0], value)
+        return value if isinstance(value, int) else repr(value)
+
+    def random_json(self, type_idx: int, rng: random.Random) -> Any:
+        generic_id = self.decl(type_idx).generic_id
+        if generic_id == "felt252":
+            return str(rng.choice(EDGE_FELT) if rng.random() < 0.25 else rng.randrange(FELT252_PRIME))
+        if generic_id == "u128":
+            return str(rng.choice(EDGE_U128) if rng.random() < 0.25 else rng.randrange(U128_MODULUS))
+        if self.is_bool(type_idx):
+            return rng.random() < 0.5
+        if generic_id == "Enum":
+            variant = rng.randrange(len(self.members(type_idx)))
+            return {"variant": variant, "value": self.random_json(self.members(type_idx)[variant], rng)}
+        if generic_id == "Struct":
+            return [self.random_json(member, rng) for member in self.members(type_idx)]
+        if generic_id in {"Array", "Span"}:
+            return [self.random_json(self.members(type_idx)[0], rng) for _ in range(rng.randrange(4))]
+        if generic_id in {"Box", "Nullable", "NonZero", "Snapshot"}:
+            return self.random_json(self.members(type_idx)[0], rng)
+        raise ExecutionError(f"cannot generate argument of type {self.program.type_name(type_idx)!r}")
+
+
+class Runner:
+    def __init__(self, program: SierraProgram, cost_table: dict[str, Any], profile: bool = False) -> None:
+        self.program = program
+        self.codec = ValueCodec(program)
+        estimator = StaticGasEstimator(program, cost_table)
+        self.interpreter = SierraInterpreter(program, estimator.base_cost, profile=profile)
+        self.runs = 0
+
+    def user_param_types(self, name: str) -> list[int]:
+        func = self.interpreter.function(name)
+        return [ty for ty in func.param_types if not self.interpreter.is_builtin(ty)]
+
+    def run_json(self, name: str, args: list[Any]) -> dict[str, Any]:
+        func = self.interpreter.function(name)
+        param_types = self.user_param_types(name)
+        if len(args) != len(param_types):
+            raise ExecutionError(f"{name}: expected {len(param_types)} arguments, got {len(args)}")
+        values = [self.codec.from_json(ty, arg) for ty, arg in zip(param_types, args)]
+        self.runs += 1
+        result = self.interpreter.run(name, values)
+        ret_types = [ty for ty in func.ret_types if not self.interpreter.is_builtin(ty)]
+        return {
+            "function": name,
+            "args": args,
+            "results": [self.codec.to_json(ty, value) for ty, value in zip(ret_types, result.values)],
+            "statements": result.statements,
+            "steps": result.steps,
+            "range_checks": result.range_checks,
+        }
+
+
+def compare_programs(lhs: Runner, rhs: Runner, count: int, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    mismatches: list[dict[str, Any]] = []
+    runs = 0
+    for func in lhs.program.functions:
+        if func.name not in rhs.interpreter.functions_by_name:
+            mismatches.append({"function": func.name, "error": "missing from compared program"})
+            continue
+        param_types = lhs.user_param_types(func.name)
+        for _ in range(count):
+            args = [lhs.codec.random_json(ty, rng) for ty in param_types]
+            outcomes = []
+            for runner in (lhs, rhs):
+                try:
+                    outcomes.append(runner.run_json(func.name, args)["results"])
+                except ExecutionError as exc:
+                    outcomes.append({"error": str(exc)})
+            runs += 1
+            if outcomes[0] != outcomes[1]:
+                mismatches.append({"function": func.name, "args": args, "lhs": outcomes[0], "rhs": outcomes[1]})
+                break
+    return {"runs": runs, "mismatches": mismatches, "equivalent": not mismatches}
+
+
+def main() -> int:
+    args = parse_args()
+    cost_table = load_cost_table(Path(args.cost_table).resolve())
+    runner = Runner(load_program(Path(args.input).resolve()), cost_table, profile=args.profile is not None)
+
+    if args.compare:
+        other = Runner(load_program(Path(args.compare).resolve()), cost_table)
+        report = compare_programs(runner, other, args.random, args.seed)
+        rendered = json.dumps(report, indent=2, sort_keys=True) + "\n"
+        exit_code = 0 if report["equivalent"] else 1
+    elif args.vectors:
+        lines = []
+        for raw in Path(args.vectors).read_text(encoding="utf-8").splitlines():
+            if raw.strip():
+                vector = json.loads(raw)
+                lines.append(json.dumps(runner.run_json(vector["function"], vector.get("args", [])), sort_keys=True))
+        rendered = "".join(line + "\n" for line in lines)
+        exit_code = 0
+    elif args.function:
+        rendered = json.dumps(runner.run_json(args.function, json.loads(args.args)), indent=2, sort_keys=True) + "\n"
+        exit_code = 0
+    elif args.profile:
+        rng = random.Random(args.seed)
+        lines = []
+        for func in runner.program.functions:
+            for _ in range(args.random):
+                vector = [runner.codec.random_json(ty, rng) for ty in runner.user_param_types(func.name)]
+                lines.append(json.dumps(runner.run_json(func.name, vector), sort_keys=True))
+        rendered = "".join(line + "\n" for line in lines)
+        exit_code = 0
+    else:
+        raise SystemExit("one of --function, --vectors, --compare or --profile is required")
+
+    if args.profile:
+        profile_path = Path(args.profile).resolve()
+        profile_path.parent.mkdir(parents=True, exist_ok=True)
+        profile = profile_payload(runner.program, runner.interpreter.branch_counts, "interpreter", runner.runs)
+        profile_path.write_text(json.dumps(profile, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"wrote: {profile_path}")
+
+    if args.out:
+        out_path = Path(args.out).resolve()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(rendered, encoding="utf-8")
+        print(f"wrote: {out_path}")
+    else:
+        print(rendered, end="")
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
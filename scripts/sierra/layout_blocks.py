@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Profile-guided basic-block layout of direct Sierra programs."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from array import array
+from pathlib import Path
+from typing import Any
+
+from estimate_static_gas import DEFAULT_COST_TABLE, estimate_program, load_cost_table
+from model import ControlFlowGraph, SierraProgram, id_object, load_profile, read_payload
+from optimize_peephole import check_program
+from optimize_structural import remap_statement, render_program, require_keys
+
+# Without a profile, branch 0 of a multi-branch libfunc (the success/no-overflow arm the
+# emitter places as the fallthrough) is assumed this many times likelier than each other branch.
+STATIC_BRANCH0_WEIGHT = 3.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reorder Sierra basic blocks so hot successors fall through")
+    parser.add_argument("--input", required=True, help="Input Sierra program (JSON or binary)")
+    parser.add_argument("--out", required=True, help="Output Sierra JSON path")
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Branch profile (interpret_sierra.py --profile); static branch weights when omitted",
+    )
+    parser.add_argument("--cost-table", default=str(DEFAULT_COST_TABLE), help="Static gas cost table JSON")
+    parser.add_argument("--report", default=None, help="Optional JSON layout report path")
+    return parser.parse_args()
+
+
+class BlockLayout:
+    """Chains blocks along their heaviest fallthrough-able edges, one function at a time.
+
+    A multi-branch statement's `Fallthrough` arm is a hard edge: its successor must stay next.
+    A `jump` or a single fallthrough branch is a soft edge: laying its target out next drops
+    the jump, and breaking a plain fallthrough inserts one.
+    """
+
+    def __init__(self, payload: dict[str, Any], counts: array | None) -> None:
+        self.payload = payload
+        self.program = SierraProgram(payload)
+        self.cfg = ControlFlowGraph(self.program)
+        generic = {idx: decl.generic_id for idx, decl in enumerate(self.program.libfuncs)}
+        self.is_jump = [generic.get(self.program.libfunc_of[idx]) == "jump" for idx in range(len(self.program))]
+        self.counts = counts if counts is not None else self.static_counts()
+
+    def static_counts(self) -> array:
+        """Relative branch frequencies from `STATIC_BRANCH0_WEIGHT`, propagated along forward edges."""
+        program, cfg = self.program, self.cfg
+        counts = array("d", [0.0] * len(program.branch_target))
+        for func in program.functions:
+            entry = cfg.entry_block(func.entry_point)
+            order = cfg.reverse_postorder(entry)
+            position = {block_idx: pos for pos, block_idx in enumerate(order)}
+            freq = {block_idx: 0.0 for block_idx in order}
+            freq[entry] = 1.0
+            for block_idx in order:
+                block = cfg.blocks[block_idx]
+                for stmt_idx in block.statements()[:-1]:
+                    for branch in program.branches(stmt_idx):
+                        counts[branch] = freq[block_idx]
+                weights = [STATIC_BRANCH0_WEIGHT if offset == 0 else 1.0 for offset in range(len(block.edges))]
+                for (branch, succ), weight in zip(block.edges, weights):
+                    counts[branch] = freq[block_idx] * weight / sum(weights)
+                    if position[succ] > position[block_idx]:
+                        freq[succ] += counts[branch]
+        return counts
+
+    def fallthrough_offsets(self, stmt_idx: int) -> list[int]:
+        branches = self.payload["statements"][stmt_idx]["Invocation"]["branches"]
+        return [offset for offset, branch in enumerate(branches) if branch.get("target") == "Fallthrough"]
+
+    def edge_kind(self, block_idx: int) -> str:
+        """`hard`, `soft`, `jump` or `none` for the block's single fallthrough-able edge."""
+        terminator = self.cfg.blocks[block_idx].terminator
+        if self.program.is_return(terminator):
+            return "none"
+        if self.is_jump[terminator]:
+            return "jump"
+        falls = self.fallthrough_offsets(terminator)
+        if not falls:
+            return "none"
+        return "soft" if len(self.program.branches(terminator)) == 1 else "hard"
+
+    def fallthrough_edge(self, block_idx: int) -> tuple[int, int] | None:
+        """(global branch, successor block) of the edge that may become a fallthrough."""
+        block = self.cfg.blocks[block_idx]
+        kind = self.edge_kind(block_idx)
+        if kind == "none":
+            return None
+        if kind == "hard":
+            return block.edges[self.fallthrough_offsets(block.terminator)[0]]
+        return block.edges[0]
+
+    def function_order(self, entry_point: int) -> list[int]:
+        entry = self.cfg.entry_block(entry_point)
+        blocks = self.cfg.reverse_postorder(entry)
+        chain_of = {block_idx: [block_idx] for block_idx in blocks}
+        candidates = []
+        for block_idx in blocks:
+            edge = self.fallthrough_edge(block_idx)
+            if edge is None:
+                continue
+            branch, succ = edge
+            soft = self.edge_kind(block_idx) != "hard"
+            start = self.cfg.blocks[block_idx].start
+            original = self.cfg.blocks[succ].start == self.cfg.blocks[block_idx].end
+            candidates.append((soft, -self.counts[branch], not original, start, block_idx, succ))
+        for soft, _, _, _, src, dst in sorted(candidates):
+            head, tail = chain_of[dst], chain_of[src]
+            if dst == entry or head is tail or tail[-1] != src or head[0] != dst:
+                if not soft:
+                    start = self.cfg.blocks[src].start
+                    raise ValueError(f"block@{start}: cannot keep its fallthrough successor adjacent")
+                continue
+            tail.extend(head)
+            for block_idx in head:
+                chain_of[block_idx] = tail
+        chains = {id(chain): chain for chain in chain_of.values()}.values()
+        ordered = sorted(chains, key=lambda chain: (entry not in chain, min(self.cfg.blocks[b].start for b in chain)))
+        return [block_idx for chain in ordered for block_idx in chain]
+
+    def layout(self) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        program, cfg = self.program, self.cfg
+        funcs = sorted(program.functions, key=lambda func: func.entry_point)
+        orders = [self.function_order(func.entry_point) for func in funcs]
+        placed = [block_idx for order in orders for block_idx in order]
+        if sorted(placed) != list(range(len(cfg.blocks))):
+            raise ValueError("every block must belong to exactly one function; run --eliminate-unreachable first")
+
+        jump_id = self.jump_libfunc()
+        emitted: list[dict[str, Any]] = []
+        new_index: dict[int, int] = {}
+        decisions = []
+        for func, order in zip(funcs, orders):
+            removed = added = 0
+            jump_count_before = jump_count_after = 0
+            for pos, block_idx in enumerate(order):
+                block = cfg.blocks[block_idx]
+                following = order[pos + 1] if pos + 1 < len(order) else None
+                edge = self.fallthrough_edge(block_idx)
+                kind = self.edge_kind(block_idx)
+                if kind == "jump":
+                    jump_count_before += self.counts[edge[0]]
+                for stmt_idx in block.statements():
+                    new_index[stmt_idx] = len(emitted)
+                    if kind == "jump" and stmt_idx == block.terminator and edge[1] == following:
+                        removed += 1
+                        continue
+                    emitted.append(self.payload["statements"][stmt_idx])
+                if kind == "jump" and edge[1] != following:
+                    jump_count_after += self.counts[edge[0]]
+                if kind == "soft" and edge[1] != following:
+                    added += 1
+                    jump_count_after += self.counts[edge[0]]
+                    target = {"Statement": cfg.blocks[edge[1]].start}
+                    jump = {"libfunc_id": jump_id, "args": [], "branches": [{"target": target, "results": []}]}
+                    emitted.append({"Invocation": jump})
+            decisions.append(
+                {
+                    "function": func.name,
+                    "block_order": [f"block@{cfg.blocks[block_idx].start}" for block_idx in order],
+                    "jumps_removed": removed,
+                    "jumps_added": added,
+                    "profiled_jumps": {"before": jump_count_before, "after": jump_count_after},
+                }
+            )
+
+        out = dict(self.payload)
+        out["statements"] = [remap_statement(stmt, new_index) for stmt in emitted]
+        out["funcs"] = [dict(func, entry_point=new_index[func["entry_point"]]) for func in self.payload["funcs"]]
+        if any(decision["jumps_added"] for decision in decisions) and jump_id not in [
+            decl["id"] for decl in self.payload["libfunc_declarations"]
+        ]:
+            out["libfunc_declarations"] = self.payload["libfunc_declarations"] + [
+                {"id": jump_id, "long_id": {"generic_id": "jump", "generic_args": []}}
+            ]
+        return out, decisions
+
+    def jump_libfunc(self) -> dict[str, Any]:
+        for decl in self.payload["libfunc_declarations"]:
+            if decl.get("long_id", {}).get("generic_id") == "jump":
+                return decl["id"]
+        return id_object("jump")
+
+
+def main() -> int:
+    args = parse_args()
+    input_path = Path(args.input).resolve()
+    output_path = Path(args.out).resolve()
+    payload = read_payload(input_path)
+    require_keys(payload)
+    check_program(payload)
+
+    counts = load_profile(Path(args.profile).resolve(), SierraProgram(payload)) if args.profile else None
+    optimized, decisions = BlockLayout(payload, counts).layout()
+    check_program(optimized)
+
+    cost_table = load_cost_table(Path(args.cost_table).resolve())
+    jump_steps = cost_table["libfuncs"].get("jump", cost_table["default"])["steps"]
+    gas_before = estimate_program(payload, cost_table)["total_worst_case_gas"]
+    gas_after = estimate_program(optimized, cost_table)["total_worst_case_gas"]
+    steps_before = sum(d["profiled_jumps"]["before"] for d in decisions) * jump_steps
+    steps_after = sum(d["profiled_jumps"]["after"] for d in decisions) * jump_steps
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(render_program(optimized), encoding="utf-8")
+    for decision in decisions:
+        print(
+            f"function {decision['function']}: jumps removed={decision['jumps_removed']} "
+            f"added={decision['jumps_added']}"
+        )
+    print(f"profile: {args.profile or 'static branch weights'}")
+    print(f"jump steps on profiled paths: {steps_before:g} -> {steps_after:g}")
+    print(f"static worst-case gas: {gas_before} -> {gas_after} ({gas_after - gas_before:+d})")
+    if args.report:
+        report_path = Path(args.report).resolve()
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "input": str(input_path),
+            "output": str(output_path),
+            "profile": str(Path(args.profile).resolve()) if args.profile else None,
+            "functions": decisions,
+            "profiled_jump_steps": {"before": steps_before, "after": steps_after},
+            "statements": {"before": len(payload["statements"]), "after": len(optimized["statements"])},
+            "static_worst_case_gas": {"before": gas_before, "after": gas_after, "delta": gas_after - gas_before},
+        }
+        report_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"wrote: {report_path}")
+    print(f"wrote: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
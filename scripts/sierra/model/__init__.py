@@ -0,0 +1,53 @@
+"""Shared in-memory model for direct Sierra programs.
+
+Build a `SierraProgram` once per payload (one linear pass), then derive a
+`ControlFlowGraph`, per-function `DominatorTree` and `Liveness` from it, or execute it with
+`SierraInterpreter` (optionally recording a branch-frequency profile).  Payloads are read and
+written as JSON or the compact binary encoding (`read_payload`/`write_payload`).
+"""
+
+from .cfg import BasicBlock, ControlFlowGraph
+from .dominators import DominatorTree
+from .encoding import FORMATS, iter_binary_statements, read_payload, write_payload
+from .interpreter import EnumValue, ExecutionError, ExecutionResult, SierraInterpreter
+from .liveness import Liveness
+from .profile import PROFILE_SCHEMA, load_profile, profile_payload, program_fingerprint
+from .program import (
+    RETURN,
+    Declaration,
+    Function,
+    SierraProgram,
+    debug_name,
+    fnv1a64,
+    id_key,
+    id_object,
+    load_program,
+)
+
+__all__ = [
+    "FORMATS",
+    "PROFILE_SCHEMA",
+    "RETURN",
+    "BasicBlock",
+    "ControlFlowGraph",
+    "Declaration",
+    "DominatorTree",
+    "EnumValue",
+    "ExecutionError",
+    "ExecutionResult",
+    "Function",
+    "Liveness",
+    "SierraInterpreter",
+    "SierraProgram",
+    "debug_name",
+    "fnv1a64",
+    "id_key",
+    "id_object",
+    "iter_binary_statements",
+    "load_profile",
+    "load_program",
+    "profile_payload",
+    "program_fingerprint",
+    "read_payload",
+    "write_payload",
+]
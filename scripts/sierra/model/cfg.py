@@ -0,0 +1,105 @@
+"""Basic-block control-flow graph over a `SierraProgram`."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+
+from .program import SierraProgram
+
+
+@dataclass
+class BasicBlock:
+    index: int
+    start: int
+    end: int
+    # (branch id in the program arrays, successor block) in branch order of the terminator.
+    edges: list[tuple[int, int]] = field(default_factory=list)
+    predecessors: list[int] = field(default_factory=list)
+
+    @property
+    def terminator(self) -> int:
+        return self.end - 1
+
+    @property
+    def successors(self) -> list[int]:
+        return [succ for _, succ in self.edges]
+
+    def statements(self) -> range:
+        return range(self.start, self.end)
+
+
+class ControlFlowGraph:
+    """Maximal straight-line statement runs linked by branch edges.
+
+    A block ends at a return, at any multi-branch invocation, and at any single branch
+    that does not fall through; block leaders are function entry points, explicit branch
+    targets and statements following a block end.
+    """
+
+    def __init__(self, program: SierraProgram) -> None:
+        self.program = program
+        count = len(program)
+        leaders = {func.entry_point for func in program.functions}
+        ends_block = bytearray(count)
+        for stmt_idx in range(count):
+            targets = program.successors(stmt_idx)
+            for target in targets:
+                if not 0 <= target < count:
+                    raise ValueError(f"statement {stmt_idx}: branch target {target} is out of range")
+            if program.is_return(stmt_idx) or targets != [stmt_idx + 1]:
+                ends_block[stmt_idx] = 1
+                leaders.update(targets)
+                if stmt_idx + 1 < count:
+                    leaders.add(stmt_idx + 1)
+
+        self.block_of = array("q", [-1] * count)
+        self.blocks: list[BasicBlock] = []
+        start = 0
+        for stmt_idx in range(count):
+            self.block_of[stmt_idx] = len(self.blocks)
+            if ends_block[stmt_idx] or stmt_idx + 1 in leaders or stmt_idx + 1 == count:
+                self.blocks.append(BasicBlock(len(self.blocks), start, stmt_idx + 1))
+                start = stmt_idx + 1
+
+        for block in self.blocks:
+            for branch in program.branches(block.terminator):
+                succ = self.block_of[program.branch_target[branch]]
+                block.edges.append((branch, succ))
+                self.blocks[succ].predecessors.append(block.index)
+
+    def entry_block(self, entry_point: int) -> int:
+        return self.block_of[entry_point]
+
+    def reverse_postorder(self, entry_block: int) -> list[int]:
+        """Blocks reachable from `entry_block`, each listed before all of its acyclic successors."""
+        order: list[int] = []
+        visited = {entry_block}
+        stack: list[tuple[int, int]] = [(entry_block, 0)]
+        while stack:
+            block_idx, next_edge = stack.pop()
+            edges = self.blocks[block_idx].edges
+            if next_edge < len(edges):
+                stack.append((block_idx, next_edge + 1))
+                succ = edges[next_edge][1]
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, 0))
+            else:
+                order.append(block_idx)
+        order.reverse()
+        return order
+
+    def function_blocks(self, entry_point: int) -> list[int]:
+        return self.reverse_postorder(self.entry_block(entry_point))
+
+    def back_edges(self, entry_block: int) -> list[tuple[int, int]]:
+        """Edges whose target precedes (or is) their source in reverse postorder."""
+        order = self.reverse_postorder(entry_block)
+        position = {block_idx: pos for pos, block_idx in enumerate(order)}
+        return [
+            (block_idx, succ)
+            for block_idx in order
+            for succ in self.blocks[block_idx].successors
+            if position[succ] <= position[block_idx]
+        ]
@@ -0,0 +1,54 @@
+"""Dominator tree of a function's basic blocks (Cooper-Harvey-Kennedy iteration)."""
+
+from __future__ import annotations
+
+from .cfg import ControlFlowGraph
+
+
+class DominatorTree:
+    """Immediate dominators of every block reachable from `entry_block`.
+
+    Law: `dominates(a, b)` holds iff every path from the entry to `b` passes through `a`;
+    the entry's immediate dominator is itself.
+    """
+
+    def __init__(self, cfg: ControlFlowGraph, entry_block: int) -> None:
+        self.entry = entry_block
+        self.order = cfg.reverse_postorder(entry_block)
+        position = {block_idx: pos for pos, block_idx in enumerate(self.order)}
+        self.idom: dict[int, int] = {entry_block: entry_block}
+
+        def intersect(lhs: int, rhs: int) -> int:
+            while lhs != rhs:
+                while position[lhs] > position[rhs]:
+                    lhs = self.idom[lhs]
+                while position[rhs] > position[lhs]:
+                    rhs = self.idom[rhs]
+            return lhs
+
+        changed = True
+        while changed:
+            changed = False
+            for block_idx in self.order[1:]:
+                preds = [pred for pred in cfg.blocks[block_idx].predecessors if pred in self.idom]
+                if not preds:
+                    continue
+                new_idom = preds[0]
+                for pred in preds[1:]:
+                    new_idom = intersect(pred, new_idom)
+                if self.idom.get(block_idx) != new_idom:
+                    self.idom[block_idx] = new_idom
+                    changed = True
+
+        self.children: dict[int, list[int]] = {block_idx: [] for block_idx in self.order}
+        for block_idx in self.order[1:]:
+            self.children[self.idom[block_idx]].append(block_idx)
+
+    def dominates(self, dominator: int, block_idx: int) -> bool:
+        while True:
+            if block_idx == dominator:
+                return True
+            parent = self.idom[block_idx]
+            if parent == block_idx:
+                return False
+            block_idx = parent
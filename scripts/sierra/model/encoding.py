@@ -0,0 +1,248 @@
+"""Compact binary encoding of direct Sierra program payloads.
+
+The stream is `MAGIC` followed by one tagged value.  Integers are LEB128 varints (Sierra ids
+are 64-bit hashes, Value digits are small), strings are interned on first use and later
+referenced by index, and objects are encoded against interned key "shapes" so the
+`libfunc_id`/`debug_name`/`branches` keys repeated in every statement cost one varint.
+Interning happens as values are written, so encoding and decoding are single-pass and
+statements can be consumed one at a time with `iter_binary_statements`.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+MAGIC = b"SIERRAB\x01"
+FORMATS = ("json", "binary")
+
+TAG_NULL = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_UINT = 3
+TAG_NEGINT = 4
+TAG_STR_NEW = 5
+TAG_STR_REF = 6
+TAG_LIST = 7
+TAG_OBJ_NEW_SHAPE = 8
+TAG_OBJ_SHAPE_REF = 9
+TAG_FLOAT = 10
+
+
+class BinaryEncoder:
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.strings: dict[str, int] = {}
+        self.shapes: dict[tuple[str, ...], int] = {}
+
+    def varint(self, value: int) -> None:
+        out = bytearray()
+        while True:
+            byte = value & 0x7F
+            value >>= 7
+            if value:
+                out.append(byte | 0x80)
+            else:
+                out.append(byte)
+                break
+        self.stream.write(out)
+
+    def string(self, value: str) -> None:
+        found = self.strings.get(value)
+        if found is not None:
+            self.stream.write(bytes((TAG_STR_REF,)))
+            self.varint(found)
+            return
+        self.strings[value] = len(self.strings)
+        encoded = value.encode("utf-8")
+        self.stream.write(bytes((TAG_STR_NEW,)))
+        self.varint(len(encoded))
+        self.stream.write(encoded)
+
+    def value(self, value: Any) -> None:
+        if value is None:
+            self.stream.write(bytes((TAG_NULL,)))
+        elif value is True or value is False:
+            self.stream.write(bytes((TAG_TRUE if value else TAG_FALSE,)))
+        elif isinstance(value, int):
+            self.stream.write(bytes((TAG_UINT if value >= 0 else TAG_NEGINT,)))
+            self.varint(value if value >= 0 else -value - 1)
+        elif isinstance(value, float):
+            self.stream.write(bytes((TAG_FLOAT,)))
+            self.string(repr(value))
+        elif isinstance(value, str):
+            self.string(value)
+        elif isinstance(value, list):
+            self.stream.write(bytes((TAG_LIST,)))
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, dict):
+            shape = tuple(sorted(value))
+            found = self.shapes.get(shape)
+            if found is None:
+                self.shapes[shape] = len(self.shapes)
+                self.stream.write(bytes((TAG_OBJ_NEW_SHAPE,)))
+                self.varint(len(shape))
+                for key in shape:
+                    self.string(key)
+            else:
+                self.stream.write(bytes((TAG_OBJ_SHAPE_REF,)))
+                self.varint(found)
+            for key in shape:
+                self.value(value[key])
+        else:
+            raise ValueError(f"cannot encode {type(value).__name__} in a Sierra payload")
+
+
+class BinaryDecoder:
+    """Decodes from a stream read in `CHUNK_SIZE` blocks, so large payloads are never fully buffered."""
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.buf = b""
+        self.pos = 0
+        self.strings: list[str] = []
+        self.shapes: list[tuple[str, ...]] = []
+
+    def _fill(self, need: int) -> None:
+        chunks = [self.buf[self.pos :]]
+        have = len(chunks[0])
+        while have < need:
+            chunk = self.stream.read(max(self.CHUNK_SIZE, need - have))
+            if not chunk:
+                raise ValueError("truncated binary Sierra payload")
+            chunks.append(chunk)
+            have += len(chunk)
+        self.buf = b"".join(chunks)
+        self.pos = 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.buf):
+            self._fill(1)
+        value = self.buf[self.pos]
+        self.pos += 1
+        return value
+
+    def take(self, length: int) -> bytes:
+        if self.pos + length > len(self.buf):
+            self._fill(length)
+        raw = self.buf[self.pos : self.pos + length]
+        self.pos += length
+        return raw
+
+    def varint(self) -> int:
+        byte = self.byte()
+        if byte < 0x80:
+            return byte
+        value, shift = byte & 0x7F, 7
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def string(self, tag: int) -> str:
+        if tag == TAG_STR_REF:
+            return self.strings[self.varint()]
+        if tag != TAG_STR_NEW:
+            raise ValueError(f"expected a string, found tag {tag}")
+        self.strings.append(self.take(self.varint()).decode("utf-8"))
+        return self.strings[-1]
+
+    def shape(self, tag: int) -> tuple[str, ...]:
+        if tag == TAG_OBJ_SHAPE_REF:
+            return self.shapes[self.varint()]
+        shape = tuple(self.string(self.byte()) for _ in range(self.varint()))
+        self.shapes.append(shape)
+        return shape
+
+    def value(self) -> Any:
+        tag = self.byte()
+        if tag == TAG_OBJ_SHAPE_REF or tag == TAG_OBJ_NEW_SHAPE:
+            return {key: self.value() for key in self.shape(tag)}
+        if tag == TAG_STR_REF:
+            return self.strings[self.varint()]
+        if tag == TAG_UINT:
+            return self.varint()
+        if tag == TAG_LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == TAG_STR_NEW:
+            return self.string(tag)
+        if tag == TAG_NULL:
+            return None
+        if tag in (TAG_FALSE, TAG_TRUE):
+            return tag == TAG_TRUE
+        if tag == TAG_NEGINT:
+            return -self.varint() - 1
+        if tag == TAG_FLOAT:
+            return float(self.string(self.byte()))
+        raise ValueError(f"unknown binary Sierra tag {tag}")
+
+
+def dump_binary(payload: dict[str, Any], stream: BinaryIO) -> None:
+    stream.write(MAGIC)
+    BinaryEncoder(stream).value(payload)
+
+
+def encode_binary(payload: dict[str, Any]) -> bytes:
+    buffer = io.BytesIO()
+    dump_binary(payload, buffer)
+    return buffer.getvalue()
+
+
+def _open_decoder(stream: BinaryIO) -> BinaryDecoder:
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a binary Sierra payload (bad magic)")
+    return BinaryDecoder(stream)
+
+
+def load_binary(stream: BinaryIO) -> dict[str, Any]:
+    payload = _open_decoder(stream).value()
+    if not isinstance(payload, dict):
+        raise ValueError("binary Sierra payload must encode an object")
+    return payload
+
+
+def iter_binary_statements(stream: BinaryIO) -> Iterator[dict[str, Any]]:
+    """Yield statements one at a time; other top-level sections are decoded and discarded."""
+    decoder = _open_decoder(stream)
+    tag = decoder.byte()
+    if tag not in (TAG_OBJ_NEW_SHAPE, TAG_OBJ_SHAPE_REF):
+        raise ValueError("binary Sierra payload must encode an object")
+    for key in decoder.shape(tag):
+        if key != "statements":
+            decoder.value()
+            continue
+        if decoder.byte() != TAG_LIST:
+            raise ValueError("'statements' must be a list")
+        for _ in range(decoder.varint()):
+            yield decoder.value()
+
+
+def read_payload(path: Path, fmt: str = "auto") -> dict[str, Any]:
+    """Read a Sierra payload in `fmt` ("json", "binary" or "auto" to sniff the magic)."""
+    with path.open("rb") as handle:
+        is_binary = handle.read(len(MAGIC)) == MAGIC
+        if fmt != "auto" and (fmt == "binary") != is_binary:
+            raise ValueError(f"{path}: expected a {fmt} Sierra payload")
+        handle.seek(0)
+        payload = load_binary(handle) if is_binary else json.loads(handle.read().decode("utf-8"))
+    if not isinstance(payload, dict):
+        raise ValueError(f"{path}: Sierra program must be a JSON object")
+    return payload
+
+
+def write_payload(path: Path, payload: dict[str, Any], fmt: str = "json") -> None:
+    if fmt == "binary":
+        with path.open("wb") as handle:
+            dump_binary(payload, handle)
+    elif fmt == "json":
+        path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    else:
+        raise ValueError(f"unsupported Sierra payload format '{fmt}', supported: {', '.join(FORMATS)}")
@@ -0,0 +1,248 @@
+"""Reference interpreter for the direct Sierra subset emitted by the Lean backend."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, NamedTuple
+
+from .program import Declaration, Function, SierraProgram
+
+FELT252_PRIME = 2**251 + 17 * 2**192 + 1
+U128_MODULUS = 2**128
+BUILTIN_TYPES = {"RangeCheck", "GasBuiltin"}
+INITIAL_GAS = 10**12
+DEFAULT_STATEMENT_BUDGET = 1_000_000
+
+CostFn = Callable[[int, int], "tuple[int, int]"]
+
+
+class ExecutionError(ValueError):
+    pass
+
+
+class EnumValue(NamedTuple):
+    variant: int
+    value: Any
+
+
+@dataclass
+class ExecutionResult:
+    values: list[Any]
+    statements: int
+    steps: int
+    range_checks: int
+
+
+def decode_value_arg(arg: Any) -> int:
+    """Decode a `{"Value": [sign, digits]}` generic arg.
+
+    Digits are little-endian base-256, mirroring `bigIntJson` in the subset emitter.
+    """
+    sign, digits = arg["Value"]
+    magnitude = 0
+    for digit in reversed(digits):
+        magnitude = magnitude * 256 + int(digit)
+    return -magnitude if sign < 0 else magnitude
+
+
+def value_args(decl: Declaration) -> list[int]:
+    return [decode_value_arg(arg) for arg in decl.generic_args if isinstance(arg, dict) and "Value" in arg]
+
+
+def _const_felt(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    return 0, [value_args(decl)[0] % FELT252_PRIME]
+
+
+def _const_u128(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    return 0, [value_args(decl)[0]]
+
+
+def _overflowing(op: Callable[[int, int], int]) -> Callable[[Declaration, list[Any]], tuple[int, list[Any]]]:
+    def handler(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+        range_check, lhs, rhs = args
+        raw = op(lhs, rhs)
+        return (0 if 0 <= raw < U128_MODULUS else 1), [range_check, raw % U128_MODULUS]
+
+    return handler
+
+
+def _felt_is_zero(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    return (0, []) if args[0] == 0 else (1, [args[0]])
+
+
+def _u128_eq(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    return (1 if args[0] == args[1] else 0), []
+
+
+def _guarantee_mul(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    product = args[0] * args[1]
+    return 0, [product // U128_MODULUS, product % U128_MODULUS, ("U128MulGuarantee", product)]
+
+
+def _u128s_from_felt(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    range_check, value = args
+    if value < U128_MODULUS:
+        return 0, [range_check, value]
+    return 1, [range_check, value // U128_MODULUS, value % U128_MODULUS]
+
+
+def _enum_match(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    return args[0].variant, [args[0].value]
+
+
+def _withdraw_gas(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    return 0, list(args)
+
+
+def _passthrough(decl: Declaration, args: list[Any]) -> tuple[int, list[Any]]:
+    return 0, list(args)
+
+
+LIBFUNC_HANDLERS: dict[str, Callable[[Declaration, list[Any]], tuple[int, list[Any]]]] = {
+    "array_append": lambda decl, args: (0, [args[0] + (args[1],)]),
+    "array_len": lambda decl, args: (0, [len(args[0])]),
+    "array_new": lambda decl, args: (0, [()]),
+    "bool_not_impl": lambda decl, args: (0, [EnumValue(1 - args[0].variant, ())]),
+    "branch_align": _passthrough,
+    "disable_ap_tracking": _passthrough,
+    "drop": lambda decl, args: (0, []),
+    "dup": lambda decl, args: (0, [args[0], args[0]]),
+    "enable_ap_tracking": _passthrough,
+    "enum_init": lambda decl, args: (0, [EnumValue(value_args(decl)[0], args[0])]),
+    "enum_match": _enum_match,
+    "felt252_add": lambda decl, args: (0, [(args[0] + args[1]) % FELT252_PRIME]),
+    "felt252_const": _const_felt,
+    "felt252_is_zero": _felt_is_zero,
+    "felt252_mul": lambda decl, args: (0, [(args[0] * args[1]) % FELT252_PRIME]),
+    "felt252_sub": lambda decl, args: (0, [(args[0] - args[1]) % FELT252_PRIME]),
+    "finalize_locals": _passthrough,
+    "jump": _passthrough,
+    "rename": _passthrough,
+    "snapshot_take": lambda decl, args: (0, [args[0], args[0]]),
+    "store_local": _passthrough,
+    "store_temp": _passthrough,
+    "struct_construct": lambda decl, args: (0, [tuple(args)]),
+    "struct_deconstruct": lambda decl, args: (0, list(args[0])),
+    "u128_const": _const_u128,
+    "u128_eq": _u128_eq,
+    "u128_guarantee_mul": _guarantee_mul,
+    "u128_mul_guarantee_verify": lambda decl, args: (0, [args[0]]),
+    "u128_overflowing_add": _overflowing(lambda lhs, rhs: lhs + rhs),
+    "u128_overflowing_sub": _overflowing(lambda lhs, rhs: lhs - rhs),
+    "u128_to_felt252": _passthrough,
+    "u128s_from_felt252": _u128s_from_felt,
+    "unwrap_non_zero": _passthrough,
+    "withdraw_gas": _withdraw_gas,
+}
+
+
+class SierraInterpreter:
+    """Executes functions of a `SierraProgram` with linear variable consumption.
+
+    Every use consumes its var (`dup` is the only way to copy), so a pass that reuses a
+    consumed var or reads an undefined one fails loudly instead of computing garbage.
+    `cost_fn(stmt_idx, branch_idx)` supplies (steps, range_checks) per executed branch and
+    excludes callee bodies, which are counted as they execute.  With `profile`, every taken
+    branch is counted in `branch_counts` (indexed by global branch id).
+    """
+
+    def __init__(
+        self,
+        program: SierraProgram,
+        cost_fn: CostFn | None = None,
+        statement_budget: int = DEFAULT_STATEMENT_BUDGET,
+        profile: bool = False,
+    ) -> None:
+        self.program = program
+        self.cost_fn = cost_fn
+        self.statement_budget = statement_budget
+        self.branch_counts = array("q", [0] * len(program.branch_target)) if profile else None
+        self.handlers: list[Callable[[Declaration, list[Any]], tuple[int, list[Any]]]] = []
+        for decl in program.libfuncs:
+            handler = LIBFUNC_HANDLERS.get(decl.generic_id)
+            self.handlers.append(handler if handler is not None else self._unsupported(decl))
+        self.functions_by_name = {func.name: func for func in program.functions}
+
+    @staticmethod
+    def _unsupported(decl: Declaration) -> Callable[[Declaration, list[Any]], tuple[int, list[Any]]]:
+        def handler(_: Declaration, __: list[Any]) -> tuple[int, list[Any]]:
+            raise ExecutionError(f"libfunc {decl.debug_name!r} ({decl.generic_id}) is not supported")
+
+        return handler
+
+    def function(self, name: str) -> Function:
+        func = self.functions_by_name.get(name)
+        if func is None:
+            raise ExecutionError(f"unknown function {name!r}")
+        return func
+
+    def is_builtin(self, type_idx: int) -> bool:
+        decl = self.program.types[type_idx] if type_idx < len(self.program.types) else None
+        return decl is not None and decl.generic_id in BUILTIN_TYPES
+
+    def run(self, name: str, user_args: list[Any]) -> ExecutionResult:
+        """Call `name` with values for its non-builtin params; builtin results are stripped."""
+        func = self.function(name)
+        args: list[Any] = []
+        remaining = list(user_args)
+        for type_idx in func.param_types:
+            if self.is_builtin(type_idx):
+                args.append(INITIAL_GAS if self.program.types[type_idx].generic_id == "GasBuiltin" else 0)
+            elif remaining:
+                args.append(remaining.pop(0))
+            else:
+                raise ExecutionError(f"{name}: missing argument for parameter of type {self.program.type_name(type_idx)}")
+        if remaining:
+            raise ExecutionError(f"{name}: too many arguments")
+        counters = [0, 0, 0]
+        values = self.call(func, args, counters)
+        user_values = [value for value, ty in zip(values, func.ret_types) if not self.is_builtin(ty)]
+        return ExecutionResult(user_values, counters[0], counters[1], counters[2])
+
+    def call(self, func: Function, args: list[Any], counters: list[int]) -> list[Any]:
+        if len(args) != len(func.params):
+            raise ExecutionError(f"{func.name}: expected {len(func.params)} args, got {len(args)}")
+        program = self.program
+        env: dict[int, Any] = dict(zip(func.params, args))
+        stmt_idx = func.entry_point
+        while True:
+            counters[0] += 1
+            if counters[0] > self.statement_budget:
+                raise ExecutionError(f"{func.name}: statement budget of {self.statement_budget} exhausted")
+            try:
+                inputs = [env.pop(var) for var in program.args(stmt_idx)]
+            except KeyError as exc:
+                raise ExecutionError(
+                    f"{func.name}: statement {stmt_idx} uses undefined or consumed var {program.var_name(exc.args[0])!r}"
+                ) from None
+            libfunc = program.libfunc_of[stmt_idx]
+            if libfunc < 0:
+                if env:
+                    leaked = program.var_names(sorted(env))
+                    raise ExecutionError(f"{func.name}: statement {stmt_idx} returns with unconsumed vars {leaked}")
+                self._charge(stmt_idx, 0, counters)
+                return inputs
+            decl = program.libfuncs[libfunc]
+            if decl.generic_id == "function_call":
+                callee = program.function_by_ident(next(arg["UserFunc"] for arg in decl.generic_args if "UserFunc" in arg))
+                branch, outputs = 0, self.call(callee, inputs, counters)
+            else:
+                branch, outputs = self.handlers[libfunc](decl, inputs)
+            self._charge(stmt_idx, branch, counters)
+            global_branch = program.branch_start[stmt_idx] + branch
+            if self.branch_counts is not None:
+                self.branch_counts[global_branch] += 1
+            results = program.results(global_branch)
+            if len(results) != len(outputs):
+                raise ExecutionError(
+                    f"{func.name}: statement {stmt_idx} branch {branch} binds {len(results)} results, got {len(outputs)}"
+                )
+            env.update(zip(results, outputs))
+            stmt_idx = program.branch_target[global_branch]
+
+    def _charge(self, stmt_idx: int, branch: int, counters: list[int]) -> None:
+        if self.cost_fn is not None:
+            steps, range_checks = self.cost_fn(stmt_idx, branch)
+            counters[1] += steps
+            counters[2] += range_checks
@@ -0,0 +1,51 @@
+"""Backward variable liveness over a function's basic blocks."""
+
+from __future__ import annotations
+
+from .cfg import ControlFlowGraph
+
+
+class Liveness:
+    """Per-block live-in/live-out variable sets for the blocks of one function.
+
+    Branch results are bound on the edge they belong to, so a variable produced only on the
+    taken branch of a terminator is never live into the other successor.
+    """
+
+    def __init__(self, cfg: ControlFlowGraph, entry_block: int) -> None:
+        self.cfg = cfg
+        self.program = cfg.program
+        self.blocks = cfg.reverse_postorder(entry_block)
+        self.live_in: dict[int, frozenset[int]] = {block_idx: frozenset() for block_idx in self.blocks}
+        self.live_out: dict[int, frozenset[int]] = dict(self.live_in)
+        changed = True
+        while changed:
+            changed = False
+            for block_idx in reversed(self.blocks):
+                live_out = self._edge_live_out(block_idx)
+                live_in = self._transfer(block_idx, self.cfg.blocks[block_idx].start, live_out)
+                if live_in != self.live_in[block_idx] or live_out != self.live_out[block_idx]:
+                    self.live_in[block_idx] = live_in
+                    self.live_out[block_idx] = live_out
+                    changed = True
+
+    def _edge_live_out(self, block_idx: int) -> frozenset[int]:
+        live: set[int] = set()
+        for branch, succ in self.cfg.blocks[block_idx].edges:
+            live |= self.live_in[succ].difference(self.program.results(branch))
+        return frozenset(live)
+
+    def _transfer(self, block_idx: int, stmt_idx: int, live_out: frozenset[int]) -> frozenset[int]:
+        """Live set before `stmt_idx`, given `live_out` after the terminator of its block."""
+        block = self.cfg.blocks[block_idx]
+        live = set(live_out)
+        live.update(self.program.args(block.terminator))
+        for idx in reversed(range(stmt_idx, block.end - 1)):
+            for branch in self.program.branches(idx):
+                live.difference_update(self.program.results(branch))
+            live.update(self.program.args(idx))
+        return frozenset(live)
+
+    def live_before(self, stmt_idx: int) -> frozenset[int]:
+        block_idx = self.cfg.block_of[stmt_idx]
+        return self._transfer(block_idx, stmt_idx, self.live_out[block_idx])
@@ -0,0 +1,58 @@
+"""Branch-frequency profiles keyed by Sierra statement and branch index.
+
+A profile is only meaningful for the exact statement layout it was recorded on, so it carries a
+fingerprint of the control structure (libfunc per statement and every branch target) and is
+rejected when loaded against a different program.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from array import array
+from pathlib import Path
+from typing import Any
+
+from .program import SierraProgram
+
+PROFILE_SCHEMA = "sierra_branch_profile_v1"
+
+
+def program_fingerprint(program: SierraProgram) -> str:
+    digest = hashlib.sha256()
+    for column in (program.libfunc_of, program.branch_start, program.branch_target):
+        digest.update(column.tobytes())
+    return digest.hexdigest()
+
+
+def profile_payload(program: SierraProgram, counts: array, source: str, runs: int) -> dict[str, Any]:
+    branches = []
+    for stmt_idx in range(len(program)):
+        for offset, branch in enumerate(program.branches(stmt_idx)):
+            if counts[branch]:
+                branches.append({"statement": stmt_idx, "branch": offset, "count": counts[branch]})
+    return {
+        "schema": PROFILE_SCHEMA,
+        "fingerprint": program_fingerprint(program),
+        "statement_count": len(program),
+        "source": source,
+        "runs": runs,
+        "branches": branches,
+    }
+
+
+def load_profile(path: Path, program: SierraProgram) -> array:
+    """Counts indexed by global branch id of `program`."""
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict) or payload.get("schema") != PROFILE_SCHEMA:
+        raise ValueError(f"{path}: expected a {PROFILE_SCHEMA} branch profile")
+    if payload.get("fingerprint") != program_fingerprint(program):
+        raise ValueError(f"{path}: profile was recorded on a different statement layout")
+    counts = array("q", [0] * len(program.branch_target))
+    for entry in payload["branches"]:
+        stmt_idx, offset = entry["statement"], entry["branch"]
+        branches = program.branches(stmt_idx)
+        if not 0 <= offset < len(branches):
+            raise ValueError(f"{path}: statement {stmt_idx} has no branch {offset}")
+        counts[branches[offset]] = entry["count"]
+    return counts
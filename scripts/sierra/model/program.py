@@ -0,0 +1,239 @@
+"""Interned, array-backed view of a direct Sierra program JSON payload."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from .encoding import read_payload
+
+RETURN = -1
+
+
+def id_key(ident: Any) -> Any:
+    """Identity of a Sierra id object: the numeric id when present, else its debug name."""
+    if not isinstance(ident, dict):
+        raise ValueError(f"invalid Sierra id object: {ident!r}")
+    raw = ident.get("id")
+    if isinstance(raw, int):
+        return raw
+    debug_name = ident.get("debug_name")
+    if not isinstance(debug_name, str):
+        raise ValueError(f"Sierra id object has neither numeric id nor debug_name: {ident!r}")
+    return debug_name
+
+
+def debug_name(ident: Any) -> str:
+    if isinstance(ident, dict):
+        value = ident.get("debug_name")
+        if isinstance(value, str) and value:
+            return value
+    return "unknown"
+
+
+FNV_OFFSET = 14695981039346656037
+FNV_PRIME = 1099511628211
+
+
+def fnv1a64(value: str) -> int:
+    """The emitter's id hash (`fnv1a64` in the subset Foundation module)."""
+    digest = FNV_OFFSET
+    for byte in value.encode("utf-8"):
+        digest = ((digest ^ byte) * FNV_PRIME) & 0xFFFFFFFFFFFFFFFF
+    return digest
+
+
+def id_object(name: str) -> dict[str, Any]:
+    """An id object following the emitter's `idJson`: FNV-1a64 of the debug name."""
+    return {"id": fnv1a64(name), "debug_name": name}
+
+
+class Interner:
+    """Maps Sierra id objects to dense indices in first-seen order."""
+
+    def __init__(self) -> None:
+        self.index: dict[Any, int] = {}
+        self.idents: list[dict[str, Any]] = []
+
+    def intern(self, ident: Any) -> int:
+        key = id_key(ident)
+        found = self.index.get(key)
+        if found is not None:
+            return found
+        self.index[key] = len(self.idents)
+        self.idents.append(ident)
+        return self.index[key]
+
+    def lookup(self, ident: Any) -> int | None:
+        return self.index.get(id_key(ident))
+
+    def name(self, idx: int) -> str:
+        return debug_name(self.idents[idx])
+
+    def __len__(self) -> int:
+        return len(self.idents)
+
+
+@dataclass(frozen=True)
+class Declaration:
+    debug_name: str
+    generic_id: str
+    generic_args: tuple[Any, ...]
+    raw: dict[str, Any]
+
+    def type_args(self) -> list[dict[str, Any]]:
+        return [arg["Type"] for arg in self.generic_args if isinstance(arg, dict) and "Type" in arg]
+
+
+@dataclass(frozen=True)
+class Function:
+    name: str
+    entry_point: int
+    params: tuple[int, ...]
+    param_types: tuple[int, ...]
+    ret_types: tuple[int, ...]
+    raw: dict[str, Any]
+
+
+class SierraProgram:
+    """Flat statement arrays plus interned type, libfunc, variable and function tables.
+
+    Statement `i` invokes libfunc `libfunc_of[i]` (or is a return when it is `RETURN`); its
+    arguments are `args_flat[args_start[i]:args_start[i + 1]]`.  Branch `b` of statement `i`
+    ranges over `branch_start[i]:branch_start[i + 1]`, jumps to `branch_target[b]` (already
+    resolved from `Fallthrough`) and binds `results_flat[results_start[b]:results_start[b + 1]]`.
+    """
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        for key in ("type_declarations", "libfunc_declarations", "statements", "funcs"):
+            if not isinstance(payload.get(key), list):
+                raise ValueError(f"invalid Sierra program format: '{key}' must be a list")
+        self.raw = payload
+        self.type_ids = Interner()
+        self.libfunc_ids = Interner()
+        self.var_ids = Interner()
+        self.types: list[Declaration] = []
+        self.libfuncs: list[Declaration] = []
+        self.libfunc_of = array("q")
+        self.args_start = array("q", [0])
+        self.args_flat = array("q")
+        self.branch_start = array("q", [0])
+        self.branch_target = array("q")
+        self.results_start = array("q", [0])
+        self.results_flat = array("q")
+        self._intern_declarations(payload["type_declarations"], self.type_ids, self.types)
+        self._intern_declarations(payload["libfunc_declarations"], self.libfunc_ids, self.libfuncs)
+        for stmt_idx, stmt in enumerate(payload["statements"]):
+            self._append_statement(stmt_idx, stmt)
+        self.functions = [self._function(func) for func in payload["funcs"]]
+        self.function_index = {id_key(func.raw.get("id")): func for func in self.functions}
+
+    @staticmethod
+    def _intern_declarations(entries: list[Any], interner: Interner, out: list[Declaration]) -> None:
+        for entry in entries:
+            if not isinstance(entry, dict):
+                raise ValueError(f"invalid Sierra declaration: {entry!r}")
+            if interner.lookup(entry.get("id")) is not None:
+                raise ValueError(f"duplicate Sierra declaration id: {entry.get('id')!r}")
+            interner.intern(entry["id"])
+            long_id = entry.get("long_id", {})
+            out.append(
+                Declaration(
+                    debug_name=debug_name(entry["id"]),
+                    generic_id=str(long_id.get("generic_id", "")),
+                    generic_args=tuple(long_id.get("generic_args", [])),
+                    raw=entry,
+                )
+            )
+
+    def _append_statement(self, stmt_idx: int, stmt: Any) -> None:
+        if isinstance(stmt, dict) and "Return" in stmt:
+            self.libfunc_of.append(RETURN)
+            self.args_flat.extend(self.var_ids.intern(var) for var in stmt["Return"])
+        elif isinstance(stmt, dict) and "Invocation" in stmt:
+            invocation = stmt["Invocation"]
+            libfunc = self.libfunc_ids.lookup(invocation.get("libfunc_id"))
+            if libfunc is None:
+                raise ValueError(f"statement {stmt_idx}: undeclared libfunc {invocation.get('libfunc_id')!r}")
+            self.libfunc_of.append(libfunc)
+            self.args_flat.extend(self.var_ids.intern(var) for var in invocation.get("args", []))
+            for branch in invocation.get("branches", []):
+                self.branch_target.append(resolve_target(stmt_idx, branch.get("target")))
+                self.results_flat.extend(self.var_ids.intern(var) for var in branch.get("results", []))
+                self.results_start.append(len(self.results_flat))
+        else:
+            raise ValueError(f"statement {stmt_idx}: expected Invocation or Return")
+        self.args_start.append(len(self.args_flat))
+        self.branch_start.append(len(self.branch_target))
+
+    def _function(self, func: Any) -> Function:
+        if not isinstance(func, dict) or not isinstance(func.get("entry_point"), int):
+            raise ValueError(f"invalid Sierra function entry: {func!r}")
+        if not 0 <= func["entry_point"] < len(self.libfunc_of):
+            raise ValueError(f"function {debug_name(func.get('id'))!r} has out-of-range entry_point")
+        signature = func.get("signature", {})
+        return Function(
+            name=debug_name(func.get("id")),
+            entry_point=func["entry_point"],
+            params=tuple(self.var_ids.intern(param["id"]) for param in func.get("params", [])),
+            param_types=tuple(self.type_ids.intern(ty) for ty in signature.get("param_types", [])),
+            ret_types=tuple(self.type_ids.intern(ty) for ty in signature.get("ret_types", [])),
+            raw=func,
+        )
+
+    def __len__(self) -> int:
+        return len(self.libfunc_of)
+
+    def is_return(self, stmt_idx: int) -> bool:
+        return self.libfunc_of[stmt_idx] == RETURN
+
+    def libfunc(self, stmt_idx: int) -> Declaration | None:
+        libfunc = self.libfunc_of[stmt_idx]
+        return None if libfunc == RETURN else self.libfuncs[libfunc]
+
+    def args(self, stmt_idx: int) -> array:
+        return self.args_flat[self.args_start[stmt_idx] : self.args_start[stmt_idx + 1]]
+
+    def branches(self, stmt_idx: int) -> range:
+        return range(self.branch_start[stmt_idx], self.branch_start[stmt_idx + 1])
+
+    def results(self, branch: int) -> array:
+        return self.results_flat[self.results_start[branch] : self.results_start[branch + 1]]
+
+    def successors(self, stmt_idx: int) -> list[int]:
+        return [self.branch_target[branch] for branch in self.branches(stmt_idx)]
+
+    def statement_label(self, stmt_idx: int) -> str:
+        libfunc = self.libfunc(stmt_idx)
+        return "return" if libfunc is None else f"invoke {libfunc.debug_name}"
+
+    def type_name(self, type_idx: int) -> str:
+        return self.type_ids.name(type_idx)
+
+    def type_decl(self, ident: Any) -> Declaration | None:
+        idx = self.type_ids.lookup(ident)
+        return None if idx is None or idx >= len(self.types) else self.types[idx]
+
+    def function_by_ident(self, ident: Any) -> Function | None:
+        return self.function_index.get(id_key(ident))
+
+    def var_name(self, var_idx: int) -> str:
+        return self.var_ids.name(var_idx)
+
+    def var_names(self, var_indices: Iterable[int]) -> list[str]:
+        return [self.var_name(var) for var in var_indices]
+
+
+def resolve_target(stmt_idx: int, target: Any) -> int:
+    if target == "Fallthrough":
+        return stmt_idx + 1
+    if isinstance(target, dict) and isinstance(target.get("Statement"), int):
+        return target["Statement"]
+    raise ValueError(f"statement {stmt_idx}: invalid branch target {target!r}")
+
+
+def load_program(path: Path) -> SierraProgram:
+    """Load a JSON or binary-encoded Sierra program; the format is detected from the file."""
+    return SierraProgram(read_payload(path))
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Fixed-point peephole optimization of direct Sierra programs."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from estimate_static_gas import DEFAULT_COST_TABLE, estimate_program, load_cost_table
+from model import ControlFlowGraph, Liveness, SierraProgram, id_key
+from optimize_structural import remap_statement, render_program, require_keys
+from peephole_rules import RULE_REGISTRY, PeepholeContext, Rewrite
+
+MAX_ITERATIONS = 64
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Peephole-optimize a direct Sierra program")
+    parser.add_argument("--input", required=True, help="Input Sierra JSON path")
+    parser.add_argument("--out", required=True, help="Output Sierra JSON path")
+    parser.add_argument(
+        "--rules",
+        default=",".join(RULE_REGISTRY),
+        help=f"Comma-separated rule names. Supported: {', '.join(RULE_REGISTRY)}",
+    )
+    parser.add_argument("--cost-table", default=str(DEFAULT_COST_TABLE), help="Static gas cost table JSON")
+    parser.add_argument("--report", default=None, help="Optional JSON report path")
+    return parser.parse_args()
+
+
+def check_program(payload: dict[str, Any]) -> None:
+    """Fast structural validation: resolvable ids and targets, and no use before definition."""
+    program = SierraProgram(payload)
+    cfg = ControlFlowGraph(program)
+    for func in program.functions:
+        entry = cfg.entry_block(func.entry_point)
+        undefined = Liveness(cfg, entry).live_in[entry] - set(func.params)
+        if undefined:
+            raise ValueError(f"function {func.name!r} uses undefined vars {program.var_names(sorted(undefined))}")
+
+
+def rename_vars(stmt: dict[str, Any], rename: dict[Any, dict[str, Any]]) -> dict[str, Any]:
+    def use(var: dict[str, Any]) -> dict[str, Any]:
+        return rename.get(id_key(var), var)
+
+    if "Return" in stmt:
+        return {"Return": [use(var) for var in stmt["Return"]]}
+    invocation = dict(stmt["Invocation"])
+    invocation["args"] = [use(var) for var in invocation.get("args", [])]
+    return {"Invocation": invocation}
+
+
+def apply_rewrites(payload: dict[str, Any], rewrites: list[Rewrite]) -> dict[str, Any]:
+    deleted = {stmt_idx for rewrite in rewrites for stmt_idx in rewrite.delete}
+    rename: dict[Any, dict[str, Any]] = {}
+    for rewrite in rewrites:
+        rename.update(rewrite.rename)
+    # Chase chains such as a -> b -> c introduced by separate rewrites in the same round.
+    for key, var in list(rename.items()):
+        seen = {key}
+        while id_key(var) in rename and id_key(var) not in seen:
+            seen.add(id_key(var))
+            var = rename[id_key(var)]
+        rename[key] = var
+
+    # A deleted statement is replaced by the next kept statement after it.
+    count = len(payload["statements"])
+    new_index: dict[int, int] = {}
+    kept_after = count - len(deleted)
+    for stmt_idx in reversed(range(count)):
+        if stmt_idx in deleted:
+            new_index[stmt_idx] = kept_after
+        else:
+            kept_after -= 1
+            new_index[stmt_idx] = kept_after
+
+    out = dict(payload)
+    out["statements"] = [
+        remap_statement(rename_vars(stmt, rename), new_index)
+        for stmt_idx, stmt in enumerate(payload["statements"])
+        if stmt_idx not in deleted
+    ]
+    out["funcs"] = [dict(func, entry_point=new_index[func["entry_point"]]) for func in payload["funcs"]]
+    return out
+
+
+def run_rule(payload: dict[str, Any], rule_fn: Any) -> tuple[dict[str, Any], int, int]:
+    """Apply every non-overlapping match of one rule; return (program, hits, rejected)."""
+    ctx = PeepholeContext(payload)
+    rewrites: list[Rewrite] = []
+    claimed: set[int] = set()
+    for stmt_idx in range(len(ctx.program)):
+        rewrite = rule_fn(ctx, stmt_idx)
+        if rewrite is None or claimed.intersection(rewrite.delete):
+            continue
+        claimed.update(rewrite.delete)
+        rewrites.append(rewrite)
+    if not rewrites:
+        return payload, 0, 0
+    candidate = apply_rewrites(payload, rewrites)
+    try:
+        check_program(candidate)
+        return candidate, len(rewrites), 0
+    except ValueError:
+        pass
+    # The batch failed the check: accept the first rewrite that validates on its own and let the
+    # fixed-point driver rediscover the rest against the renumbered program.
+    rejected = 0
+    for rewrite in rewrites:
+        single = apply_rewrites(payload, [rewrite])
+        try:
+            check_program(single)
+        except ValueError:
+            rejected += 1
+            continue
+        return single, 1, rejected
+    return payload, 0, rejected
+
+
+def optimize(payload: dict[str, Any], rules: list[str]) -> tuple[dict[str, Any], dict[str, Any]]:
+    require_keys(payload)
+    check_program(payload)
+    counters = {name: {"hits": 0, "rejected": 0} for name in rules}
+    current = payload
+    iterations = 0
+    while iterations < MAX_ITERATIONS:
+        iterations += 1
+        changed = False
+        for name in rules:
+            current, hits, rejected = run_rule(current, RULE_REGISTRY[name])
+            counters[name]["hits"] += hits
+            counters[name]["rejected"] += rejected
+            changed = changed or hits > 0
+        if not changed:
+            break
+    else:
+        raise ValueError(f"peephole rules did not reach a fixed point after {MAX_ITERATIONS} iterations")
+    return current, {"iterations": iterations, "rules": counters}
+
+
+def parse_rules(raw: str) -> list[str]:
+    rules = [name.strip() for name in raw.split(",") if name.strip()]
+    if not rules:
+        raise ValueError("no peephole rules specified")
+    for name in rules:
+        if name not in RULE_REGISTRY:
+            raise ValueError(f"unsupported peephole rule '{name}', supported rules: {', '.join(RULE_REGISTRY)}")
+    return rules
+
+
+def main() -> int:
+    args = parse_args()
+    input_path = Path(args.input).resolve()
+    output_path = Path(args.out).resolve()
+    payload = json.loads(input_path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict):
+        raise SystemExit("input Sierra payload must be a JSON object")
+
+    cost_table = load_cost_table(Path(args.cost_table).resolve())
+    optimized, stats = optimize(payload, parse_rules(args.rules))
+    gas_before = estimate_program(payload, cost_table)["total_worst_case_gas"]
+    gas_after = estimate_program(optimized, cost_table)["total_worst_case_gas"]
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(render_program(optimized), encoding="utf-8")
+    for name, counter in stats["rules"].items():
+        print(f"rule {name}: hits={counter['hits']} rejected={counter['rejected']}")
+    print(f"statements: {len(payload['statements'])} -> {len(optimized['statements'])}")
+    print(f"static worst-case gas: {gas_before} -> {gas_after} ({gas_after - gas_before:+d})")
+    if args.report:
+        report_path = Path(args.report).resolve()
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "input": str(input_path),
+            "output": str(output_path),
+            "iterations": stats["iterations"],
+            "rules": stats["rules"],
+            "statements": {"before": len(payload["statements"]), "after": len(optimized["statements"])},
+            "static_worst_case_gas": {"before": gas_before, "after": gas_after, "delta": gas_after - gas_before},
+        }
+        report_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"wrote: {report_path}")
+    print(f"wrote: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,11 +8,25 @@ import json
 from pathlib import Path
 from typing import Any
 
+from model import FORMATS, SierraProgram, id_key, read_payload, write_payload
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Canonicalize Sierra program structure")
-    parser.add_argument("--input", required=True, help="Input Sierra JSON path")
-    parser.add_argument("--out", required=True, help="Output Sierra JSON path")
+    parser.add_argument("--input", required=True, help="Input Sierra program path (JSON or binary, detected)")
+    parser.add_argument("--out", required=True, help="Output Sierra program path")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="Output encoding (default: json)")
+    parser.add_argument(
+        "--eliminate-unreachable",
+        action="store_true",
+        help="Drop statements unreachable from every function entry point and renumber statement targets",
+    )
+    parser.add_argument(
+        "--compact-declarations",
+        action="store_true",
+        help="Drop unreferenced type/libfunc declarations and renumber type, libfunc and var ids densely",
+    )
+    parser.add_argument("--report", default=None, help="Optional JSON report of size deltas")
     return parser.parse_args()
 
 
@@ -48,6 +62,232 @@ def read_decl_sort_key(entry: Any) -> tuple[str, str]:
     return (debug_name, id_key)
 
 
+def reachable_statements(program: SierraProgram) -> list[int]:
+    seen = bytearray(len(program))
+    worklist = [func.entry_point for func in program.functions]
+    while worklist:
+        stmt_idx = worklist.pop()
+        if seen[stmt_idx]:
+            continue
+        seen[stmt_idx] = 1
+        for target in program.successors(stmt_idx):
+            if not 0 <= target < len(program):
+                raise ValueError(f"statement {stmt_idx}: branch target {target} is out of range")
+            if not seen[target]:
+                worklist.append(target)
+    return [stmt_idx for stmt_idx in range(len(program)) if seen[stmt_idx]]
+
+
+def remap_statement(stmt: dict[str, Any], new_index: dict[int, int]) -> dict[str, Any]:
+    if "Invocation" not in stmt:
+        return stmt
+    invocation = dict(stmt["Invocation"])
+    branches = []
+    for branch in invocation.get("branches", []):
+        target = branch.get("target")
+        if isinstance(target, dict) and "Statement" in target:
+            branch = dict(branch)
+            branch["target"] = {"Statement": new_index[target["Statement"]]}
+        branches.append(branch)
+    invocation["branches"] = branches
+    return {"Invocation": invocation}
+
+
+def eliminate_unreachable(payload: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    """Remove statements no entry point reaches; return the program and the removed count.
+
+    Kept statements keep their relative order, so a `Fallthrough` successor (always reachable
+    when its predecessor is) stays adjacent and only explicit targets need renumbering.
+    """
+    require_keys(payload)
+    kept = reachable_statements(SierraProgram(payload))
+    removed = len(payload["statements"]) - len(kept)
+    if removed == 0:
+        return payload, 0
+    new_index = {old: new for new, old in enumerate(kept)}
+    out = dict(payload)
+    out["statements"] = [remap_statement(payload["statements"][old], new_index) for old in kept]
+    out["funcs"] = [dict(func, entry_point=new_index[func["entry_point"]]) for func in payload["funcs"]]
+    return out, removed
+
+
+# Type generic ids a libfunc's signature uses without naming them in its generic args. Libfuncs
+# outside this table may depend on any type, so type pruning is skipped when one is invoked.
+IMPLICIT_LIBFUNC_TYPES: dict[str, tuple[str, ...]] = {
+    "array_append": ("Array",),
+    "array_len": ("Array", "Snapshot", "u32"),
+    "array_new": ("Array",),
+    "bool_not_impl": ("Enum",),
+    "branch_align": (),
+    "disable_ap_tracking": (),
+    "drop": (),
+    "dup": (),
+    "enable_ap_tracking": (),
+    "enum_init": (),
+    "enum_match": (),
+    "felt252_add": ("felt252",),
+    "felt252_const": ("felt252",),
+    "felt252_is_zero": ("felt252", "NonZero"),
+    "felt252_mul": ("felt252",),
+    "felt252_sub": ("felt252",),
+    "finalize_locals": (),
+    "function_call": (),
+    "jump": (),
+    "rename": (),
+    "snapshot_take": ("Snapshot",),
+    "store_local": (),
+    "store_temp": (),
+    "struct_construct": (),
+    "struct_deconstruct": (),
+    "u128_const": ("u128",),
+    "u128_eq": ("u128",),
+    "u128_guarantee_mul": ("u128", "U128MulGuarantee"),
+    "u128_mul_guarantee_verify": ("RangeCheck", "U128MulGuarantee"),
+    "u128_overflowing_add": ("RangeCheck", "u128"),
+    "u128_overflowing_sub": ("RangeCheck", "u128"),
+    "u128_to_felt252": ("felt252",),
+    "u128s_from_felt252": ("RangeCheck", "felt252", "u128"),
+    "unwrap_non_zero": ("NonZero",),
+    "withdraw_gas": ("GasBuiltin", "RangeCheck"),
+}
+
+
+def type_refs(generic_args: Any) -> list[Any]:
+    return [arg["Type"] for arg in generic_args if isinstance(arg, dict) and "Type" in arg]
+
+
+def prune_declarations(payload: dict[str, Any]) -> dict[str, Any]:
+    """Keep invoked libfuncs and the types reachable from them, from signatures and from the
+    implicit types of the invoked libfuncs (see `IMPLICIT_LIBFUNC_TYPES`)."""
+    used_libfuncs = {
+        id_key(stmt["Invocation"]["libfunc_id"]) for stmt in payload["statements"] if "Invocation" in stmt
+    }
+    libfuncs = [decl for decl in payload["libfunc_declarations"] if id_key(decl["id"]) in used_libfuncs]
+
+    out = dict(payload)
+    out["libfunc_declarations"] = libfuncs
+    implicit_generics: set[str] = set()
+    for decl in libfuncs:
+        generic_id = decl.get("long_id", {}).get("generic_id")
+        if generic_id not in IMPLICIT_LIBFUNC_TYPES:
+            return out
+        implicit_generics.update(IMPLICIT_LIBFUNC_TYPES[generic_id])
+
+    types_by_key = {id_key(decl["id"]): decl for decl in payload["type_declarations"]}
+    worklist: list[Any] = [
+        decl["id"]
+        for decl in payload["type_declarations"]
+        if decl.get("long_id", {}).get("generic_id") in implicit_generics
+    ]
+    for decl in libfuncs:
+        worklist.extend(type_refs(decl.get("long_id", {}).get("generic_args", [])))
+    for func in payload["funcs"]:
+        signature = func.get("signature", {})
+        worklist.extend(signature.get("param_types", []))
+        worklist.extend(signature.get("ret_types", []))
+        worklist.extend(param["ty"] for param in func.get("params", []))
+    live_types: set[Any] = set()
+    while worklist:
+        key = id_key(worklist.pop())
+        if key in live_types:
+            continue
+        live_types.add(key)
+        decl = types_by_key.get(key)
+        if decl is not None:
+            worklist.extend(type_refs(decl.get("long_id", {}).get("generic_args", [])))
+
+    out["type_declarations"] = [decl for decl in payload["type_declarations"] if id_key(decl["id"]) in live_types]
+    return out
+
+
+def renumber_ids(payload: dict[str, Any]) -> dict[str, Any]:
+    """Renumber type and libfunc ids by declaration order and var ids by first occurrence.
+
+    Debug names are kept; only the numeric `id` fields change, so the output no longer follows
+    the FNV-1a debug-name hash policy of the emitter.
+    """
+    type_ids = {id_key(decl["id"]): idx for idx, decl in enumerate(payload["type_declarations"])}
+    libfunc_ids = {id_key(decl["id"]): idx for idx, decl in enumerate(payload["libfunc_declarations"])}
+    var_ids: dict[Any, int] = {}
+
+    def type_id(ident: dict[str, Any]) -> dict[str, Any]:
+        key = id_key(ident)
+        if key not in type_ids:
+            raise ValueError(f"reference to undeclared type {ident!r}")
+        return dict(ident, id=type_ids[key])
+
+    def var_id(ident: dict[str, Any]) -> dict[str, Any]:
+        return dict(ident, id=var_ids.setdefault(id_key(ident), len(var_ids)))
+
+    def long_id(decl: dict[str, Any]) -> dict[str, Any]:
+        value = dict(decl.get("long_id", {}))
+        value["generic_args"] = [
+            {"Type": type_id(arg["Type"])} if isinstance(arg, dict) and "Type" in arg else arg
+            for arg in value.get("generic_args", [])
+        ]
+        return value
+
+    out = dict(payload)
+    out["type_declarations"] = [
+        dict(decl, id=type_id(decl["id"]), long_id=long_id(decl)) for decl in payload["type_declarations"]
+    ]
+    out["libfunc_declarations"] = [
+        dict(decl, id=dict(decl["id"], id=libfunc_ids[id_key(decl["id"])]), long_id=long_id(decl))
+        for decl in payload["libfunc_declarations"]
+    ]
+
+    funcs = []
+    for func in payload["funcs"]:
+        signature = func.get("signature", {})
+        funcs.append(
+            dict(
+                func,
+                signature=dict(
+                    signature,
+                    param_types=[type_id(ty) for ty in signature.get("param_types", [])],
+                    ret_types=[type_id(ty) for ty in signature.get("ret_types", [])],
+                ),
+                params=[dict(param, id=var_id(param["id"]), ty=type_id(param["ty"])) for param in func.get("params", [])],
+            )
+        )
+    out["funcs"] = funcs
+
+    statements = []
+    for stmt in payload["statements"]:
+        if "Return" in stmt:
+            statements.append({"Return": [var_id(var) for var in stmt["Return"]]})
+            continue
+        invocation = stmt["Invocation"]
+        statements.append(
+            {
+                "Invocation": dict(
+                    invocation,
+                    libfunc_id=dict(invocation["libfunc_id"], id=libfunc_ids[id_key(invocation["libfunc_id"])]),
+                    args=[var_id(var) for var in invocation.get("args", [])],
+                    branches=[
+                        dict(branch, results=[var_id(var) for var in branch.get("results", [])])
+                        for branch in invocation.get("branches", [])
+                    ],
+                )
+            }
+        )
+    out["statements"] = statements
+    return out
+
+
+def render_program(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, indent=2, sort_keys=True) + "\n"
+
+
+def size_summary(payload: dict[str, Any]) -> dict[str, int]:
+    return {
+        "bytes": len(render_program(payload).encode("utf-8")),
+        "type_declarations": len(payload["type_declarations"]),
+        "libfunc_declarations": len(payload["libfunc_declarations"]),
+        "statements": len(payload["statements"]),
+    }
+
+
 def canonicalize(payload: dict[str, Any]) -> dict[str, Any]:
     require_keys(payload)
     out = dict(payload)
@@ -61,13 +301,45 @@ def main() -> int:
     input_path = Path(args.input).resolve()
     output_path = Path(args.out).resolve()
 
-    payload = json.loads(input_path.read_text(encoding="utf-8"))
-    if not isinstance(payload, dict):
-        raise SystemExit("input Sierra payload must be a JSON object")
+    payload = read_payload(input_path)
 
+    before = size_summary(canonicalize(payload))
     optimized = canonicalize(payload)
+    if args.eliminate_unreachable:
+        optimized, removed = eliminate_unreachable(optimized)
+        print(f"unreachable statements removed: {removed}")
+    if args.compact_declarations:
+        optimized = renumber_ids(prune_declarations(optimized))
+    after = size_summary(optimized)
+    delta = {key: after[key] - before[key] for key in before}
+    if args.compact_declarations:
+        print(
+            "declarations pruned: "
+            f"types {-delta['type_declarations']}, libfuncs {-delta['libfunc_declarations']}"
+        )
+    print(f"size bytes: {before['bytes']} -> {after['bytes']} ({delta['bytes']:+d})")
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(optimized, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    write_payload(output_path, optimized, args.format)
+    if args.format == "binary":
+        print(f"binary encoding bytes: {output_path.stat().st_size}")
+    if args.report:
+        report_path = Path(args.report).resolve()
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "input": str(input_path),
+            "output": str(output_path),
+            "format": args.format,
+            "passes": {
+                "eliminate_unreachable": args.eliminate_unreachable,
+                "compact_declarations": args.compact_declarations,
+            },
+            "before": before,
+            "after": after,
+            "delta": delta,
+        }
+        report_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"wrote: {report_path}")
     print(f"wrote: {output_path}")
     return 0
 
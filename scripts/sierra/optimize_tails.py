@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Common-suffix (tail) merging of sibling branch arms in direct Sierra programs."""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from estimate_static_gas import DEFAULT_COST_TABLE, estimate_program, load_cost_table
+from model import ControlFlowGraph, SierraProgram, id_object, read_payload
+from optimize_peephole import check_program
+from optimize_structural import remap_statement, render_program, require_keys
+
+MAX_ITERATIONS = 64
+# Libfuncs whose results are deferred or aliased values with no ap change. Any other libfunc in
+# an arm prefix moves ap, so sibling prefixes must run the same sequence of them for cell
+# references (`[ap - k]`) to agree at the merge point.
+ZERO_AP_LIBFUNCS = {
+    "drop",
+    "dup",
+    "enum_init",
+    "felt252_add",
+    "felt252_const",
+    "felt252_mul",
+    "felt252_sub",
+    "rename",
+    "snapshot_take",
+    "struct_construct",
+    "struct_deconstruct",
+    "u128_const",
+    "u128_to_felt252",
+    "unwrap_non_zero",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge identical statement suffixes of sibling branch arms")
+    parser.add_argument("--input", required=True, help="Input Sierra program (JSON or binary)")
+    parser.add_argument("--out", required=True, help="Output Sierra JSON path")
+    parser.add_argument("--cost-table", default=str(DEFAULT_COST_TABLE), help="Static gas cost table JSON")
+    parser.add_argument("--report", default=None, help="Optional JSON report path")
+    return parser.parse_args()
+
+
+def splice(payload: dict[str, Any], replacements: dict[int, list[dict[str, Any]]]) -> dict[str, Any]:
+    """Replace each listed statement by its replacement list; branches to it land on the first replacement."""
+    new_index: dict[int, int] = {}
+    position = 0
+    for stmt_idx in range(len(payload["statements"])):
+        new_index[stmt_idx] = position
+        position += len(replacements.get(stmt_idx, [None]))
+    statements: list[dict[str, Any]] = []
+    for stmt_idx, stmt in enumerate(payload["statements"]):
+        for out in replacements.get(stmt_idx, [stmt]):
+            statements.append(remap_statement(out, new_index))
+    out = dict(payload)
+    out["statements"] = statements
+    out["funcs"] = [dict(func, entry_point=new_index[func["entry_point"]]) for func in payload["funcs"]]
+    return out
+
+
+class TailMerger:
+    """Finds, per multi-branch statement, arms whose tails can share one copy.
+
+    An arm is the `branch_align`-headed block a branch targets when that branch is its only
+    predecessor; sibling arms end either in a Return or by flowing (`jump` or fallthrough) into
+    the same join block.  A merged tail may only read vars that every arm holds in the same
+    place: vars defined before the branching statement, or `store_temp` results pushed at the
+    same position of identical ap-moving prefixes (renamed to the kept arm's names).
+
+    On current emitter output this merges nothing: the bool-returning arms end in
+    `enum_init; store_temp; return` with different variants, so the `store_temp` reads a deferred
+    `enum_init` value that differs per arm and CASM would reject the merge. The only shareable
+    tail is the `return` alone, which saves no statement over the `jump` that would replace it.
+    """
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+        self.program = SierraProgram(payload)
+        self.cfg = ControlFlowGraph(self.program)
+        program = self.program
+        self.generic = [
+            program.libfuncs[program.libfunc_of[idx]].generic_id if not program.is_return(idx) else "return"
+            for idx in range(len(program))
+        ]
+        self.definitions: dict[int, int] = {}
+        for stmt_idx in range(len(program)):
+            for branch in program.branches(stmt_idx):
+                for var in program.results(branch):
+                    self.definitions[var] = -1 if var in self.definitions else stmt_idx
+        for func in program.functions:
+            for var in func.params:
+                self.definitions[var] = -1 if var in self.definitions else -2
+        self.var_objects: dict[int, dict[str, Any]] = {}
+        for stmt in payload["statements"]:
+            invocation = stmt.get("Invocation", {})
+            for var in invocation.get("args", []) + [v for b in invocation.get("branches", []) for v in b["results"]]:
+                self.var_objects.setdefault(program.var_ids.lookup(var), var)
+
+    def arm_body(self, block_idx: int) -> list[int]:
+        block = self.cfg.blocks[block_idx]
+        body = list(block.statements())
+        return body[:-1] if self.generic[block.terminator] == "jump" else body
+
+    def arm_exit(self, block_idx: int) -> Any:
+        """`return`, the join block the arm flows into, or None for any other arm shape."""
+        block = self.cfg.blocks[block_idx]
+        if self.program.is_return(block.terminator):
+            return "return"
+        branches = self.program.branches(block.terminator)
+        return block.edges[0][1] if len(branches) == 1 else None
+
+    def sibling_groups(self) -> list[list[int]]:
+        groups = []
+        for block in self.cfg.blocks:
+            if len(block.edges) < 2:
+                continue
+            by_exit: dict[Any, list[int]] = {}
+            for _, succ in block.edges:
+                arm = self.cfg.blocks[succ]
+                if arm.predecessors != [block.index] or self.generic[arm.start] != "branch_align":
+                    continue
+                exit_key = self.arm_exit(succ)
+                if exit_key is not None and succ not in by_exit.get(exit_key, []):
+                    by_exit.setdefault(exit_key, []).append(succ)
+            groups.extend(arms for arms in by_exit.values() if len(arms) > 1)
+        return groups
+
+    def ap_prefix(self, body: list[int]) -> list[int] | None:
+        """Libfunc ids of the ap-moving statements of an arm prefix (None when ap is not trackable)."""
+        moves = []
+        for stmt_idx in body[1:]:
+            if self.generic[stmt_idx] == "function_call":
+                return None
+            if self.generic[stmt_idx] not in ZERO_AP_LIBFUNCS:
+                moves.append(self.program.libfunc_of[stmt_idx])
+        return moves
+
+    def common_suffix(self, keep: int, other: int) -> tuple[int, dict[int, int]]:
+        """Length of the mergeable suffix of `other` onto `keep`, and other-var -> keep-var renames."""
+        program = self.program
+        keep_body, other_body = self.arm_body(keep), self.arm_body(other)
+        forward: dict[int, int] = {}
+        backward: dict[int, int] = {}
+        best, best_renames = 0, {}
+        length = 0
+        while length < min(len(keep_body), len(other_body)) - 1:
+            kept, dropped = keep_body[-1 - length], other_body[-1 - length]
+            if program.libfunc_of[kept] != program.libfunc_of[dropped] or self.generic[kept] == "branch_align":
+                break
+            pairs_ok = True
+            for kept_branch, other_branch in zip(program.branches(kept), program.branches(dropped)):
+                for kept_var, other_var in zip(program.results(kept_branch), program.results(other_branch)):
+                    # A result read after the tail (or never read) must already share its name.
+                    if forward.get(other_var, kept_var if other_var == kept_var else None) != kept_var:
+                        pairs_ok = False
+                    if backward.get(kept_var, other_var) != other_var:
+                        pairs_ok = False
+            for kept_var, other_var in zip(program.args(kept), program.args(dropped)):
+                if forward.setdefault(other_var, kept_var) != kept_var:
+                    pairs_ok = False
+                if backward.setdefault(kept_var, other_var) != other_var:
+                    pairs_ok = False
+            if not pairs_ok:
+                break
+            length += 1
+            renames = self.legal_renames(keep_body, other_body, length, forward)
+            if renames is not None:
+                best, best_renames = length, renames
+        return best, best_renames
+
+    def legal_renames(
+        self, keep_body: list[int], other_body: list[int], length: int, forward: dict[int, int]
+    ) -> dict[int, int] | None:
+        """Renames making the tail's upward-exposed vars agree, or None when they cannot."""
+        program = self.program
+        keep_tail, other_tail = keep_body[-length:], other_body[-length:]
+        keep_prefix, other_prefix = keep_body[: len(keep_body) - length], other_body[: len(other_body) - length]
+        keep_moves, other_moves = self.ap_prefix(keep_prefix), self.ap_prefix(other_prefix)
+        if keep_moves is None or keep_moves != other_moves:
+            return None
+        defined_in_tail = {var for idx in other_tail for b in program.branches(idx) for var in program.results(b)}
+        arm_vars = {
+            var for idx in keep_prefix + other_prefix for b in program.branches(idx) for var in program.results(b)
+        }
+        branching = self.cfg.blocks[self.cfg.blocks[self.cfg.block_of[keep_tail[0]]].predecessors[0]].terminator
+        arm_vars.update(var for b in program.branches(branching) for var in program.results(b))
+        renames = {}
+        for other_var, kept_var in forward.items():
+            if other_var in defined_in_tail:
+                continue
+            if other_var == kept_var and other_var not in arm_vars:
+                continue
+            kept_def, other_def = self.definitions.get(kept_var, -1), self.definitions.get(other_var, -1)
+            if kept_def not in keep_prefix or other_def not in other_prefix:
+                return None
+            if self.generic[kept_def] != "store_temp" or self.generic[other_def] != "store_temp":
+                return None
+            if self.push_position(keep_prefix, kept_def) != self.push_position(other_prefix, other_def):
+                return None
+            if other_var != kept_var:
+                renames[other_var] = kept_var
+        return renames
+
+    def push_position(self, prefix: list[int], stmt_idx: int) -> int:
+        return sum(1 for idx in prefix[1 : prefix.index(stmt_idx)] if self.generic[idx] not in ZERO_AP_LIBFUNCS)
+
+    def merge_round(self, jump_id: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        replacements: dict[int, list[dict[str, Any]]] = {}
+        merges = []
+        for arms in self.sibling_groups():
+            # Keep the tail in the arm that falls through into the join, so it needs no new jump.
+            keep = min(arms, key=lambda arm: (self.generic[self.cfg.blocks[arm].terminator] == "jump", arm))
+            for other in arms:
+                if other == keep:
+                    continue
+                length, renames = self.common_suffix(keep, other)
+                other_block = self.cfg.blocks[other]
+                had_jump = self.generic[other_block.terminator] == "jump"
+                saved = length - 1 + (1 if had_jump else 0)
+                if saved <= 0:
+                    continue
+                keep_body, other_body = self.arm_body(keep), self.arm_body(other)
+                target = {"Statement": keep_body[-length]}
+                jump = {"libfunc_id": jump_id, "args": [], "branches": [{"target": target, "results": []}]}
+                tail = other_body[-length:]
+                replacements[tail[0]] = [{"Invocation": jump}]
+                for stmt_idx in tail[1:] + ([other_block.terminator] if had_jump else []):
+                    replacements[stmt_idx] = []
+                for other_var, kept_var in renames.items():
+                    definer = self.definitions[other_var]
+                    invocation = dict(self.payload["statements"][definer]["Invocation"])
+                    branch = dict(invocation["branches"][0])
+                    branch["results"] = [
+                        self.var_objects[kept_var] if self.program.var_ids.lookup(var) == other_var else var
+                        for var in branch["results"]
+                    ]
+                    invocation["branches"] = [branch]
+                    replacements[definer] = [{"Invocation": invocation}]
+                merges.append(
+                    {
+                        "kept_arm": f"block@{self.cfg.blocks[keep].start}",
+                        "merged_arm": f"block@{other_block.start}",
+                        "tail_statements": length,
+                        "renamed_vars": len(renames),
+                        "statements_saved": saved,
+                    }
+                )
+        if not replacements:
+            return self.payload, []
+        return splice(self.payload, replacements), merges
+
+
+def jump_libfunc(payload: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+    for decl in payload["libfunc_declarations"]:
+        if decl.get("long_id", {}).get("generic_id") == "jump":
+            return decl["id"], False
+    return id_object("jump"), True
+
+
+def merge_tails(payload: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    require_keys(payload)
+    check_program(payload)
+    jump_id, declare = jump_libfunc(payload)
+    merges: list[dict[str, Any]] = []
+    for _ in range(MAX_ITERATIONS):
+        payload, round_merges = TailMerger(payload).merge_round(jump_id)
+        if not round_merges:
+            break
+        merges.extend(round_merges)
+    else:
+        raise ValueError(f"tail merging did not reach a fixed point after {MAX_ITERATIONS} iterations")
+    if merges and declare:
+        decl = {"id": jump_id, "long_id": {"generic_id": "jump", "generic_args": []}}
+        payload = dict(payload, libfunc_declarations=payload["libfunc_declarations"] + [decl])
+    check_program(payload)
+    return payload, merges
+
+
+def tail_merge_summary(path: Path) -> dict[str, int]:
+    """Statement counts of a program before and after tail merging (for benchmark summaries)."""
+    payload = read_payload(path)
+    merged, merges = merge_tails(payload)
+    before, after = len(payload["statements"]), len(merged["statements"])
+    return {"statements_before": before, "statements_after": after, "delta": after - before, "merges": len(merges)}
+
+
+def main() -> int:
+    args = parse_args()
+    input_path = Path(args.input).resolve()
+    output_path = Path(args.out).resolve()
+    payload = read_payload(input_path)
+
+    cost_table = load_cost_table(Path(args.cost_table).resolve())
+    merged, merges = merge_tails(payload)
+    gas_before = estimate_program(payload, cost_table)["total_worst_case_gas"]
+    gas_after = estimate_program(merged, cost_table)["total_worst_case_gas"]
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(render_program(merged), encoding="utf-8")
+    for merge in merges:
+        print(
+            f"merged {merge['merged_arm']} into {merge['kept_arm']}: tail={merge['tail_statements']} "
+            f"renamed={merge['renamed_vars']} saved={merge['statements_saved']}"
+        )
+    print(f"statements: {len(payload['statements'])} -> {len(merged['statements'])}")
+    print(f"static worst-case gas: {gas_before} -> {gas_after} ({gas_after - gas_before:+d})")
+    if args.report:
+        report_path = Path(args.report).resolve()
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "input": str(input_path),
+            "output": str(output_path),
+            "merges": merges,
+            "statements": {"before": len(payload["statements"]), "after": len(merged["statements"])},
+            "static_worst_case_gas": {"before": gas_before, "after": gas_after, "delta": gas_after - gas_before},
+        }
+        report_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"wrote: {report_path}")
+    print(f"wrote: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,174 @@
+"""Peephole rewrite rules over direct Sierra programs.
+
+A rule inspects one statement of a `PeepholeContext` and either declines (`None`) or
+returns a `Rewrite`: statements to delete plus var renames applied to every remaining
+use.  Rules only delete single-successor fallthrough statements, so a deleted statement
+is always replaced by the next kept one when branch targets are renumbered.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from model import SierraProgram, id_key
+
+
+@dataclass(frozen=True)
+class Rewrite:
+    delete: tuple[int, ...]
+    # var id key -> replacement var id object
+    rename: dict[Any, dict[str, Any]] = field(default_factory=dict)
+
+
+class PeepholeContext:
+    """Per-iteration facts shared by all rules: predecessors, entry points, def counts."""
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+        self.statements: list[dict[str, Any]] = payload["statements"]
+        self.program = SierraProgram(payload)
+        self.entry_points = {func.entry_point for func in self.program.functions}
+        self.preds: list[list[int]] = [[] for _ in range(len(self.program))]
+        for stmt_idx in range(len(self.program)):
+            for target in self.program.successors(stmt_idx):
+                if 0 <= target < len(self.program):
+                    self.preds[target].append(stmt_idx)
+        self.def_count: dict[Any, int] = {}
+        for func in payload["funcs"]:
+            for param in func.get("params", []):
+                self._count_def(param["id"])
+        for stmt in self.statements:
+            for branch in stmt.get("Invocation", {}).get("branches", []):
+                for var in branch.get("results", []):
+                    self._count_def(var)
+
+    def _count_def(self, var: dict[str, Any]) -> None:
+        key = id_key(var)
+        self.def_count[key] = self.def_count.get(key, 0) + 1
+
+    def generic_id(self, stmt_idx: int) -> str | None:
+        decl = self.program.libfunc(stmt_idx)
+        return None if decl is None else decl.generic_id
+
+    def invocation(self, stmt_idx: int) -> dict[str, Any]:
+        return self.statements[stmt_idx]["Invocation"]
+
+    def falls_through(self, stmt_idx: int) -> bool:
+        return not self.program.is_return(stmt_idx) and self.program.successors(stmt_idx) == [stmt_idx + 1]
+
+    def entered_only_by_fallthrough(self, stmt_idx: int) -> bool:
+        return (
+            stmt_idx not in self.entry_points
+            and self.preds[stmt_idx] == [stmt_idx - 1]
+            and self.falls_through(stmt_idx - 1)
+        )
+
+    def single_def(self, var: dict[str, Any]) -> bool:
+        return self.def_count.get(id_key(var), 0) == 1
+
+    def pushed_tail(self, end: int, limit: int) -> list[Any] | None:
+        """Var keys left on top of the stack by the `store_temp` run ending at `end`, oldest first.
+
+        `end` may be a `jump` entered only by fallthrough; `None` means the stack top is unknown.
+        """
+        if self.generic_id(end) == "jump":
+            if not self.entered_only_by_fallthrough(end):
+                return None
+            end -= 1
+        pushed: list[Any] = []
+        stmt_idx = end
+        while len(pushed) < limit and stmt_idx >= 0 and self.generic_id(stmt_idx) == "store_temp":
+            results = self.invocation(stmt_idx)["branches"][0]["results"]
+            pushed.append(id_key(results[0]))
+            if not self.entered_only_by_fallthrough(stmt_idx):
+                break
+            stmt_idx -= 1
+        pushed.reverse()
+        return pushed
+
+
+RuleFn = Callable[[PeepholeContext, int], "Rewrite | None"]
+
+
+def rule_jump_to_next(ctx: PeepholeContext, stmt_idx: int) -> Rewrite | None:
+    if ctx.generic_id(stmt_idx) != "jump" or not ctx.falls_through(stmt_idx):
+        return None
+    return Rewrite(delete=(stmt_idx,))
+
+
+def rule_dup_then_drop(ctx: PeepholeContext, stmt_idx: int) -> Rewrite | None:
+    """`dup(x) -> (a, b); drop(b)` keeps `x` as `a`."""
+    nxt = stmt_idx + 1
+    if ctx.generic_id(stmt_idx) != "dup" or nxt >= len(ctx.program) or ctx.generic_id(nxt) != "drop":
+        return None
+    if not ctx.falls_through(stmt_idx) or not ctx.entered_only_by_fallthrough(nxt):
+        return None
+    source = ctx.invocation(stmt_idx)["args"][0]
+    copies = ctx.invocation(stmt_idx)["branches"][0]["results"]
+    dropped = id_key(ctx.invocation(nxt)["args"][0])
+    kept = [var for var in copies if id_key(var) != dropped]
+    if len(kept) != 1 or len(copies) != 2 or not ctx.single_def(kept[0]):
+        return None
+    return Rewrite(delete=(stmt_idx, nxt), rename={id_key(kept[0]): source})
+
+
+def rule_store_temp_then_drop(ctx: PeepholeContext, stmt_idx: int) -> Rewrite | None:
+    """`store_temp(x) -> a; drop(a)` drops `x` directly."""
+    nxt = stmt_idx + 1
+    if ctx.generic_id(stmt_idx) != "store_temp" or nxt >= len(ctx.program) or ctx.generic_id(nxt) != "drop":
+        return None
+    if not ctx.falls_through(stmt_idx) or not ctx.entered_only_by_fallthrough(nxt):
+        return None
+    stored = ctx.invocation(stmt_idx)["branches"][0]["results"][0]
+    if id_key(ctx.invocation(nxt)["args"][0]) != id_key(stored) or not ctx.single_def(stored):
+        return None
+    return Rewrite(delete=(stmt_idx,), rename={id_key(stored): ctx.invocation(stmt_idx)["args"][0]})
+
+
+def rule_redundant_store_temp(ctx: PeepholeContext, stmt_idx: int) -> Rewrite | None:
+    """Drop a `store_temp` run whose sources are already the top stack cells on every incoming path.
+
+    This is the merge-point shape the emitter produces: each branch arm ends by storing the
+    merged vars, and the join re-stores them in the same order before returning.
+    """
+    if ctx.generic_id(stmt_idx) != "store_temp" or stmt_idx in ctx.entry_points or not ctx.preds[stmt_idx]:
+        return None
+    if stmt_idx > 0 and ctx.entered_only_by_fallthrough(stmt_idx) and ctx.generic_id(stmt_idx - 1) == "store_temp":
+        return None  # Only match at the start of a run.
+    run: list[int] = []
+    cursor = stmt_idx
+    while cursor < len(ctx.program) and ctx.generic_id(cursor) == "store_temp" and ctx.falls_through(cursor):
+        if cursor != stmt_idx and not ctx.entered_only_by_fallthrough(cursor):
+            break
+        run.append(cursor)
+        cursor += 1
+    sources = [id_key(ctx.invocation(idx)["args"][0]) for idx in run]
+
+    matched = len(run)
+    for pred in ctx.preds[stmt_idx]:
+        if not ctx.falls_through(pred) and ctx.generic_id(pred) != "jump":
+            return None
+        tail = ctx.pushed_tail(pred, len(run))
+        if not tail:
+            return None
+        matched = min(matched, max((k for k in range(len(tail) + 1) if tail[len(tail) - k :] == sources[:k]), default=0))
+    if matched == 0:
+        return None
+
+    rename: dict[Any, dict[str, Any]] = {}
+    for idx in run[:matched]:
+        invocation = ctx.invocation(idx)
+        stored = invocation["branches"][0]["results"][0]
+        if not ctx.single_def(stored):
+            return None
+        rename[id_key(stored)] = invocation["args"][0]
+    return Rewrite(delete=tuple(run[:matched]), rename=rename)
+
+
+RULE_REGISTRY: dict[str, RuleFn] = {
+    "jump_to_next": rule_jump_to_next,
+    "dup_then_drop": rule_dup_then_drop,
+    "store_temp_then_drop": rule_store_temp_then_drop,
+    "redundant_store_temp": rule_redundant_store_temp,
+}
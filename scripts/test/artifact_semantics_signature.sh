@@ -0,0 +1,131 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+OPTIMIZE="$ROOT_DIR/scripts/bench/optimize_artifacts.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+python3 - "$TMP_DIR/dev" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+out = Path(sys.argv[1])
+out.mkdir(parents=True)
+entry_points = {
+    "CONSTRUCTOR": [],
+    "EXTERNAL": [{"selector": "0x1a", "function_idx": 0}, {"selector": "0x2b", "function_idx": 1}],
+    "L1_HANDLER": [],
+}
+sierra = {
+    "sierra_program": [hex(value) for value in range(600)],
+    "sierra_program_debug_info": {"type_names": [], "libfunc_names": [], "user_func_names": []},
+    "contract_class_version": "0.1.0",
+    "entry_points_by_type": entry_points,
+    "abi": [{"type": "function", "name": "get", "inputs": [], "outputs": [], "state_mutability": "view"}],
+}
+casm = {
+    "bytecode": [hex(value) for value in range(40)],
+    "hints": [],
+    "entry_points_by_type": {
+        "CONSTRUCTOR": [],
+        "EXTERNAL": [
+            {"selector": "0x1a", "offset": 4, "builtins": ["range_check"]},
+            {"selector": "0x2b", "offset": 19, "builtins": []},
+        ],
+        "L1_HANDLER": [],
+    },
+}
+(out / "pkg_Demo.contract_class.json").write_text(json.dumps(sierra))
+(out / "pkg_Demo.compiled_contract_class.json").write_text(json.dumps(casm))
+index = {
+    "version": 1,
+    "contracts": [
+        {
+            "id": "demo",
+            "package_name": "pkg",
+            "contract_name": "Demo",
+            "module_path": "pkg::Demo",
+            "artifacts": {"sierra": "pkg_Demo.contract_class.json", "casm": "pkg_Demo.compiled_contract_class.json"},
+        }
+    ],
+}
+(out / "pkg.starknet_artifacts.json").write_text(json.dumps(index))
+PY
+
+INDEX="$TMP_DIR/dev/pkg.starknet_artifacts.json"
+CACHE="$TMP_DIR/dev/pkg_Demo.contract_class.json.semsig.json"
+
+python3 "$OPTIMIZE" --index "$INDEX" --contract-name Demo --out-dir "$TMP_DIR/opt1" >/dev/null
+python3 "$OPTIMIZE" --index "$INDEX" --contract-name Demo --out-dir "$TMP_DIR/opt2" >/dev/null
+test -f "$CACHE"
+test -f "$TMP_DIR/opt1/pkg_Demo.optimized.contract_class.json.semsig.json"
+cmp -s "$TMP_DIR/opt1/optimized.starknet_artifacts.json" "$TMP_DIR/opt2/optimized.starknet_artifacts.json"
+
+python3 - "$TMP_DIR" "$ROOT_DIR/scripts/bench" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+tmp = Path(sys.argv[1])
+sys.path.insert(0, sys.argv[2])
+from optimize_artifacts import diverged_paths, semantics_tree  # noqa: E402
+
+first = json.loads((tmp / "opt1" / "artifact_optimization_report.json").read_text())
+second = json.loads((tmp / "opt2" / "artifact_optimization_report.json").read_text())
+if first["semantic_signature"]["source_cache_hit"] or not second["semantic_signature"]["source_cache_hit"]:
+    print("expected a signature cache miss on the first run and a hit on the second")
+    sys.exit(1)
+if first["semantic_signature"]["before"] != second["semantic_signature"]["before"]:
+    print("cached signature differs from the freshly computed one")
+    sys.exit(1)
+if first["passes"] != [{"changed": True, "pass": "strip_sierra_debug_info"}]:
+    print(f"unexpected pass report: {first['passes']}")
+    sys.exit(1)
+
+dev = tmp / "dev"
+sierra = json.loads((dev / "pkg_Demo.contract_class.json").read_text())
+casm = json.loads((dev / "pkg_Demo.compiled_contract_class.json").read_text())
+base = semantics_tree(sierra, casm)
+if set(base["groups"]["casm_bytecode"]["leaves"]) != {"prelude", "EXTERNAL:0x1a", "EXTERNAL:0x2b"}:
+    print(f"unexpected CASM leaves: {sorted(base['groups']['casm_bytecode']['leaves'])}")
+    sys.exit(1)
+
+casm["bytecode"][25] = "0xdead"
+diverged = diverged_paths(base, semantics_tree(sierra, casm))
+if diverged != ["casm_bytecode/EXTERNAL:0x2b"]:
+    print(f"expected the bytecode change to be attributed to EXTERNAL:0x2b, got {diverged}")
+    sys.exit(1)
+casm["bytecode"][25] = "0x19"
+
+sierra["entry_points_by_type"]["EXTERNAL"][0]["function_idx"] = 7
+sierra["sierra_program"][300] = "0x0"
+diverged = diverged_paths(base, semantics_tree(sierra, casm))
+if diverged != ["sierra_entry_points/EXTERNAL:0x1a", "sierra_program/chunk:00001"]:
+    print(f"unexpected divergence report: {diverged}")
+    sys.exit(1)
+PY
+
+# A stale cache (artifact rewritten after caching) must be recomputed, not trusted.
+python3 - "$TMP_DIR/dev/pkg_Demo.contract_class.json" <<'PY'
+import json
+import sys
+
+path = sys.argv[1]
+payload = json.load(open(path, encoding="utf-8"))
+payload["abi"].append({"type": "event", "name": "Ping", "kind": "struct", "members": []})
+open(path, "w", encoding="utf-8").write(json.dumps(payload))
+PY
+python3 "$OPTIMIZE" --index "$INDEX" --contract-name Demo --out-dir "$TMP_DIR/opt3" >/dev/null
+python3 - "$TMP_DIR/opt2/artifact_optimization_report.json" "$TMP_DIR/opt3/artifact_optimization_report.json" <<'PY'
+import json
+import sys
+
+old, new = (json.load(open(path, encoding="utf-8"))["semantic_signature"] for path in sys.argv[1:3])
+if new["source_cache_hit"] or old["before"]["sierra_abi_hash"] == new["before"]["sierra_abi_hash"]:
+    print("stale signature cache was reused after the artifact changed")
+    sys.exit(1)
+PY
+
+echo "artifact semantics signature checks passed"
@@ -0,0 +1,135 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+STORE_PY="$ROOT_DIR/scripts/workflow/artifact_store.py"
+TMP_DIR="$(mktemp -d)"
+trap 'chmod -R u+w "$TMP_DIR"; rm -rf "$TMP_DIR"' EXIT
+STORE=(python3 "$STORE_PY" --store "$TMP_DIR/store")
+
+make_build() {
+  local dir="$1" payload="$2"
+  mkdir -p "$dir/src" "$dir/target/dev/incremental" "$dir/target/dev/.fingerprint"
+  printf 'name = "demo"\n' >"$dir/Scarb.toml"
+  printf '%s\n' "$payload" >"$dir/src/lib.cairo"
+  printf '{"sierra_program": ["%s"]}\n' "$payload" >"$dir/target/dev/demo_Demo.contract_class.json"
+  printf '{"contracts": []}\n' >"$dir/target/dev/demo.starknet_artifacts.json"
+  head -c 4096 /dev/zero >"$dir/target/dev/incremental/cache.bin"
+  printf 'x\n' >"$dir/target/dev/.fingerprint/demo"
+}
+
+key_a="$("${STORE[@]}" key --source "$ROOT_DIR/lakefile.lean" --option module=A --option optimize=true)"
+key_a_again="$("${STORE[@]}" key --source "$ROOT_DIR/lakefile.lean" --option module=A --option optimize=true)"
+key_b="$("${STORE[@]}" key --source "$ROOT_DIR/lakefile.lean" --option module=A --option optimize=false)"
+if [[ "$key_a" != "$key_a_again" || "$key_a" == "$key_b" ]]; then
+  echo "store keys must be deterministic and sensitive to options"
+  exit 1
+fi
+printf 'other-pin\n' >"$TMP_DIR/pin.txt"
+key_pin="$("${STORE[@]}" key --source "$ROOT_DIR/lakefile.lean" --option module=A --option optimize=true --pin-file "$TMP_DIR/pin.txt")"
+if [[ "$key_a" == "$key_pin" ]]; then
+  echo "store key ignores the toolchain pin"
+  exit 1
+fi
+
+status=0
+"${STORE[@]}" fetch --key "$key_a" --dest "$TMP_DIR/out_a" 2>/dev/null || status=$?
+if [[ "$status" -ne 3 ]]; then
+  echo "expected a miss (exit 3) on an empty store, got $status"
+  exit 1
+fi
+
+make_build "$TMP_DIR/build_a" alpha
+"${STORE[@]}" put --key "$key_a" --src "$TMP_DIR/build_a" >/dev/null
+"${STORE[@]}" fetch --key "$key_a" --dest "$TMP_DIR/out_a" >/dev/null
+"${STORE[@]}" fetch --key "$key_a" --dest "$TMP_DIR/out_copy" --copy >/dev/null
+
+python3 - "$TMP_DIR" <<'PY'
+import os
+import sys
+from pathlib import Path
+
+tmp = Path(sys.argv[1])
+out = tmp / "out_a"
+expected = {
+    "Scarb.toml",
+    "src/lib.cairo",
+    "target/dev/demo_Demo.contract_class.json",
+    "target/dev/demo.starknet_artifacts.json",
+}
+found = {path.relative_to(out).as_posix() for path in out.rglob("*") if path.is_file()}
+if found != expected:
+    print(f"unexpected materialized files: {sorted(found)}")
+    sys.exit(1)
+for rel in expected:
+    if (out / rel).read_bytes() != (tmp / "build_a" / rel).read_bytes():
+        print(f"content mismatch for {rel}")
+        sys.exit(1)
+linked = out / "target/dev/demo_Demo.contract_class.json"
+copied = tmp / "out_copy/target/dev/demo_Demo.contract_class.json"
+if linked.stat().st_nlink < 2 or os.access(linked, os.W_OK) and os.geteuid() != 0:
+    print("hard-linked artifacts should share a read-only store blob")
+    sys.exit(1)
+if copied.stat().st_nlink != 1 or not os.access(copied, os.W_OK):
+    print("--copy should produce independent writable files")
+    sys.exit(1)
+PY
+
+# Identical files across entries are stored once.
+make_build "$TMP_DIR/build_b" alpha
+"${STORE[@]}" put --key "$key_b" --src "$TMP_DIR/build_b" >/dev/null
+"${STORE[@]}" stats >"$TMP_DIR/stats.json"
+python3 - "$TMP_DIR/stats.json" <<'PY'
+import json
+import sys
+
+stats = json.load(open(sys.argv[1], encoding="utf-8"))
+if stats["entries"] != 2 or stats["blobs"] != 4 or stats["logical_bytes"] != 2 * stats["stored_bytes"]:
+    print(f"expected two entries sharing four blobs: {stats}")
+    sys.exit(1)
+if (stats["hits"], stats["misses"]) != (2, 1):
+    print(f"unexpected hit/miss counters: {stats}")
+    sys.exit(1)
+PY
+
+# LRU: give B its own blobs, touch A, then add C under a cap that forces one eviction; B goes.
+make_build "$TMP_DIR/build_b" beta
+"${STORE[@]}" put --key "$key_b" --src "$TMP_DIR/build_b" >/dev/null
+sleep 1
+"${STORE[@]}" fetch --key "$key_a" --dest "$TMP_DIR/out_a2" >/dev/null
+key_c="$("${STORE[@]}" key --source "$ROOT_DIR/lakefile.lean" --option module=C)"
+make_build "$TMP_DIR/build_c" gamma-with-a-longer-payload
+sleep 1
+"${STORE[@]}" put --key "$key_c" --src "$TMP_DIR/build_c" --max-bytes 150 >/dev/null
+test -f "$TMP_DIR/store/entries/$key_c.json"
+test -f "$TMP_DIR/store/entries/$key_a.json"
+if [[ -f "$TMP_DIR/store/entries/$key_b.json" ]]; then
+  echo "expected LRU eviction of the least recently used entry"
+  exit 1
+fi
+
+"${STORE[@]}" gc --max-bytes 0 >"$TMP_DIR/gc.json"
+python3 - "$TMP_DIR/gc.json" "$TMP_DIR/store" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+result = json.load(open(sys.argv[1], encoding="utf-8"))
+store = Path(sys.argv[2])
+if result["bytes"] != 0 or list((store / "entries").glob("*.json")) or list((store / "objects").glob("*/*")):
+    print(f"gc --max-bytes 0 should empty the store: {result}")
+    sys.exit(1)
+PY
+
+# --verify drops entries whose blobs were corrupted behind the store's back.
+"${STORE[@]}" put --key "$key_a" --src "$TMP_DIR/build_a" >/dev/null
+blob="$(find "$TMP_DIR/store/objects" -type f | head -n 1)"
+chmod u+w "$blob"
+printf 'corrupt' >"$blob"
+"${STORE[@]}" gc --verify >/dev/null
+if [[ -f "$TMP_DIR/store/entries/$key_a.json" ]]; then
+  echo "gc --verify kept an entry with a corrupt blob"
+  exit 1
+fi
+
+echo "artifact store checks passed"
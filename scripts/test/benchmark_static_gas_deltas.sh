@@ -0,0 +1,91 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+SUITE="$ROOT_DIR/scripts/bench/run_manifest_benchmark_suite.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+cat >"$TMP_DIR/runner.sh" <<'SH'
+#!/usr/bin/env bash
+printf 'baseline_sierra_gas = 100\ngenerated_sierra_gas = 90\nbaseline_l2_gas = 100\n'
+printf 'generated_l2_gas = 90\nsierra_improvement_pct = 10\nl2_improvement_pct = 10\n'
+SH
+chmod +x "$TMP_DIR/runner.sh"
+
+# Stand-in for `leancairo-sierra-gen --batch`: one cost-driven report per entry, two functions each.
+cat >"$TMP_DIR/sierra_gen.py" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+args = sys.argv[1:]
+manifest = json.loads(Path(args[args.index("--batch") + 1]).read_text(encoding="utf-8"))
+calls = Path(sys.argv[0]).with_suffix(".calls")
+calls.write_text(calls.read_text() + "batch\n" if calls.exists() else "batch\n")
+for entry in manifest["entries"]:
+    entry_args = entry["args"]
+    if entry_args[entry_args.index("--optimize-strategy") + 1] != "cost-driven":
+        raise SystemExit("static gas must be measured with the cost-driven strategy")
+    out_dir = Path(entry_args[entry_args.index("--out") + 1])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    functions = [
+        {
+            "function": name,
+            "candidates": [
+                {"label": "fixed", "cost": {"gas": fixed}},
+                {"label": "no-const-prop", "cost": {"gas": without}},
+            ],
+        }
+        for name, fixed, without in (("f", 1000, 1300), ("g", 400, 600))
+    ]
+    (out_dir / "optimization-report.json").write_text(json.dumps({"functions": functions}), encoding="utf-8")
+Path(args[args.index("--summary") + 1]).write_text("{}", encoding="utf-8")
+PY
+
+# The suite records config and log paths relative to the repository root.
+mkdir -p "$ROOT_DIR/.artifacts"
+SUITE_DIR="$(mktemp -d "$ROOT_DIR/.artifacts/benchmark_static_gas_deltas.XXXXXX")"
+trap 'rm -rf "$TMP_DIR" "$SUITE_DIR"' EXIT
+python3 - "$TMP_DIR/runner.sh" "$SUITE_DIR/harness.json" <<'PY'
+import json
+import sys
+
+cases = [
+    {"id": "newton_u128", "family": "fixed_point", "runner_script": sys.argv[1]},
+    {"id": "no_direct_sierra", "family": "integer", "runner_script": sys.argv[1]},
+]
+open(sys.argv[2], "w", encoding="utf-8").write(json.dumps({"cases": cases}))
+PY
+
+python3 "$SUITE" --config "$SUITE_DIR/harness.json" --out-json "$TMP_DIR/summary.json" \
+  --out-md "$TMP_DIR/summary.md" --logs-dir "$SUITE_DIR/logs" \
+  --sierra-gen "python3 $TMP_DIR/sierra_gen.py" >/dev/null
+
+# Both pipelines are measured on the same freshly compiled source, in a single batch.
+if [[ "$(cat "$TMP_DIR/sierra_gen.calls")" != "batch" ]]; then
+  echo "static gas must be measured with exactly one generator batch"
+  exit 1
+fi
+python3 - "$TMP_DIR/summary.json" <<'PY'
+import json
+import sys
+
+summary = json.load(open(sys.argv[1], encoding="utf-8"))
+rows = {row["id"]: row for row in summary["cases"]}
+if rows["no_direct_sierra"]["static_gas"] is not None:
+    print(f"case without a direct Sierra program has static gas: {rows['no_direct_sierra']}")
+    sys.exit(1)
+static_gas = rows["newton_u128"]["static_gas"]
+if static_gas != {"gas": 1400, "without_const_prop_gas": 1900, "delta": -500}:
+    print(f"unexpected static gas: {static_gas}")
+    sys.exit(1)
+families = {row["family"]: row for row in summary["families"]}
+if families["fixed_point"]["static_gas_delta"] != -500 or families["integer"]["static_gas"] != 0:
+    print(f"unexpected per-family static gas: {summary['families']}")
+    sys.exit(1)
+PY
+rg -q '^## Static Sierra Gas Deltas$' "$TMP_DIR/summary.md"
+rg -q '^\| `newton_u128` \| `fixed_point` \| `1400` \| `1900` \| `-500` \|$' "$TMP_DIR/summary.md"
+
+echo "benchmark static gas delta checks passed"
@@ -0,0 +1,80 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+OUT_DIR="$ROOT_DIR/.artifacts/cli_batch"
+export PATH="$HOME/.elan/bin:$PATH"
+
+rm -rf "$OUT_DIR"
+mkdir -p "$OUT_DIR"
+
+cat >"$OUT_DIR/sierra.manifest.json" <<JSON
+{
+  "entries": [
+    {"id": "subset", "args": ["--module", "MyLeanSierraSubset", "--out", "$OUT_DIR/sierra_subset", "--optimize", "true"]},
+    {"id": "missing", "args": ["--module", "Missing.Module", "--out", "$OUT_DIR/missing"]},
+    {"id": "subset_again", "args": ["--module", "MyLeanSierraSubset", "--out", "$OUT_DIR/sierra_subset_again"]},
+    {"args": ["--module", "MyLeanSierraScalar", "--out", "$OUT_DIR/sierra_scalar", "--optimize-strategy", "cost-driven"]}
+  ]
+}
+JSON
+
+cd "$ROOT_DIR"
+
+# A failing entry is reported and fails the run without stopping the remaining entries.
+status=0
+lake exe leancairo-sierra-gen --batch "$OUT_DIR/sierra.manifest.json" --summary "$OUT_DIR/sierra.summary.json" \
+  || status=$?
+if [[ "$status" -ne 1 ]]; then
+  echo "a batch with a failing entry must exit 1, got $status"
+  exit 1
+fi
+python3 - "$OUT_DIR/sierra.summary.json" <<'PY'
+import json
+import sys
+
+summary = json.load(open(sys.argv[1], encoding="utf-8"))
+rows = summary["entries"]
+if [row["id"] for row in rows] != ["subset", "missing", "subset_again", "MyLeanSierraScalar"]:
+    raise SystemExit(f"unexpected entry ids: {rows}")
+if [row["status"] for row in rows] != ["ok", "error", "ok", "ok"]:
+    raise SystemExit(f"unexpected entry statuses: {rows}")
+if rows[1]["module"] != "Missing.Module" or not rows[1]["error"]:
+    raise SystemExit(f"failing entry must name its module and error: {rows[1]}")
+if (summary["entry_count"], summary["failed_count"]) != (4, 1):
+    raise SystemExit(f"unexpected summary counts: {summary}")
+for key in ("preload_ms", "total_ms"):
+    if not isinstance(summary[key], int):
+        raise SystemExit(f"{key} must be an integer")
+if any(not isinstance(row["elapsed_ms"], int) for row in rows):
+    raise SystemExit("every entry needs an integer elapsed_ms")
+PY
+for dir in sierra_subset sierra_subset_again; do
+  diff -u "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json" "$OUT_DIR/$dir/sierra/program.sierra.json"
+done
+# Per-entry options apply: only the cost-driven entry writes an optimization report.
+if [[ ! -f "$OUT_DIR/sierra_scalar/optimization-report.json" ]]; then
+  echo "cost-driven batch entry is missing optimization-report.json"
+  exit 1
+fi
+if [[ -f "$OUT_DIR/sierra_subset/optimization-report.json" ]]; then
+  echo "fixed-strategy batch entry must not write optimization-report.json"
+  exit 1
+fi
+
+# Cairo batch output matches a direct single-module invocation.
+cat >"$OUT_DIR/cairo.manifest.json" <<JSON
+{"entries": [{"id": "hello", "args": ["--module", "MyLeanContract", "--out", "$OUT_DIR/cairo_batch", "--emit-casm", "false"]}]}
+JSON
+lake exe leancairo-gen --batch "$OUT_DIR/cairo.manifest.json"
+lake exe leancairo-gen --module MyLeanContract --out "$OUT_DIR/cairo_direct" --emit-casm false
+diff -ru "$OUT_DIR/cairo_direct" "$OUT_DIR/cairo_batch"
+
+status=0
+lake exe leancairo-gen --batch "$OUT_DIR/cairo.manifest.json" --module MyLeanContract >/dev/null 2>&1 || status=$?
+if [[ "$status" -eq 0 ]]; then
+  echo "--batch combined with single-module arguments must be rejected"
+  exit 1
+fi
+
+echo "cli batch checks passed"
@@ -0,0 +1,108 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+DAEMON_PY="$ROOT_DIR/scripts/workflow/compiler_daemon.py"
+OUT_DIR="$ROOT_DIR/.artifacts/compiler_daemon"
+TMP_DIR="$(mktemp -d)"
+export PATH="$HOME/.elan/bin:$PATH"
+export LEANCAIRO_COMPILER_DAEMON="$TMP_DIR/daemon.sock"
+trap 'python3 "$DAEMON_PY" stop >/dev/null; rm -rf "$TMP_DIR"' EXIT
+
+rm -rf "$OUT_DIR"
+mkdir -p "$OUT_DIR"
+
+# The Lean server answers one JSON line per request, in order, and survives failing requests.
+(
+  cd "$ROOT_DIR"
+  printf '%s\n' \
+    "{\"id\": 1, \"args\": [\"--module\", \"MyLeanSierraSubset\", \"--out\", \"$OUT_DIR/serve\"]}" \
+    '{"id": 2, "args": ["--module", "MyLeanSierraSubset"]}' \
+    'not json' \
+    | lake exe leancairo-sierra-gen --serve >"$OUT_DIR/serve.jsonl"
+)
+python3 - "$OUT_DIR/serve.jsonl" <<'PY'
+import json
+import sys
+
+responses = [json.loads(line) for line in open(sys.argv[1], encoding="utf-8") if line.startswith("{")]
+if [row["id"] for row in responses] != [1, 2, None]:
+    raise SystemExit(f"unexpected response ids: {responses}")
+if [row["status"] for row in responses] != ["ok", "error", "error"]:
+    raise SystemExit(f"unexpected response statuses: {responses}")
+if "missing required argument --out" not in responses[1]["error"]:
+    raise SystemExit(f"unexpected error for a request without --out: {responses[1]['error']}")
+for row in responses:
+    if not isinstance(row["elapsed_ms"], int):
+        raise SystemExit(f"elapsed_ms must be an integer: {row}")
+PY
+diff -u "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json" "$OUT_DIR/serve/sierra/program.sierra.json"
+
+python3 "$DAEMON_PY" start
+status=0
+python3 "$DAEMON_PY" start >/dev/null || status=$?
+if [[ "$status" -ne 4 ]]; then
+  echo "starting a second daemon on the same socket must exit 4, got $status"
+  exit 1
+fi
+
+# Repeated Sierra requests reuse one resident generator and match the golden program.
+for run in 1 2; do
+  "$ROOT_DIR/scripts/workflow/generate-sierra-from-lean.sh" \
+    --module MyLeanSierraSubset --out "$OUT_DIR/sierra_$run" --optimize true
+  diff -u "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json" "$OUT_DIR/sierra_$run/sierra/program.sierra.json"
+done
+
+# Cairo output through the daemon matches a direct one-process-per-invocation run.
+"$ROOT_DIR/scripts/workflow/generate-from-lean.sh" \
+  --module MyLeanContract --out "$OUT_DIR/cairo_daemon" --emit-casm false
+LEANCAIRO_COMPILER_DAEMON=off "$ROOT_DIR/scripts/workflow/generate-from-lean.sh" \
+  --module MyLeanContract --out "$OUT_DIR/cairo_direct" --emit-casm false
+diff -ru "$OUT_DIR/cairo_direct" "$OUT_DIR/cairo_daemon"
+
+# A failing request is reported to the caller and leaves the daemon usable.
+status=0
+"$ROOT_DIR/scripts/workflow/generate-sierra-from-lean.sh" --module Missing.Module --out "$OUT_DIR/missing" \
+  >/dev/null 2>&1 || status=$?
+if [[ "$status" -eq 0 ]]; then
+  echo "compiling a missing module through the daemon must fail"
+  exit 1
+fi
+
+python3 "$DAEMON_PY" status >"$OUT_DIR/status.json"
+python3 - "$OUT_DIR/status.json" <<'PY'
+import json
+import sys
+
+status = json.load(open(sys.argv[1], encoding="utf-8"))
+sierra = status["compilers"]["leancairo-sierra-gen"]
+cairo = status["compilers"]["leancairo-gen"]
+if (sierra["requests"], sierra["restarts"], sierra["running"]) != (3, 0, True):
+    raise SystemExit(f"unexpected Sierra generator stats: {sierra}")
+if (cairo["requests"], cairo["restarts"]) != (1, 0):
+    raise SystemExit(f"unexpected Cairo generator stats: {cairo}")
+PY
+
+# Touching a Lean source reloads the resident generator instead of serving the stale import.
+touch "$ROOT_DIR/src/MyLeanSierraSubset.lean"
+"$ROOT_DIR/scripts/workflow/generate-sierra-from-lean.sh" \
+  --module MyLeanSierraSubset --out "$OUT_DIR/sierra_reloaded" --optimize true
+diff -u "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json" "$OUT_DIR/sierra_reloaded/sierra/program.sierra.json"
+python3 "$DAEMON_PY" status >"$OUT_DIR/status.json"
+python3 - "$OUT_DIR/status.json" <<'PY'
+import json
+import sys
+
+status = json.load(open(sys.argv[1], encoding="utf-8"))
+sierra = status["compilers"]["leancairo-sierra-gen"]
+if (sierra["requests"], sierra["reloads"], sierra["restarts"]) != (4, 1, 0):
+    raise SystemExit(f"an edited source must reload the Sierra generator: {sierra}")
+PY
+
+python3 "$DAEMON_PY" stop
+if [[ -e "$LEANCAIRO_COMPILER_DAEMON" ]]; then
+  echo "daemon socket must be removed on stop"
+  exit 1
+fi
+
+echo "compiler daemon checks passed"
@@ -43,13 +43,23 @@ snapshot_hashes() {
   rm -f "$rows_file"
 }
 
+SNAPSHOT_COMMITTED="$(mktemp)"
 SNAPSHOT_A="$(mktemp)"
 SNAPSHOT_B="$(mktemp)"
-trap 'rm -f "$SNAPSHOT_A" "$SNAPSHOT_B"' EXIT
+trap 'rm -f "$SNAPSHOT_COMMITTED" "$SNAPSHOT_A" "$SNAPSHOT_B"' EXIT
+
+# Regeneration rewrites the mirrors in place, so hash the committed ones first.
+snapshot_hashes "$SNAPSHOT_COMMITTED"
 
 "$GEN_SCRIPT" "$MANIFEST_FILE"
 snapshot_hashes "$SNAPSHOT_A"
 
+if ! diff -u "$SNAPSHOT_COMMITTED" "$SNAPSHOT_A" >/dev/null; then
+  echo "committed example mirrors are stale; regenerate them with $GEN_SCRIPT"
+  diff -u "$SNAPSHOT_COMMITTED" "$SNAPSHOT_A" || true
+  exit 1
+fi
+
 "$GEN_SCRIPT" "$MANIFEST_FILE"
 snapshot_hashes "$SNAPSHOT_B"
 
@@ -59,4 +69,4 @@ if ! diff -u "$SNAPSHOT_A" "$SNAPSHOT_B" >/dev/null; then
   exit 1
 fi
 
-echo "examples regeneration determinism checks passed"
+echo "examples regeneration determinism and freshness checks passed"
@@ -0,0 +1,103 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+AGGREGATOR="$ROOT_DIR/scripts/bench/generate_remark_hotspots.py"
+TEST_FILE="$ROOT_DIR/tests/lean/optimization_remarks.lean"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+export PATH="$HOME/.elan/bin:$PATH"
+
+cat >"$TMP_DIR/first.jsonl" <<'JSONL'
+{"contract":"Kernel","function":"cheap","pass":"constant-propagation","ir_nodes_before":3,"ir_nodes_after":3,"sierra_statements":4,"static_cost":{"steps":1,"range_checks":0,"gas":100}}
+{"contract":"Kernel","function":"cheap","pass":"algebraic-fold","ir_nodes_before":3,"ir_nodes_after":3,"sierra_statements":3,"static_cost":{"steps":1,"range_checks":0,"gas":90}}
+{"contract":"Kernel","function":"hot","pass":"constant-propagation","ir_nodes_before":11,"ir_nodes_after":5,"sierra_statements":null,"static_cost":{"steps":13,"range_checks":2,"gas":1440}}
+{"contract":"Kernel","function":"hot","pass":"global-value-numbering","ir_nodes_before":5,"ir_nodes_after":7,"sierra_statements":null,"static_cost":{"steps":13,"range_checks":2,"gas":1440}}
+JSONL
+# A rerun of `hot` replaces the first stream's pass chain for that function.
+cat >"$TMP_DIR/second.jsonl" <<'JSONL'
+{"contract":"Kernel","function":"hot","pass":"constant-propagation","ir_nodes_before":11,"ir_nodes_after":5,"sierra_statements":21,"static_cost":{"steps":13,"range_checks":2,"gas":1440}}
+JSONL
+
+python3 "$AGGREGATOR" --remarks "$TMP_DIR/first.jsonl" --remarks "$TMP_DIR/second.jsonl" \
+  --out-json "$TMP_DIR/hotspots.json" --out-md "$TMP_DIR/hotspots.md" >/dev/null
+python3 - "$TMP_DIR/hotspots.json" <<'PY'
+import json
+import sys
+
+report = json.load(open(sys.argv[1], encoding="utf-8"))
+hotspots = report["hotspots"]
+if [row["function"] for row in hotspots] != ["hot", "cheap"]:
+    print(f"hotspots are not ranked by static gas: {hotspots}")
+    sys.exit(1)
+if hotspots[0]["passes"] != [{"pass": "constant-propagation", "ir_node_delta": -6, "static_gas": 1440}]:
+    print(f"rerun did not replace the pass chain: {hotspots[0]}")
+    sys.exit(1)
+if hotspots[0]["sierra_statements"] != 21:
+    print(f"unexpected Sierra statement count: {hotspots[0]}")
+    sys.exit(1)
+# Every record describes the function after its own pass; the last one is the final program.
+if (hotspots[1]["static_gas"], hotspots[1]["sierra_statements"]) != (90, 3):
+    print(f"function statistics do not come from its last pass: {hotspots[1]}")
+    sys.exit(1)
+if [step["static_gas"] for step in hotspots[1]["passes"]] != [100, 90]:
+    print(f"unexpected per-pass static gas: {hotspots[1]['passes']}")
+    sys.exit(1)
+passes = {row["pass"]: row for row in report["passes"]}
+if passes["global-value-numbering"]["functions_grown"] != 1 or passes["constant-propagation"]["functions_shrunk"] != 2:
+    print(f"unexpected pass summary: {report['passes']}")
+    sys.exit(1)
+PY
+rg -q '^\| `Kernel` \| `hot` \| `1440` \| `21` \| `11` \| `5` \| constant-propagation -6 \|$' "$TMP_DIR/hotspots.md"
+
+printf '{"contract":"Kernel","function":"broken"}\n' >"$TMP_DIR/bad.jsonl"
+if python3 "$AGGREGATOR" --remarks "$TMP_DIR/bad.jsonl" --out-json "$TMP_DIR/bad.json" \
+  --out-md "$TMP_DIR/bad.md" >"$TMP_DIR/bad.log" 2>&1; then
+  echo "expected remark aggregator to fail on a malformed record"
+  exit 1
+fi
+rg -q "missing key 'pass'" "$TMP_DIR/bad.log"
+
+(
+  cd "$ROOT_DIR"
+  lake build LeanCairo.Compiler.Optimize.Remarks LeanCairo.Pipeline.Sierra.Remarks
+  lake build LeanCairo.Pipeline.Sierra.EntryPoint LeanCairo.Pipeline.Generation.EntryPoint
+  lake build LeanCairo.CLI.Arguments LeanCairo.SierraCLI.Arguments
+  lake env lean "$TEST_FILE"
+
+  # Both CLIs write one record per function and pass of the fixed pipeline, in pipeline order.
+  lake exe leancairo-sierra-gen --module MyLeanSierraSubset --out "$TMP_DIR/sierra" --optimize true \
+    --emit-remarks "$TMP_DIR/sierra.jsonl"
+  lake exe leancairo-gen --module MyLeanContract --out "$TMP_DIR/cairo" --emit-casm false --optimize true \
+    --emit-remarks "$TMP_DIR/cairo.jsonl"
+)
+python3 - "$TMP_DIR/sierra.jsonl" "$TMP_DIR/cairo.jsonl" <<'PY'
+import json
+import sys
+
+PASSES = ["constant-propagation", "algebraic-fold", "canonicalize", "global-value-numbering"]
+KEYS = {"contract", "function", "pass", "ir_nodes_before", "ir_nodes_after", "sierra_statements", "static_cost"}
+
+for path, direct_sierra in ((sys.argv[1], True), (sys.argv[2], False)):
+    records = [json.loads(line) for line in open(path, encoding="utf-8")]
+    if not records:
+        raise SystemExit(f"{path}: no remark records")
+    by_function = {}
+    for record in records:
+        if set(record) != KEYS or set(record["static_cost"]) != {"steps", "range_checks", "gas"}:
+            raise SystemExit(f"{path}: unexpected remark schema: {record}")
+        statements = record["sierra_statements"]
+        if statements is not None and (not direct_sierra or not isinstance(statements, int)):
+            raise SystemExit(f"{path}: unexpected sierra_statements: {record}")
+        by_function.setdefault(record["function"], []).append(record)
+    for function, chain in by_function.items():
+        if [record["pass"] for record in chain] != PASSES:
+            raise SystemExit(f"{path}: {function}: expected one record per pass, got {[r['pass'] for r in chain]}")
+        for prev, nxt in zip(chain, chain[1:]):
+            if prev["ir_nodes_after"] != nxt["ir_nodes_before"]:
+                raise SystemExit(f"{path}: {function}: node counts do not chain at {nxt['pass']}")
+        if direct_sierra and not isinstance(chain[-1]["sierra_statements"], int):
+            raise SystemExit(f"{path}: {function}: emitted function has no Sierra statement count")
+PY
+
+echo "optimization remark checks passed"
@@ -0,0 +1,76 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+TEST_FILE="$ROOT_DIR/tests/lean/optimizer_cost_selection.lean"
+COST_MODEL="$ROOT_DIR/src/LeanCairo/Compiler/Optimize/CostModel.lean"
+COST_TABLE="$ROOT_DIR/config/sierra-libfunc-costs.json"
+export PATH="$HOME/.elan/bin:$PATH"
+
+if [[ ! -f "$TEST_FILE" ]]; then
+  echo "missing optimizer cost selection test file: $TEST_FILE"
+  exit 1
+fi
+
+# The Lean unit prices must match the cost table the Python estimator scores programs with.
+python3 - "$COST_MODEL" "$COST_TABLE" <<'PY'
+import json
+import re
+import sys
+
+source = open(sys.argv[1], encoding="utf-8").read()
+table = json.load(open(sys.argv[2], encoding="utf-8"))
+libfuncs = table["libfuncs"]
+
+
+def definition(name: str) -> str:
+    match = re.search(rf"^def {name}\b.*?(?=^\S|\Z)", source, re.MULTILINE | re.DOTALL)
+    if match is None:
+        raise SystemExit(f"missing cost model definition: {name}")
+    return match.group(0)
+
+
+def literal(entry: dict) -> str:
+    steps = entry.get("steps", entry.get("steps_per_cell"))
+    if entry.get("range_checks", 0):
+        return f"{{ steps := {steps}, rangeChecks := {entry['range_checks']} }}"
+    return f"{{ steps := {steps} }}"
+
+
+def branch(name: str, index: int) -> dict:
+    return libfuncs[name]["branches"][index]
+
+
+expectations = [
+    ("stepWeight", f"Nat := {table['weights']['step']}"),
+    ("rangeCheckWeight", f"Nat := {table['weights']['range_check']}"),
+    ("storeTempCost", literal(libfuncs["store_temp"])),
+    ("jumpCost", literal(libfuncs["jump"])),
+    ("u128OverflowingCost", literal(branch("u128_overflowing_add", 0))),
+    ("u128OverflowingCost", literal(branch("u128_overflowing_sub", 1))),
+    ("u128MulGuaranteeCost", literal(libfuncs["u128_guarantee_mul"])),
+    ("u128MulGuaranteeCost", literal(libfuncs["u128_mul_guarantee_verify"])),
+    ("u128MulViaFelt252Cost", literal(branch("u128s_from_felt252", 0))),
+    ("u128MulViaFelt252Cost", literal(branch("u128s_from_felt252", 1))),
+    ("u128EqCost", literal(branch("u128_eq", 0))),
+]
+failures = [
+    f"{name}: expected `{expected}`" for name, expected in expectations if expected not in definition(name)
+]
+if table["model"] != "sierra_static_gas_v1":
+    failures.append(f"cost table model changed to {table['model']}; recalibrate CostModel.lean")
+if failures:
+    print("Lean cost model is out of sync with the Sierra cost table:")
+    for failure in failures:
+        print(f"  {failure}")
+    sys.exit(1)
+PY
+
+(
+  cd "$ROOT_DIR"
+  lake build LeanCairo.Compiler.Optimize.CostModel LeanCairo.Compiler.Optimize.Selection
+  lake build LeanCairo.Pipeline.Sierra.EntryPoint LeanCairo.SierraCLI.Arguments
+  lake env lean "$TEST_FILE"
+)
+
+echo "optimizer cost selection checks passed"
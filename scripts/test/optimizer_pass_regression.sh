@@ -14,6 +14,8 @@ fi
   cd "$ROOT_DIR"
   lake build LeanCairo.Compiler.Optimize.Pipeline LeanCairo.Compiler.Optimize.IRSpec
   lake build LeanCairo.Compiler.Proof.OptimizeSound LeanCairo.Compiler.Proof.CSELetNormSound
+  lake build LeanCairo.Compiler.Proof.IntervalSound LeanCairo.Compiler.Proof.GVNSound
+  lake build LeanCairo.Compiler.Proof.ConstPropSound
   lake env lean "$TEST_FILE"
 )
 
@@ -0,0 +1,70 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+OPTIMIZER="$ROOT_DIR/scripts/sierra/optimize_structural.py"
+LIFT="$ROOT_DIR/scripts/sierra/render_review_lift.py"
+GOLDEN="$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json "$GOLDEN"; do
+  python3 "$OPTIMIZER" --input "$program" --out "$TMP_DIR/a.sierra.json" >/dev/null
+  python3 "$OPTIMIZER" --input "$program" --out "$TMP_DIR/a.sierra.bin" --format binary >/dev/null
+  python3 "$OPTIMIZER" --input "$program" --out "$TMP_DIR/b.sierra.bin" --format binary >/dev/null
+  cmp -s "$TMP_DIR/a.sierra.bin" "$TMP_DIR/b.sierra.bin"
+  # Binary input must optimize to the same JSON as the JSON input.
+  python3 "$OPTIMIZER" --input "$TMP_DIR/a.sierra.bin" --out "$TMP_DIR/from_bin.sierra.json" >/dev/null
+  diff -u "$TMP_DIR/a.sierra.json" "$TMP_DIR/from_bin.sierra.json" >/dev/null
+
+  python3 "$LIFT" --input "$TMP_DIR/a.sierra.json" --out "$TMP_DIR/lift_json.cairo"
+  python3 "$LIFT" --input "$TMP_DIR/a.sierra.bin" --out "$TMP_DIR/lift_bin.cairo"
+  diff <(sed '/^\/\/ Source Sierra:/d' "$TMP_DIR/lift_json.cairo") <(sed '/^\/\/ Source Sierra:/d' "$TMP_DIR/lift_bin.cairo") >/dev/null
+
+  python3 - "$TMP_DIR/a.sierra.json" "$TMP_DIR/a.sierra.bin" "$ROOT_DIR/scripts/sierra" <<'PY'
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, sys.argv[3])
+from model import iter_binary_statements, read_payload  # noqa: E402
+from model.encoding import BinaryDecoder, encode_binary, load_binary  # noqa: E402
+
+json_path, bin_path = Path(sys.argv[1]), Path(sys.argv[2])
+payload = json.loads(json_path.read_text(encoding="utf-8"))
+if read_payload(bin_path) != payload:
+    print(f"{bin_path}: binary payload does not round-trip to the JSON form")
+    sys.exit(1)
+with bin_path.open("rb") as handle:
+    if list(iter_binary_statements(handle)) != payload["statements"]:
+        print("streaming statement decode differs from the JSON statements")
+        sys.exit(1)
+raw = bin_path.read_bytes()
+if raw != encode_binary(read_payload(bin_path)):
+    print("re-encoding a decoded payload is not byte-identical")
+    sys.exit(1)
+if len(raw) * 2 > len(json_path.read_bytes()):
+    print(f"binary encoding ({len(raw)} B) is not at least 2x smaller than JSON ({len(json_path.read_bytes())} B)")
+    sys.exit(1)
+# Tiny refill chunks exercise the streaming decoder's buffer boundaries.
+BinaryDecoder.CHUNK_SIZE = 3
+if load_binary(io.BytesIO(raw)) != payload:
+    print("chunked decode differs from the JSON payload")
+    sys.exit(1)
+try:
+    load_binary(io.BytesIO(raw[:-5]))
+except ValueError:
+    pass
+else:
+    print("truncated binary payload decoded without error")
+    sys.exit(1)
+PY
+done
+
+if python3 "$LIFT" --input "$TMP_DIR/a.sierra.bin" --out "$TMP_DIR/forced.cairo" --format json >/dev/null 2>&1; then
+  echo "expected --format json to reject a binary input"
+  exit 1
+fi
+
+echo "sierra binary encoding checks passed"
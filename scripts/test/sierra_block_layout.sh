@@ -0,0 +1,105 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+LAYOUT="$ROOT_DIR/scripts/sierra/layout_blocks.py"
+INTERP="$ROOT_DIR/scripts/sierra/interpret_sierra.py"
+OPTIMIZE="$ROOT_DIR/scripts/bench/optimize_artifacts.py"
+NEWTON="$ROOT_DIR/examples/Sierra/newton_u128/sierra/program.sierra.json"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+# Static branch weights: every layout preserves semantics and is a fixed point of the pass.
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json; do
+  python3 "$LAYOUT" --input "$program" --out "$TMP_DIR/static.sierra.json" >/dev/null
+  python3 "$LAYOUT" --input "$TMP_DIR/static.sierra.json" --out "$TMP_DIR/static_again.sierra.json" >/dev/null
+  cmp -s "$TMP_DIR/static.sierra.json" "$TMP_DIR/static_again.sierra.json"
+  python3 "$INTERP" --input "$program" --compare "$TMP_DIR/static.sierra.json" --random 40 >/dev/null
+done
+
+# Random u128 inputs make the overflow arm of every Newton step hot; small inputs never overflow.
+python3 - "$TMP_DIR/small.jsonl" <<'PY'
+import json
+import sys
+
+with open(sys.argv[1], "w", encoding="utf-8") as handle:
+    for name in ("newtonReciprocalStep", "newtonReciprocalTwoSteps", "newtonReciprocalResidualAfterStep"):
+        for a in range(4):
+            handle.write(json.dumps({"function": name, "args": [str(a), "0"]}) + "\n")
+PY
+python3 "$INTERP" --input "$NEWTON" --profile "$TMP_DIR/random.profile.json" --random 40 --out "$TMP_DIR/random.jsonl" >/dev/null
+python3 "$INTERP" --input "$NEWTON" --vectors "$TMP_DIR/small.jsonl" --profile "$TMP_DIR/small.profile.json" \
+  --out "$TMP_DIR/small_runs.jsonl" >/dev/null
+
+for workload in random small; do
+  python3 "$LAYOUT" --input "$NEWTON" --profile "$TMP_DIR/$workload.profile.json" \
+    --out "$TMP_DIR/$workload.sierra.json" --report "$TMP_DIR/$workload.layout.json" >/dev/null
+  python3 "$INTERP" --input "$NEWTON" --compare "$TMP_DIR/$workload.sierra.json" --random 40 >/dev/null
+  python3 "$INTERP" --input "$TMP_DIR/$workload.sierra.json" --vectors "$TMP_DIR/small.jsonl" \
+    --out "$TMP_DIR/$workload.small_runs.jsonl" >/dev/null
+done
+
+python3 - "$TMP_DIR" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+tmp = Path(sys.argv[1])
+load = lambda name: json.loads((tmp / name).read_text(encoding="utf-8"))
+steps = lambda name: sum(json.loads(line)["steps"] for line in (tmp / name).read_text().splitlines())
+
+random_layout = load("random.layout.json")
+if any(row["jumps_removed"] or row["jumps_added"] for row in random_layout["functions"]):
+    print("a profile with hot overflow arms must keep the emitted layout")
+    sys.exit(1)
+small_layout = load("small.layout.json")
+removed = sum(row["jumps_removed"] for row in small_layout["functions"])
+added = sum(row["jumps_added"] for row in small_layout["functions"])
+if removed != 5 or added != 5:
+    print(f"expected every Newton diamond to move its jump to the cold arm, got -{removed}/+{added}")
+    sys.exit(1)
+jumps = small_layout["profiled_jump_steps"]
+if jumps["after"] != 0 or jumps["before"] <= 0:
+    print(f"hot paths should execute no jumps after layout: {jumps}")
+    sys.exit(1)
+baseline, laid_out = steps("small_runs.jsonl"), steps("small.small_runs.jsonl")
+if baseline - laid_out != jumps["before"]:
+    print(f"executed steps {baseline} -> {laid_out} do not match the saved jumps {jumps['before']}")
+    sys.exit(1)
+if steps("random.small_runs.jsonl") != baseline:
+    print("an unchanged layout must execute the same steps")
+    sys.exit(1)
+PY
+
+# Profiles are bound to the statement layout they were recorded on.
+if python3 "$LAYOUT" --input "$TMP_DIR/small.sierra.json" --profile "$TMP_DIR/small.profile.json" \
+  --out "$TMP_DIR/stale.sierra.json" >/dev/null 2>&1; then
+  echo "expected a profile from a different layout to be rejected"
+  exit 1
+fi
+
+# The layout decision is carried into the artifact optimization report.
+python3 - "$TMP_DIR/dev" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+out = Path(sys.argv[1])
+out.mkdir(parents=True)
+(out / "pkg_Demo.contract_class.json").write_text(json.dumps({"sierra_program": ["0x1"], "abi": []}))
+contract = {"contract_name": "Demo", "artifacts": {"sierra": "pkg_Demo.contract_class.json"}}
+(out / "pkg.starknet_artifacts.json").write_text(json.dumps({"version": 1, "contracts": [contract]}))
+PY
+python3 "$OPTIMIZE" --index "$TMP_DIR/dev/pkg.starknet_artifacts.json" --contract-name Demo --out-dir "$TMP_DIR/opt" \
+  --sierra-layout-report "$TMP_DIR/small.layout.json" --no-signature-cache >/dev/null
+python3 - "$TMP_DIR/opt/artifact_optimization_report.json" "$TMP_DIR/small.layout.json" <<'PY'
+import json
+import sys
+
+report, layout = (json.load(open(path, encoding="utf-8")) for path in sys.argv[1:3])
+if report["sierra_layout"]["functions"] != layout["functions"]:
+    print("artifact optimization report does not record the block layout decision")
+    sys.exit(1)
+PY
+
+echo "sierra block layout checks passed"
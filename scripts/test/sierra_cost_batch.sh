@@ -0,0 +1,172 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+COST="$ROOT_DIR/scripts/bench/compute_sierra_cost.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+python3 - "$TMP_DIR" "$ROOT_DIR/examples/Sierra" <<'PY'
+import json
+import shutil
+import sys
+from pathlib import Path
+
+tmp = Path(sys.argv[1])
+programs = sorted(Path(sys.argv[2]).glob("*/sierra/program.sierra.json"))[:3]
+for idx, program in enumerate(programs):
+    dev = tmp / f"cand_{idx}" / "target" / "dev"
+    dev.mkdir(parents=True)
+    shutil.copyfile(program, dev / "pkg.sierra.json")
+    sierra = {
+        "sierra_program": ["0x0"] * (10 + idx),
+        "entry_points_by_type": {"EXTERNAL": [{"selector": "0x1", "function_idx": 0}]},
+        "abi": [{"type": "interface", "name": "I", "items": [{"type": "function", "name": "f"}]}],
+    }
+    casm = {"bytecode": ["0x0"] * (20 + idx), "hints": []}
+    (dev / "pkg_Demo.contract_class.json").write_text(json.dumps(sierra))
+    (dev / "pkg_Demo.compiled_contract_class.json").write_text(json.dumps(casm))
+    index = {
+        "contracts": [
+            {
+                "contract_name": "Demo",
+                "artifacts": {"sierra": "pkg_Demo.contract_class.json", "casm": "pkg_Demo.compiled_contract_class.json"},
+            }
+        ]
+    }
+    (dev / "pkg.starknet_artifacts.json").write_text(json.dumps(index))
+PY
+
+python3 "$COST" --batch "$TMP_DIR/cand_*/target/dev/*.starknet_artifacts.json" \
+  --contract-name Demo --pair-sierra-program --jobs 2 --out "$TMP_DIR/batch.jsonl"
+python3 "$COST" --batch "$TMP_DIR/cand_*/target/dev/*.starknet_artifacts.json" \
+  --contract-name Demo --pair-sierra-program --jobs 1 >"$TMP_DIR/serial.jsonl"
+cmp -s "$TMP_DIR/batch.jsonl" "$TMP_DIR/serial.jsonl"
+
+for idx in 0 1 2; do
+  dev="$TMP_DIR/cand_$idx/target/dev"
+  python3 "$COST" --index "$dev/pkg.starknet_artifacts.json" --contract-name Demo \
+    --sierra-program "$dev/pkg.sierra.json" >"$TMP_DIR/single_$idx.json"
+done
+
+python3 - "$TMP_DIR" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+tmp = Path(sys.argv[1])
+rows = [json.loads(line) for line in (tmp / "batch.jsonl").read_text().splitlines()]
+if len(rows) != 3:
+    print(f"expected three batch rows, got {len(rows)}")
+    sys.exit(1)
+for idx, row in enumerate(rows):
+    single = json.loads((tmp / f"single_{idx}.json").read_text())
+    if not row["index"].endswith(f"cand_{idx}/target/dev/pkg.starknet_artifacts.json"):
+        print(f"batch rows are out of input order: {row['index']}")
+        sys.exit(1)
+    row.pop("index")
+    if row != single:
+        print(f"batch row {idx} differs from single-contract metrics")
+        sys.exit(1)
+    if row["score_model"] == "length_v1" or row["casm_bytecode_len"] != 20 + idx:
+        print(f"batch row {idx} did not pair the Sierra program: {row['score_model']}")
+        sys.exit(1)
+PY
+
+# A bad candidate yields an error row and a failing exit, without hiding the good rows.
+status=0
+python3 "$COST" --batch "$TMP_DIR/cand_0/target/dev/pkg.starknet_artifacts.json" "$TMP_DIR/missing.json" \
+  --contract-name Demo --out "$TMP_DIR/partial.jsonl" 2>/dev/null || status=$?
+if [[ "$status" -ne 1 ]]; then
+  echo "expected exit 1 for a batch with a missing index, got $status"
+  exit 1
+fi
+python3 - "$TMP_DIR/partial.jsonl" <<'PY'
+import json
+import sys
+
+rows = [json.loads(line) for line in open(sys.argv[1], encoding="utf-8")]
+if "error" in rows[0] or "error" not in rows[1]:
+    print(f"unexpected partial batch rows: {rows}")
+    sys.exit(1)
+PY
+
+# A looping program has no static bound: its row says so, and the batch falls back to length scores.
+cp -R "$TMP_DIR/cand_1" "$TMP_DIR/loop"
+python3 - "$TMP_DIR/loop/target/dev/pkg.sierra.json" <<'PY'
+import json
+import sys
+
+path = sys.argv[1]
+payload = json.load(open(path, encoding="utf-8"))
+entry = payload["funcs"][0]["entry_point"]
+jump_id = 1 + max(decl["id"]["id"] for decl in payload["libfunc_declarations"])
+payload["libfunc_declarations"].append(
+    {"id": {"id": jump_id, "debug_name": "jump"}, "long_id": {"generic_id": "jump", "generic_args": []}}
+)
+payload["statements"][entry] = {
+    "Invocation": {
+        "libfunc_id": {"id": jump_id, "debug_name": "jump"},
+        "args": [],
+        "branches": [{"target": {"Statement": entry}, "results": []}],
+    }
+}
+json.dump(payload, open(path, "w", encoding="utf-8"))
+PY
+python3 "$COST" --batch "$TMP_DIR/cand_0/target/dev/pkg.starknet_artifacts.json" \
+  "$TMP_DIR/loop/target/dev/pkg.starknet_artifacts.json" \
+  --contract-name Demo --pair-sierra-program --out "$TMP_DIR/loop.jsonl"
+python3 - "$TMP_DIR/loop.jsonl" <<'PY'
+import json
+import sys
+
+bounded, looping = [json.loads(line) for line in open(sys.argv[1], encoding="utf-8")]
+if looping["static_worst_case_gas"] is not None or "cyclic control flow" not in looping.get("static_unbounded", ""):
+    print(f"looping program was not reported as unbounded: {looping}")
+    sys.exit(1)
+if not isinstance(bounded["static_worst_case_gas"], int):
+    print(f"bounded program lost its static estimate: {bounded}")
+    sys.exit(1)
+for row, casm_len in ((bounded, 20), (looping, 21)):
+    if row["score_model"] != "length_v1" or row["score"] != casm_len * 10_000 + row["sierra_program_len"]:
+        print(f"mixed batch must fall back to length scores: {row}")
+        sys.exit(1)
+PY
+
+# Alone, an unbounded program has no score to fall back to, so the single-program mode refuses it.
+if python3 "$COST" --sierra-program "$TMP_DIR/loop/target/dev/pkg.sierra.json" >/dev/null 2>"$TMP_DIR/alone.log"; then
+  echo "expected an unbounded program without --index to fail"
+  exit 1
+fi
+rg -q 'no static gas bound .*pass --index' "$TMP_DIR/alone.log"
+
+# Pairing follows the selected contract, not the first program in target/dev; a candidate without a
+# program of its own makes the whole batch fall back to length scores.
+cp "$TMP_DIR/loop/target/dev/pkg.sierra.json" "$TMP_DIR/cand_0/target/dev/aaa_Other.sierra.json"
+cp -R "$TMP_DIR/cand_2" "$TMP_DIR/unpaired"
+rm "$TMP_DIR/unpaired/target/dev/pkg.sierra.json"
+python3 "$COST" --batch "$TMP_DIR/cand_0/target/dev/pkg.starknet_artifacts.json" \
+  --contract-name Demo --pair-sierra-program --out "$TMP_DIR/paired.jsonl"
+python3 "$COST" --batch "$TMP_DIR/cand_0/target/dev/pkg.starknet_artifacts.json" \
+  "$TMP_DIR/unpaired/target/dev/pkg.starknet_artifacts.json" \
+  --contract-name Demo --pair-sierra-program --out "$TMP_DIR/unpaired.jsonl"
+python3 - "$TMP_DIR/paired.jsonl" "$TMP_DIR/unpaired.jsonl" <<'PY'
+import json
+import sys
+
+(paired,) = [json.loads(line) for line in open(sys.argv[1], encoding="utf-8")]
+if not paired["sierra_program"].endswith("cand_0/target/dev/pkg.sierra.json"):
+    print(f"paired a program that belongs to another contract: {paired['sierra_program']}")
+    sys.exit(1)
+rows = [json.loads(line) for line in open(sys.argv[2], encoding="utf-8")]
+if "sierra_program" in rows[1] or any(row["score_model"] != "length_v1" for row in rows):
+    print(f"batch with an unpaired candidate must fall back to length scores: {rows}")
+    sys.exit(1)
+PY
+
+if python3 "$COST" --batch "$TMP_DIR/nothing_*/x.json" >/dev/null 2>&1; then
+  echo "expected an unmatched batch glob to fail"
+  exit 1
+fi
+
+echo "sierra cost batch checks passed"
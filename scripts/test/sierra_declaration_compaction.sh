@@ -0,0 +1,117 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+OPTIMIZER="$ROOT_DIR/scripts/sierra/optimize_structural.py"
+ESTIMATOR="$ROOT_DIR/scripts/sierra/estimate_static_gas.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"; do
+  python3 "$OPTIMIZER" --compact-declarations --input "$program" --out "$TMP_DIR/a.sierra.json" --report "$TMP_DIR/report.json" >/dev/null
+  python3 "$OPTIMIZER" --compact-declarations --input "$program" --out "$TMP_DIR/b.sierra.json" >/dev/null
+  diff -u "$TMP_DIR/a.sierra.json" "$TMP_DIR/b.sierra.json" >/dev/null
+  python3 "$OPTIMIZER" --compact-declarations --input "$TMP_DIR/a.sierra.json" --out "$TMP_DIR/again.sierra.json" >/dev/null
+  diff -u "$TMP_DIR/a.sierra.json" "$TMP_DIR/again.sierra.json" >/dev/null
+
+  python3 "$ESTIMATOR" --input "$program" --out "$TMP_DIR/gas.base.json" >/dev/null
+  python3 "$ESTIMATOR" --input "$TMP_DIR/a.sierra.json" --out "$TMP_DIR/gas.compact.json" >/dev/null
+
+  python3 - "$program" "$TMP_DIR/a.sierra.json" "$TMP_DIR/report.json" "$TMP_DIR/gas.base.json" "$TMP_DIR/gas.compact.json" <<'PY'
+import json
+import sys
+
+base, compact, report, gas_base, gas_compact = (json.load(open(path, encoding="utf-8")) for path in sys.argv[1:6])
+label = sys.argv[1]
+
+for key in ("type_declarations", "libfunc_declarations"):
+    ids = [decl["id"]["id"] for decl in compact[key]]
+    if ids != list(range(len(ids))):
+        print(f"{label}: {key} ids are not dense 0..n in declaration order")
+        sys.exit(1)
+
+var_ids = set()
+for func in compact["funcs"]:
+    var_ids.update(param["id"]["id"] for param in func["params"])
+for stmt in compact["statements"]:
+    if "Return" in stmt:
+        var_ids.update(var["id"] for var in stmt["Return"])
+        continue
+    var_ids.update(var["id"] for var in stmt["Invocation"]["args"])
+    for branch in stmt["Invocation"]["branches"]:
+        var_ids.update(var["id"] for var in branch["results"])
+if var_ids != set(range(len(var_ids))):
+    print(f"{label}: var ids are not dense")
+    sys.exit(1)
+
+
+def shape(payload):
+    return [
+        ("return", len(stmt["Return"]))
+        if "Return" in stmt
+        else (stmt["Invocation"]["libfunc_id"]["debug_name"], [b["target"] for b in stmt["Invocation"]["branches"]])
+        for stmt in payload["statements"]
+    ]
+
+
+if shape(base) != shape(compact):
+    print(f"{label}: compaction changed the statement stream")
+    sys.exit(1)
+if gas_base["total_worst_case_gas"] != gas_compact["total_worst_case_gas"]:
+    print(f"{label}: compaction changed the static gas estimate")
+    sys.exit(1)
+if report["delta"]["bytes"] >= 0 or report["after"]["bytes"] - report["before"]["bytes"] != report["delta"]["bytes"]:
+    print(f"{label}: expected a consistent, negative size delta in the report")
+    sys.exit(1)
+PY
+done
+
+GOLDEN="$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"
+python3 - "$ROOT_DIR/examples/Sierra/newton_u128/sierra/program.sierra.json" "$TMP_DIR/padded.sierra.json" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+u128 = next(decl["id"] for decl in payload["type_declarations"] if decl["long_id"]["generic_id"] == "u128")
+payload["type_declarations"].append(
+    {
+        "id": {"id": 9_000_001, "debug_name": "UnusedPair"},
+        "long_id": {"generic_id": "Struct", "generic_args": [{"UserType": {"debug_name": "UnusedPair"}}, {"Type": u128}]},
+        "declared_type_info": None,
+    }
+)
+payload["libfunc_declarations"].append(
+    {"id": {"id": 9_000_002, "debug_name": "drop_UnusedPair"}, "long_id": {"generic_id": "drop", "generic_args": [{"Type": {"id": 9_000_001, "debug_name": "UnusedPair"}}]}}
+)
+json.dump(payload, open(sys.argv[2], "w", encoding="utf-8"))
+PY
+
+python3 "$OPTIMIZER" --compact-declarations --input "$TMP_DIR/padded.sierra.json" --out "$TMP_DIR/pruned.sierra.json" >"$TMP_DIR/pruned.log"
+if ! rg -q "declarations pruned: types 1, libfuncs 1" "$TMP_DIR/pruned.log"; then
+  echo "expected the injected unused type and libfunc declarations to be pruned"
+  cat "$TMP_DIR/pruned.log"
+  exit 1
+fi
+python3 - "$TMP_DIR/pruned.sierra.json" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+names = {decl["id"]["debug_name"] for decl in payload["type_declarations"]}
+if "UnusedPair" in names or "U128MulGuarantee" not in names or "RangeCheck" not in names:
+    print(f"unexpected retained type set after pruning: {sorted(names)}")
+    sys.exit(1)
+PY
+
+python3 "$OPTIMIZER" --input "$GOLDEN" --out "$TMP_DIR/plain.sierra.json" >/dev/null
+python3 - "$GOLDEN" "$TMP_DIR/plain.sierra.json" <<'PY'
+import json
+import sys
+
+base, plain = (json.load(open(path, encoding="utf-8")) for path in sys.argv[1:3])
+if base["statements"] != plain["statements"] or base["funcs"] != plain["funcs"]:
+    print("compaction must stay opt-in: default structural output changed ids")
+    sys.exit(1)
+PY
+
+echo "sierra declaration compaction checks passed"
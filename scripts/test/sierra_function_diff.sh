@@ -0,0 +1,77 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+DIFF="$ROOT_DIR/scripts/sierra/diff_sierra_functions.py"
+PEEPHOLE="$ROOT_DIR/scripts/sierra/optimize_peephole.py"
+PROGRAM="$ROOT_DIR/examples/Sierra/u128_range_checked/sierra/program.sierra.json"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+python3 "$DIFF" --before "$PROGRAM" --after "$PROGRAM" --out "$TMP_DIR/self.json" >/dev/null
+python3 "$PEEPHOLE" --input "$PROGRAM" --out "$TMP_DIR/peephole.sierra.json" >/dev/null
+python3 "$DIFF" --before "$PROGRAM" --after "$TMP_DIR/peephole.sierra.json" \
+  --out "$TMP_DIR/diff.json" --markdown "$TMP_DIR/diff.md" >/dev/null
+python3 "$DIFF" --before "$PROGRAM" --after "$TMP_DIR/peephole.sierra.json" \
+  --out "$TMP_DIR/diff_again.json" --markdown "$TMP_DIR/diff_again.md" >/dev/null
+cmp -s "$TMP_DIR/diff.json" "$TMP_DIR/diff_again.json"
+cmp -s "$TMP_DIR/diff.md" "$TMP_DIR/diff_again.md"
+
+python3 - "$PROGRAM" "$TMP_DIR/renamed.sierra.json" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+payload["funcs"][0]["id"]["debug_name"] = "renamedFunction"
+open(sys.argv[2], "w", encoding="utf-8").write(json.dumps(payload))
+PY
+python3 "$DIFF" --before "$PROGRAM" --after "$TMP_DIR/renamed.sierra.json" --out "$TMP_DIR/renamed.json" >/dev/null
+
+python3 - "$TMP_DIR" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+tmp = Path(sys.argv[1])
+load = lambda name: json.loads((tmp / name).read_text(encoding="utf-8"))
+
+identity = load("self.json")
+if any(row["status"] != "unchanged" for row in identity["functions"]) or identity["total_worst_case_gas"]["delta"]:
+    print("self-diff must report every function unchanged")
+    sys.exit(1)
+
+diff = load("diff.json")
+total = diff["total_worst_case_gas"]["delta"]
+attributed = sum(row["worst_case_gas"]["delta"] for row in diff["functions"])
+if total >= 0 or attributed != total:
+    print(f"function attribution ({attributed}) must sum to the program gas delta ({total}) and show a saving")
+    sys.exit(1)
+for row in diff["functions"]:
+    blocks = row["blocks"]
+    block_delta = sum(block["static_cost"]["delta"] for block in blocks["changed"])
+    block_delta += sum(block["static_cost"] for block in blocks["added"]) - sum(
+        block["static_cost"] for block in blocks["removed"]
+    )
+    if row["status"] == "changed" and not row["libfuncs"]["removed"]:
+        print(f"{row['name']}: changed function lists no removed libfuncs")
+        sys.exit(1)
+    if row["status"] == "unchanged" and (block_delta or blocks["changed"]):
+        print(f"{row['name']}: unchanged function has block changes")
+        sys.exit(1)
+    if row["status"] == "changed" and block_delta != row["worst_case_gas"]["delta"]:
+        # Straight-line merge points: the saved store_temps sit on the worst path.
+        print(f"{row['name']}: block deltas ({block_delta}) do not explain {row['worst_case_gas']['delta']}")
+        sys.exit(1)
+
+renamed = load("renamed.json")
+statuses = {row["name"]: row["status"] for row in renamed["functions"]}
+if statuses.get("renamedFunction") != "added" or "removed" not in statuses.values():
+    print(f"renamed function should show as added/removed: {statuses}")
+    sys.exit(1)
+PY
+
+rg -q '^## Function Cost Attribution$' "$TMP_DIR/diff.md"
+rg -q '^## Changed Blocks$' "$TMP_DIR/diff.md"
+rg -q '^\| `addU128Wrapping` \| `changed` \|' "$TMP_DIR/diff.md"
+
+echo "sierra function diff checks passed"
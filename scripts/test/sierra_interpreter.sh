@@ -0,0 +1,129 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+INTERPRETER="$ROOT_DIR/scripts/sierra/interpret_sierra.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+python3 - "$ROOT_DIR" <<'PY'
+import random
+import sys
+from pathlib import Path
+
+root = Path(sys.argv[1])
+sys.path.insert(0, str(root / "scripts" / "sierra"))
+from estimate_static_gas import DEFAULT_COST_TABLE, estimate_program, load_cost_table  # noqa: E402
+from interpret_sierra import Runner  # noqa: E402
+from model import load_program  # noqa: E402
+from model.interpreter import FELT252_PRIME as P  # noqa: E402
+
+M = 2**128
+cost_table = load_cost_table(DEFAULT_COST_TABLE)
+examples = root / "examples" / "Sierra"
+
+
+def runner(example: str) -> Runner:
+    return Runner(load_program(examples / example / "sierra" / "program.sierra.json"), cost_table)
+
+
+def u128() -> int:
+    return random.choice([0, 1, M - 1, M - 2, 2**64, random.randrange(M)])
+
+
+def felt() -> int:
+    return random.choice([0, 1, P - 1, random.randrange(P)])
+
+
+def check(example: str, function: str, make_args, expected) -> None:
+    run = runner(example)
+    for _ in range(200):
+        args = make_args()
+        observed = run.run_json(function, [str(arg) if type(arg) is int else arg for arg in args])["results"]
+        want = expected(*args)
+        if observed != want:
+            print(f"{example}.{function}{tuple(args)}: interpreter {observed} != reference {want}")
+            sys.exit(1)
+
+
+random.seed(7)
+check("u128_range_checked", "addU128Wrapping", lambda: [u128(), u128()], lambda a, b: [(a + b) % M])
+check("u128_range_checked", "subU128Wrapping", lambda: [u128(), u128()], lambda a, b: [(a - b) % M])
+check("u128_range_checked", "mulU128Wrapping", lambda: [u128(), u128()], lambda a, b: [(a * b) % M])
+check("fast_power_u128", "pow13U128", lambda: [u128()], lambda a: [pow(a, 13, M)])
+
+
+def karatsuba(x0: int, x1: int, y0: int, y1: int) -> list[int]:
+    z0, z1, z2 = x0 * y0 % M, x1 * y1 % M, (x0 + x1) % M * ((y0 + y1) % M) % M
+    cross = (z2 - z0 - z1) % M
+    return [(z0 + cross * 10**9 % M + z1 * 10**18 % M) % M]
+
+
+check("karatsuba_u128", "karatsubaCombine", lambda: [u128(), u128(), u128(), u128()], karatsuba)
+check("scalar_core", "feltAffine", lambda: [felt(), felt()], lambda x, y: [((x + 7) * y - x) % P])
+check("scalar_core", "eqFelt252", lambda: random.choice([[5, 5], [felt(), felt()]]), lambda a, b: [a == b])
+check("scalar_core", "eqU128", lambda: random.choice([[9, 9], [u128(), u128()]]), lambda a, b: [a == b])
+check("scalar_core", "identityBool", lambda: [random.random() < 0.5], lambda flag: [flag])
+check("scalar_core", "literalTrue", lambda: [], lambda: [True])
+
+# Dynamic cost of any run lies between the static best and worst case of its function.
+for program_path in sorted(examples.glob("*/sierra/program.sierra.json")):
+    run = Runner(load_program(program_path), cost_table)
+    static = {fn["name"]: fn for fn in estimate_program(run.program.raw, cost_table)["functions"]}
+    weights = cost_table["weights"]
+    rng = random.Random(11)
+    for func in run.program.functions:
+        for _ in range(50):
+            args = [run.codec.random_json(ty, rng) for ty in run.user_param_types(func.name)]
+            result = run.run_json(func.name, args)
+            gas = result["steps"] * weights["step"] + result["range_checks"] * weights["range_check"]
+            bounds = static[func.name]
+            if not bounds["best_case"]["gas"] <= gas <= bounds["worst_case"]["gas"]:
+                print(f"{program_path}: {func.name}: dynamic gas {gas} outside static bounds {bounds['best_case']['gas']}..{bounds['worst_case']['gas']}")
+                sys.exit(1)
+PY
+
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json; do
+  python3 "$ROOT_DIR/scripts/sierra/optimize_peephole.py" --input "$program" --out "$TMP_DIR/peephole.sierra.json" >/dev/null
+  python3 "$ROOT_DIR/scripts/sierra/optimize_structural.py" --compact-declarations \
+    --input "$TMP_DIR/peephole.sierra.json" --out "$TMP_DIR/compact.sierra.json" >/dev/null
+  python3 "$INTERPRETER" --input "$program" --compare "$TMP_DIR/compact.sierra.json" --random 40 >"$TMP_DIR/compare.json" || {
+    echo "$program: optimized program is not equivalent under the reference interpreter"
+    cat "$TMP_DIR/compare.json"
+    exit 1
+  }
+done
+
+GOLDEN="$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"
+printf '%s\n' '{"function": "feltAffine", "args": [2, 3]}' '{"function": "constU128", "args": []}' >"$TMP_DIR/vectors.jsonl"
+python3 "$INTERPRETER" --input "$GOLDEN" --vectors "$TMP_DIR/vectors.jsonl" --out "$TMP_DIR/results.jsonl" >/dev/null
+python3 - "$TMP_DIR/results.jsonl" <<'PY'
+import json
+import sys
+
+rows = [json.loads(line) for line in open(sys.argv[1], encoding="utf-8")]
+if [row["results"] for row in rows] != [[(2 + 7) * 3 - 2], [42]]:
+    print(f"unexpected vector results: {rows}")
+    sys.exit(1)
+PY
+
+python3 - "$GOLDEN" "$TMP_DIR/reused.sierra.json" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+first = payload["statements"][0]["Invocation"]
+payload["statements"][1]["Return"] = list(first["args"])
+json.dump(payload, open(sys.argv[2], "w", encoding="utf-8"))
+PY
+if python3 "$INTERPRETER" --input "$TMP_DIR/reused.sierra.json" --function identityFelt --args '[1]' >"$TMP_DIR/reused.log" 2>&1; then
+  echo "expected the interpreter to reject a consumed var"
+  exit 1
+fi
+if ! rg -q "undefined or consumed var" "$TMP_DIR/reused.log"; then
+  echo "consumed-var diagnostic was not reported"
+  cat "$TMP_DIR/reused.log"
+  exit 1
+fi
+
+echo "sierra interpreter checks passed"
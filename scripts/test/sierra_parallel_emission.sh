@@ -0,0 +1,19 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+TEST_FILE="$ROOT_DIR/tests/lean/sierra_parallel_emission.lean"
+export PATH="$HOME/.elan/bin:$PATH"
+
+if [[ ! -f "$TEST_FILE" ]]; then
+  echo "missing parallel emission test file: $TEST_FILE"
+  exit 1
+fi
+
+(
+  cd "$ROOT_DIR"
+  lake build LeanCairo.Backend.Sierra.Emit.Subset.Function
+  lake env lean "$TEST_FILE"
+)
+
+echo "sierra parallel emission checks passed"
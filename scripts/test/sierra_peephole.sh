@@ -0,0 +1,121 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+PEEPHOLE="$ROOT_DIR/scripts/sierra/optimize_peephole.py"
+GOLDEN="$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json "$GOLDEN"; do
+  python3 "$PEEPHOLE" --input "$program" --out "$TMP_DIR/a.sierra.json" --report "$TMP_DIR/report.json" >/dev/null
+  python3 "$PEEPHOLE" --input "$program" --out "$TMP_DIR/b.sierra.json" >/dev/null
+  diff -u "$TMP_DIR/a.sierra.json" "$TMP_DIR/b.sierra.json" >/dev/null
+  python3 "$PEEPHOLE" --input "$TMP_DIR/a.sierra.json" --out "$TMP_DIR/again.sierra.json" --report "$TMP_DIR/again.json" >/dev/null
+
+  python3 - "$program" "$TMP_DIR/report.json" "$TMP_DIR/again.json" <<'PY'
+import json
+import sys
+
+label = sys.argv[1]
+report, again = (json.load(open(path, encoding="utf-8")) for path in sys.argv[2:4])
+hits = sum(counter["hits"] for counter in report["rules"].values())
+gas = report["static_worst_case_gas"]
+if gas["after"] > gas["before"]:
+    print(f"{label}: peephole increased static gas {gas['before']} -> {gas['after']}")
+    sys.exit(1)
+if hits and not (gas["after"] < gas["before"] or report["statements"]["after"] < report["statements"]["before"]):
+    print(f"{label}: {hits} rule hits without any statement or gas reduction")
+    sys.exit(1)
+if any(counter["hits"] for counter in again["rules"].values()):
+    print(f"{label}: peephole output is not a fixed point: {again['rules']}")
+    sys.exit(1)
+PY
+done
+
+python3 "$PEEPHOLE" --input "$ROOT_DIR/examples/Sierra/u128_range_checked/sierra/program.sierra.json" \
+  --out "$TMP_DIR/u128.sierra.json" >"$TMP_DIR/u128.log"
+if ! rg -q "rule redundant_store_temp: hits=[1-9]" "$TMP_DIR/u128.log"; then
+  echo "expected redundant_store_temp to fire on the u128 range-checked merge points"
+  cat "$TMP_DIR/u128.log"
+  exit 1
+fi
+
+python3 - "$GOLDEN" "$TMP_DIR/padded.sierra.json" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+felt = next(decl["id"] for decl in payload["type_declarations"] if decl["id"]["debug_name"] == "felt252")
+dup = next(decl["id"] for decl in payload["libfunc_declarations"] if decl["id"]["debug_name"] == "dup_felt252")
+drop = {"id": 9_000_001, "debug_name": "drop_felt252"}
+jump = {"id": 9_000_002, "debug_name": "jump"}
+payload["libfunc_declarations"] += [
+    {"id": drop, "long_id": {"generic_id": "drop", "generic_args": [{"Type": felt}]}},
+    {"id": jump, "long_id": {"generic_id": "jump", "generic_args": []}},
+]
+func = payload["funcs"][0]
+param = func["params"][0]["id"]
+keep = {"id": 9_000_003, "debug_name": "peephole::dup_keep"}
+use = {"id": 9_000_004, "debug_name": "peephole::dup_use"}
+statements = payload["statements"]
+for stmt in statements:
+    for branch in stmt.get("Invocation", {}).get("branches", []):
+        if isinstance(branch["target"], dict):
+            branch["target"]["Statement"] += 3
+for other in payload["funcs"]:
+    if other is not func:
+        other["entry_point"] += 3
+entry = func["entry_point"]
+statements[entry]["Invocation"]["args"] = [keep if arg == param else arg for arg in statements[entry]["Invocation"]["args"]]
+injected = [
+    {"Invocation": {"libfunc_id": dup, "args": [param], "branches": [{"target": "Fallthrough", "results": [keep, use]}]}},
+    {"Invocation": {"libfunc_id": drop, "args": [use], "branches": [{"target": "Fallthrough", "results": []}]}},
+    {"Invocation": {"libfunc_id": jump, "args": [], "branches": [{"target": {"Statement": entry + 3}, "results": []}]}},
+]
+payload["statements"] = statements[:entry] + injected + statements[entry:]
+json.dump(payload, open(sys.argv[2], "w", encoding="utf-8"))
+PY
+
+python3 "$PEEPHOLE" --input "$TMP_DIR/padded.sierra.json" --out "$TMP_DIR/cleaned.sierra.json" >"$TMP_DIR/padded.log"
+for expected in "rule jump_to_next: hits=1" "rule dup_then_drop: hits=1"; do
+  if ! rg -q "$expected" "$TMP_DIR/padded.log"; then
+    echo "missing peephole counter: $expected"
+    cat "$TMP_DIR/padded.log"
+    exit 1
+  fi
+done
+python3 - "$GOLDEN" "$TMP_DIR/cleaned.sierra.json" <<'PY'
+import json
+import sys
+
+base, cleaned = (json.load(open(path, encoding="utf-8")) for path in sys.argv[1:3])
+if base["statements"] != cleaned["statements"] or base["funcs"] != cleaned["funcs"]:
+    print("peephole did not restore the program after removing injected dup/drop and jump")
+    sys.exit(1)
+PY
+
+python3 - "$GOLDEN" "$TMP_DIR/broken.sierra.json" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+payload["statements"][1]["Return"] = [{"id": 9_000_005, "debug_name": "never_defined"}]
+json.dump(payload, open(sys.argv[2], "w", encoding="utf-8"))
+PY
+if python3 "$PEEPHOLE" --input "$TMP_DIR/broken.sierra.json" --out "$TMP_DIR/broken.out.json" >"$TMP_DIR/broken.log" 2>&1; then
+  echo "expected peephole check to reject a use of an undefined var"
+  exit 1
+fi
+if ! rg -q "uses undefined vars" "$TMP_DIR/broken.log"; then
+  echo "undefined-var diagnostic was not reported"
+  cat "$TMP_DIR/broken.log"
+  exit 1
+fi
+
+if python3 "$PEEPHOLE" --input "$GOLDEN" --out "$TMP_DIR/unknown.json" --rules no_such_rule >"$TMP_DIR/unknown.log" 2>&1; then
+  echo "expected unknown peephole rule to be rejected"
+  exit 1
+fi
+
+echo "sierra peephole checks passed"
@@ -0,0 +1,104 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+GOLDEN="$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"
+
+python3 - "$ROOT_DIR/scripts/sierra" "$GOLDEN" "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json <<'PY'
+import sys
+from pathlib import Path
+
+sys.path.insert(0, sys.argv[1])
+from model import ControlFlowGraph, DominatorTree, Liveness, load_program  # noqa: E402
+
+for raw_path in sys.argv[2:]:
+    path = Path(raw_path)
+    program = load_program(path)
+    cfg = ControlFlowGraph(program)
+
+    covered = [stmt for block in cfg.blocks for stmt in block.statements()]
+    if covered != list(range(len(program))):
+        print(f"{path}: basic blocks do not partition the statement list")
+        sys.exit(1)
+    for block in cfg.blocks:
+        for stmt_idx in range(block.start, block.terminator):
+            if program.successors(stmt_idx) != [stmt_idx + 1]:
+                print(f"{path}: statement {stmt_idx} branches from the middle of block {block.index}")
+                sys.exit(1)
+        for succ in block.successors:
+            if block.index not in cfg.blocks[succ].predecessors:
+                print(f"{path}: edge {block.index}->{succ} missing from predecessor list")
+                sys.exit(1)
+
+    for func in program.functions:
+        entry = cfg.entry_block(func.entry_point)
+        if cfg.blocks[entry].start != func.entry_point:
+            print(f"{path}: {func.name}: entry point does not start a block")
+            sys.exit(1)
+        order = cfg.function_blocks(func.entry_point)
+        if order[0] != entry or len(set(order)) != len(order):
+            print(f"{path}: {func.name}: reverse postorder must start at the entry and be duplicate-free")
+            sys.exit(1)
+
+        dom = DominatorTree(cfg, entry)
+        for block_idx in order:
+            if not dom.dominates(entry, block_idx):
+                print(f"{path}: {func.name}: entry does not dominate block {block_idx}")
+                sys.exit(1)
+            if block_idx != entry and not all(
+                dom.dominates(dom.idom[block_idx], pred)
+                for pred in cfg.blocks[block_idx].predecessors
+                if pred in dom.idom
+            ):
+                print(f"{path}: {func.name}: idom of block {block_idx} does not dominate its predecessors")
+                sys.exit(1)
+
+        live = Liveness(cfg, entry)
+        escaped = live.live_in[entry] - set(func.params)
+        if escaped:
+            print(f"{path}: {func.name}: variables live at entry but not parameters: {program.var_names(escaped)}")
+            sys.exit(1)
+        if live.live_before(func.entry_point) != live.live_in[entry]:
+            print(f"{path}: {func.name}: live_before(entry) disagrees with block live-in")
+            sys.exit(1)
+        again = Liveness(cfg, entry)
+        if again.live_in != live.live_in or again.live_out != live.live_out:
+            print(f"{path}: {func.name}: liveness is not deterministic")
+            sys.exit(1)
+PY
+
+python3 - "$ROOT_DIR/scripts/sierra" "$GOLDEN" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, sys.argv[1])
+from model import ControlFlowGraph, SierraProgram  # noqa: E402
+
+payload = json.loads(Path(sys.argv[2]).read_text(encoding="utf-8"))
+for stmt in payload["statements"]:
+    if "Invocation" in stmt:
+        stmt["Invocation"]["branches"][0]["target"] = {"Statement": len(payload["statements"]) + 5}
+        break
+try:
+    ControlFlowGraph(SierraProgram(payload))
+except ValueError as exc:
+    if "out of range" not in str(exc):
+        raise
+else:
+    print("expected out-of-range branch target to be rejected")
+    sys.exit(1)
+
+payload = json.loads(Path(sys.argv[2]).read_text(encoding="utf-8"))
+payload["libfunc_declarations"].append(payload["libfunc_declarations"][0])
+try:
+    SierraProgram(payload)
+except ValueError as exc:
+    if "duplicate Sierra declaration" not in str(exc):
+        raise
+else:
+    print("expected duplicate libfunc declaration to be rejected")
+    sys.exit(1)
+PY
+
+echo "sierra program model checks passed"
@@ -0,0 +1,76 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+ESTIMATOR="$ROOT_DIR/scripts/sierra/estimate_static_gas.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+GOLDEN="$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"
+
+python3 "$ESTIMATOR" --input "$GOLDEN" --out "$TMP_DIR/a.json" >/dev/null
+python3 "$ESTIMATOR" --input "$GOLDEN" --out "$TMP_DIR/b.json" >/dev/null
+diff -u "$TMP_DIR/a.json" "$TMP_DIR/b.json" >/dev/null
+
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json "$GOLDEN"; do
+  python3 "$ESTIMATOR" --input "$program" --out "$TMP_DIR/report.json" >/dev/null
+  python3 - "$TMP_DIR/report.json" <<'PY'
+import json
+import sys
+
+report = json.load(open(sys.argv[1], encoding="utf-8"))
+program = report["program"]
+if report["unknown_libfuncs"]:
+    print(f"{program}: libfuncs missing from cost table: {report['unknown_libfuncs']}")
+    sys.exit(1)
+total = 0
+for fn in report["functions"]:
+    worst = fn["worst_case"]["gas"]
+    best = fn["best_case"]["gas"]
+    if not 0 < best <= worst:
+        print(f"{program}: {fn['name']}: expected 0 < best ({best}) <= worst ({worst})")
+        sys.exit(1)
+    for branch in fn["branches"]:
+        arm_worst = max(arm["worst_case_gas"] for arm in branch["arms"])
+        if arm_worst > worst:
+            print(f"{program}: {fn['name']}: branch at {branch['statement']} exceeds function worst case")
+            sys.exit(1)
+    total += worst
+if total != report["total_worst_case_gas"]:
+    print(f"{program}: total_worst_case_gas does not sum per-function worst cases")
+    sys.exit(1)
+PY
+done
+
+CYCLIC="$TMP_DIR/cyclic.sierra.json"
+python3 - "$GOLDEN" "$CYCLIC" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+entry = payload["funcs"][0]["entry_point"]
+payload["libfunc_declarations"].append(
+    {"id": {"id": 1, "debug_name": "jump"}, "long_id": {"generic_id": "jump", "generic_args": []}}
+)
+payload["statements"][entry] = {
+    "Invocation": {
+        "libfunc_id": {"id": 1, "debug_name": "jump"},
+        "args": [],
+        "branches": [{"target": {"Statement": entry}, "results": []}],
+    }
+}
+json.dump(payload, open(sys.argv[2], "w", encoding="utf-8"))
+PY
+
+if python3 "$ESTIMATOR" --input "$CYCLIC" >"$TMP_DIR/negative.log" 2>&1; then
+  echo "expected static gas estimator to reject cyclic control flow"
+  exit 1
+fi
+
+if ! rg -q "cyclic control flow" "$TMP_DIR/negative.log"; then
+  echo "cyclic control-flow diagnostic was not reported"
+  cat "$TMP_DIR/negative.log"
+  exit 1
+fi
+
+echo "sierra static gas estimate checks passed"
@@ -0,0 +1,63 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+TEST_FILE="$ROOT_DIR/tests/lean/sierra_streaming_writer.lean"
+ARTIFACT_DIR="$ROOT_DIR/.artifacts/sierra_streaming_writer"
+export PATH="$HOME/.elan/bin:$PATH"
+
+if [[ ! -f "$TEST_FILE" ]]; then
+  echo "missing streaming writer test file: $TEST_FILE"
+  exit 1
+fi
+
+# Checked-in programs are stored in the canonical form the writer produces.
+python3 - "$ROOT_DIR/scripts/sierra" "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json" "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json <<'PY'
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, sys.argv[1])
+from optimize_structural import canonicalize, render_program
+
+for raw in sys.argv[2:]:
+    text = Path(raw).read_text(encoding="utf-8")
+    if render_program(canonicalize(json.loads(text))) != text:
+        raise SystemExit(f"program is not in canonical form: {raw}")
+PY
+
+rm -rf "$ARTIFACT_DIR"
+(
+  cd "$ROOT_DIR"
+  lake build LeanCairo.Backend.Sierra.Emit.Subset.Stream
+  lake env lean "$TEST_FILE"
+)
+
+python3 - "$ROOT_DIR/scripts/sierra" "$ARTIFACT_DIR" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, sys.argv[1])
+from optimize_structural import canonicalize, render_program
+
+artifacts = Path(sys.argv[2])
+sample = json.loads((artifacts / "escape_sample.json").read_text(encoding="utf-8"))
+if not sample["alpha"].endswith("é"):
+    raise SystemExit("escape sample lost its non-ASCII character")
+# Python escapes U+007F along with control and non-ASCII characters; the Lean rendering must agree.
+expected_sample = json.dumps(sample, indent=2, sort_keys=True)
+if (artifacts / "escape_sample_canonical.json").read_text(encoding="utf-8") != expected_sample:
+    raise SystemExit("canonical escape sample does not match json.dumps")
+
+streamed_paths = sorted(artifacts.glob("streamed_*.json"))
+if len(streamed_paths) != 3:
+    raise SystemExit(f"expected 3 streamed programs, found {len(streamed_paths)}")
+for streamed_path in streamed_paths:
+    reference_path = artifacts / streamed_path.name.replace("streamed_", "reference_")
+    expected = render_program(canonicalize(json.loads(reference_path.read_text(encoding="utf-8"))))
+    if streamed_path.read_text(encoding="utf-8") != expected:
+        raise SystemExit(f"streamed program is not the canonical form of its reference: {streamed_path}")
+PY
+
+echo "sierra streaming writer checks passed"
@@ -7,6 +7,10 @@ BASE_PROGRAM="$OUT_DIR/generated/sierra/program.sierra.json"
 OPT_PROGRAM="$OUT_DIR/generated/sierra/program.optimized.sierra.json"
 BASE_CASM="$OUT_DIR/generated/sierra/program.casm"
 OPT_CASM="$OUT_DIR/generated/sierra/program.optimized.casm"
+COMPACT_PROGRAM="$OUT_DIR/generated/sierra/program.compact.sierra.json"
+COMPACT_CASM="$OUT_DIR/generated/sierra/program.compact.casm"
+PEEPHOLE_PROGRAM="$OUT_DIR/generated/sierra/program.peephole.sierra.json"
+PEEPHOLE_CASM="$OUT_DIR/generated/sierra/program.peephole.casm"
 export PATH="$HOME/.elan/bin:$PATH"
 
 rm -rf "$OUT_DIR"
@@ -16,6 +20,10 @@ cd "$ROOT_DIR"
 lake exe leancairo-sierra-gen --module MyLeanSierraSubset --out "$OUT_DIR/generated" --optimize true
 
 python3 "$ROOT_DIR/scripts/sierra/optimize_structural.py" --input "$BASE_PROGRAM" --out "$OPT_PROGRAM"
+python3 "$ROOT_DIR/scripts/sierra/optimize_structural.py" --compact-declarations \
+  --input "$BASE_PROGRAM" --out "$COMPACT_PROGRAM" --report "$OUT_DIR/compact-report.json"
+python3 "$ROOT_DIR/scripts/sierra/optimize_peephole.py" \
+  --input "$BASE_PROGRAM" --out "$PEEPHOLE_PROGRAM" --report "$OUT_DIR/peephole-report.json"
 
 cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
   validate --input "$BASE_PROGRAM" >/dev/null
@@ -27,7 +35,19 @@ cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
 cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
   compile --input "$OPT_PROGRAM" --out-casm "$OPT_CASM" >/dev/null
 
+cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
+  validate --input "$COMPACT_PROGRAM" >/dev/null
+cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
+  compile --input "$COMPACT_PROGRAM" --out-casm "$COMPACT_CASM" >/dev/null
+
+cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
+  validate --input "$PEEPHOLE_PROGRAM" >/dev/null
+cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
+  compile --input "$PEEPHOLE_PROGRAM" --out-casm "$PEEPHOLE_CASM" >/dev/null
+
 test -s "$BASE_CASM"
 test -s "$OPT_CASM"
+test -s "$COMPACT_CASM"
+test -s "$PEEPHOLE_CASM"
 
 echo "sierra structural optimization e2e checks passed"
@@ -0,0 +1,233 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+TAILS="$ROOT_DIR/scripts/sierra/optimize_tails.py"
+INTERP="$ROOT_DIR/scripts/sierra/interpret_sierra.py"
+SUITE="$ROOT_DIR/scripts/bench/run_manifest_benchmark_suite.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+# Sibling felt252_is_zero arms: `pick` returns through identical tails after a store_temp,
+# `blend` joins after identical tails, and `pickDeferred` reads a deferred constant in its tail,
+# which CASM cannot merge because the two arms hold different values in that reference.
+python3 - "$TMP_DIR/tails.sierra.json" "$ROOT_DIR/scripts/sierra" <<'PY'
+import json
+import sys
+
+sys.path.insert(0, sys.argv[2])
+from model import id_object  # noqa: E402
+
+felt, non_zero = id_object("felt252"), id_object("NonZero<felt252>")
+libfuncs, statements, funcs = [], [], []
+
+
+def libfunc(name, generic_id, generic_args=()):
+    ident = id_object(name)
+    if all(decl["id"] != ident for decl in libfuncs):
+        libfuncs.append({"id": ident, "long_id": {"generic_id": generic_id, "generic_args": list(generic_args)}})
+    return ident
+
+
+def const(value):
+    return libfunc(f"felt252_const<{value}>", "felt252_const", [{"Value": [1, [value]]}])
+
+
+LIB = {
+    "is_zero": libfunc("felt252_is_zero", "felt252_is_zero"),
+    "align": libfunc("branch_align", "branch_align"),
+    "drop_nz": libfunc("drop<NonZero<felt252>>", "drop", [{"Type": non_zero}]),
+    "store": libfunc("store_temp<felt252>", "store_temp", [{"Type": felt}]),
+    "mul": libfunc("felt252_mul", "felt252_mul"),
+    "add": libfunc("felt252_add", "felt252_add"),
+    "jump": libfunc("jump", "jump"),
+}
+
+
+def function(name, params, body):
+    var = lambda local: id_object(f"{name}::{local}")
+    labels, base = {}, len(statements)
+    for pos, item in enumerate(body):
+        if isinstance(item, str):
+            labels[item] = base + pos - len(labels)
+    funcs.append(
+        {
+            "id": id_object(name),
+            "signature": {"param_types": [felt] * len(params), "ret_types": [felt]},
+            "params": [{"id": var(param), "ty": felt} for param in params],
+            "entry_point": base,
+        }
+    )
+    for item in body:
+        if isinstance(item, str):
+            continue
+        if item[0] == "return":
+            statements.append({"Return": [var(name) for name in item[1]]})
+            continue
+        lib, args, branches = item
+        statements.append(
+            {
+                "Invocation": {
+                    "libfunc_id": LIB[lib] if isinstance(lib, str) else lib,
+                    "args": [var(arg) for arg in args],
+                    "branches": [
+                        {
+                            "target": "Fallthrough" if target is None else {"Statement": labels[target]},
+                            "results": [var(res) for res in results],
+                        }
+                        for target, results in branches
+                    ],
+                }
+            }
+        )
+
+
+def arm(label, drop, value, tail_from_store, finish):
+    body = [label, ("align", [], [(None, [])])]
+    if drop:
+        body.append(("drop_nz", ["nz"], [(None, [])]))
+    body.append((const(value), [], [(None, [f"c{value}"])]))
+    if tail_from_store:
+        body.append(("store", [f"c{value}"], [(None, [f"s{value}"])]))
+        body.append(("mul", [f"s{value}", "y"], [(None, [f"m{value}"])]))
+    else:
+        body.append(("mul", [f"c{value}", "y"], [(None, [f"m{value}"])]))
+    return body + finish(value)
+
+
+def returning(value):
+    return [("store", [f"m{value}"], [(None, [f"r{value}"])]), ("return", [f"r{value}"])]
+
+
+def branch(zero_label):
+    return ("is_zero", ["x"], [(None, []), (zero_label, ["nz"])])
+
+
+function(
+    "pick",
+    ["x", "y"],
+    [branch("nonzero"), *arm("zero", False, 5, True, returning), *arm("nonzero", True, 7, True, returning)],
+)
+function(
+    "pickDeferred",
+    ["x", "y"],
+    [branch("nonzero"), *arm("zero", False, 5, False, returning), *arm("nonzero", True, 7, False, returning)],
+)
+
+
+def joining(value):
+    return [
+        ("store", [f"m{value}"], [(None, [f"q{value}"])]),
+        ("add", [f"q{value}", "z"], [(None, [f"t{value}"])]),
+        ("store", [f"t{value}"], [(None, ["out"])]),
+    ]
+
+
+function(
+    "blend",
+    ["x", "y", "z"],
+    [
+        branch("nonzero"),
+        *arm("zero", False, 3, True, lambda value: joining(value) + [("jump", [], [("join", [])])]),
+        *arm("nonzero", True, 4, True, joining),
+        "join",
+        ("store", ["out"], [(None, ["fin"])]),
+        ("return", ["fin"]),
+    ],
+)
+payload = {
+    "version": 1,
+    "type_declarations": [
+        {"id": felt, "long_id": {"generic_id": "felt252", "generic_args": []}, "declared_type_info": None},
+        {
+            "id": non_zero,
+            "long_id": {"generic_id": "NonZero", "generic_args": [{"Type": felt}]},
+            "declared_type_info": None,
+        },
+    ],
+    "libfunc_declarations": libfuncs,
+    "statements": statements,
+    "funcs": funcs,
+}
+open(sys.argv[1], "w", encoding="utf-8").write(json.dumps(payload, indent=2))
+PY
+
+PROGRAM="$TMP_DIR/tails.sierra.json"
+python3 "$TAILS" --input "$PROGRAM" --out "$TMP_DIR/merged.sierra.json" --report "$TMP_DIR/report.json" >/dev/null
+python3 "$TAILS" --input "$TMP_DIR/merged.sierra.json" --out "$TMP_DIR/merged_again.sierra.json" >/dev/null
+cmp -s "$TMP_DIR/merged.sierra.json" "$TMP_DIR/merged_again.sierra.json"
+python3 "$INTERP" --input "$PROGRAM" --compare "$TMP_DIR/merged.sierra.json" --random 50 >/dev/null
+
+python3 - "$TMP_DIR/report.json" <<'PY'
+import json
+import sys
+
+report = json.load(open(sys.argv[1], encoding="utf-8"))
+merges = sorted((row["tail_statements"], row["renamed_vars"], row["statements_saved"]) for row in report["merges"])
+# pick shares mul/store/return (s7 -> s5); blend shares mul/store/add/store (s3 -> s4) and drops its jump.
+if merges != [(3, 1, 2), (4, 1, 4)]:
+    print(f"unexpected tail merges: {report['merges']}")
+    sys.exit(1)
+if report["statements"]["before"] - report["statements"]["after"] != 6:
+    print(f"expected six fewer statements: {report['statements']}")
+    sys.exit(1)
+PY
+
+# Emitted arms diverge in deferred enum_init values right before their store_temp/return epilogues,
+# so the pass changes nothing on the emitted corpus or the golden.
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json \
+  "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"; do
+  python3 "$TAILS" --input "$program" --out "$TMP_DIR/example.sierra.json" >/dev/null
+  python3 - "$program" "$TMP_DIR/example.sierra.json" <<'PY'
+import json
+import sys
+
+if json.load(open(sys.argv[1], encoding="utf-8")) != json.load(open(sys.argv[2], encoding="utf-8")):
+    print(f"{sys.argv[1]}: tail merging changed an emitted program")
+    sys.exit(1)
+PY
+done
+
+# The benchmark summary reports tail-merge size deltas per case and per family.
+cat >"$TMP_DIR/runner.sh" <<'SH'
+#!/usr/bin/env bash
+printf 'baseline_sierra_gas = 100\ngenerated_sierra_gas = 90\nbaseline_l2_gas = 100\n'
+printf 'generated_l2_gas = 90\nsierra_improvement_pct = 10\nl2_improvement_pct = 10\n'
+SH
+chmod +x "$TMP_DIR/runner.sh"
+# The suite records config and log paths relative to the repository root.
+mkdir -p "$ROOT_DIR/.artifacts"
+SUITE_DIR="$(mktemp -d "$ROOT_DIR/.artifacts/sierra_tail_merge.XXXXXX")"
+trap 'rm -rf "$TMP_DIR" "$SUITE_DIR"' EXIT
+python3 - "$TMP_DIR/runner.sh" "$SUITE_DIR/harness.json" <<'PY'
+import json
+import sys
+
+cases = [
+    {"id": "newton_u128", "family": "fixed_point", "runner_script": sys.argv[1]},
+    {"id": "karatsuba_u128", "family": "integer", "runner_script": sys.argv[1]},
+]
+open(sys.argv[2], "w", encoding="utf-8").write(json.dumps({"cases": cases}))
+PY
+# Static gas needs the Lean generator; an empty examples manifest measures no case here.
+printf '{"examples": []}\n' >"$TMP_DIR/examples-manifest.json"
+python3 "$SUITE" --config "$SUITE_DIR/harness.json" --out-json "$TMP_DIR/summary.json" --out-md "$TMP_DIR/summary.md" \
+  --logs-dir "$SUITE_DIR/logs" --examples-manifest "$TMP_DIR/examples-manifest.json" >/dev/null
+python3 - "$TMP_DIR/summary.json" <<'PY'
+import json
+import sys
+
+summary = json.load(open(sys.argv[1], encoding="utf-8"))
+for row in summary["cases"]:
+    tail = row["tail_merge"]
+    if tail is None or tail["statements_before"] <= 0 or tail["delta"] != 0:
+        print(f"{row['id']}: unexpected tail merge summary {tail}")
+        sys.exit(1)
+families = {row["family"]: row for row in summary["families"]}
+if families["integer"]["tail_merge_statement_delta"] != 0 or "tail_merge_statements_before" not in families["integer"]:
+    print(f"missing per-family tail merge deltas: {summary['families']}")
+    sys.exit(1)
+PY
+rg -q '^## Tail Merge Size Deltas$' "$TMP_DIR/summary.md"
+
+echo "sierra tail merge checks passed"
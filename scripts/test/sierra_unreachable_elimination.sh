@@ -0,0 +1,98 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+OPTIMIZER="$ROOT_DIR/scripts/sierra/optimize_structural.py"
+TMP_DIR="$(mktemp -d)"
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+for program in "$ROOT_DIR"/examples/Sierra/*/sierra/program.sierra.json "$ROOT_DIR/tests/golden/sierra_subset/program.sierra.json"; do
+  python3 - "$program" "$TMP_DIR/padded.sierra.json" <<'PY'
+import json
+import sys
+
+payload = json.load(open(sys.argv[1], encoding="utf-8"))
+statements = payload["statements"]
+first_return = next(idx for idx, stmt in enumerate(statements) if "Return" in stmt)
+insert_at = first_return + 1
+live_target = payload["funcs"][0]["entry_point"]
+jump_id = {"id": 9_000_001, "debug_name": "jump"}
+payload["libfunc_declarations"].append({"id": jump_id, "long_id": {"generic_id": "jump", "generic_args": []}})
+dead = [
+    {"Invocation": {"libfunc_id": jump_id, "args": [], "branches": [{"target": {"Statement": live_target}, "results": []}]}},
+    {"Invocation": {"libfunc_id": jump_id, "args": [], "branches": [{"target": {"Statement": insert_at}, "results": []}]}},
+    {"Return": []},
+]
+
+
+def shift(idx: int) -> int:
+    return idx + len(dead) if idx >= insert_at else idx
+
+
+for stmt in statements:
+    for branch in stmt.get("Invocation", {}).get("branches", []):
+        if isinstance(branch["target"], dict):
+            branch["target"]["Statement"] = shift(branch["target"]["Statement"])
+for stmt in dead:
+    for branch in stmt.get("Invocation", {}).get("branches", []):
+        branch["target"]["Statement"] = shift(branch["target"]["Statement"])
+for func in payload["funcs"]:
+    func["entry_point"] = shift(func["entry_point"])
+payload["statements"] = statements[:insert_at] + dead + statements[insert_at:]
+json.dump(payload, open(sys.argv[2], "w", encoding="utf-8"))
+PY
+
+  python3 "$OPTIMIZER" --eliminate-unreachable --input "$program" --out "$TMP_DIR/base.sierra.json" >"$TMP_DIR/base.log"
+  python3 "$OPTIMIZER" --eliminate-unreachable --input "$TMP_DIR/padded.sierra.json" \
+    --out "$TMP_DIR/padded.opt.sierra.json" >"$TMP_DIR/padded.log"
+  python3 "$OPTIMIZER" --eliminate-unreachable --input "$TMP_DIR/padded.opt.sierra.json" \
+    --out "$TMP_DIR/again.sierra.json" >"$TMP_DIR/again.log"
+
+  if ! rg -q "unreachable statements removed: 0" "$TMP_DIR/base.log"; then
+    echo "$program: emitted program unexpectedly contains unreachable statements"
+    exit 1
+  fi
+  if ! rg -q "unreachable statements removed: 3" "$TMP_DIR/padded.log"; then
+    echo "$program: expected exactly the three injected statements to be removed"
+    cat "$TMP_DIR/padded.log"
+    exit 1
+  fi
+  if ! rg -q "unreachable statements removed: 0" "$TMP_DIR/again.log"; then
+    echo "$program: unreachable-statement elimination is not idempotent"
+    exit 1
+  fi
+
+  python3 - "$TMP_DIR/base.sierra.json" "$TMP_DIR/padded.opt.sierra.json" <<'PY'
+import json
+import sys
+
+base = json.load(open(sys.argv[1], encoding="utf-8"))
+padded = json.load(open(sys.argv[2], encoding="utf-8"))
+if base["statements"] != padded["statements"] or base["funcs"] != padded["funcs"]:
+    print(f"{sys.argv[1]}: statements/entry points differ after eliminating injected dead code")
+    sys.exit(1)
+PY
+done
+
+python3 "$OPTIMIZER" --input "$TMP_DIR/padded.sierra.json" --out "$TMP_DIR/kept.sierra.json" >"$TMP_DIR/kept.log"
+if rg -q "unreachable statements removed" "$TMP_DIR/kept.log"; then
+  echo "unreachable-statement elimination must stay opt-in"
+  exit 1
+fi
+python3 - "$TMP_DIR/padded.sierra.json" "$TMP_DIR/kept.sierra.json" <<'PY'
+import json
+import sys
+
+if len(json.load(open(sys.argv[1], encoding="utf-8"))["statements"]) != len(json.load(open(sys.argv[2], encoding="utf-8"))["statements"]):
+    print("the default structural pass must keep every statement")
+    sys.exit(1)
+PY
+
+# The eliminated program (the padded golden, after renumbering) must still validate and compile to CASM.
+cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
+  validate --input "$TMP_DIR/padded.opt.sierra.json" >/dev/null
+cargo run --manifest-path "$ROOT_DIR/tools/sierra_toolchain/Cargo.toml" -- \
+  compile --input "$TMP_DIR/padded.opt.sierra.json" --out-casm "$TMP_DIR/padded.opt.casm" >/dev/null
+test -s "$TMP_DIR/padded.opt.casm"
+
+echo "sierra unreachable-statement elimination checks passed"
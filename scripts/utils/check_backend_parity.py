@@ -5,8 +5,12 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "sierra"))
+from model import SierraProgram  # noqa: E402
+
 
 CANONICAL_PRIMITIVES = {
     "felt252": "felt252",
@@ -150,28 +154,15 @@ def load_json(path: Path) -> dict:
 
 
 def collect_direct_signatures(payload: dict) -> dict[str, dict[str, list[str]]]:
+    program = SierraProgram(payload)
     signatures: dict[str, dict[str, list[str]]] = {}
-    funcs = payload.get("funcs", [])
-    for func in funcs:
-        func_id = func.get("id", {})
-        debug_name = func_id.get("debug_name")
-        if not isinstance(debug_name, str) or debug_name == "":
+    for func in program.functions:
+        if not isinstance(func.raw.get("id", {}).get("debug_name"), str) or func.name == "unknown":
             raise ValueError("direct Sierra function id is missing debug_name")
-        signature = func.get("signature", {})
-        param_types = [
-            entry.get("debug_name", "")
-            for entry in signature.get("param_types", [])
-            if isinstance(entry, dict)
-        ]
-        ret_types = [
-            entry.get("debug_name", "")
-            for entry in signature.get("ret_types", [])
-            if isinstance(entry, dict)
-        ]
-        name = to_snake_case(debug_name)
+        name = to_snake_case(func.name)
         signatures[name] = {
-            "params": normalize_signature_types(param_types),
-            "outputs": normalize_signature_types(ret_types),
+            "params": normalize_signature_types([program.type_name(ty) for ty in func.param_types]),
+            "outputs": normalize_signature_types([program.type_name(ty) for ty in func.ret_types]),
         }
     return signatures
 
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Local content-addressed store for generated Sierra, CASM and Scarb artifact trees."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_STORE = ROOT_DIR / ".artifacts" / "store"
+DEFAULT_MAX_BYTES = 2 * 1024**3
+PIN_FILE = ROOT_DIR / "config" / "cairo_pinned_commit.txt"
+STORE_SCHEMA = 1
+MISS_EXIT_CODE = 3
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Content-addressed artifact store with LRU eviction")
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("LEANCAIRO_ARTIFACT_STORE", str(DEFAULT_STORE)),
+        help="Store directory (default: $LEANCAIRO_ARTIFACT_STORE or .artifacts/store)",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    key = sub.add_parser("key", help="Print the store key for sources, the toolchain pin and options")
+    key.add_argument("--source", action="append", default=[], help="Source file or directory (repeatable)")
+    key.add_argument("--option", action="append", default=[], help="Build option as NAME=VALUE (repeatable)")
+    key.add_argument("--pin-file", default=str(PIN_FILE), help="Toolchain pin file")
+
+    fetch = sub.add_parser("fetch", help=f"Materialize an entry into --dest; exit {MISS_EXIT_CODE} on a miss")
+    fetch.add_argument("--key", required=True)
+    fetch.add_argument("--dest", required=True)
+    fetch.add_argument("--copy", action="store_true", help="Copy blobs instead of hard-linking them")
+
+    put = sub.add_parser("put", help="Store the artifact files of a build output directory")
+    put.add_argument("--key", required=True)
+    put.add_argument("--src", required=True)
+    put.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="Evict LRU entries above this size")
+
+    sub.add_parser("stats", help="Print entry/blob counts, sizes and hit rates as JSON")
+
+    gc = sub.add_parser("gc", help="Evict LRU entries above --max-bytes and delete unreferenced blobs")
+    gc.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    gc.add_argument("--verify", action="store_true", help="Also drop entries whose blobs are missing or corrupt")
+    return parser.parse_args()
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def source_files(sources: list[str]) -> list[Path]:
+    files: set[Path] = set()
+    for raw in sources:
+        path = Path(raw).resolve()
+        if path.is_dir():
+            files.update(p for p in path.rglob("*") if p.is_file() and "__pycache__" not in p.parts)
+        elif path.is_file():
+            files.add(path)
+        else:
+            raise ValueError(f"missing key source: {raw}")
+    return sorted(files)
+
+
+def compute_key(sources: list[str], options: list[str], pin_file: Path) -> str:
+    """Key = sha256 over (relative path, content hash) of every source, the pin and the options."""
+    if not sources:
+        raise ValueError("at least one --source is required")
+    lines = [f"schema\0{STORE_SCHEMA}", f"pin\0{pin_file.read_text(encoding='utf-8').strip()}"]
+    for path in source_files(sources):
+        label = path.relative_to(ROOT_DIR) if path.is_relative_to(ROOT_DIR) else path
+        lines.append(f"source\0{label}\0{sha256_file(path)}")
+    for option in options:
+        if "=" not in option:
+            raise ValueError(f"--option must be NAME=VALUE, got {option!r}")
+        lines.append(f"option\0{option}")
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def is_artifact(rel: Path) -> bool:
+    """Generated project files plus top-level JSON under `target/<profile>/`; Scarb caches are skipped."""
+    if any(part.startswith(".") for part in rel.parts):
+        return False
+    if rel.parts[0] == "target":
+        return len(rel.parts) == 3 and rel.suffix == ".json"
+    return True
+
+
+class ArtifactStore:
+    """Blobs live at `objects/<aa>/<sha256>` (read-only); entries at `entries/<key>.json`.
+
+    An entry's mtime is its last use, so LRU order needs no extra bookkeeping.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.objects = root / "objects"
+        self.entries = root / "entries"
+        self.counters_path = root / "counters.json"
+
+    def blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def entry_path(self, key: str) -> Path:
+        if len(key) != 64 or any(ch not in "0123456789abcdef" for ch in key):
+            raise ValueError(f"malformed store key: {key!r}")
+        return self.entries / f"{key}.json"
+
+    def load_entry(self, path: Path) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry if isinstance(entry, dict) and entry.get("schema") == STORE_SCHEMA else None
+
+    def bump(self, counter: str) -> None:
+        counters = {}
+        if self.counters_path.is_file():
+            counters = json.loads(self.counters_path.read_text(encoding="utf-8"))
+        counters[counter] = int(counters.get(counter, 0)) + 1
+        write_json_atomic(self.counters_path, counters)
+
+    def fetch(self, key: str, dest: Path, copy: bool) -> bool:
+        entry_path = self.entry_path(key)
+        entry = self.load_entry(entry_path) if entry_path.is_file() else None
+        if entry is None or any(not self.blob_path(meta["sha256"]).is_file() for meta in entry["files"].values()):
+            self.bump("misses")
+            return False
+        for rel, meta in sorted(entry["files"].items()):
+            target = dest / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.exists() or target.is_symlink():
+                target.unlink()
+            blob = self.blob_path(meta["sha256"])
+            if copy:
+                shutil.copyfile(blob, target)
+                target.chmod(0o644)
+            else:
+                try:
+                    os.link(blob, target)
+                except OSError:
+                    shutil.copyfile(blob, target)
+        os.utime(entry_path)
+        self.bump("hits")
+        return True
+
+    def put(self, key: str, src: Path) -> dict[str, Any]:
+        files: dict[str, dict[str, Any]] = {}
+        for path in sorted(src.rglob("*")):
+            rel = path.relative_to(src)
+            if not path.is_file() or not is_artifact(rel):
+                continue
+            digest = sha256_file(path)
+            blob = self.blob_path(digest)
+            if not blob.is_file():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_name(f".{digest}.{os.getpid()}.tmp")
+                shutil.copyfile(path, tmp)
+                # Read-only blobs make an in-place write through a hard link fail instead of corrupting the store.
+                tmp.chmod(0o444)
+                os.replace(tmp, blob)
+            files[rel.as_posix()] = {"sha256": digest, "size": path.stat().st_size}
+        if not files:
+            raise ValueError(f"no artifact files found under {src}")
+        entry = {"schema": STORE_SCHEMA, "key": key, "created_unix": int(time.time()), "files": files}
+        write_json_atomic(self.entry_path(key), entry)
+        return entry
+
+    def scan(self) -> tuple[list[tuple[float, Path, dict[str, Any]]], dict[str, int]]:
+        entries = []
+        for path in self.entries.glob("*.json") if self.entries.is_dir() else []:
+            entry = self.load_entry(path)
+            if entry is not None:
+                entries.append((path.stat().st_mtime, path, entry))
+        blobs = {}
+        for path in self.objects.glob("*/*") if self.objects.is_dir() else []:
+            if not path.name.startswith("."):
+                blobs[path.name] = path.stat().st_size
+        return sorted(entries, key=lambda row: (row[0], row[1].name)), blobs
+
+    def gc(self, max_bytes: int, verify: bool) -> dict[str, int]:
+        entries, blobs = self.scan()
+        evicted = 0
+        if verify:
+            kept = []
+            for row in entries:
+                if all(
+                    meta["sha256"] in blobs and sha256_file(self.blob_path(meta["sha256"])) == meta["sha256"]
+                    for meta in row[2]["files"].values()
+                ):
+                    kept.append(row)
+                else:
+                    row[1].unlink()
+                    evicted += 1
+            entries = kept
+
+        def referenced_bytes(rows: list[tuple[float, Path, dict[str, Any]]]) -> int:
+            digests = {meta["sha256"] for row in rows for meta in row[2]["files"].values()}
+            return sum(blobs.get(digest, 0) for digest in digests)
+
+        while entries and referenced_bytes(entries) > max_bytes:
+            _, path, _ = entries.pop(0)
+            path.unlink()
+            evicted += 1
+        live = {meta["sha256"] for row in entries for meta in row[2]["files"].values()}
+        removed_blobs = 0
+        for digest in sorted(set(blobs) - live):
+            self.blob_path(digest).unlink()
+            removed_blobs += 1
+        return {"entries_evicted": evicted, "blobs_removed": removed_blobs, "bytes": referenced_bytes(entries)}
+
+    def stats(self) -> dict[str, Any]:
+        entries, blobs = self.scan()
+        logical = sum(meta["size"] for row in entries for meta in row[2]["files"].values())
+        counters = {}
+        if self.counters_path.is_file():
+            counters = json.loads(self.counters_path.read_text(encoding="utf-8"))
+        hits, misses = int(counters.get("hits", 0)), int(counters.get("misses", 0))
+        return {
+            "store": str(self.root),
+            "entries": len(entries),
+            "blobs": len(blobs),
+            "stored_bytes": sum(blobs.values()),
+            "logical_bytes": logical,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+def main() -> int:
+    args = parse_args()
+    store = ArtifactStore(Path(args.store).resolve())
+    if args.command == "key":
+        print(compute_key(args.source, args.option, Path(args.pin_file).resolve()))
+    elif args.command == "fetch":
+        if not store.fetch(args.key, Path(args.dest).resolve(), args.copy):
+            print(f"artifact store miss: {args.key}", file=sys.stderr)
+            return MISS_EXIT_CODE
+        print(f"artifact store hit: {args.key}")
+    elif args.command == "put":
+        entry = store.put(args.key, Path(args.src).resolve())
+        result = store.gc(args.max_bytes, verify=False)
+        print(f"artifact store put: {args.key} files={len(entry['files'])} evicted={result['entries_evicted']}")
+    elif args.command == "stats":
+        print(json.dumps(store.stats(), indent=2, sort_keys=True))
+    elif args.command == "gc":
+        print(json.dumps(store.gc(args.max_bytes, args.verify), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Usage: build-with-store.sh [--scarb-build] [--copy] [--fetch-only|--put-only] <out-dir> <lake-exe> [generator args...]
+#
+# Runs `lake exe <lake-exe> <args...> --out <out-dir>` (and `scarb build` in <out-dir> with
+# --scarb-build) unless the artifact store already holds the output for the same Lean sources,
+# toolchain pin and options, in which case the stored files are materialized into <out-dir>.
+# Set LEANCAIRO_ARTIFACT_STORE=off to always rebuild. Builds go through a running compiler daemon
+# (scripts/workflow/compiler_daemon.py) when there is one; it reloads whenever the keyed sources
+# change, so a stored output always comes from the sources in its key. --fetch-only exits 3 on a miss
+# instead of building, and --put-only stores an <out-dir> produced elsewhere (e.g. by a `--batch` run).
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+STORE_PY="$ROOT_DIR/scripts/workflow/artifact_store.py"
+
+scarb_build=false
+fetch_only=false
+put_only=false
+fetch_args=()
+while [[ $# -gt 0 ]]; do
+  case "$1" in
+    --scarb-build) scarb_build=true; shift ;;
+    --copy) fetch_args+=(--copy); shift ;;
+    --fetch-only) fetch_only=true; shift ;;
+    --put-only) put_only=true; shift ;;
+    *) break ;;
+  esac
+done
+if [[ $# -lt 2 ]]; then
+  echo "usage: $0 [--scarb-build] [--copy] [--fetch-only|--put-only] <out-dir> <lake-exe> [generator args...]" >&2
+  exit 2
+fi
+OUT_DIR="$1"
+LAKE_EXE="$2"
+shift 2
+
+export PATH="$HOME/.elan/bin:$PATH"
+
+build() {
+  (
+    cd "$ROOT_DIR"
+    python3 "$ROOT_DIR/scripts/workflow/compiler_daemon.py" run --cli "$LAKE_EXE" -- "$@" --out "$OUT_DIR"
+  )
+  if [[ "$scarb_build" == true ]]; then
+    (
+      cd "$OUT_DIR"
+      scarb build
+    )
+  fi
+}
+
+if [[ "${LEANCAIRO_ARTIFACT_STORE:-}" == "off" ]]; then
+  if [[ "$fetch_only" == true ]]; then
+    exit 3
+  fi
+  if [[ "$put_only" == false ]]; then
+    build "$@"
+  fi
+  exit 0
+fi
+
+key_args=(
+  --source "$ROOT_DIR/src"
+  --source "$ROOT_DIR/examples/Lean"
+  --source "$ROOT_DIR/lakefile.lean"
+  --source "$ROOT_DIR/lean-toolchain"
+  --source "$ROOT_DIR/lake-manifest.json"
+  --option "exe=$LAKE_EXE"
+  --option "scarb_build=$scarb_build"
+)
+for arg in "$@"; do
+  key_args+=(--option "arg=$arg")
+done
+key="$(python3 "$STORE_PY" key "${key_args[@]}")"
+
+if [[ "$put_only" == true ]]; then
+  python3 "$STORE_PY" put --key "$key" --src "$OUT_DIR"
+  exit 0
+fi
+
+status=0
+python3 "$STORE_PY" fetch --key "$key" --dest "$OUT_DIR" "${fetch_args[@]}" 2>/dev/null || status=$?
+if [[ "$status" -eq 0 ]]; then
+  exit 0
+fi
+if [[ "$status" -ne 3 ]]; then
+  echo "artifact store fetch failed for $OUT_DIR (exit $status)" >&2
+  exit "$status"
+fi
+if [[ "$fetch_only" == true ]]; then
+  exit 3
+fi
+
+build "$@"
+python3 "$STORE_PY" put --key "$key" --src "$OUT_DIR"
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Route generator invocations through resident `lake exe <cli> --serve` processes behind a Unix socket."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_SOCKET = ROOT_DIR / ".artifacts" / "compiler-daemon" / "daemon.sock"
+CLIS = ("leancairo-gen", "leancairo-sierra-gen")
+DISABLED_VALUE = "off"
+NOT_STARTED_EXIT_CODE = 4
+START_TIMEOUT_SECONDS = 30.0
+# The inputs the artifact store keys builds on (see build-with-store.sh); a change reloads the compilers.
+FINGERPRINT_SOURCES = ("src", "examples/Lean", "lakefile.lean", "lean-toolchain", "lake-manifest.json")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Resident compiler daemon for leancairo-gen and leancairo-sierra-gen")
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help=f"Unix socket path (default: $LEANCAIRO_COMPILER_DAEMON or {DEFAULT_SOCKET.relative_to(ROOT_DIR)})",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("serve", help="Run the daemon in the foreground")
+    sub.add_parser(
+        "start",
+        help=f"Start the daemon in the background; exit {NOT_STARTED_EXIT_CODE} if it is running or disabled",
+    )
+    sub.add_parser("stop", help="Stop a running daemon and its compiler processes")
+    sub.add_parser("status", help="Print daemon statistics as JSON; exit 1 when no daemon is running")
+
+    run = sub.add_parser("run", help="Compile through the daemon, or run `lake exe` directly when none is running")
+    run.add_argument("--cli", required=True, choices=CLIS)
+    run.add_argument("cli_args", nargs=argparse.REMAINDER, help="Generator arguments after `--`")
+    return parser.parse_args()
+
+
+def socket_path(raw: Optional[str]) -> Optional[Path]:
+    value = raw if raw is not None else os.environ.get("LEANCAIRO_COMPILER_DAEMON", str(DEFAULT_SOCKET))
+    if value == DISABLED_VALUE:
+        return None
+    return Path(value).resolve()
+
+
+def lake_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PATH"] = f"{Path.home() / '.elan' / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+    return env
+
+
+class SourceFingerprint:
+    """sha256 over (path, size, mtime) of every Lean source and toolchain pin file.
+
+    Walking the source trees on every request is the expensive part, so the file list is cached and
+    re-walked only when a directory's mtime changes (a file was added, removed or renamed). Each call
+    then costs one stat per cached file and directory, with no directory listing.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.dirs: Optional[Dict[Path, int]] = None
+        self.files: List[Path] = []
+
+    def tree_changed(self) -> bool:
+        if self.dirs is None:
+            return True
+        for directory, mtime_ns in self.dirs.items():
+            try:
+                if directory.stat().st_mtime_ns != mtime_ns:
+                    return True
+            except FileNotFoundError:
+                return True
+        # A pinned path that was a file (or missing) may have become a directory.
+        return any((ROOT_DIR / raw).is_dir() and ROOT_DIR / raw not in self.dirs for raw in FINGERPRINT_SOURCES)
+
+    def walk(self) -> None:
+        dirs: Dict[Path, int] = {}
+        files: List[Path] = []
+        for raw in FINGERPRINT_SOURCES:
+            path = ROOT_DIR / raw
+            if not path.is_dir():
+                files.append(path)
+                continue
+            dirs[path] = path.stat().st_mtime_ns
+            for child in sorted(path.rglob("*")):
+                if child.is_dir():
+                    dirs[child] = child.stat().st_mtime_ns
+                elif child.is_file():
+                    files.append(child)
+        self.dirs, self.files = dirs, files
+
+    def __call__(self) -> str:
+        with self.lock:
+            if self.tree_changed():
+                self.walk()
+            lines: List[str] = []
+            for file in self.files:
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    lines.append(f"{file.relative_to(ROOT_DIR)}\0missing")
+                    continue
+                lines.append(f"{file.relative_to(ROOT_DIR)}\0{stat.st_size}\0{stat.st_mtime_ns}")
+            return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+source_fingerprint = SourceFingerprint()
+
+
+class ResidentCompiler:
+    """One `lake exe <cli> --serve` process; requests to it are serialized."""
+
+    def __init__(self, cli: str) -> None:
+        self.cli = cli
+        self.lock = threading.Lock()
+        self.process: Optional[subprocess.Popen[str]] = None
+        self.fingerprint: Optional[str] = None
+        self.next_id = 0
+        self.requests = 0
+        self.restarts = 0
+        self.reloads = 0
+
+    def ensure_process(self, fingerprint: str) -> subprocess.Popen[str]:
+        if self.process is not None and self.process.poll() is None:
+            if self.fingerprint == fingerprint:
+                return self.process
+            # A resident server never re-imports a module, so edited sources need a fresh process.
+            self.close()
+            self.process = None
+            self.reloads += 1
+        if self.process is not None:
+            self.restarts += 1
+        self.fingerprint = fingerprint
+        self.process = subprocess.Popen(
+            ["lake", "exe", self.cli, "--serve"],
+            cwd=ROOT_DIR,
+            env=lake_env(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        return self.process
+
+    def compile(self, args: List[str]) -> Dict[str, Any]:
+        with self.lock:
+            process = self.ensure_process(source_fingerprint())
+            self.next_id += 1
+            self.requests += 1
+            request_id = self.next_id
+            assert process.stdin is not None and process.stdout is not None
+            process.stdin.write(json.dumps({"id": request_id, "args": args}) + "\n")
+            process.stdin.flush()
+            # `lake exe` may print build progress before the server starts; skip non-response lines.
+            while True:
+                line = process.stdout.readline()
+                if not line:
+                    raise ValueError(f"{self.cli} server exited (code {process.wait()}) before answering")
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(response, dict) and response.get("id") == request_id:
+                    return response
+
+    def close(self) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        assert self.process.stdin is not None
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path) -> None:
+        self.compilers = {cli: ResidentCompiler(cli) for cli in CLIS}
+        self.started_at = time.time()
+        super().__init__(str(path), DaemonRequestHandler)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 3),
+            "compilers": {
+                cli: {
+                    "running": compiler.process is not None and compiler.process.poll() is None,
+                    "requests": compiler.requests,
+                    "restarts": compiler.restarts,
+                    "reloads": compiler.reloads,
+                }
+                for cli, compiler in sorted(self.compilers.items())
+            },
+        }
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    server: DaemonServer
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("expected request object")
+            command = request.get("command", "compile")
+            if command == "status":
+                response: Dict[str, Any] = {"status": "ok", **self.server.status()}
+            elif command == "shutdown":
+                response = {"status": "ok"}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            elif command == "compile":
+                cli = request.get("cli")
+                args = request.get("args")
+                if cli not in self.server.compilers:
+                    raise ValueError(f"unknown cli: {cli!r}")
+                if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+                    raise ValueError("args: expected list of strings")
+                response = self.server.compilers[cli].compile(args)
+            else:
+                raise ValueError(f"unknown command: {command!r}")
+        except (ValueError, OSError) as exc:
+            response = {"status": "error", "error": str(exc), "output": ""}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+def send(path: Path, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Sends one request; `None` when no daemon is listening on `path`."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(str(path))
+            conn.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+            with conn.makefile("r", encoding="utf-8") as reader:
+                line = reader.readline()
+    except (FileNotFoundError, ConnectionRefusedError, ConnectionResetError):
+        return None
+    if not line:
+        raise ValueError(f"daemon at {path} closed the connection without answering")
+    response = json.loads(line)
+    if not isinstance(response, dict):
+        raise ValueError(f"daemon at {path} sent a non-object response")
+    return response
+
+
+def serve(path: Path) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if send(path, {"command": "status"}) is not None:
+        raise ValueError(f"daemon already running at {path}")
+    path.unlink(missing_ok=True)
+    server = DaemonServer(path)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        for compiler in server.compilers.values():
+            compiler.close()
+        path.unlink(missing_ok=True)
+    return 0
+
+
+def start(path: Path) -> int:
+    if send(path, {"command": "status"}) is not None:
+        print(f"compiler daemon already running: {path}")
+        return NOT_STARTED_EXIT_CODE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    log_path = path.with_suffix(".log")
+    with log_path.open("a", encoding="utf-8") as log:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--socket", str(path), "serve"],
+            cwd=ROOT_DIR,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if send(path, {"command": "status"}) is not None:
+            print(f"compiler daemon started: {path}")
+            return 0
+        time.sleep(0.1)
+    raise ValueError(f"compiler daemon did not come up within {START_TIMEOUT_SECONDS:.0f}s (log: {log_path})")
+
+
+def stop(path: Path) -> int:
+    if send(path, {"command": "shutdown"}) is None:
+        print(f"no compiler daemon running: {path}")
+        return 0
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while path.exists() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    print(f"compiler daemon stopped: {path}")
+    return 0
+
+
+def run_direct(cli: str, args: List[str]) -> int:
+    os.chdir(ROOT_DIR)
+    env = lake_env()
+    os.execvpe("lake", ["lake", "exe", cli, *args], env)
+    return 1
+
+
+def run(path: Optional[Path], cli: str, args: List[str]) -> int:
+    if args and args[0] == "--":
+        args = args[1:]
+    if path is None or "--help" in args or "--serve" in args:
+        return run_direct(cli, args)
+    response = send(path, {"command": "compile", "cli": cli, "args": args})
+    if response is None:
+        return run_direct(cli, args)
+    sys.stdout.write(str(response.get("output") or ""))
+    if response.get("status") != "ok":
+        print(f"error: {response.get('error')}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    path = socket_path(args.socket)
+    if args.command == "run":
+        return run(path, args.cli, args.cli_args)
+    if path is None:
+        print("compiler daemon disabled (LEANCAIRO_COMPILER_DAEMON=off)")
+        return NOT_STARTED_EXIT_CODE if args.command == "start" else 0
+    if args.command == "serve":
+        return serve(path)
+    if args.command == "start":
+        return start(path)
+    if args.command == "stop":
+        return stop(path)
+    status = send(path, {"command": "status"})
+    if status is None:
+        print(f"no compiler daemon running: {path}")
+        return 1
+    print(json.dumps(status, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
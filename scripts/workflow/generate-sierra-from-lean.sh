@@ -5,4 +5,5 @@ ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
 export PATH="$HOME/.elan/bin:$PATH"
 
 cd "$ROOT_DIR"
-lake exe leancairo-sierra-gen "$@"
+# Uses a running compiler daemon (scripts/workflow/compiler_daemon.py) when there is one.
+python3 "$ROOT_DIR/scripts/workflow/compiler_daemon.py" run --cli leancairo-sierra-gen -- "$@"
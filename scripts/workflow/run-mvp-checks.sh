@@ -65,6 +65,7 @@ export PATH="$HOME/.elan/bin:$PATH"
 "$ROOT_DIR/scripts/test/eval_conversion_legality.sh"
 "$ROOT_DIR/scripts/test/eval_aggregate_wrapper_semantics.sh"
 "$ROOT_DIR/scripts/test/eval_typed_resource_mixed.sh"
+"$ROOT_DIR/scripts/test/eval_map_refinement.sh"
 "$ROOT_DIR/scripts/test/control_flow_normalization_regression.sh"
 "$ROOT_DIR/scripts/test/call_panic_semantics_regression.sh"
 "$ROOT_DIR/scripts/test/canonicalization_regression.sh"
@@ -134,5 +135,10 @@ export PATH="$HOME/.elan/bin:$PATH"
 "$ROOT_DIR/scripts/bench/check_optimizer_non_regression.sh" MyLeanContractCSEBench CSEBenchContract
 "$ROOT_DIR/scripts/bench/check_optimizer_family_thresholds.sh"
 "$ROOT_DIR/scripts/bench/check_artifact_passes.sh"
+"$ROOT_DIR/scripts/test/artifact_semantics_signature.sh"
+"$ROOT_DIR/scripts/test/artifact_store.sh"
+"$ROOT_DIR/scripts/test/compiler_daemon.sh"
+"$ROOT_DIR/scripts/test/cli_batch.sh"
+"$ROOT_DIR/scripts/test/sierra_cost_batch.sh"
 
 echo "all MVP quality checks passed"
@@ -59,6 +59,7 @@ ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
 "$ROOT_DIR/scripts/test/eval_conversion_legality.sh"
 "$ROOT_DIR/scripts/test/eval_aggregate_wrapper_semantics.sh"
 "$ROOT_DIR/scripts/test/eval_typed_resource_mixed.sh"
+"$ROOT_DIR/scripts/test/eval_map_refinement.sh"
 "$ROOT_DIR/scripts/test/control_flow_normalization_regression.sh"
 "$ROOT_DIR/scripts/test/call_panic_semantics_regression.sh"
 "$ROOT_DIR/scripts/test/canonicalization_regression.sh"
@@ -116,6 +117,22 @@ ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
 "$ROOT_DIR/scripts/test/sierra_aggregate_branch_typing.sh"
 "$ROOT_DIR/scripts/test/sierra_structural_optimization_e2e.sh"
 "$ROOT_DIR/scripts/test/sierra_structural_optimization_reproducibility.sh"
+"$ROOT_DIR/scripts/test/sierra_unreachable_elimination.sh"
+"$ROOT_DIR/scripts/test/sierra_declaration_compaction.sh"
+"$ROOT_DIR/scripts/test/sierra_peephole.sh"
+"$ROOT_DIR/scripts/test/sierra_interpreter.sh"
+"$ROOT_DIR/scripts/test/sierra_function_diff.sh"
+"$ROOT_DIR/scripts/test/sierra_binary_encoding.sh"
+"$ROOT_DIR/scripts/test/sierra_block_layout.sh"
+"$ROOT_DIR/scripts/test/sierra_tail_merge.sh"
+"$ROOT_DIR/scripts/test/benchmark_static_gas_deltas.sh"
+"$ROOT_DIR/scripts/test/optimizer_cost_selection.sh"
+"$ROOT_DIR/scripts/test/optimization_remarks.sh"
+"$ROOT_DIR/scripts/test/sierra_parallel_emission.sh"
+"$ROOT_DIR/scripts/test/sierra_emit_scaling.sh"
+"$ROOT_DIR/scripts/test/sierra_streaming_writer.sh"
+"$ROOT_DIR/scripts/test/sierra_static_gas_estimate.sh"
+"$ROOT_DIR/scripts/test/sierra_program_model.sh"
 "$ROOT_DIR/scripts/test/sierra_differential.sh"
 "$ROOT_DIR/scripts/test/sierra_u128_wrapping_differential.sh"
 "$ROOT_DIR/scripts/test/backend_parity_aggregate_collection.sh"
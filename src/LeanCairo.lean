@@ -11,16 +11,26 @@ import LeanCairo.Compiler.IR.Spec
 import LeanCairo.Compiler.IR.SpecLowering
 import LeanCairo.Compiler.Semantics.Eval
 import LeanCairo.Compiler.Semantics.ContractEval
+import LeanCairo.Compiler.Semantics.MapEval
 import LeanCairo.Compiler.Optimize.Expr
 import LeanCairo.Compiler.Optimize.CSELetNorm
 import LeanCairo.Compiler.Optimize.Canonicalize
+import LeanCairo.Compiler.Optimize.ConstProp
+import LeanCairo.Compiler.Optimize.GVN
 import LeanCairo.Compiler.Optimize.Pass
 import LeanCairo.Compiler.Optimize.Pipeline
 import LeanCairo.Compiler.Optimize.Contract
 import LeanCairo.Compiler.Optimize.IRSpec
+import LeanCairo.Compiler.Optimize.Interval
+import LeanCairo.Compiler.Optimize.CostModel
+import LeanCairo.Compiler.Optimize.Selection
+import LeanCairo.Compiler.Optimize.Remarks
 import LeanCairo.Compiler.Proof.OptimizeSound
 import LeanCairo.Compiler.Proof.CSELetNormSound
+import LeanCairo.Compiler.Proof.ConstPropSound
+import LeanCairo.Compiler.Proof.GVNSound
 import LeanCairo.Compiler.Proof.IRSpecSound
+import LeanCairo.Compiler.Proof.IntervalSound
 import LeanCairo.Compiler.Proof.TranslationRelation
 import LeanCairo.Core.Validation.Errors
 import LeanCairo.Core.Validation.Context
@@ -4,6 +4,7 @@ namespace LeanCairo.Backend.Sierra.Emit.Subset
 
 open Lean
 open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
 open LeanCairo.Core.Domain
 open LeanCairo.Core.Spec
 
@@ -93,6 +94,60 @@ partial def emitU128MulWrapping
   let outVar <- emitStoreTemp fnName .u128 lowRaw
   pure (envAfterRhs, outVar)
 
+partial def emitU128MulViaFelt252
+    (fnName : String)
+    (env : Env)
+    (lhs rhs : IRExpr .u128) : EmitM (Env × Json) := do
+  let (envAfterLhs, lhsVar) <- emitExpr fnName env lhs
+  let (envAfterRhs, rhsVar) <- emitExpr fnName envAfterLhs rhs
+  let rcIn <- requireRangeCheckVar fnName
+  let _ <- registerTypeDecl .rangeCheck
+  let _ <- registerTypeDecl .u128
+  let _ <- registerTypeDecl .felt252
+
+  -- Operand ranges bound the exact product below the felt252 prime, so `felt252_mul` does not
+  -- reduce it and splitting it back into u128 limbs yields the wrapping product as the low limb.
+  let toFeltLibfuncId <- registerLibfuncDecl "u128_to_felt252" "u128_to_felt252" []
+  let lhsFelt <- freshVarId fnName "u128_mul_lhs_felt"
+  pushStmt (invocationStmtJson toFeltLibfuncId [lhsVar] [lhsFelt])
+  let rhsFelt <- freshVarId fnName "u128_mul_rhs_felt"
+  pushStmt (invocationStmtJson toFeltLibfuncId [rhsVar] [rhsFelt])
+  let feltMulLibfuncId <- registerLibfuncDecl "felt252_mul" "felt252_mul" []
+  let productRaw <- freshVarId fnName "u128_mul_felt_product_raw"
+  pushStmt (invocationStmtJson feltMulLibfuncId [lhsFelt, rhsFelt] [productRaw])
+  let product <- emitStoreTemp fnName .felt252 productRaw
+
+  let invocationIdx <- nextAbsoluteStatementIdx
+  let wideTarget := invocationIdx + 5
+  let splitLibfuncId <- registerLibfuncDecl "u128s_from_felt252" "u128s_from_felt252" []
+  let rcNarrow <- freshVarId fnName "u128_mul_range_check_narrow"
+  let valueNarrow <- freshVarId fnName "u128_mul_result_narrow"
+  let rcWide <- freshVarId fnName "u128_mul_range_check_wide"
+  let highWide <- freshVarId fnName "u128_mul_high_wide"
+  let lowWide <- freshVarId fnName "u128_mul_low_wide"
+  pushStmt <|
+    invocationStmtBranchesJson
+      splitLibfuncId
+      [rcIn, product]
+      [
+        (fallthroughTargetJson, [rcNarrow, valueNarrow]),
+        (statementTargetJson wideTarget, [rcWide, highWide, lowWide])
+      ]
+
+  emitBranchAlign
+  let mergedRangeCheck <- freshVarId fnName "u128_mul_range_check_merged"
+  let mergedValue <- freshVarId fnName "u128_mul_result_merged"
+  emitStoreTempTo .rangeCheck rcNarrow mergedRangeCheck
+  emitStoreTempTo .u128 valueNarrow mergedValue
+  emitJump (invocationIdx + 9)
+
+  emitBranchAlign
+  emitDrop fnName .u128 highWide
+  emitStoreTempTo .rangeCheck rcWide mergedRangeCheck
+  emitStoreTempTo .u128 lowWide mergedValue
+  setRangeCheckVar mergedRangeCheck
+  pure (envAfterRhs, mergedValue)
+
 partial def emitExpr (fnName : String) (env : Env) : IRExpr ty -> EmitM (Env × Json)
   | .var name =>
       consumeVar fnName env ty name
@@ -119,8 +174,12 @@ partial def emitExpr (fnName : String) (env : Env) : IRExpr ty -> EmitM (Env ×
       emitU128OverflowingWrapping fnName env lhs rhs "u128_overflowing_add" "u128_add"
   | .subU128 lhs rhs =>
       emitU128OverflowingWrapping fnName env lhs rhs "u128_overflowing_sub" "u128_sub"
-  | .mulU128 lhs rhs =>
-      emitU128MulWrapping fnName env lhs rhs
+  | .mulU128 lhs rhs => do
+      let ranges := (← get).ranges
+      if NatInterval.mulFitsFelt252 (rangeOf ranges lhs) (rangeOf ranges rhs) then
+        emitU128MulViaFelt252 fnName env lhs rhs
+      else
+        emitU128MulWrapping fnName env lhs rhs
   | .addU256 _ _ =>
       u256ArithUnsupported fnName "add"
   | .subU256 _ _ =>
@@ -140,42 +199,39 @@ partial def emitExpr (fnName : String) (env : Env) : IRExpr ty -> EmitM (Env ×
   | .ite _ _ _ =>
       unsupportedExpr fnName "ite lowering is not yet implemented"
   | .letE name boundTy bound body => do
+      let useCount <- claimLetUseCount fnName name
+      let boundRange := rangeOf (← get).ranges bound
       let (envAfterBound, boundVar) <- emitExpr fnName env bound
-      let useCount := countVarUses name body
-      if useCount = 0 then
-        emitDrop fnName boundTy boundVar
-        emitExpr fnName envAfterBound body
-      else
-        let boundState : LinearVar := { ty := boundTy, remaining := useCount, current? := some boundVar }
-        let (envAfterBody, bodyVar) <- emitExpr fnName ((name, boundState) :: envAfterBound) body
-        match envAfterBody with
-        | [] =>
-            throw s!"internal error: let-binding scope lost for '{name}' in function '{fnName}'"
-        | (boundName, finalBoundState) :: rest =>
-            if boundName != name then
-              throw s!"internal error: let-binding stack mismatch for '{name}' in function '{fnName}'"
-            else if finalBoundState.remaining != 0 then
-              throw s!"internal error: let-binding '{name}' has non-zero remaining uses in function '{fnName}'"
-            else if finalBoundState.current?.isSome then
-              throw s!"internal error: let-binding '{name}' still has live value after body in function '{fnName}'"
-            else
-              pure (rest, bodyVar)
+      withRangeBinding boundTy name boundRange do
+        if useCount = 0 then
+          emitDrop fnName boundTy boundVar
+          emitExpr fnName envAfterBound body
+        else
+          let boundState : LinearVar := { ty := boundTy, remaining := useCount, current? := some boundVar }
+          let (envAfterBody, bodyVar) <- emitExpr fnName (envAfterBound.push name boundState) body
+          match envAfterBody.pop? with
+          | none =>
+              throw s!"internal error: let-binding scope lost for '{name}' in function '{fnName}'"
+          | some (boundName, finalBoundState, rest) =>
+              if boundName != name then
+                throw s!"internal error: let-binding stack mismatch for '{name}' in function '{fnName}'"
+              else if finalBoundState.remaining != 0 then
+                throw s!"internal error: let-binding '{name}' has non-zero remaining uses in function '{fnName}'"
+              else if finalBoundState.current?.isSome then
+                throw s!"internal error: let-binding '{name}' still has live value after body in function '{fnName}'"
+              else
+                pure (rest, bodyVar)
 
 end
 
-partial def dropRemainingEnv (fnName : String) (env : Env) : EmitM Unit := do
-  match env with
-  | [] => pure ()
-  | (_, entry) :: rest =>
-      if entry.remaining != 0 then
-        throw s!"internal error: remaining variable uses are non-zero at function end ('{fnName}')"
-      else
-        match entry.current? with
-        | some valueVar =>
-            emitDrop fnName entry.ty valueVar
-            dropRemainingEnv fnName rest
-        | none =>
-            dropRemainingEnv fnName rest
+def dropRemainingEnv (fnName : String) (env : Env) : EmitM Unit := do
+  for (_, entry) in env.entriesInnermostFirst do
+    if entry.remaining != 0 then
+      throw s!"internal error: remaining variable uses are non-zero at function end ('{fnName}')"
+    else
+      match entry.current? with
+      | some valueVar => emitDrop fnName entry.ty valueVar
+      | none => pure ()
 
 def emitBoolReturnBranch
     (fnName : String)
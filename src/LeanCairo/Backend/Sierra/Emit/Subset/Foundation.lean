@@ -1,12 +1,16 @@
 import Lean.Data.Json
+import Std.Data.HashMap
+import Std.Data.HashSet
 import LeanCairo.Backend.Sierra.Generated.Surface
 import LeanCairo.Compiler.IR.Spec
+import LeanCairo.Compiler.Optimize.Interval
 
 namespace LeanCairo.Backend.Sierra.Emit.Subset
 
 open Lean
 open LeanCairo.Backend.Sierra.Generated
 open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
 open LeanCairo.Core.Domain
 open LeanCairo.Core.Spec
 
@@ -17,6 +21,9 @@ Sierra subset backend invariants (phase-2 direct Lean -> Sierra lane):
 - supported user signature types: felt252, u128, bool,
 - range-check lane: when u128 add/sub appears, emitter injects explicit `RangeCheck`
   input/output in Sierra signatures,
+- u128 mul whose operand ranges (`rangeOf` over enclosing lets) bound the product below the
+  felt252 prime lowers through `felt252_mul` + `u128s_from_felt252` instead of
+  `u128_guarantee_mul` + `u128_mul_guarantee_verify`,
 - supported expressions:
   - vars / letE,
   - literals: felt252, u128, bool,
@@ -397,6 +404,31 @@ def fallthroughTargetJson : Json :=
 def statementTargetJson (statementIdx : Nat) : Json :=
   Json.mkObj [("Statement", Json.num (JsonNumber.fromNat statementIdx))]
 
+/-- Shifts a `{"Statement": idx}` branch target by `offset`; `Fallthrough` targets are unchanged. -/
+def relocateTargetJson (offset : Nat) (target : Json) : Json :=
+  match target.getObjValAs? Nat "Statement" with
+  | .ok statementIdx => statementTargetJson (statementIdx + offset)
+  | .error _ => target
+
+/--
+Rebases a statement emitted at entry point 0 onto `offset`. Only invocation branch targets hold
+absolute statement indices, so return statements and variable ids are left untouched.
+-/
+def relocateStatementJson (offset : Nat) (stmt : Json) : Json :=
+  if offset = 0 then
+    stmt
+  else
+    match stmt.getObjVal? "Invocation" with
+    | .error _ => stmt
+    | .ok invocation =>
+        match invocation.getObjVal? "branches" with
+        | .ok (.arr branches) =>
+            let relocated :=
+              branches.map (fun branch =>
+                branch.setObjVal! "target" (relocateTargetJson offset (branch.getObjValD "target")))
+            stmt.setObjVal! "Invocation" (invocation.setObjVal! "branches" (Json.arr relocated))
+        | _ => stmt
+
 def branchJson (target : Json) (results : List Json) : Json :=
   Json.mkObj [("target", target), ("results", Json.arr results.toArray)]
 
@@ -424,22 +456,103 @@ def returnStmtJson (results : List Json) : Json :=
 def paramVarDebugName (fnName : String) (paramName : String) : String :=
   s!"{fnName}::param::{paramName}"
 
-def insertDeclIfMissing
-    (decls : List (String × Json))
-    (key : String)
-    (decl : Json) : List (String × Json) :=
-  if decls.any (fun entry => entry.fst = key) then
-    decls
+/-- Declarations in first-registration order, with a hash set guarding against duplicates. -/
+structure DeclTable where
+  entries : Array (String × Json) := #[]
+  keys : Std.HashSet String := {}
+  deriving Inhabited
+
+namespace DeclTable
+
+def insert (table : DeclTable) (key : String) (decl : Json) : DeclTable :=
+  if table.keys.contains key then
+    table
   else
-    decls ++ [(key, decl)]
+    { entries := table.entries.push (key, decl), keys := table.keys.insert key }
+
+def insertMany (table : DeclTable) (decls : List (String × Json)) : DeclTable :=
+  decls.foldl (fun acc entry => acc.insert entry.fst entry.snd) table
+
+def toList (table : DeclTable) : List (String × Json) :=
+  table.entries.toList
+
+end DeclTable
+
+/--
+Use counts for every binder of a function body, gathered in a single traversal. Parameters take the
+first slots in declaration order and each `letE` takes the next slot in pre-order, which is the order
+`emitExpr` reaches let-bindings, so the emitter claims slots with a counter instead of recounting.
+-/
+structure VarUseCounts where
+  binderNames : Array String := #[]
+  counts : Array Nat := #[]
+  deriving Inhabited
+
+namespace VarUseCounts
+
+/-- Appends a zero-count slot for `name`, returning its index. -/
+private def addBinder (acc : VarUseCounts) (name : String) : VarUseCounts × Nat :=
+  ({ binderNames := acc.binderNames.push name, counts := acc.counts.push 0 }, acc.counts.size)
+
+/-- `scope` maps each visible name to the slot of its innermost binder. -/
+private partial def collect (scope : Std.HashMap String Nat) (acc : VarUseCounts) : IRExpr ty -> VarUseCounts
+  | .var name =>
+      match scope[name]? with
+      | some slot => { acc with counts := acc.counts.modify slot (· + 1) }
+      | none => acc
+  | .storageRead _ => acc
+  | .litU128 _ => acc
+  | .litU256 _ => acc
+  | .litBool _ => acc
+  | .litFelt252 _ => acc
+  | .addFelt252 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .subFelt252 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .mulFelt252 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .addU128 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .subU128 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .mulU128 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .addU256 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .subU256 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .mulU256 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .eq lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .ltU128 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .leU128 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .ltU256 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .leU256 lhs rhs => collect scope (collect scope acc lhs) rhs
+  | .ite cond thenBranch elseBranch =>
+      collect scope (collect scope (collect scope acc cond) thenBranch) elseBranch
+  | .letE name _ bound body =>
+      let (acc, slot) := addBinder acc name
+      let acc := collect scope acc bound
+      collect (scope.insert name slot) acc body
+
+/-- Use counts for `params` and every let-binding of `body`. The first of two same-named params wins. -/
+def ofFunction (params : List Param) (body : IRExpr ty) : VarUseCounts :=
+  let (acc, scope) :=
+    params.foldl
+      (fun (state : VarUseCounts × Std.HashMap String Nat) param =>
+        let (acc, scope) := state
+        let (acc, slot) := addBinder acc param.name
+        (acc, if scope.contains param.name then scope else scope.insert param.name slot))
+      (({} : VarUseCounts), ({} : Std.HashMap String Nat))
+  collect scope acc body
+
+def countAt (useCounts : VarUseCounts) (slot : Nat) : Nat :=
+  useCounts.counts[slot]?.getD 0
+
+end VarUseCounts
 
 structure EmitState where
-  typeDecls : List (String × Json) := []
-  libfuncDecls : List (String × Json) := []
+  typeDecls : DeclTable := {}
+  libfuncDecls : DeclTable := {}
   statementsRev : List Json := []
+  statementCount : Nat := 0
   tempCounter : Nat := 0
   entryPoint : Nat := 0
   rangeCheckVar? : Option Json := none
+  ranges : RangeEnv := RangeEnv.empty
+  useCounts : VarUseCounts := {}
+  nextBinderSlot : Nat := 0
   deriving Inhabited
 
 abbrev EmitM := StateT EmitState (Except EmitError)
@@ -450,11 +563,18 @@ def liftExcept {α : Type} (value : Except EmitError α) : EmitM α := do
   | .error err => throw err
 
 def pushStmt (stmt : Json) : EmitM Unit :=
-  modify (fun st => { st with statementsRev := stmt :: st.statementsRev })
+  modify (fun st => { st with statementsRev := stmt :: st.statementsRev, statementCount := st.statementCount + 1 })
 
 def setRangeCheckVar (value : Json) : EmitM Unit :=
   modify (fun st => { st with rangeCheckVar? := some value })
 
+def withRangeBinding (boundTy : Ty) (name : String) (range : NatInterval) (action : EmitM α) : EmitM α := do
+  let saved := (← get).ranges
+  modify (fun st => { st with ranges := st.ranges.bind boundTy name range })
+  let result <- action
+  modify (fun st => { st with ranges := saved })
+  pure result
+
 def requireRangeCheckVar (fnName : String) : EmitM Json := do
   match (← get).rangeCheckVar? with
   | some value => pure value
@@ -464,7 +584,7 @@ def requireRangeCheckVar (fnName : String) : EmitM Json := do
 
 def nextAbsoluteStatementIdx : EmitM Nat := do
   let st <- get
-  pure (st.entryPoint + st.statementsRev.length)
+  pure (st.entryPoint + st.statementCount)
 
 def freshVarId (fnName : String) (purpose : String) : EmitM Json := do
   let st <- get
@@ -476,26 +596,26 @@ def registerTypeDecl (ty : Ty) : EmitM Json := do
   match ty with
   | .bool =>
       let unitDecl <- liftExcept unitTypeDeclJson
-      modify (fun st => { st with typeDecls := insertDeclIfMissing st.typeDecls unitTypeDebugName unitDecl })
+      modify (fun st => { st with typeDecls := st.typeDecls.insert unitTypeDebugName unitDecl })
   | .tuple _ | .structTy _ | .enumTy _ =>
       let unitDecl <- liftExcept unitTypeDeclJson
-      modify (fun st => { st with typeDecls := insertDeclIfMissing st.typeDecls unitTypeDebugName unitDecl })
+      modify (fun st => { st with typeDecls := st.typeDecls.insert unitTypeDebugName unitDecl })
   | .array elemTag | .span elemTag | .nullable elemTag | .boxed elemTag =>
       let elemTy <- liftExcept (tyOfElementTag elemTag)
       let elemTyDecl <- liftExcept (typeDeclJson elemTy)
       let elemDebugName <- liftExcept (tyDebugName elemTy)
-      modify (fun st => { st with typeDecls := insertDeclIfMissing st.typeDecls elemDebugName elemTyDecl })
+      modify (fun st => { st with typeDecls := st.typeDecls.insert elemDebugName elemTyDecl })
   | .nonZero innerTag =>
       let innerTy <- liftExcept (innerTyOfNonZeroTag innerTag)
       let innerTyDecl <- liftExcept (typeDeclJson innerTy)
       let innerDebugName <- liftExcept (tyDebugName innerTy)
-      modify (fun st => { st with typeDecls := insertDeclIfMissing st.typeDecls innerDebugName innerTyDecl })
+      modify (fun st => { st with typeDecls := st.typeDecls.insert innerDebugName innerTyDecl })
   | _ =>
       pure ()
   let tyDecl <- liftExcept (typeDeclJson ty)
   let tyId <- liftExcept (typeIdJson ty)
   let debugName <- liftExcept (tyDebugName ty)
-  modify (fun st => { st with typeDecls := insertDeclIfMissing st.typeDecls debugName tyDecl })
+  modify (fun st => { st with typeDecls := st.typeDecls.insert debugName tyDecl })
   pure tyId
 
 def registerOpaqueNoArgTypeDecl (debugName genericId : String) : EmitM Json := do
@@ -513,7 +633,7 @@ def registerOpaqueNoArgTypeDecl (debugName genericId : String) : EmitM Json := d
             ] ),
         ("declared_type_info", Json.null)
       ]
-  modify (fun st => { st with typeDecls := insertDeclIfMissing st.typeDecls debugName decl })
+  modify (fun st => { st with typeDecls := st.typeDecls.insert debugName decl })
   pure tyId
 
 def registerU128MulGuaranteeTypeDecl : EmitM Json :=
@@ -533,7 +653,7 @@ def registerLibfuncDecl (debugName : String) (genericId : String) (genericArgs :
               ("generic_args", Json.arr genericArgs.toArray)
             ] )
       ]
-  modify (fun st => { st with libfuncDecls := insertDeclIfMissing st.libfuncDecls debugName decl })
+  modify (fun st => { st with libfuncDecls := st.libfuncDecls.insert debugName decl })
   pure libfuncId
 
 def storeTempDebugName (ty : Ty) : Except EmitError String := do
@@ -570,7 +690,7 @@ def emitDrop (fnName : String) (ty : Ty) (valueVar : Json) : EmitM Unit := do
   pushStmt (invocationStmtJson libfuncId [valueVar] [])
 
 def nextStatementIdx : EmitM Nat := do
-  pure (←get).statementsRev.length
+  pure (←get).statementCount
 
 def emitBranchAlign : EmitM Unit := do
   let branchAlignLibfuncId <- registerLibfuncDecl "branch_align" "branch_align" []
@@ -635,85 +755,114 @@ structure LinearVar where
   current? : Option Json
   deriving Inhabited
 
-abbrev Env := List (String × LinearVar)
+structure EnvSlot where
+  name : String
+  var : LinearVar
+  shadowed? : Option Nat := none
+  deriving Inhabited
+
+/--
+Live variables as a stack of slots with a hashed index from each name to its innermost slot, so
+`consumeVar` is a lookup rather than a scan of every enclosing binding. The top of the stack is the
+innermost binding, matching the head of the association list this replaces.
+-/
+structure Env where
+  slots : Array EnvSlot := #[]
+  index : Std.HashMap String Nat := {}
+  deriving Inhabited
 
-partial def pendingDropCount (env : Env) : Except EmitError Nat := do
-  match env with
-  | [] => pure 0
-  | (_, entry) :: rest =>
-      if entry.remaining != 0 then
+namespace Env
+
+def push (env : Env) (name : String) (var : LinearVar) : Env :=
+  {
+    slots := env.slots.push { name := name, var := var, shadowed? := env.index[name]? }
+    index := env.index.insert name env.slots.size
+  }
+
+/-- Innermost first, like the association list: the head shadows later entries of the same name. -/
+def ofList (entries : List (String × LinearVar)) : Env :=
+  entries.foldr (fun entry env => env.push entry.fst entry.snd) {}
+
+/-- Removes the innermost binding and restores the slot it shadowed. -/
+def pop? (env : Env) : Option (String × LinearVar × Env) :=
+  match env.slots.back? with
+  | none => none
+  | some slot =>
+      let index :=
+        match slot.shadowed? with
+        | some previous => env.index.insert slot.name previous
+        | none => env.index.erase slot.name
+      some (slot.name, slot.var, { slots := env.slots.pop, index := index })
+
+def lookup? (env : Env) (name : String) : Option (Nat × LinearVar) := do
+  let slotIdx <- env.index[name]?
+  let slot <- env.slots[slotIdx]?
+  pure (slotIdx, slot.var)
+
+def update (env : Env) (slotIdx : Nat) (var : LinearVar) : Env :=
+  { env with slots := env.slots.modify slotIdx (fun slot => { slot with var := var }) }
+
+def entriesInnermostFirst (env : Env) : List (String × LinearVar) :=
+  env.slots.foldl (fun acc slot => (slot.name, slot.var) :: acc) []
+
+end Env
+
+def pendingDropCount (env : Env) : Except EmitError Nat :=
+  env.slots.foldlM
+    (fun count slot =>
+      if slot.var.remaining != 0 then
         .error "internal error: non-zero remaining uses encountered while computing branch shape"
+      else if slot.var.current?.isSome then
+        pure (count + 1)
       else
-        let restCount <- pendingDropCount rest
-        if entry.current?.isSome then
-          pure (restCount + 1)
-        else
-          pure restCount
-
-partial def countVarUses (target : String) : IRExpr ty -> Nat
-  | .var name => if name = target then 1 else 0
-  | .storageRead _ => 0
-  | .litU128 _ => 0
-  | .litU256 _ => 0
-  | .litBool _ => 0
-  | .litFelt252 _ => 0
-  | .addFelt252 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .subFelt252 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .mulFelt252 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .addU128 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .subU128 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .mulU128 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .addU256 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .subU256 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .mulU256 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .eq lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .ltU128 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .leU128 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .ltU256 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .leU256 lhs rhs => countVarUses target lhs + countVarUses target rhs
-  | .ite cond thenBranch elseBranch =>
-      countVarUses target cond + countVarUses target thenBranch + countVarUses target elseBranch
-  | .letE name _ bound body =>
-      let boundCount := countVarUses target bound
-      if name = target then
-        boundCount
+        pure count)
+    0
+
+/-- Use count of the next `letE` slot, checked against the binder name recorded by `VarUseCounts`. -/
+def claimLetUseCount (fnName : String) (name : String) : EmitM Nat := do
+  let st <- get
+  let slot := st.nextBinderSlot
+  set { st with nextBinderSlot := slot + 1 }
+  match st.useCounts.binderNames[slot]? with
+  | some binderName =>
+      if binderName = name then
+        pure (st.useCounts.countAt slot)
       else
-        boundCount + countVarUses target body
+        throw
+          s!"internal error: use-count slot {slot} belongs to '{binderName}', not let-binding '{name}' in function '{fnName}'"
+  | none =>
+      throw s!"internal error: missing use count for let-binding '{name}' in function '{fnName}'"
 
-partial def consumeVar
+def consumeVar
     (fnName : String)
     (env : Env)
     (expectedTy : Ty)
     (name : String) : EmitM (Env × Json) := do
-  match env with
-  | [] =>
+  match env.lookup? name with
+  | none =>
       throw s!"unbound variable '{name}' in function '{fnName}'"
-  | (entryName, entryVar) :: rest =>
-      if entryName = name then
-        if entryVar.ty != expectedTy then
-          throw s!"typed variable mismatch for '{name}' in function '{fnName}'"
-        else
-          match entryVar.current? with
-          | none =>
-              throw s!"variable '{name}' in function '{fnName}' was already consumed"
-          | some currentValue =>
-              if entryVar.remaining = 0 then
-                throw s!"variable '{name}' in function '{fnName}' has zero remaining uses"
-              else if entryVar.remaining = 1 then
-                let updated : LinearVar := { entryVar with remaining := 0, current? := none }
-                pure (((entryName, updated) :: rest), currentValue)
-              else
-                let tyId <- registerTypeDecl expectedTy
-                let dupName <- liftExcept (dupDebugName expectedTy)
-                let dupLibfuncId <- registerLibfuncDecl dupName "dup" [typeArgJson tyId]
-                let keepVar <- freshVarId fnName "dup_keep"
-                let useVar <- freshVarId fnName "dup_use"
-                pushStmt (invocationStmtJson dupLibfuncId [currentValue] [keepVar, useVar])
-                let updated : LinearVar := { entryVar with remaining := entryVar.remaining - 1, current? := some keepVar }
-                pure (((entryName, updated) :: rest), useVar)
+  | some (slotIdx, entryVar) =>
+      if entryVar.ty != expectedTy then
+        throw s!"typed variable mismatch for '{name}' in function '{fnName}'"
       else
-        let (rest', consumed) <- consumeVar fnName rest expectedTy name
-        pure (((entryName, entryVar) :: rest'), consumed)
+        match entryVar.current? with
+        | none =>
+            throw s!"variable '{name}' in function '{fnName}' was already consumed"
+        | some currentValue =>
+            if entryVar.remaining = 0 then
+              throw s!"variable '{name}' in function '{fnName}' has zero remaining uses"
+            else if entryVar.remaining = 1 then
+              let updated : LinearVar := { entryVar with remaining := 0, current? := none }
+              pure (env.update slotIdx updated, currentValue)
+            else
+              let tyId <- registerTypeDecl expectedTy
+              let dupName <- liftExcept (dupDebugName expectedTy)
+              let dupLibfuncId <- registerLibfuncDecl dupName "dup" [typeArgJson tyId]
+              let keepVar <- freshVarId fnName "dup_keep"
+              let useVar <- freshVarId fnName "dup_use"
+              pushStmt (invocationStmtJson dupLibfuncId [currentValue] [keepVar, useVar])
+              let updated : LinearVar := { entryVar with remaining := entryVar.remaining - 1, current? := some keepVar }
+              pure (env.update slotIdx updated, useVar)
 
 def u128ArithUnsupported (fnName : String) (opName : String) : EmitM α :=
   throw
@@ -56,14 +56,16 @@ def emitFunction (entryPoint : Nat) (fnSpec : IRFuncSpec) : Except EmitError Emi
     | none => [retTypeId]
   let rangeCheckParamId := idJson (paramVarDebugName fnSpec.name "__range_check")
 
+  let useCounts := VarUseCounts.ofFunction fnSpec.args fnSpec.body
   let initialEnv : Env :=
-    fnSpec.args.map (fun param =>
-      ( param.name,
-        {
-          ty := param.ty
-          remaining := countVarUses param.name fnSpec.body
-          current? := some (idJson (paramVarDebugName fnSpec.name param.name))
-        } ))
+    Env.ofList <|
+      (fnSpec.args.zip (List.range fnSpec.args.length)).map (fun (param, slot) =>
+        ( param.name,
+          {
+            ty := param.ty
+            remaining := useCounts.countAt slot
+            current? := some (idJson (paramVarDebugName fnSpec.name param.name))
+          } ))
 
   let emitAction : EmitM Unit := do
     if usesRangeCheckLane then
@@ -95,10 +97,12 @@ def emitFunction (entryPoint : Nat) (fnSpec : IRFuncSpec) : Except EmitError Emi
         pushStmt (returnStmtJson [retTemp])
 
   let initialState : EmitState :=
-    if usesRangeCheckLane then
-      { entryPoint := entryPoint, rangeCheckVar? := some rangeCheckParamId }
-    else
-      { entryPoint := entryPoint }
+    {
+      entryPoint := entryPoint
+      rangeCheckVar? := if usesRangeCheckLane then some rangeCheckParamId else none
+      useCounts := useCounts
+      nextBinderSlot := fnSpec.args.length
+    }
 
   match emitAction.run initialState with
   | .error err => .error err
@@ -135,54 +139,77 @@ def emitFunction (entryPoint : Nat) (fnSpec : IRFuncSpec) : Except EmitError Emi
         {
           funcJson := funcJson
           statements := st.statementsRev.reverse
-          typeDecls := st.typeDecls
-          libfuncDecls := st.libfuncDecls
+          typeDecls := st.typeDecls.toList
+          libfuncDecls := st.libfuncDecls.toList
         }
 
-def mergeDecls
-    (base : List (String × Json))
-    (extra : List (String × Json)) : List (String × Json) :=
-  extra.foldl (fun acc entry => insertDeclIfMissing acc entry.fst entry.snd) base
+/--
+Emits every function independently at entry point 0, each in its own task, returning the results in
+source order. Errors are reported for the first failing function, as in sequential emission.
+-/
+def emitFunctionsConcurrently (functions : List IRFuncSpec) : Except EmitError (List EmittedFunction) :=
+  let tasks := functions.map (fun fnSpec => Task.spawn (fun _ => emitFunction 0 fnSpec))
+  tasks.mapM Task.get
 
-def renderSubsetProgramJson (spec : IRContractSpec) : Except EmitError String := do
+/--
+A linked program kept in emission-sized pieces: rebased function entries, each function's statements
+with the offset they are relocated by, and the merged declaration tables.
+-/
+structure LinkedSubsetProgram where
+  funcs : Array Json := #[]
+  chunks : Array (Nat × List Json) := #[]
+  typeDecls : DeclTable := {}
+  libfuncDecls : DeclTable := {}
+  statementCount : Nat := 0
+  deriving Inhabited
+
+/--
+Appends a function emitted at entry point 0: its entry point is shifted past the functions already
+linked, its statements are kept with that offset, and its declarations are merged in
+first-registration order.
+-/
+def LinkedSubsetProgram.append (program : LinkedSubsetProgram) (emitted : EmittedFunction) :
+    LinkedSubsetProgram :=
+  let offset := program.statementCount
+  {
+    funcs := program.funcs.push (emitted.funcJson.setObjVal! "entry_point" (Json.num (JsonNumber.fromNat offset)))
+    chunks := program.chunks.push (offset, emitted.statements)
+    typeDecls := program.typeDecls.insertMany emitted.typeDecls
+    libfuncDecls := program.libfuncDecls.insertMany emitted.libfuncDecls
+    statementCount := offset + emitted.statements.length
+  }
+
+/-- Every statement of `program` relocated to its final index, in program order. -/
+def LinkedSubsetProgram.statements (program : LinkedSubsetProgram) : Array Json :=
+  program.chunks.foldl
+    (fun acc (offset, statements) => statements.foldl (fun acc stmt => acc.push (relocateStatementJson offset stmt)) acc)
+    #[]
+
+def ensureSubsetProgramShape (spec : IRContractSpec) : Except EmitError Unit :=
   if !spec.storage.isEmpty then
     .error "Sierra subset backend currently requires empty storage declaration"
   else if spec.functions.isEmpty then
     .error "Sierra subset backend requires at least one function"
   else
-    let rec emitFunctions
-        (entryPoint : Nat)
-        (remaining : List IRFuncSpec)
-        (funcsAcc : List Json)
-        (stmtsAcc : List Json)
-        (typeDeclsAcc : List (String × Json))
-        (libDeclsAcc : List (String × Json)) :
-        Except EmitError (List Json × List Json × List (String × Json) × List (String × Json)) := do
-      match remaining with
-      | [] =>
-          pure (funcsAcc.reverse, stmtsAcc.reverse, typeDeclsAcc, libDeclsAcc)
-      | fnSpec :: rest =>
-          let emitted <- emitFunction entryPoint fnSpec
-          let newEntryPoint := entryPoint + emitted.statements.length
-          emitFunctions
-            newEntryPoint
-            rest
-            (emitted.funcJson :: funcsAcc)
-            (emitted.statements.reverse ++ stmtsAcc)
-            (mergeDecls typeDeclsAcc emitted.typeDecls)
-            (mergeDecls libDeclsAcc emitted.libfuncDecls)
-
-    let (funcsJson, statementsJson, typeDecls, libDecls) <-
-      emitFunctions 0 spec.functions [] [] [] []
-    let programJson :=
-      Json.mkObj
-        [
-          ("version", Json.num (JsonNumber.fromNat 1)),
-          ("type_declarations", Json.arr (typeDecls.map Prod.snd).toArray),
-          ("libfunc_declarations", Json.arr (libDecls.map Prod.snd).toArray),
-          ("statements", Json.arr statementsJson.toArray),
-          ("funcs", Json.arr funcsJson.toArray)
-        ]
-    pure (toString programJson)
+    .ok ()
+
+/-- Emits every function concurrently, then links the results in source order. -/
+def linkSubsetProgram (spec : IRContractSpec) : Except EmitError LinkedSubsetProgram := do
+  ensureSubsetProgramShape spec
+  let emitted <- emitFunctionsConcurrently spec.functions
+  pure (emitted.foldl LinkedSubsetProgram.append {})
+
+def renderSubsetProgramJson (spec : IRContractSpec) : Except EmitError String := do
+  let program <- linkSubsetProgram spec
+  let programJson :=
+    Json.mkObj
+      [
+        ("version", Json.num (JsonNumber.fromNat 1)),
+        ("type_declarations", Json.arr (program.typeDecls.entries.map Prod.snd)),
+        ("libfunc_declarations", Json.arr (program.libfuncDecls.entries.map Prod.snd)),
+        ("statements", Json.arr program.statements),
+        ("funcs", Json.arr program.funcs)
+      ]
+  pure (toString programJson)
 
 end LeanCairo.Backend.Sierra.Emit.Subset
@@ -0,0 +1,194 @@
+import LeanCairo.Backend.Sierra.Emit.Subset.Function
+
+namespace LeanCairo.Backend.Sierra.Emit.Subset
+
+open Lean
+open LeanCairo.Compiler.IR
+
+/-
+Streaming program writer:
+- functions are emitted and linked by `linkSubsetProgram` first, because `funcs` and
+  `libfunc_declarations` sort ahead of `statements`; every function's statement `Json` is therefore
+  held until the write, but the program object and its rendered string are never built: statements
+  are relocated and rendered one at a time,
+- output is the canonical form of `scripts/sierra/optimize_structural.py`: top-level keys, object keys
+  and declarations sorted, rendered byte-for-byte as `json.dumps(indent=2, sort_keys=True)`,
+- `Json` values are rendered directly; object fields are collected and sorted by key on write, so the
+  layout does not depend on the order `Json` keeps them in.
+-/
+
+private def hex4 (code : Nat) : String :=
+  let digits := Nat.toDigits 16 code
+  digits.foldl String.push ("".pushn '0' (4 - digits.length))
+
+/-- `json.dumps` with `ensure_ascii`: everything outside printable ASCII, DEL included, becomes `\uXXXX`. -/
+private def pushEscapedChar (acc : String) (c : Char) : String :=
+  match c with
+  | '"' => acc ++ "\\\""
+  | '\\' => acc ++ "\\\\"
+  | '\n' => acc ++ "\\n"
+  | '\r' => acc ++ "\\r"
+  | '\t' => acc ++ "\\t"
+  | _ =>
+      let code := c.toNat
+      if code = 8 then
+        acc ++ "\\b"
+      else if code = 12 then
+        acc ++ "\\f"
+      else if code < 0x20 ∨ (0x7f ≤ code ∧ code < 0x10000) then
+        acc ++ "\\u" ++ hex4 code
+      else if 0x10000 ≤ code then
+        let offset := code - 0x10000
+        acc ++ "\\u" ++ hex4 (0xD800 + offset / 0x400) ++ "\\u" ++ hex4 (0xDC00 + offset % 0x400)
+      else
+        acc.push c
+
+private def pushQuoted (acc : String) (value : String) : String :=
+  (String.foldl pushEscapedChar (acc.push '"') value).push '"'
+
+/-- `layout` is the nesting level when indenting, or `none` for the single-line `json.dumps` form. -/
+private def openItem (acc : String) (layout : Option Nat) (first : Bool) : String :=
+  match layout with
+  | some level => (if first then acc.push '\n' else acc ++ ",\n").pushn ' ' (2 * (level + 1))
+  | none => if first then acc else acc ++ ", "
+
+private def closeContainer (acc : String) (layout : Option Nat) (closer : Char) : String :=
+  match layout with
+  | some level => ((acc.push '\n').pushn ' ' (2 * level)).push closer
+  | none => acc.push closer
+
+/-- Object fields in Python's `sort_keys` order: by code point, as `String` compares. -/
+private def sortedFields (fields : RBNode String (fun _ => Json)) : Array (String × Json) :=
+  (fields.fold (fun (acc : Array (String × Json)) key value => acc.push (key, value)) #[]).qsort
+    (fun lhs rhs => lhs.fst < rhs.fst)
+
+private partial def renderCanonical (acc : String) (layout : Option Nat) : Json -> String
+  | .null => acc ++ "null"
+  | .bool value => acc ++ (if value then "true" else "false")
+  | .num value => acc ++ value.toString
+  | .str value => pushQuoted acc value
+  | .arr items =>
+      if items.isEmpty then
+        acc ++ "[]"
+      else
+        let (body, _) :=
+          items.foldl
+            (fun (state : String × Bool) item =>
+              (renderCanonical (openItem state.fst layout state.snd) (layout.map (· + 1)) item, false))
+            (acc.push '[', true)
+        closeContainer body layout ']'
+  | .obj fields =>
+      let sorted := sortedFields fields
+      if sorted.isEmpty then
+        acc ++ "{}"
+      else
+        let (body, _) :=
+          sorted.foldl
+            (fun (state : String × Bool) field =>
+              let keyed := pushQuoted (openItem state.fst layout state.snd) field.fst ++ ": "
+              (renderCanonical keyed (layout.map (· + 1)) field.snd, false))
+            (acc.push '{', true)
+        closeContainer body layout '}'
+
+/--
+Renders `value` exactly as Python's `json.dumps(value, indent=2, sort_keys=True)` would when the value
+sits `level` containers deep, so it can be spliced into a larger canonical document.
+-/
+def canonicalJsonString (level : Nat) (value : Json) : String :=
+  renderCanonical "" (some level) value
+
+/-- Python's `f"{value:020d}"` for an integer literal, or `none` when `text` is not one. -/
+private def paddedIntegerKey? (text : String) : Option String :=
+  let (negative, digits) :=
+    match text.toList with
+    | '-' :: rest => (true, rest)
+    | chars => (false, chars)
+  if digits.isEmpty || !digits.all Char.isDigit then
+    none
+  else
+    let digitText := digits.foldl String.push ""
+    if negative then
+      some ("-" ++ "".pushn '0' (19 - digits.length) ++ digitText)
+    else
+      some ("".pushn '0' (20 - digits.length) ++ digitText)
+
+/-- `read_decl_sort_key` from `optimize_structural.py`: debug name, then the zero-padded numeric id. -/
+private def declSortKey (decl : Json) : String × String :=
+  let fallback := ("", renderCanonical "" none decl)
+  match decl.getObjVal? "id" with
+  | .ok ident@(.obj _) =>
+      let debugName :=
+        match ident.getObjVal? "debug_name" with
+        | .ok (.str name) => name
+        | _ => ""
+      let rawId := (ident.getObjVal? "id").toOption.getD .null
+      let idKey :=
+        match rawId with
+        | .bool true => "".pushn '0' 19 ++ "1"
+        | .bool false => "".pushn '0' 20
+        | .num value =>
+            if value.exponent = 0 then
+              (paddedIntegerKey? (toString value.mantissa)).getD (renderCanonical "" none rawId)
+            else
+              renderCanonical "" none rawId
+        | other => renderCanonical "" none other
+      (debugName, idKey)
+  | _ => fallback
+
+private def declKeyLt (lhs rhs : (String × String) × Json) : Bool :=
+  lhs.fst.fst < rhs.fst.fst || (lhs.fst.fst = rhs.fst.fst && lhs.fst.snd < rhs.fst.snd)
+
+private def sortDeclarations (decls : Array (String × Json)) : Array Json :=
+  ((decls.map (fun entry => (declSortKey entry.snd, entry.snd))).qsort declKeyLt).map Prod.snd
+
+private def liftEmit (result : Except EmitError α) : IO α :=
+  match result with
+  | .ok value => pure value
+  | .error err => throw <| IO.userError s!"Sierra program streaming failed: {err}"
+
+private def beginArrayField (out : IO.FS.Stream) (key : String) : IO Unit :=
+  out.putStr (pushQuoted "  " key ++ ": [")
+
+private def writeArrayItem (out : IO.FS.Stream) (first : Bool) (item : String) : IO Unit := do
+  out.putStr (if first then "\n    " else ",\n    ")
+  out.putStr item
+
+private def endArrayField (out : IO.FS.Stream) (empty : Bool) : IO Unit :=
+  out.putStr (if empty then "],\n" else "\n  ],\n")
+
+private def writeArrayField (out : IO.FS.Stream) (key : String) (items : Array Json) : IO Unit := do
+  beginArrayField out key
+  let mut first := true
+  for item in items do
+    writeArrayItem out first (renderCanonical "" (some 2) item)
+    first := false
+  endArrayField out items.isEmpty
+
+/--
+Writes `program` as canonical Sierra JSON: `funcs`, sorted `libfunc_declarations`, `statements`,
+sorted `type_declarations` and `version`, in that order. Only one statement is rendered at a time.
+-/
+def writeLinkedSubsetProgram (out : IO.FS.Stream) (program : LinkedSubsetProgram) : IO Unit := do
+  out.putStr "{\n"
+  beginArrayField out "funcs"
+  let mut first := true
+  for func in program.funcs do
+    writeArrayItem out first (canonicalJsonString 2 func)
+    first := false
+  endArrayField out program.funcs.isEmpty
+  writeArrayField out "libfunc_declarations" (sortDeclarations program.libfuncDecls.entries)
+  beginArrayField out "statements"
+  first := true
+  for (offset, statements) in program.chunks do
+    for stmt in statements do
+      writeArrayItem out first (canonicalJsonString 2 (relocateStatementJson offset stmt))
+      first := false
+  endArrayField out (program.statementCount == 0)
+  writeArrayField out "type_declarations" (sortDeclarations program.typeDecls.entries)
+  out.putStr "  \"version\": 1\n}\n"
+  out.flush
+
+def writeSubsetProgram (out : IO.FS.Stream) (spec : IRContractSpec) : IO Unit := do
+  writeLinkedSubsetProgram out (← liftEmit (linkSubsetProgram spec))
+
+end LeanCairo.Backend.Sierra.Emit.Subset
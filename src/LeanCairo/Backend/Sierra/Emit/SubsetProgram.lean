@@ -1,7 +1,14 @@
 import LeanCairo.Backend.Sierra.Emit.Subset.Function
+import LeanCairo.Backend.Sierra.Emit.Subset.Stream
 
 namespace LeanCairo.Backend.Sierra.Emit
 
 def renderSubsetProgramJson := LeanCairo.Backend.Sierra.Emit.Subset.renderSubsetProgramJson
 
+abbrev LinkedSubsetProgram := LeanCairo.Backend.Sierra.Emit.Subset.LinkedSubsetProgram
+
+def linkSubsetProgram := LeanCairo.Backend.Sierra.Emit.Subset.linkSubsetProgram
+
+def writeLinkedSubsetProgram := LeanCairo.Backend.Sierra.Emit.Subset.writeLinkedSubsetProgram
+
 end LeanCairo.Backend.Sierra.Emit
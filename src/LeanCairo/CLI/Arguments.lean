@@ -12,6 +12,7 @@ structure CliOptions where
   emitCasm : Bool
   optimize : Bool
   inliningStrategy : InliningStrategy
+  emitRemarks : Option String
   deriving Repr
 
 private structure PartialCliOptions where
@@ -20,6 +21,7 @@ private structure PartialCliOptions where
   emitCasm : Bool := false
   optimize : Bool := true
   inliningStrategy : InliningStrategy := .default
+  emitRemarks : Option String := none
 
 private def parseBoolLiteral (flagName : String) (value : String) : Except String Bool :=
   match value with
@@ -44,21 +46,36 @@ private def parseTokens (tokens : List String) (state : PartialCliOptions) : Exc
       match InliningStrategy.parse value with
       | .ok parsed => parseTokens rest { state with inliningStrategy := parsed }
       | .error err => .error err
+  | "--emit-remarks" :: value :: rest => parseTokens rest { state with emitRemarks := some value }
   | "--module" :: [] => .error "missing value for --module"
   | "--out" :: [] => .error "missing value for --out"
   | "--emit-casm" :: [] => .error "missing value for --emit-casm"
   | "--optimize" :: [] => .error "missing value for --optimize"
   | "--inlining-strategy" :: [] => .error "missing value for --inlining-strategy"
+  | "--emit-remarks" :: [] => .error "missing value for --emit-remarks"
   | unknown :: _ => .error s!"unknown argument: {unknown}"
 
 def usage : String :=
   String.intercalate "\n"
     [
       "Usage:",
-      "  lake exe leancairo-gen --module <LeanModule> --out <Directory> [--emit-casm true|false] [--optimize true|false] [--inlining-strategy default|avoid|<n>]",
+      "  lake exe leancairo-gen --module <LeanModule> --out <Directory> [--emit-casm true|false] [--optimize true|false] [--inlining-strategy default|avoid|<n>] [--emit-remarks <File>]",
       "",
       "Requirements:",
       "  <LeanModule> must define: def contract : ContractSpec",
+      "",
+      "Remarks:",
+      "  --emit-remarks <File> writes one JSON Lines record per function and pass application",
+      "",
+      "Server mode:",
+      "  lake exe leancairo-gen --serve",
+      "  reads one request per stdin line, {\"id\": ..., \"args\": [<arguments above>]}, and writes one",
+      "  JSON line per request with its status; each module is built and imported once per server",
+      "",
+      "Batch mode:",
+      "  lake exe leancairo-gen --batch <Manifest.json> [--summary <File>]",
+      "  compiles every entry of {\"entries\": [{\"id\": ..., \"args\": [<arguments above>]}]} in one process,",
+      "  importing all modules once; --summary writes per-entry status and timing as JSON",
       ""
     ]
 
@@ -82,6 +99,7 @@ def parseCliOptions (args : List String) : Except String CliOptions := do
         emitCasm := parsed.emitCasm
         optimize := parsed.optimize
         inliningStrategy := parsed.inliningStrategy
+        emitRemarks := parsed.emitRemarks
       }
 
 end LeanCairo.CLI
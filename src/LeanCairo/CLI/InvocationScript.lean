@@ -22,6 +22,11 @@ private def boolLiteral (value : Bool) : String :=
 private def inliningStrategyLiteral (value : LeanCairo.Pipeline.Generation.InliningStrategy) : String :=
   LeanCairo.Pipeline.Generation.InliningStrategy.toLeanExpr value
 
+private def optionalPathLiteral (value : Option String) : String :=
+  match value with
+  | some path => s!"(some \"{escapeLeanStringLiteral path}\")"
+  | none => "none"
+
 private def toTempSafeName (value : String) : String :=
   String.ofList <| value.toList.map (fun c => if c.isAlphanum then c else '_')
 
@@ -34,6 +39,7 @@ private def renderInvocationScript (options : CliOptions) : String :=
   let escapedOutDir := escapeLeanStringLiteral options.outDir
   let emitLiteral := boolLiteral options.emitCasm
   let optimizeLiteral := boolLiteral options.optimize
+  let remarksLiteral := optionalPathLiteral options.emitRemarks
   let inliningLiteral := inliningStrategyLiteral options.inliningStrategy
   String.intercalate "\n"
     [
@@ -41,7 +47,7 @@ private def renderInvocationScript (options : CliOptions) : String :=
       s!"import {options.moduleName}",
       "",
       "#eval",
-      s!"  LeanCairo.Pipeline.Generation.generateProjectCheckedWithTuning {options.moduleName}.contract \"{escapedOutDir}\" {emitLiteral} {optimizeLiteral} {inliningLiteral}",
+      s!"  LeanCairo.Pipeline.Generation.generateProjectCheckedWithTuning {options.moduleName}.contract \"{escapedOutDir}\" {emitLiteral} {optimizeLiteral} {inliningLiteral} {remarksLiteral}",
       ""
     ]
 
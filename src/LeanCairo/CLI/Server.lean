@@ -0,0 +1,20 @@
+import LeanCairo.CLI.Arguments
+import LeanCairo.Pipeline.Generation.EntryPoint
+import LeanCairo.Pipeline.Resident
+
+namespace LeanCairo.CLI
+
+open LeanCairo.Pipeline
+
+/-- One `--serve` request: the same options as a command line, compiled in-process. -/
+def runResidentInvocation (cache : ContractCache) (args : List String) : IO ContractCache := do
+  let options <-
+    match parseCliOptions args with
+    | .ok options => pure options
+    | .error err => throw <| IO.userError err
+  let (spec, cache) <- cache.load options.moduleName
+  LeanCairo.Pipeline.Generation.generateProjectCheckedWithTuning
+    spec options.outDir options.emitCasm options.optimize options.inliningStrategy options.emitRemarks
+  pure cache
+
+end LeanCairo.CLI
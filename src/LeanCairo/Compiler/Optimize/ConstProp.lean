@@ -0,0 +1,275 @@
+import LeanCairo.Compiler.IR.Expr
+import LeanCairo.Compiler.Optimize.GVN
+import LeanCairo.Compiler.Optimize.Interval
+
+namespace LeanCairo.Compiler.Optimize
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Semantics
+open LeanCairo.Core.Domain
+
+/-!
+Constant propagation and strength reduction policy:
+1. A `letE` whose bound value reduces to a literal records that literal for its name; reads of the
+   name at the literal's type are replaced by the literal. Any other binding of the name shadows
+   the recorded literal.
+2. A binding whose name no longer occurs in its body is dropped when its bound value cannot
+   panic; a u128/u256 operation that may overflow keeps its binding so the runtime failure stays.
+3. Operators over literal operands fold only when the unbounded `evalExpr` result fits the width
+   of the type: u128/u256 results below `2^128`/`2^256` (subtraction additionally needs no
+   borrow) and felt252 results below the prime in absolute value. Such folds agree with the
+   wrapping `evalExprStrict` semantics as well, so the emitted constant is the runtime value.
+4. `ite` over a literal condition selects its arm.
+5. u128/u256 multiplication of a variable by the literal 2 or 4 becomes one or two doublings. On
+   the direct Sierra lane a doubling is a `u128_overflowing_add` (3 steps, 1 range check per arm),
+   while the cheapest multiplication route pays `u128s_from_felt252` (up to 10 steps, 3 range
+   checks); a third doubling would cost more than the multiplication. Doubling copies its operand,
+   so any other operand is left as a multiplication: `x * 4` becomes `(x + x) + (x + x)`, three
+   additions that only read `x`, or two once GVN shares `x + x`. felt252 multiplication is already
+   free in the cost table and is not rewritten.
+-/
+
+def u256Modulus : Nat := IntegerDomains.pow2 256
+
+/-- Literal value a `letE` binder is known to hold. -/
+inductive ConstVal where
+  | u128 (value : Nat)
+  | u256 (value : Nat)
+  | bool (value : Bool)
+  | felt252 (value : Int)
+  deriving Repr, DecidableEq
+
+namespace ConstVal
+
+def ty : ConstVal -> Ty
+  | .u128 _ => .u128
+  | .u256 _ => .u256
+  | .bool _ => .bool
+  | .felt252 _ => .felt252
+
+/-- The literal expression for this value when read at type `readTy`. -/
+def exprAt : ConstVal -> (readTy : Ty) -> Option (IRExpr readTy)
+  | .u128 value, .u128 => some (.litU128 value)
+  | .u256 value, .u256 => some (.litU256 value)
+  | .bool value, .bool => some (.litBool value)
+  | .felt252 value, .felt252 => some (.litFelt252 value)
+  | _, _ => none
+
+end ConstVal
+
+def constOf? : IRExpr ty -> Option ConstVal
+  | .var _ => none
+  | .storageRead _ => none
+  | .litU128 value => some (.u128 value)
+  | .litU256 value => some (.u256 value)
+  | .litBool value => some (.bool value)
+  | .litFelt252 value => some (.felt252 value)
+  | .addFelt252 _ _ => none
+  | .subFelt252 _ _ => none
+  | .mulFelt252 _ _ => none
+  | .addU128 _ _ => none
+  | .subU128 _ _ => none
+  | .mulU128 _ _ => none
+  | .addU256 _ _ => none
+  | .subU256 _ _ => none
+  | .mulU256 _ _ => none
+  | .eq _ _ => none
+  | .ltU128 _ _ => none
+  | .leU128 _ _ => none
+  | .ltU256 _ _ => none
+  | .leU256 _ _ => none
+  | .ite _ _ _ => none
+  | .letE _ _ _ _ => none
+
+/-- Literals held by the enclosing let-bound names. -/
+abbrev ConstEnv := String -> Option ConstVal
+
+namespace ConstEnv
+
+def empty : ConstEnv := fun _ => none
+
+def set (env : ConstEnv) (name : String) (value : Option ConstVal) : ConstEnv :=
+  fun n => if n = name then value else env n
+
+end ConstEnv
+
+/-- Number of doublings that replace a multiplication by `factor`, when that is cheaper. -/
+def strengthReductionDoublings (factor : Nat) : Option Nat :=
+  if factor = 2 then some 1
+  else if factor = 4 then some 2
+  else none
+
+def doubledU128 : Nat -> IRExpr .u128 -> IRExpr .u128
+  | 0, expr => expr
+  | count + 1, expr => .addU128 (doubledU128 count expr) (doubledU128 count expr)
+
+def doubledU256 : Nat -> IRExpr .u256 -> IRExpr .u256
+  | 0, expr => expr
+  | count + 1, expr => .addU256 (doubledU256 count expr) (doubledU256 count expr)
+
+def reduceMulU128 (operand : IRExpr .u128) (factor : Nat) (fallback : IRExpr .u128) : IRExpr .u128 :=
+  match strengthReductionDoublings factor with
+  | some count => if isVarExpr operand then doubledU128 count operand else fallback
+  | none => fallback
+
+def reduceMulU256 (operand : IRExpr .u256) (factor : Nat) (fallback : IRExpr .u256) : IRExpr .u256 :=
+  match strengthReductionDoublings factor with
+  | some count => if isVarExpr operand then doubledU256 count operand else fallback
+  | none => fallback
+
+def propagateAddFelt252 (lhs rhs : IRExpr .felt252) : IRExpr .felt252 :=
+  match lhs, rhs with
+  | .litFelt252 a, .litFelt252 b =>
+      if (a + b).natAbs < felt252Prime then .litFelt252 (a + b) else .addFelt252 lhs rhs
+  | _, _ => .addFelt252 lhs rhs
+
+def propagateSubFelt252 (lhs rhs : IRExpr .felt252) : IRExpr .felt252 :=
+  match lhs, rhs with
+  | .litFelt252 a, .litFelt252 b =>
+      if (a - b).natAbs < felt252Prime then .litFelt252 (a - b) else .subFelt252 lhs rhs
+  | _, _ => .subFelt252 lhs rhs
+
+def propagateMulFelt252 (lhs rhs : IRExpr .felt252) : IRExpr .felt252 :=
+  match lhs, rhs with
+  | .litFelt252 a, .litFelt252 b =>
+      if (a * b).natAbs < felt252Prime then .litFelt252 (a * b) else .mulFelt252 lhs rhs
+  | _, _ => .mulFelt252 lhs rhs
+
+def propagateAddU128 (lhs rhs : IRExpr .u128) : IRExpr .u128 :=
+  match lhs, rhs with
+  | .litU128 a, .litU128 b =>
+      if a + b < u128Modulus then .litU128 (a + b) else .addU128 lhs rhs
+  | _, _ => .addU128 lhs rhs
+
+def propagateSubU128 (lhs rhs : IRExpr .u128) : IRExpr .u128 :=
+  match lhs, rhs with
+  | .litU128 a, .litU128 b =>
+      if b ≤ a ∧ a < u128Modulus then .litU128 (a - b) else .subU128 lhs rhs
+  | _, _ => .subU128 lhs rhs
+
+def propagateMulU128 (lhs rhs : IRExpr .u128) : IRExpr .u128 :=
+  match lhs, rhs with
+  | .litU128 a, .litU128 b =>
+      if a * b < u128Modulus then .litU128 (a * b) else .mulU128 lhs rhs
+  | operand, .litU128 factor => reduceMulU128 operand factor (.mulU128 lhs rhs)
+  | .litU128 factor, operand => reduceMulU128 operand factor (.mulU128 lhs rhs)
+  | _, _ => .mulU128 lhs rhs
+
+def propagateAddU256 (lhs rhs : IRExpr .u256) : IRExpr .u256 :=
+  match lhs, rhs with
+  | .litU256 a, .litU256 b =>
+      if a + b < u256Modulus then .litU256 (a + b) else .addU256 lhs rhs
+  | _, _ => .addU256 lhs rhs
+
+def propagateSubU256 (lhs rhs : IRExpr .u256) : IRExpr .u256 :=
+  match lhs, rhs with
+  | .litU256 a, .litU256 b =>
+      if b ≤ a ∧ a < u256Modulus then .litU256 (a - b) else .subU256 lhs rhs
+  | _, _ => .subU256 lhs rhs
+
+def propagateMulU256 (lhs rhs : IRExpr .u256) : IRExpr .u256 :=
+  match lhs, rhs with
+  | .litU256 a, .litU256 b =>
+      if a * b < u256Modulus then .litU256 (a * b) else .mulU256 lhs rhs
+  | operand, .litU256 factor => reduceMulU256 operand factor (.mulU256 lhs rhs)
+  | .litU256 factor, operand => reduceMulU256 operand factor (.mulU256 lhs rhs)
+  | _, _ => .mulU256 lhs rhs
+
+def propagateLtU128 (lhs rhs : IRExpr .u128) : IRExpr .bool :=
+  match lhs, rhs with
+  | .litU128 a, .litU128 b =>
+      if a < u128Modulus ∧ b < u128Modulus then .litBool (decide (a < b)) else .ltU128 lhs rhs
+  | _, _ => .ltU128 lhs rhs
+
+def propagateLeU128 (lhs rhs : IRExpr .u128) : IRExpr .bool :=
+  match lhs, rhs with
+  | .litU128 a, .litU128 b =>
+      if a < u128Modulus ∧ b < u128Modulus then .litBool (decide (a ≤ b)) else .leU128 lhs rhs
+  | _, _ => .leU128 lhs rhs
+
+def propagateLtU256 (lhs rhs : IRExpr .u256) : IRExpr .bool :=
+  match lhs, rhs with
+  | .litU256 a, .litU256 b =>
+      if a < u256Modulus ∧ b < u256Modulus then .litBool (decide (a < b)) else .ltU256 lhs rhs
+  | _, _ => .ltU256 lhs rhs
+
+def propagateLeU256 (lhs rhs : IRExpr .u256) : IRExpr .bool :=
+  match lhs, rhs with
+  | .litU256 a, .litU256 b =>
+      if a < u256Modulus ∧ b < u256Modulus then .litBool (decide (a ≤ b)) else .leU256 lhs rhs
+  | _, _ => .leU256 lhs rhs
+
+def propagateIte (cond : IRExpr .bool) (thenBranch elseBranch : IRExpr ty) : IRExpr ty :=
+  match cond with
+  | .litBool value => if value then thenBranch else elseBranch
+  | _ => .ite cond thenBranch elseBranch
+
+/--
+Whether evaluating the expression can never fail at runtime. u128/u256 arithmetic panics on
+overflow or underflow in the emitted Sierra, so it, and anything containing it, is excluded.
+-/
+def cannotPanic : IRExpr ty -> Bool
+  | .var _ => true
+  | .storageRead _ => true
+  | .litU128 _ => true
+  | .litU256 _ => true
+  | .litBool _ => true
+  | .litFelt252 _ => true
+  | .addFelt252 lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .subFelt252 lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .mulFelt252 lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .addU128 _ _ => false
+  | .subU128 _ _ => false
+  | .mulU128 _ _ => false
+  | .addU256 _ _ => false
+  | .subU256 _ _ => false
+  | .mulU256 _ _ => false
+  | .eq lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .ltU128 lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .leU128 lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .ltU256 lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .leU256 lhs rhs => cannotPanic lhs && cannotPanic rhs
+  | .ite cond thenBranch elseBranch => cannotPanic cond && cannotPanic thenBranch && cannotPanic elseBranch
+  | .letE _ _ bound body => cannotPanic bound && cannotPanic body
+
+/-- Drops an unused binding, unless evaluating its bound value could panic at runtime. -/
+def dropDeadLet (name : String) (boundTy : Ty) (bound : IRExpr boundTy) (body : IRExpr ty) : IRExpr ty :=
+  if name ∈ exprNames body ∨ cannotPanic bound = false then .letE name boundTy bound body else body
+
+def propagateExpr (env : ConstEnv) : IRExpr ty -> IRExpr ty
+  | .var name =>
+      match env name with
+      | some value =>
+          match value.exprAt ty with
+          | some lit => lit
+          | none => .var name
+      | none => .var name
+  | .storageRead name => .storageRead name
+  | .litU128 value => .litU128 value
+  | .litU256 value => .litU256 value
+  | .litBool value => .litBool value
+  | .litFelt252 value => .litFelt252 value
+  | .addFelt252 lhs rhs => propagateAddFelt252 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .subFelt252 lhs rhs => propagateSubFelt252 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .mulFelt252 lhs rhs => propagateMulFelt252 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .addU128 lhs rhs => propagateAddU128 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .subU128 lhs rhs => propagateSubU128 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .mulU128 lhs rhs => propagateMulU128 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .addU256 lhs rhs => propagateAddU256 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .subU256 lhs rhs => propagateSubU256 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .mulU256 lhs rhs => propagateMulU256 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .eq lhs rhs => .eq (propagateExpr env lhs) (propagateExpr env rhs)
+  | .ltU128 lhs rhs => propagateLtU128 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .leU128 lhs rhs => propagateLeU128 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .ltU256 lhs rhs => propagateLtU256 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .leU256 lhs rhs => propagateLeU256 (propagateExpr env lhs) (propagateExpr env rhs)
+  | .ite cond thenBranch elseBranch =>
+      propagateIte (propagateExpr env cond) (propagateExpr env thenBranch) (propagateExpr env elseBranch)
+  | .letE name boundTy bound body =>
+      let bound' := propagateExpr env bound
+      dropDeadLet name boundTy bound' (propagateExpr (env.set name (constOf? bound')) body)
+
+def constPropExpr (expr : IRExpr ty) : IRExpr ty :=
+  propagateExpr ConstEnv.empty expr
+
+end LeanCairo.Compiler.Optimize
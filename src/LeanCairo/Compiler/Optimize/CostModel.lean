@@ -0,0 +1,124 @@
+import LeanCairo.Compiler.IR.Spec
+import LeanCairo.Compiler.Optimize.Interval
+
+namespace LeanCairo.Compiler.Optimize
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Core.Domain
+
+/-!
+Static Sierra cost model policy:
+1. Unit prices mirror `config/sierra-libfunc-costs.json` (model `sierra_static_gas_v1`): a CASM step
+   weighs 100 and a range-check cell weighs 70; `scripts/test/optimizer_cost_selection.sh` keeps the
+   two in sync.
+2. Each node is charged for the statements the direct Sierra emitter lowers it to, including the
+   `store_temp`/`jump` merge statements around branching libfuncs. Branching libfuncs and `ite`
+   contribute their worse arm, so scores are worst-case gas like `estimate_static_gas.py`.
+3. `mulU128` is charged for the felt252 route exactly when `rangeOf` proves the product fits, the
+   same decision the emitter makes; otherwise it is charged for the guarantee route.
+4. Nodes without a direct lowering yet are charged coarse proxies (u256 arithmetic at twice the
+   u128 price, ordered comparisons at a u128 subtraction) so candidate rankings stay meaningful.
+-/
+
+structure SierraCost where
+  steps : Nat := 0
+  rangeChecks : Nat := 0
+  deriving Repr, DecidableEq, Inhabited
+
+namespace SierraCost
+
+def stepWeight : Nat := 100
+
+def rangeCheckWeight : Nat := 70
+
+def gas (cost : SierraCost) : Nat :=
+  cost.steps * stepWeight + cost.rangeChecks * rangeCheckWeight
+
+def add (lhs rhs : SierraCost) : SierraCost :=
+  { steps := lhs.steps + rhs.steps, rangeChecks := lhs.rangeChecks + rhs.rangeChecks }
+
+instance : Add SierraCost := ⟨add⟩
+
+def double (cost : SierraCost) : SierraCost :=
+  cost + cost
+
+/-- The costlier of two alternatives by weighted gas, keeping `lhs` on ties. -/
+def worse (lhs rhs : SierraCost) : SierraCost :=
+  if lhs.gas < rhs.gas then rhs else lhs
+
+end SierraCost
+
+/-- `store_temp` of a single-cell value. -/
+def storeTempCost : SierraCost := { steps := 1 }
+
+def jumpCost : SierraCost := { steps := 1 }
+
+/-- `u128_overflowing_{add,sub}`: the fallthrough arm stores both results and jumps to the merge. -/
+def u128OverflowingCost : SierraCost :=
+  ({ steps := 3, rangeChecks := 1 } : SierraCost) + storeTempCost + storeTempCost + jumpCost
+
+/-- `u128_guarantee_mul` plus `u128_mul_guarantee_verify` and the stored low limb. -/
+def u128MulGuaranteeCost : SierraCost :=
+  ({ steps := 7 } : SierraCost) + ({ steps := 9, rangeChecks := 4 } : SierraCost) + storeTempCost
+
+/-- `felt252_mul` over widened operands, then the worse `u128s_from_felt252` arm with its merge. -/
+def u128MulViaFelt252Cost : SierraCost :=
+  let narrowArm : SierraCost :=
+    ({ steps := 4, rangeChecks := 2 } : SierraCost) + storeTempCost + storeTempCost + jumpCost
+  let wideArm : SierraCost :=
+    ({ steps := 10, rangeChecks := 3 } : SierraCost) + storeTempCost + storeTempCost
+  storeTempCost + narrowArm.worse wideArm
+
+def u128EqCost : SierraCost := { steps := 2 }
+
+def u128MulCost (env : RangeEnv) (lhs rhs : IRExpr .u128) : SierraCost :=
+  if NatInterval.mulFitsFelt252 (rangeOf env lhs) (rangeOf env rhs) then
+    u128MulViaFelt252Cost
+  else
+    u128MulGuaranteeCost
+
+def exprSierraCost (env : RangeEnv) : IRExpr ty -> SierraCost
+  | .var _ => {}
+  | .storageRead _ => {}
+  | .litU128 _ => storeTempCost
+  | .litU256 _ => storeTempCost.double
+  | .litBool _ => storeTempCost
+  | .litFelt252 _ => storeTempCost
+  | .addFelt252 lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + storeTempCost
+  | .subFelt252 lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + storeTempCost
+  | .mulFelt252 lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + storeTempCost
+  | .addU128 lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost
+  | .subU128 lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost
+  | .mulU128 lhs rhs =>
+      exprSierraCost env lhs + exprSierraCost env rhs + u128MulCost env lhs rhs
+  | .addU256 lhs rhs =>
+      exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost.double
+  | .subU256 lhs rhs =>
+      exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost.double
+  | .mulU256 lhs rhs =>
+      exprSierraCost env lhs + exprSierraCost env rhs + u128MulGuaranteeCost.double
+  | .eq lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + u128EqCost
+  | .ltU128 lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost
+  | .leU128 lhs rhs => exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost
+  | .ltU256 lhs rhs =>
+      exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost.double
+  | .leU256 lhs rhs =>
+      exprSierraCost env lhs + exprSierraCost env rhs + u128OverflowingCost.double
+  | .ite cond thenBranch elseBranch =>
+      exprSierraCost env cond + jumpCost +
+        (exprSierraCost (refineGuard env cond true) thenBranch).worse
+          (exprSierraCost (refineGuard env cond false) elseBranch)
+  | .letE name boundTy bound body =>
+      exprSierraCost env bound +
+        exprSierraCost (env.bind boundTy name (rangeOf env bound)) body
+
+def storageWriteSierraCost (writeSpec : IRStorageWrite) : SierraCost :=
+  exprSierraCost RangeEnv.empty writeSpec.value
+
+/-- Worst-case static cost of a function: its return expression plus every storage write value. -/
+def funcSierraCost (fnSpec : IRFuncSpec) : SierraCost :=
+  fnSpec.writes.foldl
+    (fun acc writeSpec => acc + storageWriteSierraCost writeSpec)
+    (exprSierraCost RangeEnv.empty fnSpec.body)
+
+end LeanCairo.Compiler.Optimize
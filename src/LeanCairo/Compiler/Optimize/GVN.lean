@@ -0,0 +1,349 @@
+import Std.Data.HashMap
+import LeanCairo.Compiler.IR.Expr
+
+namespace LeanCairo.Compiler.Optimize
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Core.Domain
+
+/-!
+Global value numbering policy:
+1. Every non-leaf subtree is hash-consed bottom-up into a `ValueTable`; structurally identical
+   subtrees (same constructor, names, literals and children) share one entry.
+2. A value is shared when it occurs at least twice in a scope and is evaluated on every path
+   through it: outside `ite` arms, or in both arms of the same `ite`.
+3. Shared values are hoisted largest first into a `letE` at the head of the scope, bound to a
+   name `__leancairo_internal_gvn_<n>` that is fresh for the whole scope. Every structurally
+   identical occurrence, including occurrences inside nested `letE` bodies and `ite` arms, is
+   replaced by that name.
+4. `ite` arms and `letE` bodies open nested scopes, so values that depend on a local binder are
+   still shared under it.
+5. Hoisting is applied only when `HoistLegal` holds: the binder name is unused and no binder in
+   the scope captures a variable of the hoisted value. Otherwise the scope is left unchanged.
+-/
+
+abbrev ExprKey := Sigma IRExpr
+
+/-- Names read or bound anywhere in the expression. -/
+def exprNames : IRExpr ty -> List String
+  | .var name => [name]
+  | .storageRead _ => []
+  | .litU128 _ => []
+  | .litU256 _ => []
+  | .litBool _ => []
+  | .litFelt252 _ => []
+  | .addFelt252 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .subFelt252 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .mulFelt252 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .addU128 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .subU128 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .mulU128 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .addU256 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .subU256 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .mulU256 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .eq lhs rhs => exprNames lhs ++ exprNames rhs
+  | .ltU128 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .leU128 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .ltU256 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .leU256 lhs rhs => exprNames lhs ++ exprNames rhs
+  | .ite cond thenBranch elseBranch => exprNames cond ++ exprNames thenBranch ++ exprNames elseBranch
+  | .letE name _ bound body => name :: (exprNames bound ++ exprNames body)
+
+/-- Names bound by `letE` anywhere in the expression. -/
+def exprBinders : IRExpr ty -> List String
+  | .var _ => []
+  | .storageRead _ => []
+  | .litU128 _ => []
+  | .litU256 _ => []
+  | .litBool _ => []
+  | .litFelt252 _ => []
+  | .addFelt252 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .subFelt252 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .mulFelt252 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .addU128 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .subU128 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .mulU128 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .addU256 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .subU256 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .mulU256 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .eq lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .ltU128 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .leU128 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .ltU256 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .leU256 lhs rhs => exprBinders lhs ++ exprBinders rhs
+  | .ite cond thenBranch elseBranch =>
+      exprBinders cond ++ exprBinders thenBranch ++ exprBinders elseBranch
+  | .letE name _ bound body => name :: (exprBinders bound ++ exprBinders body)
+
+/-- Variables are leaves: sharing one needs no binder, and copying one costs nothing. -/
+def isVarExpr : IRExpr ty -> Bool
+  | .var _ => true
+  | _ => false
+
+def replaceIf (target : ExprKey) (name : String) (original rebuilt : IRExpr ty) : IRExpr ty :=
+  if (⟨ty, original⟩ : ExprKey) = target then .var name else rebuilt
+
+/-- Replace every occurrence of `target` by a read of `name`. -/
+def abstractExpr (target : ExprKey) (name : String) : IRExpr ty -> IRExpr ty
+  | .var varName => replaceIf target name (.var varName) (.var varName)
+  | .storageRead field => replaceIf target name (.storageRead field) (.storageRead field)
+  | .litU128 value => replaceIf target name (.litU128 value) (.litU128 value)
+  | .litU256 value => replaceIf target name (.litU256 value) (.litU256 value)
+  | .litBool value => replaceIf target name (.litBool value) (.litBool value)
+  | .litFelt252 value => replaceIf target name (.litFelt252 value) (.litFelt252 value)
+  | .addFelt252 lhs rhs =>
+      replaceIf target name (.addFelt252 lhs rhs)
+        (.addFelt252 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .subFelt252 lhs rhs =>
+      replaceIf target name (.subFelt252 lhs rhs)
+        (.subFelt252 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .mulFelt252 lhs rhs =>
+      replaceIf target name (.mulFelt252 lhs rhs)
+        (.mulFelt252 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .addU128 lhs rhs =>
+      replaceIf target name (.addU128 lhs rhs)
+        (.addU128 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .subU128 lhs rhs =>
+      replaceIf target name (.subU128 lhs rhs)
+        (.subU128 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .mulU128 lhs rhs =>
+      replaceIf target name (.mulU128 lhs rhs)
+        (.mulU128 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .addU256 lhs rhs =>
+      replaceIf target name (.addU256 lhs rhs)
+        (.addU256 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .subU256 lhs rhs =>
+      replaceIf target name (.subU256 lhs rhs)
+        (.subU256 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .mulU256 lhs rhs =>
+      replaceIf target name (.mulU256 lhs rhs)
+        (.mulU256 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .eq lhs rhs =>
+      replaceIf target name (.eq lhs rhs)
+        (.eq (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .ltU128 lhs rhs =>
+      replaceIf target name (.ltU128 lhs rhs)
+        (.ltU128 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .leU128 lhs rhs =>
+      replaceIf target name (.leU128 lhs rhs)
+        (.leU128 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .ltU256 lhs rhs =>
+      replaceIf target name (.ltU256 lhs rhs)
+        (.ltU256 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .leU256 lhs rhs =>
+      replaceIf target name (.leU256 lhs rhs)
+        (.leU256 (abstractExpr target name lhs) (abstractExpr target name rhs))
+  | .ite cond thenBranch elseBranch =>
+      replaceIf target name (.ite cond thenBranch elseBranch)
+        (.ite (abstractExpr target name cond) (abstractExpr target name thenBranch)
+          (abstractExpr target name elseBranch))
+  | .letE binder boundTy bound body =>
+      replaceIf target name (.letE binder boundTy bound body)
+        (.letE binder boundTy (abstractExpr target name bound) (abstractExpr target name body))
+
+/-- `name` is unused in `body` and `bound`, and no binder in `body` captures a variable of
+`bound`, so every occurrence of `bound` in `body` may read `name` instead. -/
+abbrev HoistLegal (name : String) (bound : IRExpr boundTy) (body : IRExpr ty) : Prop :=
+  name ∉ exprNames body ∧ name ∉ exprNames bound ∧
+    ∀ binder ∈ exprBinders body, binder ≠ name ∧ binder ∉ exprNames bound
+
+def hoistExpr (name : String) (bound : IRExpr boundTy) (body : IRExpr ty) : IRExpr ty :=
+  if HoistLegal name bound body then
+    .letE name boundTy bound (abstractExpr ⟨boundTy, bound⟩ name body)
+  else
+    body
+
+structure ValueEntry where
+  hash : UInt64
+  key : ExprKey
+  size : Nat
+  order : Nat
+  mustEval : Bool
+  occurrences : Nat
+
+/-- Hash-consing table: buckets keyed by structural hash, disambiguated by structural equality. -/
+structure ValueTable where
+  buckets : Std.HashMap UInt64 (Array ValueEntry) := {}
+  nextOrder : Nat := 0
+
+namespace ValueTable
+
+def find? (table : ValueTable) (hash : UInt64) (key : ExprKey) : Option ValueEntry :=
+  (table.buckets.getD hash #[]).find? (fun entry => decide (entry.key = key))
+
+/-- Merge `entry` into the table, adding its occurrences; `mustEval` is or-ed in. -/
+def absorb (table : ValueTable) (entry : ValueEntry) (mustEval : Bool) : ValueTable :=
+  let bucket := table.buckets.getD entry.hash #[]
+  match bucket.findIdx? (fun existing => decide (existing.key = entry.key)) with
+  | some index =>
+      let bucket :=
+        bucket.modify index fun existing =>
+          { existing with
+            mustEval := existing.mustEval || mustEval
+            occurrences := existing.occurrences + entry.occurrences }
+      { table with buckets := table.buckets.insert entry.hash bucket }
+  | none =>
+      {
+        buckets := table.buckets.insert entry.hash (bucket.push { entry with order := table.nextOrder, mustEval := mustEval })
+        nextOrder := table.nextOrder + 1
+      }
+
+def entries (table : ValueTable) : List ValueEntry :=
+  (table.buckets.fold (fun acc _ bucket => acc ++ bucket.toList) []).mergeSort
+    (fun lhs rhs => lhs.order ≤ rhs.order)
+
+/-- Fold both `ite` arms into the enclosing scope; a value is evaluated on every path through the
+`ite` only when it is evaluated on every path through each arm. -/
+def absorbArms (table : ValueTable) (mustEval : Bool) (thenTable elseTable : ValueTable) : ValueTable :=
+  let table :=
+    thenTable.entries.foldl
+      (fun acc entry =>
+        let inBoth := entry.mustEval && (elseTable.find? entry.hash entry.key).any (·.mustEval)
+        acc.absorb entry (mustEval && inBoth))
+      table
+  elseTable.entries.foldl (fun acc entry => acc.absorb entry false) table
+
+end ValueTable
+
+def recordValue (mustEval : Bool) (table : ValueTable) (hash : UInt64) (size : Nat) (node : IRExpr ty) :
+    UInt64 × Nat × ValueTable :=
+  let entry : ValueEntry :=
+    { hash := hash, key := ⟨ty, node⟩, size := size, order := 0, mustEval := mustEval, occurrences := 1 }
+  (hash, size, table.absorb entry mustEval)
+
+/-- Hash-cons every non-leaf subtree of one scope; returns the root hash and size. -/
+def scanValues (mustEval : Bool) (table : ValueTable) : IRExpr ty -> UInt64 × Nat × ValueTable
+  | .var name => (mixHash 1 (hash name), 1, table)
+  | .storageRead name => (mixHash 2 (hash name), 1, table)
+  | .litU128 value => (mixHash 3 (hash value), 1, table)
+  | .litU256 value => (mixHash 4 (hash value), 1, table)
+  | .litBool value => (mixHash 5 (hash value), 1, table)
+  | .litFelt252 value => (mixHash 6 (hash value), 1, table)
+  | .addFelt252 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 7 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.addFelt252 lhs rhs)
+  | .subFelt252 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 8 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.subFelt252 lhs rhs)
+  | .mulFelt252 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 9 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.mulFelt252 lhs rhs)
+  | .addU128 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 10 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.addU128 lhs rhs)
+  | .subU128 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 11 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.subU128 lhs rhs)
+  | .mulU128 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 12 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.mulU128 lhs rhs)
+  | .addU256 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 13 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.addU256 lhs rhs)
+  | .subU256 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 14 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.subU256 lhs rhs)
+  | .mulU256 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 15 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.mulU256 lhs rhs)
+  | .eq lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 16 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.eq lhs rhs)
+  | .ltU128 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 17 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.ltU128 lhs rhs)
+  | .leU128 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 18 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.leU128 lhs rhs)
+  | .ltU256 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 19 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.ltU256 lhs rhs)
+  | .leU256 lhs rhs =>
+      let (lhsHash, lhsSize, table) := scanValues mustEval table lhs
+      let (rhsHash, rhsSize, table) := scanValues mustEval table rhs
+      recordValue mustEval table (mixHash 20 (mixHash lhsHash rhsHash)) (1 + lhsSize + rhsSize) (.leU256 lhs rhs)
+  | .ite cond thenBranch elseBranch =>
+      let (condHash, condSize, table) := scanValues mustEval table cond
+      let (thenHash, thenSize, thenTable) := scanValues true {} thenBranch
+      let (elseHash, elseSize, elseTable) := scanValues true {} elseBranch
+      let table := table.absorbArms mustEval thenTable elseTable
+      recordValue mustEval table (mixHash 21 (mixHash condHash (mixHash thenHash elseHash)))
+        (1 + condSize + thenSize + elseSize) (.ite cond thenBranch elseBranch)
+  | .letE name boundTy bound body =>
+      let (boundHash, boundSize, table) := scanValues mustEval table bound
+      let (bodyHash, bodySize, table) := scanValues mustEval table body
+      recordValue mustEval table (mixHash 22 (mixHash (hash name) (mixHash boundHash bodyHash)))
+        (1 + boundSize + bodySize) (.letE name boundTy bound body)
+
+def valueTableOf (expr : IRExpr ty) : ValueTable :=
+  (scanValues true {} expr).2.2
+
+def isSharedEntry (entry : ValueEntry) : Bool :=
+  entry.mustEval && entry.occurrences ≥ 2
+
+/-- Shared values of one scope, largest first so that whole repeated trees get a single name. -/
+def sharedValues (expr : IRExpr ty) : List ValueEntry :=
+  ((valueTableOf expr).entries.filter isSharedEntry).mergeSort
+    (fun lhs rhs => lhs.size > rhs.size || (lhs.size == rhs.size && lhs.order ≤ rhs.order))
+
+def gvnTempName (index : Nat) : String :=
+  s!"__leancairo_internal_gvn_{index}"
+
+def freshGvnName (expr : IRExpr ty) : String :=
+  let names := exprNames expr
+  let index := ((List.range (names.length + 1)).find? (fun index => !names.contains (gvnTempName index))).getD 0
+  gvnTempName index
+
+/-- Hoist `entry` if earlier hoists in the same scope left it shared. -/
+def hoistShared (expr : IRExpr ty) (entry : ValueEntry) : IRExpr ty :=
+  if ((valueTableOf expr).find? entry.hash entry.key).any isSharedEntry then
+    hoistExpr (freshGvnName expr) entry.key.2 expr
+  else
+    expr
+
+def gvnScope (expr : IRExpr ty) : IRExpr ty :=
+  (sharedValues expr).foldl hoistShared expr
+
+def gvnNested : IRExpr ty -> IRExpr ty
+  | .var name => .var name
+  | .storageRead name => .storageRead name
+  | .litU128 value => .litU128 value
+  | .litU256 value => .litU256 value
+  | .litBool value => .litBool value
+  | .litFelt252 value => .litFelt252 value
+  | .addFelt252 lhs rhs => .addFelt252 (gvnNested lhs) (gvnNested rhs)
+  | .subFelt252 lhs rhs => .subFelt252 (gvnNested lhs) (gvnNested rhs)
+  | .mulFelt252 lhs rhs => .mulFelt252 (gvnNested lhs) (gvnNested rhs)
+  | .addU128 lhs rhs => .addU128 (gvnNested lhs) (gvnNested rhs)
+  | .subU128 lhs rhs => .subU128 (gvnNested lhs) (gvnNested rhs)
+  | .mulU128 lhs rhs => .mulU128 (gvnNested lhs) (gvnNested rhs)
+  | .addU256 lhs rhs => .addU256 (gvnNested lhs) (gvnNested rhs)
+  | .subU256 lhs rhs => .subU256 (gvnNested lhs) (gvnNested rhs)
+  | .mulU256 lhs rhs => .mulU256 (gvnNested lhs) (gvnNested rhs)
+  | .eq lhs rhs => .eq (gvnNested lhs) (gvnNested rhs)
+  | .ltU128 lhs rhs => .ltU128 (gvnNested lhs) (gvnNested rhs)
+  | .leU128 lhs rhs => .leU128 (gvnNested lhs) (gvnNested rhs)
+  | .ltU256 lhs rhs => .ltU256 (gvnNested lhs) (gvnNested rhs)
+  | .leU256 lhs rhs => .leU256 (gvnNested lhs) (gvnNested rhs)
+  | .ite cond thenBranch elseBranch =>
+      .ite (gvnNested cond) (gvnScope (gvnNested thenBranch)) (gvnScope (gvnNested elseBranch))
+  | .letE name boundTy bound body =>
+      .letE name boundTy (gvnNested bound) (gvnScope (gvnNested body))
+
+def gvnExpr (expr : IRExpr ty) : IRExpr ty :=
+  gvnScope (gvnNested expr)
+
+end LeanCairo.Compiler.Optimize
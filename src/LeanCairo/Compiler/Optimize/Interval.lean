@@ -0,0 +1,151 @@
+import LeanCairo.Compiler.IR.Expr
+import LeanCairo.Compiler.Semantics.Eval
+
+namespace LeanCairo.Compiler.Optimize
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Semantics
+open LeanCairo.Core.Domain
+
+/-!
+Interval analysis policy for the u128 lane:
+1. Ranges describe values under `evalExprStrict`, which reduces every u128 variable, literal and
+   arithmetic result modulo `2^128`; an unknown u128 value therefore lies in `[0, 2^128 - 1]`.
+2. Arithmetic keeps a precise range only when operand bounds prove the operation cannot wrap;
+   otherwise the result widens to the full u128 range.
+3. `ltU128`/`leU128` guards comparing a variable against a literal narrow that variable in the
+   corresponding `ite` branch; every other guard leaves the environment unchanged.
+4. Non-u128 expressions are not tracked and analyze to the full u128 range.
+-/
+
+def u128Modulus : Nat := IntegerDomains.pow2 128
+
+def felt252Prime : Nat := 2 ^ 251 + 17 * 2 ^ 192 + 1
+
+structure NatInterval where
+  lo : Nat
+  hi : Nat
+  deriving Repr, DecidableEq, Inhabited
+
+namespace NatInterval
+
+def Contains (range : NatInterval) (value : Nat) : Prop :=
+  range.lo ≤ value ∧ value ≤ range.hi
+
+def u128Top : NatInterval := { lo := 0, hi := u128Modulus - 1 }
+
+def point (value : Nat) : NatInterval := { lo := value, hi := value }
+
+def join (lhs rhs : NatInterval) : NatInterval :=
+  { lo := min lhs.lo rhs.lo, hi := max lhs.hi rhs.hi }
+
+def capHi (range : NatInterval) (bound : Nat) : NatInterval :=
+  { range with hi := min range.hi bound }
+
+def raiseLo (range : NatInterval) (bound : Nat) : NatInterval :=
+  { range with lo := max range.lo bound }
+
+def addWrapping (lhs rhs : NatInterval) : NatInterval :=
+  if lhs.hi + rhs.hi < u128Modulus then
+    { lo := lhs.lo + rhs.lo, hi := lhs.hi + rhs.hi }
+  else
+    u128Top
+
+def subWrapping (lhs rhs : NatInterval) : NatInterval :=
+  if rhs.hi ≤ lhs.lo then
+    { lo := lhs.lo - rhs.hi, hi := lhs.hi - rhs.lo }
+  else
+    u128Top
+
+def mulWrapping (lhs rhs : NatInterval) : NatInterval :=
+  if lhs.hi * rhs.hi < u128Modulus then
+    { lo := lhs.lo * rhs.lo, hi := lhs.hi * rhs.hi }
+  else
+    u128Top
+
+/-- The exact product of two values in these ranges is a felt252 value, so it can be computed with
+`felt252_mul` and split back into u128 limbs instead of going through `u128_guarantee_mul`. -/
+def mulFitsFelt252 (lhs rhs : NatInterval) : Bool :=
+  decide (lhs.hi * rhs.hi < felt252Prime)
+
+end NatInterval
+
+/-- Known ranges of u128 let-bound variables; unknown names read as the full u128 range. -/
+abbrev RangeEnv := String -> Option NatInterval
+
+namespace RangeEnv
+
+def empty : RangeEnv := fun _ => none
+
+def lookup (env : RangeEnv) (name : String) : NatInterval :=
+  (env name).getD NatInterval.u128Top
+
+def set (env : RangeEnv) (name : String) (range : Option NatInterval) : RangeEnv :=
+  fun n => if n = name then range else env n
+
+def boundRange : Ty -> NatInterval -> Option NatInterval
+  | .u128, range => some range
+  | _, _ => none
+
+/-- Bindings of any other type shadow an outer u128 range of the same name. -/
+def bind (env : RangeEnv) (boundTy : Ty) (name : String) (range : NatInterval) : RangeEnv :=
+  env.set name (boundRange boundTy range)
+
+def narrow (env : RangeEnv) (name : String) (f : NatInterval -> NatInterval) : RangeEnv :=
+  env.set name (some (f (env.lookup name)))
+
+end RangeEnv
+
+def varName? : IRExpr .u128 -> Option String
+  | .var name => some name
+  | _ => none
+
+def litU128? : IRExpr .u128 -> Option Nat
+  | .litU128 value => some (IntegerDomains.normalizeUnsigned 128 value)
+  | _ => none
+
+def refineLt (env : RangeEnv) (lhs rhs : IRExpr .u128) (outcome : Bool) : RangeEnv :=
+  match varName? lhs with
+  | some name =>
+      match litU128? rhs with
+      | some bound =>
+          if outcome then
+            env.narrow name (fun range => range.capHi (bound - 1))
+          else
+            env.narrow name (fun range => range.raiseLo bound)
+      | none => env
+  | none => env
+
+def refineLe (env : RangeEnv) (lhs rhs : IRExpr .u128) (outcome : Bool) : RangeEnv :=
+  match varName? lhs with
+  | some name =>
+      match litU128? rhs with
+      | some bound =>
+          if outcome then
+            env.narrow name (fun range => range.capHi bound)
+          else
+            env.narrow name (fun range => range.raiseLo (bound + 1))
+      | none => env
+  | none => env
+
+/-- Ranges that hold whenever `cond` evaluates to `outcome`. -/
+def refineGuard (env : RangeEnv) (cond : IRExpr .bool) (outcome : Bool) : RangeEnv :=
+  match cond with
+  | .ltU128 lhs rhs => refineLt env lhs rhs outcome
+  | .leU128 lhs rhs => refineLe env lhs rhs outcome
+  | _ => env
+
+def rangeOf (env : RangeEnv) : IRExpr ty -> NatInterval
+  | .var name => env.lookup name
+  | .litU128 value => NatInterval.point (IntegerDomains.normalizeUnsigned 128 value)
+  | .addU128 lhs rhs => (rangeOf env lhs).addWrapping (rangeOf env rhs)
+  | .subU128 lhs rhs => (rangeOf env lhs).subWrapping (rangeOf env rhs)
+  | .mulU128 lhs rhs => (rangeOf env lhs).mulWrapping (rangeOf env rhs)
+  | .ite cond thenBranch elseBranch =>
+      (rangeOf (refineGuard env cond true) thenBranch).join
+        (rangeOf (refineGuard env cond false) elseBranch)
+  | .letE name boundTy bound body =>
+      rangeOf (env.bind boundTy name (rangeOf env bound)) body
+  | _ => NatInterval.u128Top
+
+end LeanCairo.Compiler.Optimize
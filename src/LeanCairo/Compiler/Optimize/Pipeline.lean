@@ -1,12 +1,40 @@
 import LeanCairo.Compiler.Optimize.Expr
 import LeanCairo.Compiler.Optimize.Canonicalize
+import LeanCairo.Compiler.Optimize.ConstProp
+import LeanCairo.Compiler.Optimize.GVN
 import LeanCairo.Compiler.Optimize.Pass
+import LeanCairo.Compiler.Proof.ConstPropSound
+import LeanCairo.Compiler.Proof.GVNSound
 import LeanCairo.Compiler.Proof.OptimizeSound
 
 namespace LeanCairo.Compiler.Optimize
 
 open LeanCairo.Compiler.IR
 
+def constPropPass : VerifiedExprPass where
+  name := "constant-propagation"
+  legality :=
+    {
+      preconditions :=
+        [
+          "input expression is well-typed",
+          "literal bindings are substituted only at reads of the literal's type"
+        ]
+      postconditions :=
+        [
+          "output expression preserves evaluator semantics",
+          "folded literals agree with the wrapping width semantics of their type"
+        ]
+      resourceSideConditions :=
+        [
+          "multiplications are strength-reduced only where the replacement libfuncs are cheaper"
+        ]
+    }
+  run := fun expr => constPropExpr expr
+  sound := by
+    intro ctx ty expr
+    simpa using LeanCairo.Compiler.Proof.constPropExprSound ctx expr
+
 def algebraicFoldPass : VerifiedExprPass where
   name := "algebraic-fold"
   legality :=
@@ -31,8 +59,36 @@ def algebraicFoldPass : VerifiedExprPass where
     intro ctx ty expr
     simpa using LeanCairo.Compiler.Proof.optimizeExprSound ctx expr
 
+def gvnPass : VerifiedExprPass where
+  name := "global-value-numbering"
+  legality :=
+    {
+      preconditions :=
+        [
+          "input expression is well-typed",
+          "hoisted binder names are fresh for the whole scope"
+        ]
+      postconditions :=
+        [
+          "output expression preserves evaluator semantics",
+          "structurally identical subtrees evaluated on every path are bound once"
+        ]
+      resourceSideConditions :=
+        [
+          "values are hoisted only out of positions evaluated on every path, so no arm gains work"
+        ]
+    }
+  run := fun expr => gvnExpr expr
+  sound := by
+    intro ctx ty expr
+    simpa using LeanCairo.Compiler.Proof.gvnExprSound ctx expr
+
+/--
+GVN runs last: canonicalization's fixed-name CSE would otherwise rebind every variable GVN shares
+(`g + g` becomes `let t := g; t + t`).
+-/
 def optimizerPasses : List VerifiedExprPass :=
-  [algebraicFoldPass, canonicalizePass]
+  [constPropPass, algebraicFoldPass, canonicalizePass, gvnPass]
 
 def optimizerPipelineContractCheck : Except String Unit :=
   VerifiedExprPass.validatePipelineContracts optimizerPasses
@@ -0,0 +1,135 @@
+import Lean.Data.Json
+import LeanCairo.Compiler.Optimize.CostModel
+import LeanCairo.Compiler.Optimize.Pass
+
+namespace LeanCairo.Compiler.Optimize
+
+open Lean
+open LeanCairo.Compiler.IR
+
+def exprNodeCount : IRExpr ty -> Nat
+  | .var _ => 1
+  | .storageRead _ => 1
+  | .litU128 _ => 1
+  | .litU256 _ => 1
+  | .litBool _ => 1
+  | .litFelt252 _ => 1
+  | .addFelt252 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .subFelt252 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .mulFelt252 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .addU128 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .subU128 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .mulU128 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .addU256 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .subU256 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .mulU256 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .eq lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .ltU128 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .leU128 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .ltU256 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .leU256 lhs rhs => exprNodeCount lhs + exprNodeCount rhs + 1
+  | .ite cond thenBranch elseBranch =>
+      exprNodeCount cond + exprNodeCount thenBranch + exprNodeCount elseBranch + 1
+  | .letE _ _ bound body => exprNodeCount bound + exprNodeCount body + 1
+
+/-- IR nodes in the return expression and every storage write value. -/
+def funcNodeCount (fnSpec : IRFuncSpec) : Nat :=
+  fnSpec.writes.foldl (fun acc writeSpec => acc + exprNodeCount writeSpec.value) (exprNodeCount fnSpec.body)
+
+/-- One verified pass applied to one function, before Sierra emission statistics are attached. -/
+structure PassRemark where
+  functionName : String
+  pass : String
+  nodesBefore : Nat
+  nodesAfter : Nat
+  deriving Repr, DecidableEq
+
+/--
+Applies `passes` to `fnSpec` one at a time, as `composeMany` does, pairing each pass's remark with
+the function it produced. An empty pipeline yields a single `none` remark paired with the input, so
+every function is reported.
+-/
+def tracePassSpecs (passes : List VerifiedExprPass) (fnSpec : IRFuncSpec) : List (PassRemark × IRFuncSpec) :=
+  match passes with
+  | [] =>
+      let nodes := funcNodeCount fnSpec
+      [({ functionName := fnSpec.name, pass := "none", nodesBefore := nodes, nodesAfter := nodes }, fnSpec)]
+  | _ =>
+      let (tracedRev, _) :=
+        passes.foldl
+          (fun (acc : List (PassRemark × IRFuncSpec) × IRFuncSpec) pass =>
+            let (tracedRev, current) := acc
+            let next := pass.applyFuncSpec current
+            let remark : PassRemark :=
+              {
+                functionName := fnSpec.name
+                pass := pass.name
+                nodesBefore := funcNodeCount current
+                nodesAfter := funcNodeCount next
+              }
+            ((remark, next) :: tracedRev, next))
+          ([], fnSpec)
+      tracedRev.reverse
+
+/-- The remarks of `tracePassSpecs` together with the function after its last pass. -/
+def tracePasses (passes : List VerifiedExprPass) (fnSpec : IRFuncSpec) : List PassRemark × IRFuncSpec :=
+  let traced := tracePassSpecs passes fnSpec
+  (traced.map (·.fst), (traced.getLast?.map (·.snd)).getD fnSpec)
+
+private def natJson (value : Nat) : Json :=
+  Json.num (JsonNumber.fromNat value)
+
+def sierraCostJson (cost : SierraCost) : Json :=
+  Json.mkObj
+    [
+      ("steps", natJson cost.steps),
+      ("range_checks", natJson cost.rangeChecks),
+      ("gas", natJson cost.gas)
+    ]
+
+private def remarkJson
+    (contractName : String)
+    (statements? : Option Nat)
+    (cost : SierraCost)
+    (remark : PassRemark) : Json :=
+  Json.mkObj
+    [
+      ("contract", Json.str contractName),
+      ("function", Json.str remark.functionName),
+      ("pass", Json.str remark.pass),
+      ("ir_nodes_before", natJson remark.nodesBefore),
+      ("ir_nodes_after", natJson remark.nodesAfter),
+      ("sierra_statements", (statements?.map natJson).getD Json.null),
+      ("static_cost", sierraCostJson cost)
+    ]
+
+/--
+One JSON Lines record per pass application. Statistics describe the function as that pass left it,
+so consecutive records of a function show what each pass changed in `sierra_statements` and
+`static_cost`. `statementCount?` is supplied by the caller because only the Sierra pipeline links
+the direct emitter; other callers report `null` statements. `passesFor idx` lists the passes applied
+to the function at position `idx`, so functions sharing a name keep their own pipelines.
+-/
+def renderPassRemarksJsonLines
+    (statementCount? : IRFuncSpec -> Option Nat)
+    (spec : IRContractSpec)
+    (passesFor : Nat -> List VerifiedExprPass) : String :=
+  let lines :=
+    (spec.functions.zip (List.range spec.functions.length)).foldr
+      (fun (fnSpec, idx) acc =>
+        (tracePassSpecs (passesFor idx) fnSpec).map
+            (fun (remark, next) =>
+              (remarkJson spec.contractName (statementCount? next) (funcSierraCost next) remark).compress) ++
+          acc)
+      []
+  String.join (lines.map (· ++ "\n"))
+
+def writeRemarks (path : System.FilePath) (content : String) : IO Unit := do
+  match path.parent with
+  | some dir =>
+      if !dir.toString.isEmpty then
+        IO.FS.createDirAll dir
+  | none => pure ()
+  IO.FS.writeFile path content
+
+end LeanCairo.Compiler.Optimize
@@ -0,0 +1,141 @@
+import LeanCairo.Compiler.Optimize.CostModel
+import LeanCairo.Compiler.Optimize.Pipeline
+
+namespace LeanCairo.Compiler.Optimize
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Semantics
+
+/-!
+Cost-driven pipeline selection policy:
+1. Every candidate is an order or subset of the verified passes composed with `composeMany`, so
+   whichever candidate wins, the rewritten function is sound by `applyFuncSpecSigmaSound`.
+2. Candidates are scored per function with `funcSierraCost`; the cheapest wins and ties keep the
+   earlier candidate, so the fixed pipeline stays the choice unless another one is strictly cheaper.
+3. The empty pipeline is always a candidate, so a selected function never scores worse than its
+   unoptimized input.
+-/
+
+structure PipelineCandidate where
+  label : String
+  passes : List VerifiedExprPass
+
+def PipelineCandidate.pass (candidate : PipelineCandidate) : VerifiedExprPass :=
+  VerifiedExprPass.composeMany candidate.passes
+
+def PipelineCandidate.passNames (candidate : PipelineCandidate) : List String :=
+  candidate.passes.map (·.name)
+
+def pipelineCandidates : List PipelineCandidate :=
+  [
+    { label := "fixed", passes := optimizerPasses },
+    { label := "fold-first", passes := [algebraicFoldPass, constPropPass, canonicalizePass, gvnPass] },
+    { label := "canonicalize-last", passes := [constPropPass, algebraicFoldPass, gvnPass, canonicalizePass] },
+    { label := "no-gvn", passes := [constPropPass, algebraicFoldPass, canonicalizePass] },
+    { label := "no-const-prop", passes := [algebraicFoldPass, canonicalizePass, gvnPass] },
+    { label := "fold-only", passes := [algebraicFoldPass, canonicalizePass] },
+    { label := "none", passes := [] }
+  ]
+
+def pipelineCandidatesContractCheck : Except String Unit := do
+  for candidate in pipelineCandidates do
+    VerifiedExprPass.validatePipelineContracts candidate.passes
+
+structure CandidateScore where
+  label : String
+  passNames : List String
+  cost : SierraCost
+  deriving Repr, DecidableEq
+
+structure FuncOptimizationDecision where
+  functionName : String
+  inputCost : SierraCost
+  chosen : String
+  chosenCost : SierraCost
+  candidates : List CandidateScore
+  deriving Repr, DecidableEq
+
+def scoreCandidate (fnSpec : IRFuncSpec) (candidate : PipelineCandidate) : CandidateScore :=
+  {
+    label := candidate.label
+    passNames := candidate.passNames
+    cost := funcSierraCost (candidate.pass.applyFuncSpec fnSpec)
+  }
+
+private def cheapestCandidate
+    (best : PipelineCandidate × CandidateScore) :
+    List (PipelineCandidate × CandidateScore) -> PipelineCandidate × CandidateScore
+  | [] => best
+  | scored :: rest =>
+      if scored.snd.cost.gas < best.snd.cost.gas then
+        cheapestCandidate scored rest
+      else
+        cheapestCandidate best rest
+
+/-- The cheapest candidate for `fnSpec` together with the decision recorded for the report. -/
+def selectFuncCandidate (fnSpec : IRFuncSpec) : PipelineCandidate × FuncOptimizationDecision :=
+  let scored := pipelineCandidates.map (fun candidate => (candidate, scoreCandidate fnSpec candidate))
+  let (winner, winnerScore) :=
+    match scored with
+    | first :: rest => cheapestCandidate first rest
+    | [] =>
+        let fixed : PipelineCandidate := { label := "fixed", passes := optimizerPasses }
+        (fixed, scoreCandidate fnSpec fixed)
+  (
+    winner,
+    {
+      functionName := fnSpec.name
+      inputCost := funcSierraCost fnSpec
+      chosen := winnerScore.label
+      chosenCost := winnerScore.cost
+      candidates := scored.map (·.snd)
+    }
+  )
+
+/-- One function's selection: its input, the winning candidate and the decision for the report. -/
+structure FuncSelection where
+  input : IRFuncSpec
+  winner : PipelineCandidate
+  decision : FuncOptimizationDecision
+
+def FuncSelection.output (selection : FuncSelection) : IRFuncSpec :=
+  selection.winner.pass.applyFuncSpec selection.input
+
+def selectFunc (fnSpec : IRFuncSpec) : FuncSelection :=
+  let chosen := selectFuncCandidate fnSpec
+  { input := fnSpec, winner := chosen.fst, decision := chosen.snd }
+
+def selectIRFuncSpec (fnSpec : IRFuncSpec) : IRFuncSpec :=
+  (selectFunc fnSpec).output
+
+def selectIRContract (spec : IRContractSpec) : IRContractSpec :=
+  { spec with functions := spec.functions.map selectIRFuncSpec }
+
+/-- The selected contract and every function's selection, running selection once per function. -/
+def selectIRContractWithSelections (spec : IRContractSpec) : IRContractSpec × List FuncSelection :=
+  let selections := spec.functions.map selectFunc
+  ({ spec with functions := selections.map FuncSelection.output }, selections)
+
+def selectIRContractDecisions (spec : IRContractSpec) : List FuncOptimizationDecision :=
+  (selectIRContractWithSelections spec).snd.map (·.decision)
+
+theorem FuncSelection.outputSound (entryCtx : EvalContext) (selection : FuncSelection) :
+    evalFuncSigma entryCtx selection.output = evalFuncSigma entryCtx selection.input :=
+  selection.winner.pass.applyFuncSpecSigmaSound entryCtx selection.input
+
+theorem selectIRFuncSpecSound (entryCtx : EvalContext) (fnSpec : IRFuncSpec) :
+    evalFuncSigma entryCtx (selectIRFuncSpec fnSpec) = evalFuncSigma entryCtx fnSpec := by
+  exact (selectFunc fnSpec).outputSound entryCtx
+
+theorem selectIRContractSound (entryCtx : EvalContext) (spec : IRContractSpec) :
+    (selectIRContract spec).functions.map (evalFuncSigma entryCtx) =
+      spec.functions.map (evalFuncSigma entryCtx) := by
+  cases spec with
+  | mk contractName storage functions =>
+      simp [selectIRContract, selectIRFuncSpecSound]
+
+theorem selectIRContractWithSelectionsFst (spec : IRContractSpec) :
+    (selectIRContractWithSelections spec).fst = selectIRContract spec := by
+  simp [selectIRContractWithSelections, selectIRContract, selectIRFuncSpec, List.map_map, Function.comp_def]
+
+end LeanCairo.Compiler.Optimize
@@ -0,0 +1,319 @@
+import LeanCairo.Compiler.Optimize.ConstProp
+import LeanCairo.Compiler.Proof.GVNSound
+import LeanCairo.Compiler.Semantics.Eval
+
+namespace LeanCairo.Compiler.Proof
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
+open LeanCairo.Compiler.Semantics
+open LeanCairo.Core.Domain
+
+/-- Every literal recorded for a name is the value that name currently holds. -/
+def ConstEnvSound (env : ConstEnv) (ctx : EvalContext) : Prop :=
+  ∀ name value readTy (lit : IRExpr readTy), env name = some value -> value.exprAt readTy = some lit ->
+    EvalContext.readVar ctx readTy name = evalExpr ctx lit
+
+private theorem exprAt_ty (value : ConstVal) (readTy : Ty) (lit : IRExpr readTy)
+    (hAt : value.exprAt readTy = some lit) :
+    readTy = value.ty := by
+  cases value <;> cases readTy <;> simp [ConstVal.exprAt, ConstVal.ty] at hAt ⊢
+
+private theorem evalExprAt (value : ConstVal) (readTy : Ty) (lit : IRExpr readTy)
+    (hAt : value.exprAt readTy = some lit) (ctx ctx' : EvalContext) :
+    evalExpr ctx lit = evalExpr ctx' lit := by
+  cases value <;> cases readTy <;> simp [ConstVal.exprAt] at hAt <;> subst hAt <;> rfl
+
+private theorem constOf?_exprAt (expr : IRExpr ty) (value : ConstVal) (hConst : constOf? expr = some value) :
+    value.exprAt ty = some expr := by
+  cases expr <;> simp [constOf?] at hConst <;> subst hConst <;> rfl
+
+theorem constEnvSound_empty (ctx : EvalContext) : ConstEnvSound ConstEnv.empty ctx := by
+  intro name value readTy lit hName
+  simp [ConstEnv.empty] at hName
+
+private theorem constEnvSound_set (env : ConstEnv) (ctx : EvalContext) (name : String)
+    (bound : IRExpr boundTy) (hEnv : ConstEnvSound env ctx) :
+    ConstEnvSound (env.set name (constOf? bound))
+      (EvalContext.bindVar ctx boundTy name (evalExpr ctx bound)) := by
+  intro other value readTy lit hOther hAt
+  by_cases hName : other = name
+  · rw [hName] at hOther ⊢
+    simp [ConstEnv.set] at hOther
+    have hBound := constOf?_exprAt bound value hOther
+    have hTy : readTy = boundTy :=
+      (exprAt_ty value readTy lit hAt).trans (exprAt_ty value boundTy bound hBound).symm
+    subst hTy
+    rw [hAt] at hBound
+    cases hBound
+    rw [EvalContext.readVar_bindVar_same]
+    exact evalExprAt value readTy _ hAt _ _
+  · have hOther' : env other = some value := by
+      simpa [ConstEnv.set, hName] using hOther
+    rw [EvalContext.readVar_bindVar_name_non_interference _ _ _ _ _ _ hName,
+      hEnv other value readTy lit hOther' hAt]
+    exact evalExprAt value readTy lit hAt _ _
+
+private theorem evalDoubledU128 (ctx : EvalContext) (count : Nat) (expr : IRExpr .u128) :
+    evalExpr ctx (doubledU128 count expr) = evalExpr ctx expr * 2 ^ count := by
+  induction count with
+  | zero =>
+      simp [doubledU128]
+  | succ count ih =>
+      show evalExpr ctx (doubledU128 count expr) + evalExpr ctx (doubledU128 count expr) = _
+      rw [ih, Nat.pow_succ, Nat.mul_two, Nat.mul_add]
+
+private theorem evalDoubledU256 (ctx : EvalContext) (count : Nat) (expr : IRExpr .u256) :
+    evalExpr ctx (doubledU256 count expr) = evalExpr ctx expr * 2 ^ count := by
+  induction count with
+  | zero =>
+      simp [doubledU256]
+  | succ count ih =>
+      show evalExpr ctx (doubledU256 count expr) + evalExpr ctx (doubledU256 count expr) = _
+      rw [ih, Nat.pow_succ, Nat.mul_two, Nat.mul_add]
+
+private theorem strengthReductionDoublings_pow (factor count : Nat)
+    (hCount : strengthReductionDoublings factor = some count) :
+    factor = 2 ^ count := by
+  unfold strengthReductionDoublings at hCount
+  by_cases hTwo : factor = 2
+  · rw [if_pos hTwo] at hCount
+    cases hCount
+    simp [hTwo]
+  · rw [if_neg hTwo] at hCount
+    by_cases hFour : factor = 4
+    · rw [if_pos hFour] at hCount
+      cases hCount
+      simp [hFour]
+    · rw [if_neg hFour] at hCount
+      cases hCount
+
+private theorem evalReduceMulU128 (ctx : EvalContext) (operand : IRExpr .u128) (factor : Nat)
+    (fallback : IRExpr .u128) (hFallback : evalExpr ctx fallback = evalExpr ctx operand * factor) :
+    evalExpr ctx (reduceMulU128 operand factor fallback) = evalExpr ctx fallback := by
+  unfold reduceMulU128
+  split
+  · rename_i count hCount
+    split
+    · rw [evalDoubledU128, hFallback, strengthReductionDoublings_pow factor count hCount]
+    · rfl
+  · rfl
+
+private theorem evalReduceMulU256 (ctx : EvalContext) (operand : IRExpr .u256) (factor : Nat)
+    (fallback : IRExpr .u256) (hFallback : evalExpr ctx fallback = evalExpr ctx operand * factor) :
+    evalExpr ctx (reduceMulU256 operand factor fallback) = evalExpr ctx fallback := by
+  unfold reduceMulU256
+  split
+  · rename_i count hCount
+    split
+    · rw [evalDoubledU256, hFallback, strengthReductionDoublings_pow factor count hCount]
+    · rfl
+  · rfl
+
+private theorem evalPropagateAddFelt252 (ctx : EvalContext) (lhs rhs : IRExpr .felt252) :
+    evalExpr ctx (propagateAddFelt252 lhs rhs) = evalExpr ctx (.addFelt252 lhs rhs) := by
+  unfold propagateAddFelt252
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateSubFelt252 (ctx : EvalContext) (lhs rhs : IRExpr .felt252) :
+    evalExpr ctx (propagateSubFelt252 lhs rhs) = evalExpr ctx (.subFelt252 lhs rhs) := by
+  unfold propagateSubFelt252
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateMulFelt252 (ctx : EvalContext) (lhs rhs : IRExpr .felt252) :
+    evalExpr ctx (propagateMulFelt252 lhs rhs) = evalExpr ctx (.mulFelt252 lhs rhs) := by
+  unfold propagateMulFelt252
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateAddU128 (ctx : EvalContext) (lhs rhs : IRExpr .u128) :
+    evalExpr ctx (propagateAddU128 lhs rhs) = evalExpr ctx (.addU128 lhs rhs) := by
+  unfold propagateAddU128
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateSubU128 (ctx : EvalContext) (lhs rhs : IRExpr .u128) :
+    evalExpr ctx (propagateSubU128 lhs rhs) = evalExpr ctx (.subU128 lhs rhs) := by
+  unfold propagateSubU128
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateMulU128 (ctx : EvalContext) (lhs rhs : IRExpr .u128) :
+    evalExpr ctx (propagateMulU128 lhs rhs) = evalExpr ctx (.mulU128 lhs rhs) := by
+  unfold propagateMulU128
+  split
+  · split <;> simp [evalExpr]
+  · exact evalReduceMulU128 ctx _ _ _ (by simp [evalExpr])
+  · exact evalReduceMulU128 ctx _ _ _ (by simp [evalExpr, Nat.mul_comm])
+  · rfl
+
+private theorem evalPropagateAddU256 (ctx : EvalContext) (lhs rhs : IRExpr .u256) :
+    evalExpr ctx (propagateAddU256 lhs rhs) = evalExpr ctx (.addU256 lhs rhs) := by
+  unfold propagateAddU256
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateSubU256 (ctx : EvalContext) (lhs rhs : IRExpr .u256) :
+    evalExpr ctx (propagateSubU256 lhs rhs) = evalExpr ctx (.subU256 lhs rhs) := by
+  unfold propagateSubU256
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateMulU256 (ctx : EvalContext) (lhs rhs : IRExpr .u256) :
+    evalExpr ctx (propagateMulU256 lhs rhs) = evalExpr ctx (.mulU256 lhs rhs) := by
+  unfold propagateMulU256
+  split
+  · split <;> simp [evalExpr]
+  · exact evalReduceMulU256 ctx _ _ _ (by simp [evalExpr])
+  · exact evalReduceMulU256 ctx _ _ _ (by simp [evalExpr, Nat.mul_comm])
+  · rfl
+
+private theorem evalPropagateLtU128 (ctx : EvalContext) (lhs rhs : IRExpr .u128) :
+    evalExpr ctx (propagateLtU128 lhs rhs) = evalExpr ctx (.ltU128 lhs rhs) := by
+  unfold propagateLtU128
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateLeU128 (ctx : EvalContext) (lhs rhs : IRExpr .u128) :
+    evalExpr ctx (propagateLeU128 lhs rhs) = evalExpr ctx (.leU128 lhs rhs) := by
+  unfold propagateLeU128
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateLtU256 (ctx : EvalContext) (lhs rhs : IRExpr .u256) :
+    evalExpr ctx (propagateLtU256 lhs rhs) = evalExpr ctx (.ltU256 lhs rhs) := by
+  unfold propagateLtU256
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateLeU256 (ctx : EvalContext) (lhs rhs : IRExpr .u256) :
+    evalExpr ctx (propagateLeU256 lhs rhs) = evalExpr ctx (.leU256 lhs rhs) := by
+  unfold propagateLeU256
+  split
+  · split <;> simp [evalExpr]
+  · rfl
+
+private theorem evalPropagateIte (ctx : EvalContext) (cond : IRExpr .bool) (thenBranch elseBranch : IRExpr ty) :
+    evalExpr ctx (propagateIte cond thenBranch elseBranch) = evalExpr ctx (.ite cond thenBranch elseBranch) := by
+  cases cond with
+  | litBool value =>
+      cases value <;> simp [propagateIte, evalExpr]
+  | _ =>
+      rfl
+
+private theorem evalDropDeadLet (ctx : EvalContext) (name : String) (bound : IRExpr boundTy)
+    (body : IRExpr ty) :
+    evalExpr ctx (dropDeadLet name boundTy bound body) = evalExpr ctx (.letE name boundTy bound body) := by
+  unfold dropDeadLet
+  by_cases hKeep : name ∈ exprNames body ∨ cannotPanic bound = false
+  · rw [if_pos hKeep]
+  · rw [if_neg hKeep]
+    have hUsed : name ∉ exprNames body := fun hMem => hKeep (Or.inl hMem)
+    simp only [evalExpr]
+    rw [evalExprBindFresh ctx body boundTy name _ hUsed]
+
+theorem propagateExprSound (env : ConstEnv) (ctx : EvalContext) (expr : IRExpr ty)
+    (hEnv : ConstEnvSound env ctx) :
+    evalExpr ctx (propagateExpr env expr) = evalExpr ctx expr := by
+  induction expr generalizing env ctx with
+  | @var varTy name =>
+      simp only [propagateExpr]
+      split
+      · rename_i value hName
+        split
+        · rename_i lit hAt
+          simpa [evalExpr] using (hEnv name value varTy lit hName hAt).symm
+        · rfl
+      · rfl
+  | storageRead name =>
+      simp [propagateExpr]
+  | litU128 value =>
+      simp [propagateExpr]
+  | litU256 value =>
+      simp [propagateExpr]
+  | litBool value =>
+      simp [propagateExpr]
+  | litFelt252 value =>
+      simp [propagateExpr]
+  | addFelt252 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateAddFelt252]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | subFelt252 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateSubFelt252]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | mulFelt252 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateMulFelt252]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | addU128 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateAddU128]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | subU128 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateSubU128]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | mulU128 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateMulU128]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | addU256 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateAddU256]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | subU256 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateSubU256]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | mulU256 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateMulU256]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | @eq _ lhs rhs ihLhs ihRhs =>
+      simp [propagateExpr, evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | ltU128 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateLtU128]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | leU128 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateLeU128]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | ltU256 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateLtU256]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | leU256 lhs rhs ihLhs ihRhs =>
+      simp only [propagateExpr]
+      rw [evalPropagateLeU256]
+      simp only [evalExpr, ihLhs env ctx hEnv, ihRhs env ctx hEnv]
+  | ite cond thenBranch elseBranch ihCond ihThen ihElse =>
+      simp only [propagateExpr]
+      rw [evalPropagateIte]
+      simp only [evalExpr, ihCond env ctx hEnv, ihThen env ctx hEnv, ihElse env ctx hEnv]
+  | letE name boundTy bound body ihBound ihBody =>
+      simp only [propagateExpr]
+      rw [evalDropDeadLet]
+      simp only [evalExpr]
+      rw [ihBody _ _ (constEnvSound_set env ctx name (propagateExpr env bound) hEnv),
+        ihBound env ctx hEnv]
+
+theorem constPropExprSound (ctx : EvalContext) (expr : IRExpr ty) :
+    evalExpr ctx (constPropExpr expr) = evalExpr ctx expr :=
+  propagateExprSound ConstEnv.empty ctx expr (constEnvSound_empty ctx)
+
+end LeanCairo.Compiler.Proof
@@ -0,0 +1,354 @@
+import LeanCairo.Compiler.Optimize.GVN
+import LeanCairo.Compiler.Semantics.Eval
+
+namespace LeanCairo.Compiler.Proof
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
+open LeanCairo.Compiler.Semantics
+open LeanCairo.Core.Domain
+
+/-- Evaluation only observes the variables named in the expression and storage. -/
+theorem evalExprAgree (expr : IRExpr ty) (ctx ctx' : EvalContext)
+    (hVars : ∀ readTy name, name ∈ exprNames expr ->
+      EvalContext.readVar ctx readTy name = EvalContext.readVar ctx' readTy name)
+    (hStorage : ∀ readTy name,
+      EvalContext.readStorage ctx readTy name = EvalContext.readStorage ctx' readTy name) :
+    evalExpr ctx expr = evalExpr ctx' expr := by
+  induction expr generalizing ctx ctx' with
+  | @var varTy name =>
+      simpa [evalExpr] using hVars varTy name (by simp [exprNames])
+  | @storageRead storageTy name =>
+      simpa [evalExpr] using hStorage storageTy name
+  | litU128 value =>
+      simp [evalExpr]
+  | litU256 value =>
+      simp [evalExpr]
+  | litBool value =>
+      simp [evalExpr]
+  | litFelt252 value =>
+      simp [evalExpr]
+  | addFelt252 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | subFelt252 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | mulFelt252 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | addU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | subU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | mulU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | addU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | subU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | mulU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | eq lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | ltU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | leU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | ltU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | leU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExpr,
+        ihLhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihRhs ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | ite cond thenBranch elseBranch ihCond ihThen ihElse =>
+      simp [evalExpr,
+        ihCond ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihThen ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage,
+        ihElse ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage]
+  | letE binder boundTy bound body ihBound ihBody =>
+      have hBound :=
+        ihBound ctx ctx' (fun readTy name h => hVars readTy name (by simp [exprNames, h])) hStorage
+      simp only [evalExpr, hBound]
+      apply ihBody
+      · intro readTy name h
+        by_cases hName : name = binder
+        · rw [hName]
+          by_cases hTy : readTy = boundTy
+          · subst hTy
+            simp [EvalContext.readVar_bindVar_same]
+          · rw [EvalContext.readVar_bindVar_type_non_interference _ _ _ _ _ _ hTy,
+              EvalContext.readVar_bindVar_type_non_interference _ _ _ _ _ _ hTy]
+            exact hVars readTy binder (by simp [exprNames])
+        · rw [EvalContext.readVar_bindVar_name_non_interference _ _ _ _ _ _ hName,
+            EvalContext.readVar_bindVar_name_non_interference _ _ _ _ _ _ hName]
+          exact hVars readTy name (by simp [exprNames, h])
+      · intro readTy name
+        rw [EvalContext.readStorage_bindVar, EvalContext.readStorage_bindVar]
+        exact hStorage readTy name
+
+/-- Binding `name` to a value leaves `expr` unchanged when `name` does not occur in it. -/
+theorem evalExprBindFresh (ctx : EvalContext) (expr : IRExpr ty) (boundTy : Ty) (name : String)
+    (value : Ty.denote boundTy) (hFresh : name ∉ exprNames expr) :
+    evalExpr (EvalContext.bindVar ctx boundTy name value) expr = evalExpr ctx expr := by
+  apply evalExprAgree
+  · intro readTy readName h
+    apply EvalContext.readVar_bindVar_name_non_interference
+    intro hEq
+    subst hEq
+    exact hFresh h
+  · intro readTy readName
+    exact EvalContext.readStorage_bindVar ctx boundTy readTy name readName value
+
+private theorem evalReplaceIf (target : IRExpr targetTy) (name : String) (original rebuilt : IRExpr ty)
+    (ctx : EvalContext)
+    (hInv : EvalContext.readVar ctx targetTy name = evalExpr ctx target)
+    (hRebuilt : evalExpr ctx rebuilt = evalExpr ctx original) :
+    evalExpr ctx (replaceIf ⟨targetTy, target⟩ name original rebuilt) = evalExpr ctx original := by
+  unfold replaceIf
+  by_cases h : (⟨ty, original⟩ : ExprKey) = ⟨targetTy, target⟩
+  · rw [if_pos h]
+    obtain ⟨rfl, hExpr⟩ := Sigma.mk.inj h
+    cases eq_of_heq hExpr
+    simpa [evalExpr] using hInv
+  · rw [if_neg h]
+    exact hRebuilt
+
+/-- While `name` holds the value of `target` and no binder in `expr` shadows `name` or a
+variable of `target`, abstracting `target` to `name` preserves evaluation. -/
+theorem evalAbstractExpr (target : IRExpr targetTy) (name : String) (expr : IRExpr ty) (ctx : EvalContext)
+    (hBinders : ∀ binder ∈ exprBinders expr, binder ≠ name ∧ binder ∉ exprNames target)
+    (hInv : EvalContext.readVar ctx targetTy name = evalExpr ctx target) :
+    evalExpr ctx (abstractExpr ⟨targetTy, target⟩ name expr) = evalExpr ctx expr := by
+  induction expr generalizing ctx with
+  | var varName =>
+      simp only [abstractExpr]
+      exact evalReplaceIf target name _ _ ctx hInv rfl
+  | storageRead field =>
+      simp only [abstractExpr]
+      exact evalReplaceIf target name _ _ ctx hInv rfl
+  | litU128 value =>
+      simp only [abstractExpr]
+      exact evalReplaceIf target name _ _ ctx hInv rfl
+  | litU256 value =>
+      simp only [abstractExpr]
+      exact evalReplaceIf target name _ _ ctx hInv rfl
+  | litBool value =>
+      simp only [abstractExpr]
+      exact evalReplaceIf target name _ _ ctx hInv rfl
+  | litFelt252 value =>
+      simp only [abstractExpr]
+      exact evalReplaceIf target name _ _ ctx hInv rfl
+  | addFelt252 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | subFelt252 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | mulFelt252 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | addU128 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | subU128 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | mulU128 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | addU256 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | subU256 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | mulU256 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | eq lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | ltU128 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | leU128 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | ltU256 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | leU256 lhs rhs ihLhs ihRhs =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihLhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihRhs ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | ite cond thenBranch elseBranch ihCond ihThen ihElse =>
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp [evalExpr,
+        ihCond ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihThen ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv,
+        ihElse ctx (fun binder h => hBinders binder (by simp [exprBinders, h])) hInv]
+  | letE binder boundTy bound body ihBound ihBody =>
+      have hHere := hBinders binder (by simp [exprBinders])
+      have hBound := ihBound ctx (fun other h => hBinders other (by simp [exprBinders, h])) hInv
+      have hInvBody :
+          EvalContext.readVar (EvalContext.bindVar ctx boundTy binder (evalExpr ctx bound)) targetTy name =
+            evalExpr (EvalContext.bindVar ctx boundTy binder (evalExpr ctx bound)) target := by
+        rw [EvalContext.readVar_bindVar_name_non_interference _ _ _ _ _ _ (Ne.symm hHere.1), hInv,
+          evalExprBindFresh ctx target boundTy binder _ hHere.2]
+      simp only [abstractExpr]
+      apply evalReplaceIf target name _ _ ctx hInv
+      simp only [evalExpr, hBound]
+      exact ihBody _ (fun other h => hBinders other (by simp [exprBinders, h])) hInvBody
+
+theorem hoistExprSound (ctx : EvalContext) (name : String) (bound : IRExpr boundTy) (body : IRExpr ty) :
+    evalExpr ctx (hoistExpr name bound body) = evalExpr ctx body := by
+  unfold hoistExpr
+  by_cases hLegal : HoistLegal name bound body
+  · rw [if_pos hLegal]
+    obtain ⟨hBody, hBound, hBinders⟩ := hLegal
+    have hInv :
+        EvalContext.readVar (EvalContext.bindVar ctx boundTy name (evalExpr ctx bound)) boundTy name =
+          evalExpr (EvalContext.bindVar ctx boundTy name (evalExpr ctx bound)) bound := by
+      rw [EvalContext.readVar_bindVar_same, evalExprBindFresh ctx bound boundTy name _ hBound]
+    simp only [evalExpr]
+    rw [evalAbstractExpr bound name body _ hBinders hInv, evalExprBindFresh ctx body boundTy name _ hBody]
+  · rw [if_neg hLegal]
+
+private theorem evalHoistShared (ctx : EvalContext) (expr : IRExpr ty) (entry : ValueEntry) :
+    evalExpr ctx (hoistShared expr entry) = evalExpr ctx expr := by
+  unfold hoistShared
+  split
+  · exact hoistExprSound ctx _ entry.key.2 expr
+  · rfl
+
+theorem gvnScopeSound (ctx : EvalContext) (expr : IRExpr ty) :
+    evalExpr ctx (gvnScope expr) = evalExpr ctx expr := by
+  unfold gvnScope
+  generalize sharedValues expr = entries
+  induction entries generalizing expr with
+  | nil =>
+      rfl
+  | cons entry rest ih =>
+      rw [List.foldl_cons, ih]
+      exact evalHoistShared ctx expr entry
+
+theorem gvnNestedSound (ctx : EvalContext) (expr : IRExpr ty) :
+    evalExpr ctx (gvnNested expr) = evalExpr ctx expr := by
+  induction expr generalizing ctx with
+  | var name =>
+      simp [gvnNested, evalExpr]
+  | storageRead name =>
+      simp [gvnNested, evalExpr]
+  | litU128 value =>
+      simp [gvnNested, evalExpr]
+  | litU256 value =>
+      simp [gvnNested, evalExpr]
+  | litBool value =>
+      simp [gvnNested, evalExpr]
+  | litFelt252 value =>
+      simp [gvnNested, evalExpr]
+  | addFelt252 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | subFelt252 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | mulFelt252 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | addU128 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | subU128 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | mulU128 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | addU256 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | subU256 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | mulU256 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | eq lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | ltU128 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | leU128 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | ltU256 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | leU256 lhs rhs ihLhs ihRhs =>
+      simp [gvnNested, evalExpr, ihLhs ctx, ihRhs ctx]
+  | ite cond thenBranch elseBranch ihCond ihThen ihElse =>
+      simp [gvnNested, evalExpr, gvnScopeSound, ihCond ctx, ihThen ctx, ihElse ctx]
+  | letE name boundTy bound body ihBound ihBody =>
+      simp [gvnNested, evalExpr, gvnScopeSound, ihBound ctx]
+      exact ihBody (EvalContext.bindVar ctx boundTy name (evalExpr ctx bound))
+
+theorem gvnExprSound (ctx : EvalContext) (expr : IRExpr ty) :
+    evalExpr ctx (gvnExpr expr) = evalExpr ctx expr := by
+  simp [gvnExpr, gvnScopeSound, gvnNestedSound]
+
+end LeanCairo.Compiler.Proof
@@ -0,0 +1,350 @@
+import LeanCairo.Compiler.Optimize.Interval
+import LeanCairo.Compiler.Semantics.Eval
+
+namespace LeanCairo.Compiler.Proof
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
+open LeanCairo.Compiler.Semantics
+open LeanCairo.Core.Domain
+
+/-- Values of u128 expressions lie in their analyzed range; other types carry no obligation. -/
+def RangeHolds : (ty : Ty) -> Ty.denote ty -> NatInterval -> Prop
+  | .u128, value, range => range.Contains value ∧ value < u128Modulus
+  | _, _, _ => True
+
+/-- Every tracked range contains the strict (normalized) value of its u128 variable. -/
+def EnvSound (ctx : EvalContext) (env : RangeEnv) : Prop :=
+  ∀ name range, env name = some range ->
+    range.Contains (IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name))
+
+private theorem u128ModulusPos : 0 < u128Modulus := by
+  unfold u128Modulus IntegerDomains.pow2
+  decide
+
+private theorem normalizeLt (value : Nat) : IntegerDomains.normalizeUnsigned 128 value < u128Modulus := by
+  unfold IntegerDomains.normalizeUnsigned
+  exact Nat.mod_lt _ u128ModulusPos
+
+private theorem topContains {value : Nat} (hLt : value < u128Modulus) :
+    NatInterval.u128Top.Contains value := by
+  show 0 ≤ value ∧ value ≤ u128Modulus - 1
+  exact And.intro (Nat.zero_le _) (by omega)
+
+private theorem lookupContains {ctx : EvalContext} {env : RangeEnv} (hEnv : EnvSound ctx env) (name : String) :
+    (env.lookup name).Contains (IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name)) := by
+  unfold RangeEnv.lookup
+  cases hName : env name with
+  | none => exact topContains (normalizeLt _)
+  | some range => exact hEnv name range hName
+
+private theorem exceptBindOk {α β ε : Type} {m : Except ε α} {f : α -> Except ε β} {value : β}
+    (h : (m >>= f) = .ok value) : ∃ a, m = .ok a ∧ f a = .ok value := by
+  cases m with
+  | error err => cases h
+  | ok a => exact ⟨a, rfl, h⟩
+
+private theorem joinHoldsLeft {ty : Ty} {value : Ty.denote ty} {lhs rhs : NatInterval}
+    (h : RangeHolds ty value lhs) : RangeHolds ty value (lhs.join rhs) := by
+  cases ty with
+  | u128 =>
+      obtain ⟨⟨hLo, hHi⟩, hLt⟩ := h
+      exact And.intro
+        (And.intro (Nat.le_trans (Nat.min_le_left _ _) hLo) (Nat.le_trans hHi (Nat.le_max_left _ _))) hLt
+  | _ => exact True.intro
+
+private theorem joinHoldsRight {ty : Ty} {value : Ty.denote ty} {lhs rhs : NatInterval}
+    (h : RangeHolds ty value rhs) : RangeHolds ty value (lhs.join rhs) := by
+  cases ty with
+  | u128 =>
+      obtain ⟨⟨hLo, hHi⟩, hLt⟩ := h
+      exact And.intro
+        (And.intro (Nat.le_trans (Nat.min_le_right _ _) hLo) (Nat.le_trans hHi (Nat.le_max_right _ _))) hLt
+  | _ => exact True.intro
+
+private theorem addWrappingSound {x y : Nat} {lhs rhs : NatInterval}
+    (hx : RangeHolds .u128 x lhs) (hy : RangeHolds .u128 y rhs) :
+    RangeHolds .u128 (IntegerDomains.unsignedAdd 128 x y) (lhs.addWrapping rhs) := by
+  obtain ⟨⟨hxLo, hxHi⟩, _⟩ := hx
+  obtain ⟨⟨hyLo, hyHi⟩, _⟩ := hy
+  unfold NatInterval.addWrapping
+  by_cases hFit : lhs.hi + rhs.hi < u128Modulus
+  · have hSum : x + y < u128Modulus := by omega
+    have hExact : IntegerDomains.unsignedAdd 128 x y = x + y := Nat.mod_eq_of_lt hSum
+    rw [if_pos hFit, hExact]
+    exact And.intro (And.intro (Nat.add_le_add hxLo hyLo) (Nat.add_le_add hxHi hyHi)) hSum
+  · rw [if_neg hFit]
+    exact And.intro (topContains (normalizeLt _)) (normalizeLt _)
+
+private theorem subWrappingSound {x y : Nat} {lhs rhs : NatInterval}
+    (hx : RangeHolds .u128 x lhs) (hy : RangeHolds .u128 y rhs) :
+    RangeHolds .u128 (IntegerDomains.unsignedSub 128 x y) (lhs.subWrapping rhs) := by
+  obtain ⟨⟨hxLo, hxHi⟩, hxLt⟩ := hx
+  obtain ⟨⟨hyLo, hyHi⟩, hyLt⟩ := hy
+  have hWrapped : IntegerDomains.unsignedSub 128 x y = (x + (u128Modulus - y % u128Modulus)) % u128Modulus := rfl
+  unfold NatInterval.subWrapping
+  by_cases hFit : rhs.hi ≤ lhs.lo
+  · have hExact : IntegerDomains.unsignedSub 128 x y = x - y := by
+      have hyMod : y % u128Modulus = y := Nat.mod_eq_of_lt hyLt
+      have hSplit : x + (u128Modulus - y) = (x - y) + u128Modulus := by omega
+      rw [hWrapped, hyMod, hSplit, Nat.add_mod_right]
+      exact Nat.mod_eq_of_lt (by omega)
+    rw [if_pos hFit, hExact]
+    refine And.intro (And.intro ?_ ?_) ?_
+    · show lhs.lo - rhs.hi ≤ x - y
+      omega
+    · show x - y ≤ lhs.hi - rhs.lo
+      omega
+    · show x - y < u128Modulus
+      omega
+  · rw [if_neg hFit]
+    have hLt : IntegerDomains.unsignedSub 128 x y < u128Modulus := by
+      rw [hWrapped]
+      exact Nat.mod_lt _ u128ModulusPos
+    exact And.intro (topContains hLt) hLt
+
+private theorem mulWrappingSound {x y : Nat} {lhs rhs : NatInterval}
+    (hx : RangeHolds .u128 x lhs) (hy : RangeHolds .u128 y rhs) :
+    RangeHolds .u128 (IntegerDomains.unsignedMul 128 x y) (lhs.mulWrapping rhs) := by
+  obtain ⟨⟨hxLo, hxHi⟩, _⟩ := hx
+  obtain ⟨⟨hyLo, hyHi⟩, _⟩ := hy
+  unfold NatInterval.mulWrapping
+  by_cases hFit : lhs.hi * rhs.hi < u128Modulus
+  · have hProduct : x * y < u128Modulus := Nat.lt_of_le_of_lt (Nat.mul_le_mul hxHi hyHi) hFit
+    have hExact : IntegerDomains.unsignedMul 128 x y = x * y := Nat.mod_eq_of_lt hProduct
+    rw [if_pos hFit, hExact]
+    exact And.intro (And.intro (Nat.mul_le_mul hxLo hyLo) (Nat.mul_le_mul hxHi hyHi)) hProduct
+  · rw [if_neg hFit]
+    exact And.intro (topContains (normalizeLt _)) (normalizeLt _)
+
+private theorem narrowSound {ctx : EvalContext} {env : RangeEnv} {name : String}
+    {f : NatInterval -> NatInterval} (hEnv : EnvSound ctx env)
+    (hStep : ∀ range, range.Contains (IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name)) ->
+      (f range).Contains (IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name))) :
+    EnvSound ctx (env.narrow name f) := by
+  unfold EnvSound
+  intro n range hRange
+  by_cases hName : n = name
+  · subst hName
+    simp [RangeEnv.narrow, RangeEnv.set] at hRange
+    subst hRange
+    exact hStep _ (lookupContains hEnv n)
+  · simp only [RangeEnv.narrow, RangeEnv.set, if_neg hName] at hRange
+    exact hEnv n range hRange
+
+private theorem varNameSome {expr : IRExpr .u128} {name : String}
+    (h : varName? expr = some name) : expr = .var name := by
+  cases expr <;> simp [varName?] at h
+  subst h
+  rfl
+
+private theorem litU128Some {expr : IRExpr .u128} {bound : Nat}
+    (h : litU128? expr = some bound) :
+    ∃ value, expr = .litU128 value ∧ bound = IntegerDomains.normalizeUnsigned 128 value := by
+  cases expr <;> simp [litU128?] at h
+  exact ⟨_, rfl, h.symm⟩
+
+private theorem refineLtSound {ctx : EvalContext} {env : RangeEnv} {lhs rhs : IRExpr .u128} {outcome : Bool}
+    (hEnv : EnvSound ctx env) (hCond : evalExprStrict ctx (.ltU128 lhs rhs) = .ok outcome) :
+    EnvSound ctx (refineLt env lhs rhs outcome) := by
+  unfold refineLt
+  cases hName : varName? lhs with
+  | none => exact hEnv
+  | some name =>
+      cases hBound : litU128? rhs with
+      | none => exact hEnv
+      | some bound =>
+          have hLhs := varNameSome hName
+          obtain ⟨value, hRhs, hBoundEq⟩ := litU128Some hBound
+          subst hLhs
+          subst hRhs
+          subst hBoundEq
+          have hEval : evalExprStrict ctx (IRExpr.ltU128 (IRExpr.var name) (IRExpr.litU128 value)) =
+              .ok (decide (IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name) <
+                IntegerDomains.normalizeUnsigned 128 value)) := rfl
+          have hOutcome := hEval.symm.trans hCond
+          cases hOutcome
+          by_cases hLt : IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name) <
+              IntegerDomains.normalizeUnsigned 128 value
+          · rw [if_pos (decide_eq_true hLt)]
+            refine narrowSound hEnv (fun range hRange => And.intro hRange.1 ?_)
+            exact Nat.le_min.mpr (And.intro hRange.2 (by omega))
+          · rw [if_neg (fun hTrue => hLt (of_decide_eq_true hTrue))]
+            refine narrowSound hEnv (fun range hRange => And.intro ?_ hRange.2)
+            exact Nat.max_le.mpr (And.intro hRange.1 (by omega))
+
+private theorem refineLeSound {ctx : EvalContext} {env : RangeEnv} {lhs rhs : IRExpr .u128} {outcome : Bool}
+    (hEnv : EnvSound ctx env) (hCond : evalExprStrict ctx (.leU128 lhs rhs) = .ok outcome) :
+    EnvSound ctx (refineLe env lhs rhs outcome) := by
+  unfold refineLe
+  cases hName : varName? lhs with
+  | none => exact hEnv
+  | some name =>
+      cases hBound : litU128? rhs with
+      | none => exact hEnv
+      | some bound =>
+          have hLhs := varNameSome hName
+          obtain ⟨value, hRhs, hBoundEq⟩ := litU128Some hBound
+          subst hLhs
+          subst hRhs
+          subst hBoundEq
+          have hEval : evalExprStrict ctx (IRExpr.leU128 (IRExpr.var name) (IRExpr.litU128 value)) =
+              .ok (decide (IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name) ≤
+                IntegerDomains.normalizeUnsigned 128 value)) := rfl
+          have hOutcome := hEval.symm.trans hCond
+          cases hOutcome
+          by_cases hLe : IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name) ≤
+              IntegerDomains.normalizeUnsigned 128 value
+          · rw [if_pos (decide_eq_true hLe)]
+            refine narrowSound hEnv (fun range hRange => And.intro hRange.1 ?_)
+            exact Nat.le_min.mpr (And.intro hRange.2 hLe)
+          · rw [if_neg (fun hTrue => hLe (of_decide_eq_true hTrue))]
+            refine narrowSound hEnv (fun range hRange => And.intro ?_ hRange.2)
+            exact Nat.max_le.mpr (And.intro hRange.1 (by omega))
+
+theorem refineGuardSound {ctx : EvalContext} {env : RangeEnv} {cond : IRExpr .bool} {outcome : Bool}
+    (hEnv : EnvSound ctx env) (hCond : evalExprStrict ctx cond = .ok outcome) :
+    EnvSound ctx (refineGuard env cond outcome) := by
+  cases cond with
+  | ltU128 lhs rhs => exact refineLtSound hEnv hCond
+  | leU128 lhs rhs => exact refineLeSound hEnv hCond
+  | _ => exact hEnv
+
+private theorem bindVarStrictOk {ctx ctx' : EvalContext} {ty : Ty} {name : String} {value : Ty.denote ty}
+    (h : EvalContext.bindVarStrict ctx ty name value = .ok ctx') :
+    ctx' = EvalContext.bindVar ctx ty name (EvalContext.normalizeRuntimeValue ty value) := by
+  unfold EvalContext.bindVarStrict at h
+  split at h
+  · cases h
+    rfl
+  · cases h
+
+private theorem bindVarU128VarsNe {ctx : EvalContext} {ty : Ty} {name n : String} {value : Ty.denote ty}
+    (hName : n ≠ name) : (EvalContext.bindVar ctx ty name value).u128Vars n = ctx.u128Vars n := by
+  cases ty <;> simp [EvalContext.bindVar, hName]
+
+private theorem bindSound {ctx ctx' : EvalContext} {env : RangeEnv} {boundTy : Ty} {name : String}
+    {boundValue : Ty.denote boundTy} {range : NatInterval}
+    (hEnv : EnvSound ctx env) (hRange : RangeHolds boundTy boundValue range)
+    (hBind : EvalContext.bindVarStrict ctx boundTy name boundValue = .ok ctx') :
+    EnvSound ctx' (env.bind boundTy name range) := by
+  have hCtx := bindVarStrictOk hBind
+  subst hCtx
+  unfold EnvSound
+  intro n bound hBound
+  by_cases hName : n = name
+  · subst hName
+    cases boundTy with
+    | u128 =>
+        simp [RangeEnv.bind, RangeEnv.set, RangeEnv.boundRange] at hBound
+        subst hBound
+        obtain ⟨hContains, hLt⟩ := hRange
+        have hNorm : IntegerDomains.normalizeUnsigned 128 boundValue = boundValue := Nat.mod_eq_of_lt hLt
+        have hRead :
+            (EvalContext.bindVar ctx .u128 n (EvalContext.normalizeRuntimeValue .u128 boundValue)).u128Vars n =
+              IntegerDomains.normalizeUnsigned 128 boundValue := by
+          simp [EvalContext.bindVar, EvalContext.normalizeRuntimeValue]
+        rw [hRead, hNorm, hNorm]
+        exact hContains
+    | _ => simp [RangeEnv.bind, RangeEnv.set, RangeEnv.boundRange] at hBound
+  · simp only [RangeEnv.bind, RangeEnv.set, if_neg hName] at hBound
+    rw [bindVarU128VarsNe hName]
+    exact hEnv n bound hBound
+
+/-- `rangeOf` over-approximates strict evaluation under any sound range environment. -/
+theorem rangeOfSound
+    (ctx : EvalContext)
+    (env : RangeEnv)
+    (expr : IRExpr ty)
+    (value : Ty.denote ty)
+    (hEnv : EnvSound ctx env)
+    (hEval : evalExprStrict ctx expr = .ok value) :
+    RangeHolds ty value (rangeOf env expr) := by
+  induction expr generalizing ctx env value with
+  | @var ty name =>
+      cases ty with
+      | u128 =>
+          have hRead : evalExprStrict ctx (IRExpr.var (ty := .u128) name) =
+              .ok (IntegerDomains.normalizeUnsigned 128 (ctx.u128Vars name)) := rfl
+          have hValue := hRead.symm.trans hEval
+          cases hValue
+          exact And.intro (lookupContains hEnv name) (normalizeLt _)
+      | _ => exact True.intro
+  | @storageRead ty name =>
+      cases ty with
+      | u128 =>
+          have hRead : evalExprStrict ctx (IRExpr.storageRead (ty := .u128) name) =
+              .ok (IntegerDomains.normalizeUnsigned 128 (ctx.u128Storage name)) := rfl
+          have hValue := hRead.symm.trans hEval
+          cases hValue
+          exact And.intro (topContains (normalizeLt _)) (normalizeLt _)
+      | _ => exact True.intro
+  | litU128 literal =>
+      have hValue : Except.ok (IntegerDomains.normalizeUnsigned 128 literal) = .ok value := hEval
+      cases hValue
+      exact And.intro (And.intro (Nat.le_refl _) (Nat.le_refl _)) (normalizeLt _)
+  | addU128 lhs rhs ihLhs ihRhs =>
+      simp only [evalExprStrict] at hEval
+      obtain ⟨x, hX, hRest⟩ := exceptBindOk hEval
+      obtain ⟨y, hY, hOut⟩ := exceptBindOk hRest
+      have hValue : Except.ok (IntegerDomains.unsignedAdd 128 x y) = .ok value := hOut
+      cases hValue
+      exact addWrappingSound (ihLhs ctx env x hEnv hX) (ihRhs ctx env y hEnv hY)
+  | subU128 lhs rhs ihLhs ihRhs =>
+      simp only [evalExprStrict] at hEval
+      obtain ⟨x, hX, hRest⟩ := exceptBindOk hEval
+      obtain ⟨y, hY, hOut⟩ := exceptBindOk hRest
+      have hValue : Except.ok (IntegerDomains.unsignedSub 128 x y) = .ok value := hOut
+      cases hValue
+      exact subWrappingSound (ihLhs ctx env x hEnv hX) (ihRhs ctx env y hEnv hY)
+  | mulU128 lhs rhs ihLhs ihRhs =>
+      simp only [evalExprStrict] at hEval
+      obtain ⟨x, hX, hRest⟩ := exceptBindOk hEval
+      obtain ⟨y, hY, hOut⟩ := exceptBindOk hRest
+      have hValue : Except.ok (IntegerDomains.unsignedMul 128 x y) = .ok value := hOut
+      cases hValue
+      exact mulWrappingSound (ihLhs ctx env x hEnv hX) (ihRhs ctx env y hEnv hY)
+  | ite cond thenBranch elseBranch _ ihThen ihElse =>
+      simp only [evalExprStrict] at hEval
+      obtain ⟨condition, hCond, hBranch⟩ := exceptBindOk hEval
+      cases condition with
+      | true =>
+          exact joinHoldsLeft (ihThen ctx (refineGuard env cond true) value (refineGuardSound hEnv hCond) hBranch)
+      | false =>
+          exact joinHoldsRight (ihElse ctx (refineGuard env cond false) value (refineGuardSound hEnv hCond) hBranch)
+  | letE name boundTy bound body ihBound ihBody =>
+      simp only [evalExprStrict] at hEval
+      obtain ⟨boundValue, hBound, hRest⟩ := exceptBindOk hEval
+      obtain ⟨ctx', hBind, hBody⟩ := exceptBindOk hRest
+      have hBoundRange := ihBound ctx env boundValue hEnv hBound
+      exact ihBody ctx' (env.bind boundTy name (rangeOf env bound)) value (bindSound hEnv hBoundRange hBind) hBody
+  | _ => exact True.intro
+
+theorem rangeOfEmptySound (ctx : EvalContext) (expr : IRExpr ty) (value : Ty.denote ty)
+    (hEval : evalExprStrict ctx expr = .ok value) :
+    RangeHolds ty value (rangeOf RangeEnv.empty expr) := by
+  refine rangeOfSound ctx RangeEnv.empty expr value ?_ hEval
+  intro _ _ hNone
+  cases hNone
+
+/-- When both operand ranges fit, the u128 product computed exactly in felt252 is the wrapping
+product: it is below the field prime, so `felt252_mul` does not reduce it, and its low limb is the
+strict result. -/
+theorem mulViaFelt252Sound
+    (ctx : EvalContext)
+    (env : RangeEnv)
+    (lhs rhs : IRExpr .u128)
+    (x y : Nat)
+    (hEnv : EnvSound ctx env)
+    (hFits : NatInterval.mulFitsFelt252 (rangeOf env lhs) (rangeOf env rhs) = true)
+    (hLhs : evalExprStrict ctx lhs = .ok x)
+    (hRhs : evalExprStrict ctx rhs = .ok y) :
+    x * y < felt252Prime ∧ evalExprStrict ctx (.mulU128 lhs rhs) = .ok ((x * y) % u128Modulus) := by
+  obtain ⟨⟨_, hxHi⟩, _⟩ := rangeOfSound ctx env lhs x hEnv hLhs
+  obtain ⟨⟨_, hyHi⟩, _⟩ := rangeOfSound ctx env rhs y hEnv hRhs
+  have hFit : (rangeOf env lhs).hi * (rangeOf env rhs).hi < felt252Prime := of_decide_eq_true hFits
+  refine And.intro (Nat.lt_of_le_of_lt (Nat.mul_le_mul hxHi hyHi) hFit) ?_
+  simp only [evalExprStrict, hLhs, hRhs]
+  rfl
+
+end LeanCairo.Compiler.Proof
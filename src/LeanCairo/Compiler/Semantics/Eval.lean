@@ -407,6 +407,26 @@ theorem readStorage_bindStorage_type_non_interference
     readStorage (bindStorage ctx tyWrite nameWrite value) tyRead nameRead = readStorage ctx tyRead nameRead := by
   cases tyWrite <;> cases tyRead <;> simp [readStorage, bindStorage] at hTy ⊢ <;> contradiction
 
+theorem readVar_bindVar_name_non_interference
+    (ctx : EvalContext)
+    (tyWrite tyRead : Ty)
+    (nameWrite nameRead : String)
+    (value : Ty.denote tyWrite)
+    (hName : nameRead ≠ nameWrite) :
+    readVar (bindVar ctx tyWrite nameWrite value) tyRead nameRead = readVar ctx tyRead nameRead := by
+  by_cases hTy : tyRead = tyWrite
+  · subst hTy
+    cases tyRead <;> simp [readVar, bindVar, hName]
+  · exact readVar_bindVar_type_non_interference ctx tyWrite tyRead nameWrite nameRead value hTy
+
+theorem readStorage_bindVar
+    (ctx : EvalContext)
+    (tyWrite tyRead : Ty)
+    (nameWrite nameRead : String)
+    (value : Ty.denote tyWrite) :
+    readStorage (bindVar ctx tyWrite nameWrite value) tyRead nameRead = readStorage ctx tyRead nameRead := by
+  cases tyWrite <;> cases tyRead <;> rfl
+
 theorem readVarStrict_unsupported_failfast
     (ctx : EvalContext)
     (ty : Ty)
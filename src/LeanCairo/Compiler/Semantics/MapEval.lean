@@ -0,0 +1,392 @@
+import Std.Data.HashMap
+import LeanCairo.Compiler.IR.Spec
+import LeanCairo.Compiler.Semantics.ContractEval
+
+namespace LeanCairo.Compiler.Semantics
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Core.Domain
+
+/-!
+Map-backed evaluation policy:
+1. `EvalContext.bindVar` shadows a name by wrapping the previous closure, so a read walks every
+   earlier binding and a chain of `n` nested `letE`s evaluates in `O(n^2)`. `MapEvalContext` keeps the
+   entry context as a fallback and records bindings in one `Std.HashMap` per domain, so reads and
+   binds are expected constant time.
+2. Domains stay isolated exactly as in `EvalContext`: each runtime type owns its own variable and
+   storage maps, and binding an unsupported type is a no-op.
+3. `MapEvalContext.toContext` is the abstraction function. `evalExprMapRefinesEvalExpr` and
+   `evalFuncMapRefinesEvalFunc` show the map evaluator computes exactly what `evalExpr`/`evalFunc`
+   compute on the abstracted context, so any caller of those two can switch to it.
+4. The refinement covers the total `evalExpr` only. The differential lanes run the fail-fast
+   `evalExprStateStrict`, which this evaluator does not model, and stay on `EvalContext`.
+-/
+
+/-- Reads `name` from `bindings`, falling back to the closure-backed entry context. -/
+def lookupBinding (bindings : Std.HashMap String α) (fallback : String -> α) (name : String) : α :=
+  (bindings[name]?).getD (fallback name)
+
+theorem lookupBinding_insert
+    (bindings : Std.HashMap String α)
+    (fallback : String -> α)
+    (name n : String)
+    (value : α) :
+    lookupBinding (bindings.insert name value) fallback n =
+      if n = name then value else lookupBinding bindings fallback n := by
+  by_cases h : n = name
+  · subst h
+    simp [lookupBinding, Std.HashMap.getElem?_insert_self]
+  · simp [lookupBinding, Std.HashMap.getElem?_insert, h, Ne.symm h]
+
+theorem lookupBinding_insert_fun
+    (bindings : Std.HashMap String α)
+    (fallback : String -> α)
+    (name : String)
+    (value : α) :
+    lookupBinding (bindings.insert name value) fallback =
+      fun n => if n = name then value else lookupBinding bindings fallback n := by
+  funext n
+  exact lookupBinding_insert bindings fallback name n value
+
+theorem lookupBinding_empty (fallback : String -> α) :
+    lookupBinding ({} : Std.HashMap String α) fallback = fallback := by
+  funext n
+  simp [lookupBinding]
+
+structure MapEvalContext where
+  base : EvalContext := {}
+  feltVars : Std.HashMap String Int := {}
+  i8Vars : Std.HashMap String Int := {}
+  i16Vars : Std.HashMap String Int := {}
+  i32Vars : Std.HashMap String Int := {}
+  i64Vars : Std.HashMap String Int := {}
+  i128Vars : Std.HashMap String Int := {}
+  u128Vars : Std.HashMap String Nat := {}
+  u8Vars : Std.HashMap String Nat := {}
+  u16Vars : Std.HashMap String Nat := {}
+  u32Vars : Std.HashMap String Nat := {}
+  u64Vars : Std.HashMap String Nat := {}
+  u256Vars : Std.HashMap String Nat := {}
+  qm31Vars : Std.HashMap String Nat := {}
+  boolVars : Std.HashMap String Bool := {}
+  feltStorage : Std.HashMap String Int := {}
+  i8Storage : Std.HashMap String Int := {}
+  i16Storage : Std.HashMap String Int := {}
+  i32Storage : Std.HashMap String Int := {}
+  i64Storage : Std.HashMap String Int := {}
+  i128Storage : Std.HashMap String Int := {}
+  u128Storage : Std.HashMap String Nat := {}
+  u8Storage : Std.HashMap String Nat := {}
+  u16Storage : Std.HashMap String Nat := {}
+  u32Storage : Std.HashMap String Nat := {}
+  u64Storage : Std.HashMap String Nat := {}
+  u256Storage : Std.HashMap String Nat := {}
+  qm31Storage : Std.HashMap String Nat := {}
+  boolStorage : Std.HashMap String Bool := {}
+
+namespace MapEvalContext
+
+def ofContext (ctx : EvalContext) : MapEvalContext :=
+  { base := ctx }
+
+def toContext (ctx : MapEvalContext) : EvalContext :=
+  {
+    feltVars := lookupBinding ctx.feltVars ctx.base.feltVars
+    i8Vars := lookupBinding ctx.i8Vars ctx.base.i8Vars
+    i16Vars := lookupBinding ctx.i16Vars ctx.base.i16Vars
+    i32Vars := lookupBinding ctx.i32Vars ctx.base.i32Vars
+    i64Vars := lookupBinding ctx.i64Vars ctx.base.i64Vars
+    i128Vars := lookupBinding ctx.i128Vars ctx.base.i128Vars
+    u128Vars := lookupBinding ctx.u128Vars ctx.base.u128Vars
+    u8Vars := lookupBinding ctx.u8Vars ctx.base.u8Vars
+    u16Vars := lookupBinding ctx.u16Vars ctx.base.u16Vars
+    u32Vars := lookupBinding ctx.u32Vars ctx.base.u32Vars
+    u64Vars := lookupBinding ctx.u64Vars ctx.base.u64Vars
+    u256Vars := lookupBinding ctx.u256Vars ctx.base.u256Vars
+    qm31Vars := lookupBinding ctx.qm31Vars ctx.base.qm31Vars
+    boolVars := lookupBinding ctx.boolVars ctx.base.boolVars
+    feltStorage := lookupBinding ctx.feltStorage ctx.base.feltStorage
+    i8Storage := lookupBinding ctx.i8Storage ctx.base.i8Storage
+    i16Storage := lookupBinding ctx.i16Storage ctx.base.i16Storage
+    i32Storage := lookupBinding ctx.i32Storage ctx.base.i32Storage
+    i64Storage := lookupBinding ctx.i64Storage ctx.base.i64Storage
+    i128Storage := lookupBinding ctx.i128Storage ctx.base.i128Storage
+    u128Storage := lookupBinding ctx.u128Storage ctx.base.u128Storage
+    u8Storage := lookupBinding ctx.u8Storage ctx.base.u8Storage
+    u16Storage := lookupBinding ctx.u16Storage ctx.base.u16Storage
+    u32Storage := lookupBinding ctx.u32Storage ctx.base.u32Storage
+    u64Storage := lookupBinding ctx.u64Storage ctx.base.u64Storage
+    u256Storage := lookupBinding ctx.u256Storage ctx.base.u256Storage
+    qm31Storage := lookupBinding ctx.qm31Storage ctx.base.qm31Storage
+    boolStorage := lookupBinding ctx.boolStorage ctx.base.boolStorage
+  }
+
+def readVar (ctx : MapEvalContext) (ty : Ty) (name : String) : Ty.denote ty :=
+  match ty with
+  | .felt252 => lookupBinding ctx.feltVars ctx.base.feltVars name
+  | .i8 => lookupBinding ctx.i8Vars ctx.base.i8Vars name
+  | .i16 => lookupBinding ctx.i16Vars ctx.base.i16Vars name
+  | .i32 => lookupBinding ctx.i32Vars ctx.base.i32Vars name
+  | .i64 => lookupBinding ctx.i64Vars ctx.base.i64Vars name
+  | .i128 => lookupBinding ctx.i128Vars ctx.base.i128Vars name
+  | .u128 => lookupBinding ctx.u128Vars ctx.base.u128Vars name
+  | .u8 => lookupBinding ctx.u8Vars ctx.base.u8Vars name
+  | .u16 => lookupBinding ctx.u16Vars ctx.base.u16Vars name
+  | .u32 => lookupBinding ctx.u32Vars ctx.base.u32Vars name
+  | .u64 => lookupBinding ctx.u64Vars ctx.base.u64Vars name
+  | .u256 => lookupBinding ctx.u256Vars ctx.base.u256Vars name
+  | .qm31 => lookupBinding ctx.qm31Vars ctx.base.qm31Vars name
+  | .bool => lookupBinding ctx.boolVars ctx.base.boolVars name
+  | .tuple _ => ()
+  | .structTy _ => ()
+  | .enumTy _ => ()
+  | .array _ => ()
+  | .span _ => ()
+  | .nullable _ => ()
+  | .boxed _ => ()
+  | .dict _ _ => ()
+  | .nonZero _ => ()
+  | .rangeCheck => ()
+  | .gasBuiltin => ()
+  | .segmentArena => ()
+  | .panicSignal => ()
+
+def readStorage (ctx : MapEvalContext) (ty : Ty) (name : String) : Ty.denote ty :=
+  match ty with
+  | .felt252 => lookupBinding ctx.feltStorage ctx.base.feltStorage name
+  | .i8 => lookupBinding ctx.i8Storage ctx.base.i8Storage name
+  | .i16 => lookupBinding ctx.i16Storage ctx.base.i16Storage name
+  | .i32 => lookupBinding ctx.i32Storage ctx.base.i32Storage name
+  | .i64 => lookupBinding ctx.i64Storage ctx.base.i64Storage name
+  | .i128 => lookupBinding ctx.i128Storage ctx.base.i128Storage name
+  | .u128 => lookupBinding ctx.u128Storage ctx.base.u128Storage name
+  | .u8 => lookupBinding ctx.u8Storage ctx.base.u8Storage name
+  | .u16 => lookupBinding ctx.u16Storage ctx.base.u16Storage name
+  | .u32 => lookupBinding ctx.u32Storage ctx.base.u32Storage name
+  | .u64 => lookupBinding ctx.u64Storage ctx.base.u64Storage name
+  | .u256 => lookupBinding ctx.u256Storage ctx.base.u256Storage name
+  | .qm31 => lookupBinding ctx.qm31Storage ctx.base.qm31Storage name
+  | .bool => lookupBinding ctx.boolStorage ctx.base.boolStorage name
+  | .tuple _ => ()
+  | .structTy _ => ()
+  | .enumTy _ => ()
+  | .array _ => ()
+  | .span _ => ()
+  | .nullable _ => ()
+  | .boxed _ => ()
+  | .dict _ _ => ()
+  | .nonZero _ => ()
+  | .rangeCheck => ()
+  | .gasBuiltin => ()
+  | .segmentArena => ()
+  | .panicSignal => ()
+
+def bindVar (ctx : MapEvalContext) (ty : Ty) (name : String) (value : Ty.denote ty) : MapEvalContext :=
+  match ty with
+  | .felt252 => { ctx with feltVars := ctx.feltVars.insert name value }
+  | .i8 => { ctx with i8Vars := ctx.i8Vars.insert name value }
+  | .i16 => { ctx with i16Vars := ctx.i16Vars.insert name value }
+  | .i32 => { ctx with i32Vars := ctx.i32Vars.insert name value }
+  | .i64 => { ctx with i64Vars := ctx.i64Vars.insert name value }
+  | .i128 => { ctx with i128Vars := ctx.i128Vars.insert name value }
+  | .u128 => { ctx with u128Vars := ctx.u128Vars.insert name value }
+  | .u8 => { ctx with u8Vars := ctx.u8Vars.insert name value }
+  | .u16 => { ctx with u16Vars := ctx.u16Vars.insert name value }
+  | .u32 => { ctx with u32Vars := ctx.u32Vars.insert name value }
+  | .u64 => { ctx with u64Vars := ctx.u64Vars.insert name value }
+  | .u256 => { ctx with u256Vars := ctx.u256Vars.insert name value }
+  | .qm31 => { ctx with qm31Vars := ctx.qm31Vars.insert name value }
+  | .bool => { ctx with boolVars := ctx.boolVars.insert name value }
+  | .tuple _ => ctx
+  | .structTy _ => ctx
+  | .enumTy _ => ctx
+  | .array _ => ctx
+  | .span _ => ctx
+  | .nullable _ => ctx
+  | .boxed _ => ctx
+  | .dict _ _ => ctx
+  | .nonZero _ => ctx
+  | .rangeCheck => ctx
+  | .gasBuiltin => ctx
+  | .segmentArena => ctx
+  | .panicSignal => ctx
+
+def bindStorage (ctx : MapEvalContext) (ty : Ty) (name : String) (value : Ty.denote ty) : MapEvalContext :=
+  match ty with
+  | .felt252 => { ctx with feltStorage := ctx.feltStorage.insert name value }
+  | .i8 => { ctx with i8Storage := ctx.i8Storage.insert name value }
+  | .i16 => { ctx with i16Storage := ctx.i16Storage.insert name value }
+  | .i32 => { ctx with i32Storage := ctx.i32Storage.insert name value }
+  | .i64 => { ctx with i64Storage := ctx.i64Storage.insert name value }
+  | .i128 => { ctx with i128Storage := ctx.i128Storage.insert name value }
+  | .u128 => { ctx with u128Storage := ctx.u128Storage.insert name value }
+  | .u8 => { ctx with u8Storage := ctx.u8Storage.insert name value }
+  | .u16 => { ctx with u16Storage := ctx.u16Storage.insert name value }
+  | .u32 => { ctx with u32Storage := ctx.u32Storage.insert name value }
+  | .u64 => { ctx with u64Storage := ctx.u64Storage.insert name value }
+  | .u256 => { ctx with u256Storage := ctx.u256Storage.insert name value }
+  | .qm31 => { ctx with qm31Storage := ctx.qm31Storage.insert name value }
+  | .bool => { ctx with boolStorage := ctx.boolStorage.insert name value }
+  | .tuple _ => ctx
+  | .structTy _ => ctx
+  | .enumTy _ => ctx
+  | .array _ => ctx
+  | .span _ => ctx
+  | .nullable _ => ctx
+  | .boxed _ => ctx
+  | .dict _ _ => ctx
+  | .nonZero _ => ctx
+  | .rangeCheck => ctx
+  | .gasBuiltin => ctx
+  | .segmentArena => ctx
+  | .panicSignal => ctx
+
+theorem toContext_ofContext (ctx : EvalContext) : (ofContext ctx).toContext = ctx := by
+  cases ctx
+  simp [ofContext, toContext, lookupBinding_empty]
+
+theorem readVar_toContext (ctx : MapEvalContext) (ty : Ty) (name : String) :
+    ctx.readVar ty name = EvalContext.readVar ctx.toContext ty name := by
+  cases ty <;> rfl
+
+theorem readStorage_toContext (ctx : MapEvalContext) (ty : Ty) (name : String) :
+    ctx.readStorage ty name = EvalContext.readStorage ctx.toContext ty name := by
+  cases ty <;> rfl
+
+theorem toContext_bindVar (ctx : MapEvalContext) (ty : Ty) (name : String) (value : Ty.denote ty) :
+    (ctx.bindVar ty name value).toContext = EvalContext.bindVar ctx.toContext ty name value := by
+  cases ty <;> simp [bindVar, EvalContext.bindVar, toContext, lookupBinding_insert_fun]
+
+theorem toContext_bindStorage (ctx : MapEvalContext) (ty : Ty) (name : String) (value : Ty.denote ty) :
+    (ctx.bindStorage ty name value).toContext = EvalContext.bindStorage ctx.toContext ty name value := by
+  cases ty <;> simp [bindStorage, EvalContext.bindStorage, toContext, lookupBinding_insert_fun]
+
+end MapEvalContext
+
+def evalExprMap (ctx : MapEvalContext) : IRExpr ty -> Ty.denote ty
+  | .var name => ctx.readVar ty name
+  | .storageRead name => ctx.readStorage ty name
+  | .litU128 value => value
+  | .litU256 value => value
+  | .litBool value => value
+  | .litFelt252 value => value
+  | .addFelt252 lhs rhs => evalExprMap ctx lhs + evalExprMap ctx rhs
+  | .subFelt252 lhs rhs => evalExprMap ctx lhs - evalExprMap ctx rhs
+  | .mulFelt252 lhs rhs => evalExprMap ctx lhs * evalExprMap ctx rhs
+  | .addU128 lhs rhs => evalExprMap ctx lhs + evalExprMap ctx rhs
+  | .subU128 lhs rhs => evalExprMap ctx lhs - evalExprMap ctx rhs
+  | .mulU128 lhs rhs => evalExprMap ctx lhs * evalExprMap ctx rhs
+  | .addU256 lhs rhs => evalExprMap ctx lhs + evalExprMap ctx rhs
+  | .subU256 lhs rhs => evalExprMap ctx lhs - evalExprMap ctx rhs
+  | .mulU256 lhs rhs => evalExprMap ctx lhs * evalExprMap ctx rhs
+  | @IRExpr.eq ty lhs rhs =>
+      by
+        let _ : DecidableEq (Ty.denote ty) := Ty.denoteDecidableEq ty
+        exact decide (evalExprMap ctx lhs = evalExprMap ctx rhs)
+  | .ltU128 lhs rhs => evalExprMap ctx lhs < evalExprMap ctx rhs
+  | .leU128 lhs rhs => evalExprMap ctx lhs <= evalExprMap ctx rhs
+  | .ltU256 lhs rhs => evalExprMap ctx lhs < evalExprMap ctx rhs
+  | .leU256 lhs rhs => evalExprMap ctx lhs <= evalExprMap ctx rhs
+  | .ite cond thenBranch elseBranch =>
+      if evalExprMap ctx cond then evalExprMap ctx thenBranch else evalExprMap ctx elseBranch
+  | .letE name boundTy bound body =>
+      let value := evalExprMap ctx bound
+      let ctx' := ctx.bindVar boundTy name value
+      evalExprMap ctx' body
+
+structure MapFuncEvalOutcome (ret : Ty) where
+  result : Ty.denote ret
+  postCtx : MapEvalContext
+
+def MapFuncEvalOutcome.toOutcome (outcome : MapFuncEvalOutcome ret) : FuncEvalOutcome ret :=
+  { result := outcome.result, postCtx := outcome.postCtx.toContext }
+
+def evalWritesMapFromSnapshot (entryCtx : MapEvalContext) :
+    MapEvalContext -> List IRStorageWrite -> MapEvalContext
+  | storageCtx, [] => storageCtx
+  | storageCtx, writeSpec :: rest =>
+      let value := evalExprMap entryCtx writeSpec.value
+      let storageCtx' := storageCtx.bindStorage writeSpec.ty writeSpec.field value
+      evalWritesMapFromSnapshot entryCtx storageCtx' rest
+
+def evalWritesMap (entryCtx : MapEvalContext) (writes : List IRStorageWrite) : MapEvalContext :=
+  evalWritesMapFromSnapshot entryCtx entryCtx writes
+
+def evalFuncMap (entryCtx : MapEvalContext) (fnSpec : IRFuncSpec) : MapFuncEvalOutcome fnSpec.ret :=
+  {
+    result := evalExprMap entryCtx fnSpec.body
+    postCtx := evalWritesMap entryCtx fnSpec.writes
+  }
+
+theorem evalExprMapRefinesEvalExpr (ctx : MapEvalContext) (expr : IRExpr ty) :
+    evalExprMap ctx expr = evalExpr ctx.toContext expr := by
+  induction expr generalizing ctx with
+  | var name =>
+      simp [evalExprMap, evalExpr, MapEvalContext.readVar_toContext]
+  | storageRead name =>
+      simp [evalExprMap, evalExpr, MapEvalContext.readStorage_toContext]
+  | litU128 value =>
+      simp [evalExprMap, evalExpr]
+  | litU256 value =>
+      simp [evalExprMap, evalExpr]
+  | litBool value =>
+      simp [evalExprMap, evalExpr]
+  | litFelt252 value =>
+      simp [evalExprMap, evalExpr]
+  | addFelt252 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | subFelt252 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | mulFelt252 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | addU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | subU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | mulU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | addU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | subU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | mulU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | @eq _ lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | ltU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | leU128 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | ltU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | leU256 lhs rhs ihLhs ihRhs =>
+      simp [evalExprMap, evalExpr, ihLhs ctx, ihRhs ctx]
+  | ite cond thenBranch elseBranch ihCond ihThen ihElse =>
+      simp [evalExprMap, evalExpr, ihCond ctx, ihThen ctx, ihElse ctx]
+  | letE name boundTy bound body ihBound ihBody =>
+      simp only [evalExprMap, evalExpr]
+      rw [ihBody, MapEvalContext.toContext_bindVar, ihBound]
+
+/-- Evaluating from an entry context directly agrees with `evalExpr` on that context. -/
+theorem evalExprMap_ofContext (ctx : EvalContext) (expr : IRExpr ty) :
+    evalExprMap (MapEvalContext.ofContext ctx) expr = evalExpr ctx expr := by
+  rw [evalExprMapRefinesEvalExpr, MapEvalContext.toContext_ofContext]
+
+theorem evalWritesMapFromSnapshotRefines
+    (entryCtx storageCtx : MapEvalContext)
+    (writes : List IRStorageWrite) :
+    (evalWritesMapFromSnapshot entryCtx storageCtx writes).toContext =
+      evalWritesFromSnapshot entryCtx.toContext storageCtx.toContext writes := by
+  induction writes generalizing storageCtx with
+  | nil =>
+      rfl
+  | cons writeSpec rest ih =>
+      simp only [evalWritesMapFromSnapshot, evalWritesFromSnapshot]
+      rw [ih, MapEvalContext.toContext_bindStorage, evalExprMapRefinesEvalExpr]
+
+theorem evalFuncMapRefinesEvalFunc (entryCtx : MapEvalContext) (fnSpec : IRFuncSpec) :
+    (evalFuncMap entryCtx fnSpec).toOutcome = evalFunc entryCtx.toContext fnSpec := by
+  simp [evalFuncMap, evalFunc, MapFuncEvalOutcome.toOutcome, evalWritesMap, evalWrites,
+    evalExprMapRefinesEvalExpr, evalWritesMapFromSnapshotRefines]
+
+end LeanCairo.Compiler.Semantics
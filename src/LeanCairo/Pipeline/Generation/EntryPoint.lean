@@ -3,6 +3,7 @@ import LeanCairo.Core.Validation.Contract
 import LeanCairo.Core.Validation.Errors
 import LeanCairo.Compiler.IR.SpecLowering
 import LeanCairo.Compiler.Optimize.IRSpec
+import LeanCairo.Compiler.Optimize.Remarks
 import LeanCairo.Pipeline.Generation.InliningStrategy
 import LeanCairo.Pipeline.Generation.IRRenderer
 import LeanCairo.Pipeline.Generation.WriteProject
@@ -19,11 +20,19 @@ def generateProjectUncheckedWithTuning
     (outDir : String)
     (emitCasm : Bool)
     (enableOptimization : Bool)
-    (inliningStrategy : InliningStrategy) : IO Unit := do
+    (inliningStrategy : InliningStrategy)
+    (remarksPath : Option String := none) : IO Unit := do
   let irSpec := lowerContractSpec spec
   let inputSpec := if enableOptimization then optimizeIRContract irSpec else irSpec
   let rendered := renderProjectFromIR inputSpec emitCasm inliningStrategy
   writeGeneratedProject (System.FilePath.mk outDir) rendered
+  match remarksPath with
+  | some path =>
+      let passes := if enableOptimization then optimizerPasses else []
+      -- The Cairo pipeline does not link the direct Sierra emitter, so statement counts are `null`.
+      writeRemarks (System.FilePath.mk path)
+        (renderPassRemarksJsonLines (fun _ => none) irSpec (fun _ => passes))
+  | none => pure ()
 
 def generateProjectUncheckedWithOptions
     (spec : ContractSpec)
@@ -40,10 +49,11 @@ def generateProjectCheckedWithTuning
     (outDir : String)
     (emitCasm : Bool)
     (enableOptimization : Bool)
-    (inliningStrategy : InliningStrategy) : IO Unit := do
+    (inliningStrategy : InliningStrategy)
+    (remarksPath : Option String := none) : IO Unit := do
   match validateContract spec with
   | .ok _ =>
-      generateProjectUncheckedWithTuning spec outDir emitCasm enableOptimization inliningStrategy
+      generateProjectUncheckedWithTuning spec outDir emitCasm enableOptimization inliningStrategy remarksPath
   | .error errors =>
       throw <| IO.userError s!"contract validation failed:\n{ValidationError.renderMany errors}"
 
@@ -0,0 +1,282 @@
+import Lean
+import Std.Data.HashMap
+import Std.Data.HashSet
+import LeanCairo.Core.Domain.Identifier
+import LeanCairo.Core.Spec.ContractSpec
+
+namespace LeanCairo.Pipeline
+
+open Lean
+open LeanCairo.Core.Domain
+open LeanCairo.Core.Spec
+
+/-
+Resident compilation (`--serve`, `--batch`):
+- the generator runs in-process instead of through a `lake env lean` invocation script,
+- each module root is built with `lake build` once per process, and each module's `contract` is
+  evaluated from its imported environment once and kept with that environment,
+- a batch imports all of its modules into one shared environment up front,
+- a module edited after it was loaded is not reloaded; restart the server to pick up edits.
+-/
+
+structure LoadedContract where
+  env : Environment
+  spec : ContractSpec
+
+structure ContractCache where
+  builtRoots : Std.HashSet String := {}
+  loaded : Std.HashMap String LoadedContract := {}
+
+def moduleRootTarget (moduleName : String) : String :=
+  match moduleName.splitOn "." with
+  | [] => moduleName
+  | head :: _ => head
+
+private def runLakeBuild (rootTarget : String) : IO Unit := do
+  let output <- IO.Process.output { cmd := "lake", args := #["build", rootTarget] }
+  if output.exitCode != 0 then
+    throw
+      <| IO.userError
+          s!"failed to build module root target '{rootTarget}'\nstdout:\n{output.stdout}\nstderr:\n{output.stderr}"
+
+private unsafe def evalContractSpecUnsafe (env : Environment) (declName : Name) : Except String ContractSpec :=
+  env.evalConstCheck ContractSpec {} ``ContractSpec declName
+
+@[implemented_by evalContractSpecUnsafe]
+private opaque evalContractSpec (env : Environment) (declName : Name) : Except String ContractSpec
+
+namespace ContractCache
+
+/-- Points module resolution at the Lake search path; call once before the first `load`. -/
+def create : IO ContractCache := do
+  initSearchPath (← findSysroot)
+  enableInitializersExecution
+  pure {}
+
+def ensureRootBuilt (cache : ContractCache) (moduleName : String) : IO ContractCache := do
+  let rootTarget := moduleRootTarget moduleName
+  if cache.builtRoots.contains rootTarget then
+    pure cache
+  else
+    runLakeBuild rootTarget
+    pure { cache with builtRoots := cache.builtRoots.insert rootTarget }
+
+/-- Evaluates `<moduleName>.contract` from an environment that imports `moduleName`. -/
+def evalFrom (env : Environment) (moduleName : String) : IO LoadedContract := do
+  let declName := moduleName.toName ++ `contract
+  match evalContractSpec env declName with
+  | .ok spec => pure { env := env, spec := spec }
+  | .error err => throw <| IO.userError s!"failed to load '{declName}' from module '{moduleName}': {err}"
+
+/-- The contract of `moduleName`, building and importing the module on first use only. -/
+def load (cache : ContractCache) (moduleName : String) : IO (ContractSpec × ContractCache) := do
+  match cache.loaded[moduleName]? with
+  | some loaded => pure (loaded.spec, cache)
+  | none =>
+      let cache <- cache.ensureRootBuilt moduleName
+      let env <- importModules #[{ module := moduleName.toName : Import }] {}
+      let loaded <- evalFrom env moduleName
+      pure (loaded.spec, { cache with loaded := cache.loaded.insert moduleName loaded })
+
+/--
+Imports every not-yet-loaded module in one environment, so the modules share its imported constants.
+If the joint import fails, the modules are left for `load` to report one at a time.
+-/
+def preload (cache : ContractCache) (moduleNames : List String) : IO ContractCache := do
+  let names := moduleNames.eraseDups.filter (fun name => isValidModuleName name && !cache.loaded.contains name)
+  if names.isEmpty then
+    return cache
+  try
+    let mut next := cache
+    for name in names do
+      next <- next.ensureRootBuilt name
+    let env <- importModules (names.map (fun name => { module := name.toName : Import })).toArray {}
+    for name in names do
+      next := { next with loaded := next.loaded.insert name (← evalFrom env name) }
+    pure next
+  catch _ =>
+    pure cache
+
+end ContractCache
+
+private def requestResponse
+    (id : Json)
+    (result : Except String Unit)
+    (output : String)
+    (elapsedMs : Nat) : Json :=
+  let (status, error) :=
+    match result with
+    | .ok _ => ("ok", Json.null)
+    | .error err => ("error", Json.str err)
+  Json.mkObj
+    [
+      ("id", id),
+      ("status", Json.str status),
+      ("error", error),
+      ("output", Json.str output),
+      ("elapsed_ms", Json.num (JsonNumber.fromNat elapsedMs))
+    ]
+
+private def runCompileRequest
+    (compile : ContractCache -> List String -> IO ContractCache)
+    (cache : ContractCache)
+    (args : Except String (List String)) : IO (Except String ContractCache) := do
+  match args with
+  | .error err => pure (.error s!"invalid request: {err}")
+  | .ok args =>
+      try
+        pure (.ok (← compile cache args))
+      catch ex =>
+        pure (.error ex.toString)
+
+private partial def serveLoop
+    (compile : ContractCache -> List String -> IO ContractCache)
+    (stdin stdout : IO.FS.Stream)
+    (cache : ContractCache) : IO Unit := do
+  let line <- stdin.getLine
+  if line.isEmpty then
+    return
+  if line.all Char.isWhitespace then
+    serveLoop compile stdin stdout cache
+    return
+  let startMs <- IO.monoMsNow
+  let (id, args) : Json × Except String (List String) :=
+    match Json.parse line with
+    | .ok request => (request.getObjValD "id", request.getObjValAs? (List String) "args")
+    | .error err => (Json.null, .error s!"invalid request JSON: {err}")
+  let (output, outcome) <- IO.FS.withIsolatedStreams (runCompileRequest compile cache args)
+  let elapsedMs := (← IO.monoMsNow) - startMs
+  let (result, cache) :=
+    match outcome with
+    | .ok next => ((.ok () : Except String Unit), next)
+    | .error err => (.error err, cache)
+  stdout.putStrLn (requestResponse id result output elapsedMs).compress
+  stdout.flush
+  serveLoop compile stdin stdout cache
+
+/--
+Answers compile requests until stdin closes. Each stdin line is `{"id": <any>, "args": [<CLI args>]}`
+and gets one stdout line `{"id", "status": "ok"|"error", "error", "output", "elapsed_ms"}`. Output the
+compile step prints is captured into `output` so stdout carries responses only.
+-/
+def serveCompileRequests (compile : ContractCache -> List String -> IO ContractCache) : IO UInt32 := do
+  let cache <- ContractCache.create
+  serveLoop compile (← IO.getStdin) (← IO.getStdout) cache
+  return 0
+
+structure BatchEntry where
+  id : String
+  args : List String
+
+private def moduleArg? : List String -> Option String
+  | "--module" :: value :: _ => some value
+  | _ :: rest => moduleArg? rest
+  | [] => none
+
+private def batchEntryOfJson (index : Nat) (entry : Json) : Except String BatchEntry := do
+  let args <-
+    match entry.getObjValAs? (List String) "args" with
+    | .ok args => .ok args
+    | .error err => .error s!"entries[{index}].args: {err}"
+  let id :=
+    match entry.getObjValAs? String "id" with
+    | .ok id => id
+    | .error _ => (moduleArg? args).getD s!"entry_{index}"
+  pure { id := id, args := args }
+
+/-- A batch manifest is `{"entries": [{"id": <optional string>, "args": [<CLI args>]}, ...]}`. -/
+def readBatchManifest (path : String) : IO (List BatchEntry) := do
+  let parsed <-
+    match Json.parse (← IO.FS.readFile path) with
+    | .ok parsed => pure parsed
+    | .error err => throw <| IO.userError s!"invalid batch manifest '{path}': {err}"
+  let entries <-
+    match parsed.getObjValAs? (List Json) "entries" with
+    | .ok entries => pure entries
+    | .error err => throw <| IO.userError s!"invalid batch manifest '{path}': entries: {err}"
+  if entries.isEmpty then
+    throw <| IO.userError s!"batch manifest '{path}' has no entries"
+  match ((List.range entries.length).zip entries).mapM (fun (index, entry) => batchEntryOfJson index entry) with
+  | .ok parsed => pure parsed
+  | .error err => throw <| IO.userError s!"invalid batch manifest '{path}': {err}"
+
+private def batchEntryJson (entry : BatchEntry) (outcome : Except String Unit) (elapsedMs : Nat) : Json :=
+  let (status, error) :=
+    match outcome with
+    | .ok _ => ("ok", Json.null)
+    | .error err => ("error", Json.str err)
+  Json.mkObj
+    [
+      ("id", Json.str entry.id),
+      ("module", (moduleArg? entry.args).map Json.str |>.getD Json.null),
+      ("status", Json.str status),
+      ("error", error),
+      ("elapsed_ms", Json.num (JsonNumber.fromNat elapsedMs))
+    ]
+
+/--
+Compiles every manifest entry in this process, continuing past failures. Modules are imported
+together once before the first entry. Prints one line per entry and, with `summaryPath`, writes
+a JSON summary with per-entry status and timing. Exits 1 if any entry failed.
+-/
+def runCompileBatch
+    (compile : ContractCache -> List String -> IO ContractCache)
+    (manifestPath : String)
+    (summaryPath : Option String) : IO UInt32 := do
+  let startMs <- IO.monoMsNow
+  let entries <- readBatchManifest manifestPath
+  let cache <- ContractCache.create
+  let mut cache <- cache.preload (entries.filterMap (fun entry => moduleArg? entry.args))
+  let preloadMs := (← IO.monoMsNow) - startMs
+  let mut rows : Array Json := #[]
+  let mut failed := 0
+  for entry in entries do
+    let entryStartMs <- IO.monoMsNow
+    let outcome <- runCompileRequest compile cache (.ok entry.args)
+    let elapsedMs := (← IO.monoMsNow) - entryStartMs
+    match outcome with
+    | .ok next =>
+        cache := next
+        IO.println s!"ok: {entry.id} ({elapsedMs} ms)"
+        rows := rows.push (batchEntryJson entry (.ok ()) elapsedMs)
+    | .error err =>
+        failed := failed + 1
+        IO.eprintln s!"error: {entry.id}: {err}"
+        rows := rows.push (batchEntryJson entry (.error err) elapsedMs)
+  let totalMs := (← IO.monoMsNow) - startMs
+  match summaryPath with
+  | some path =>
+      let summary :=
+        Json.mkObj
+          [
+            ("version", Json.num (JsonNumber.fromNat 1)),
+            ("manifest", Json.str manifestPath),
+            ("entry_count", Json.num (JsonNumber.fromNat entries.length)),
+            ("failed_count", Json.num (JsonNumber.fromNat failed)),
+            ("preload_ms", Json.num (JsonNumber.fromNat preloadMs)),
+            ("total_ms", Json.num (JsonNumber.fromNat totalMs)),
+            ("entries", Json.arr rows)
+          ]
+      match (System.FilePath.mk path).parent with
+      | some dir =>
+          if !dir.toString.isEmpty then
+            IO.FS.createDirAll dir
+      | none => pure ()
+      IO.FS.writeFile path (summary.pretty ++ "\n")
+  | none => pure ()
+  IO.println s!"batch: {entries.length - failed}/{entries.length} entries compiled in {totalMs} ms"
+  return (if failed == 0 then 0 else 1)
+
+/-- `--batch <manifest.json> [--summary <File>]`, or `none` when `args` do not request a batch. -/
+def parseBatchArgs (args : List String) : Option (Except String (String × Option String)) :=
+  match args with
+  | ["--batch", manifest] => some (.ok (manifest, none))
+  | ["--batch", manifest, "--summary", summary] => some (.ok (manifest, some summary))
+  | ["--summary", summary, "--batch", manifest] => some (.ok (manifest, some summary))
+  | _ =>
+      if args.contains "--batch" then
+        some (.error "--batch takes a manifest path and an optional --summary <File>, and no other arguments")
+      else
+        none
+
+end LeanCairo.Pipeline
@@ -1,8 +1,13 @@
+import LeanCairo.Backend.Sierra.Emit.SubsetProgram
+
 namespace LeanCairo.Pipeline.Sierra
 
+open LeanCairo.Backend.Sierra.Emit
+
+/-- `program` is written by streaming it to `sierra/program.sierra.json`; it is never rendered whole. -/
 structure GeneratedSierraProject where
-  programJson : String
+  program : LinkedSubsetProgram
   readme : String
-  deriving Repr
+  optimizationReport : Option String := none
 
 end LeanCairo.Pipeline.Sierra
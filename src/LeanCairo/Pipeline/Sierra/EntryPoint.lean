@@ -1,8 +1,12 @@
 import LeanCairo.Compiler.IR.SpecLowering
 import LeanCairo.Compiler.Optimize.IRSpec
+import LeanCairo.Compiler.Optimize.Selection
 import LeanCairo.Core.Spec.ContractSpec
 import LeanCairo.Core.Validation.Contract
 import LeanCairo.Core.Validation.Errors
+import LeanCairo.Pipeline.Sierra.OptimizationReport
+import LeanCairo.Pipeline.Sierra.OptimizationStrategy
+import LeanCairo.Pipeline.Sierra.Remarks
 import LeanCairo.Pipeline.Sierra.Renderer
 import LeanCairo.Pipeline.Sierra.WriteProject
 
@@ -13,31 +17,72 @@ open LeanCairo.Compiler.Optimize
 open LeanCairo.Core.Spec
 open LeanCairo.Core.Validation
 
-def generateSierraProjectUncheckedWithOptions
+/--
+The IR handed to the emitter, the per-function report when pipelines were selected by cost, and the
+passes applied to the function at each position, in order. Cost-driven selection runs once per
+function, and its selections are positional, like `irSpec.functions`.
+-/
+private def optimizeForStrategy
+    (irSpec : IRContractSpec)
+    (enableOptimization : Bool)
+    (strategy : OptimizationStrategy) :
+    IRContractSpec × Option String × (Nat -> List VerifiedExprPass) :=
+  if !enableOptimization then
+    (irSpec, none, fun _ => [])
+  else
+    match strategy with
+    | .fixed => (optimizeIRContract irSpec, none, fun _ => optimizerPasses)
+    | .costDriven =>
+        let (selected, selections) := selectIRContractWithSelections irSpec
+        let passesFor := fun (idx : Nat) => (selections[idx]?.map (·.winner.passes)).getD []
+        (selected, some (renderOptimizationReportJson (selections.map (·.decision))), passesFor)
+
+def generateSierraProjectUncheckedWithStrategy
     (spec : ContractSpec)
     (outDir : String)
-    (enableOptimization : Bool) : IO Unit := do
+    (enableOptimization : Bool)
+    (strategy : OptimizationStrategy)
+    (remarksPath : Option String := none) : IO Unit := do
   let irSpec := lowerContractSpec spec
-  let inputSpec := if enableOptimization then optimizeIRContract irSpec else irSpec
+  let (inputSpec, report?, passesFor) := optimizeForStrategy irSpec enableOptimization strategy
   match renderSierraProjectFromIR inputSpec enableOptimization with
   | .ok rendered =>
-      writeGeneratedSierraProject (System.FilePath.mk outDir) rendered
+      writeGeneratedSierraProject (System.FilePath.mk outDir) { rendered with optimizationReport := report? }
   | .error err =>
       throw <| IO.userError s!"Sierra subset rendering failed:\n{err}"
+  match remarksPath with
+  | some path =>
+      writeRemarks (System.FilePath.mk path)
+        (renderRemarksJsonLines irSpec passesFor)
+  | none => pure ()
+
+def generateSierraProjectUncheckedWithOptions
+    (spec : ContractSpec)
+    (outDir : String)
+    (enableOptimization : Bool) : IO Unit := do
+  generateSierraProjectUncheckedWithStrategy spec outDir enableOptimization .fixed
 
 def generateSierraProjectUnchecked (spec : ContractSpec) (outDir : String) : IO Unit := do
   generateSierraProjectUncheckedWithOptions spec outDir true
 
-def generateSierraProjectCheckedWithOptions
+def generateSierraProjectCheckedWithStrategy
     (spec : ContractSpec)
     (outDir : String)
-    (enableOptimization : Bool) : IO Unit := do
+    (enableOptimization : Bool)
+    (strategy : OptimizationStrategy)
+    (remarksPath : Option String := none) : IO Unit := do
   match validateContract spec with
   | .ok _ =>
-      generateSierraProjectUncheckedWithOptions spec outDir enableOptimization
+      generateSierraProjectUncheckedWithStrategy spec outDir enableOptimization strategy remarksPath
   | .error errors =>
       throw <| IO.userError s!"contract validation failed:\n{ValidationError.renderMany errors}"
 
+def generateSierraProjectCheckedWithOptions
+    (spec : ContractSpec)
+    (outDir : String)
+    (enableOptimization : Bool) : IO Unit := do
+  generateSierraProjectCheckedWithStrategy spec outDir enableOptimization .fixed
+
 def generateSierraProjectChecked (spec : ContractSpec) (outDir : String) : IO Unit := do
   generateSierraProjectCheckedWithOptions spec outDir true
 
@@ -0,0 +1,42 @@
+import Lean.Data.Json
+import LeanCairo.Compiler.Optimize.Remarks
+import LeanCairo.Compiler.Optimize.Selection
+
+namespace LeanCairo.Pipeline.Sierra
+
+open Lean
+open LeanCairo.Compiler.Optimize
+
+private def natJson (value : Nat) : Json :=
+  Json.num (JsonNumber.fromNat value)
+
+private def candidateJson (score : CandidateScore) : Json :=
+  Json.mkObj
+    [
+      ("label", Json.str score.label),
+      ("passes", Json.arr (score.passNames.map Json.str).toArray),
+      ("cost", sierraCostJson score.cost)
+    ]
+
+private def decisionJson (decision : FuncOptimizationDecision) : Json :=
+  Json.mkObj
+    [
+      ("function", Json.str decision.functionName),
+      ("input_cost", sierraCostJson decision.inputCost),
+      ("chosen", Json.str decision.chosen),
+      ("chosen_cost", sierraCostJson decision.chosenCost),
+      ("candidates", Json.arr (decision.candidates.map candidateJson).toArray)
+    ]
+
+/-- Per-function record of which candidate pipeline won and how every candidate scored. -/
+def renderOptimizationReportJson (decisions : List FuncOptimizationDecision) : String :=
+  let report :=
+    Json.mkObj
+      [
+        ("version", natJson 1),
+        ("cost_model", Json.str "sierra_static_gas_v1"),
+        ("functions", Json.arr (decisions.map decisionJson).toArray)
+      ]
+  report.pretty ++ "\n"
+
+end LeanCairo.Pipeline.Sierra
@@ -0,0 +1,28 @@
+namespace LeanCairo.Pipeline.Sierra
+
+inductive OptimizationStrategy where
+  | fixed
+  | costDriven
+  deriving Repr, DecidableEq, Inhabited
+
+namespace OptimizationStrategy
+
+def parse (value : String) : Except String OptimizationStrategy :=
+  match value with
+  | "fixed" => .ok .fixed
+  | "cost-driven" => .ok .costDriven
+  | _ =>
+      .error
+        s!"invalid value for --optimize-strategy: '{value}' (expected 'fixed' or 'cost-driven')"
+
+def label : OptimizationStrategy -> String
+  | .fixed => "fixed"
+  | .costDriven => "cost-driven"
+
+def toLeanExpr : OptimizationStrategy -> String
+  | .fixed => "(LeanCairo.Pipeline.Sierra.OptimizationStrategy.fixed)"
+  | .costDriven => "(LeanCairo.Pipeline.Sierra.OptimizationStrategy.costDriven)"
+
+end OptimizationStrategy
+
+end LeanCairo.Pipeline.Sierra
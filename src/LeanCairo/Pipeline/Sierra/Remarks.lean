@@ -0,0 +1,21 @@
+import LeanCairo.Backend.Sierra.Emit.Subset.Function
+import LeanCairo.Compiler.Optimize.Remarks
+
+namespace LeanCairo.Pipeline.Sierra
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
+
+/-- Direct Sierra statement count for `fnSpec`, or `none` when the subset emitter rejects it. -/
+def sierraStatementCount? (fnSpec : IRFuncSpec) : Option Nat :=
+  match LeanCairo.Backend.Sierra.Emit.Subset.emitFunction 0 fnSpec with
+  | .ok emitted => some emitted.statements.length
+  | .error _ => none
+
+/-- Pass remarks with the direct Sierra statement count of each intermediate function. -/
+def renderRemarksJsonLines
+    (spec : IRContractSpec)
+    (passesFor : Nat -> List VerifiedExprPass) : String :=
+  renderPassRemarksJsonLines sierraStatementCount? spec passesFor
+
+end LeanCairo.Pipeline.Sierra
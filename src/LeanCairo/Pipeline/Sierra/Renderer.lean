@@ -34,10 +34,10 @@ private def renderReadme (spec : IRContractSpec) (optimized : Bool) : String :=
 def renderSierraProjectFromIR
     (spec : IRContractSpec)
     (optimized : Bool) : Except String GeneratedSierraProject := do
-  let programJson <- renderSubsetProgramJson spec
+  let program <- linkSubsetProgram spec
   pure
     {
-      programJson := programJson ++ "\n"
+      program := program
       readme := renderReadme spec optimized
     }
 
@@ -2,15 +2,23 @@ import LeanCairo.Pipeline.Sierra.BuildPlan
 
 namespace LeanCairo.Pipeline.Sierra
 
+open LeanCairo.Backend.Sierra.Emit
+
 private def writeFile (path : System.FilePath) (content : String) : IO Unit :=
   IO.FS.writeFile path content
 
+private def writeProgramFile (path : System.FilePath) (program : LinkedSubsetProgram) : IO Unit :=
+  IO.FS.withFile path .write (fun handle => writeLinkedSubsetProgram (IO.FS.Stream.ofHandle handle) program)
+
 def writeGeneratedSierraProject
     (outDir : System.FilePath)
     (project : GeneratedSierraProject) : IO Unit := do
   IO.FS.createDirAll outDir
   IO.FS.createDirAll (outDir / "sierra")
-  writeFile (outDir / "sierra" / "program.sierra.json") project.programJson
+  writeProgramFile (outDir / "sierra" / "program.sierra.json") project.program
   writeFile (outDir / "README.md") project.readme
+  match project.optimizationReport with
+  | some report => writeFile (outDir / "optimization-report.json") report
+  | none => pure ()
 
 end LeanCairo.Pipeline.Sierra
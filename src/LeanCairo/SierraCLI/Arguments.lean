@@ -1,19 +1,25 @@
 import LeanCairo.Core.Domain.Identifier
+import LeanCairo.Pipeline.Sierra.OptimizationStrategy
 
 namespace LeanCairo.SierraCLI
 
 open LeanCairo.Core.Domain
+open LeanCairo.Pipeline.Sierra
 
 structure CliOptions where
   moduleName : String
   outDir : String
   optimize : Bool
+  optimizeStrategy : OptimizationStrategy
+  emitRemarks : Option String
   deriving Repr
 
 private structure PartialCliOptions where
   moduleName : Option String := none
   outDir : Option String := none
   optimize : Bool := true
+  optimizeStrategy : OptimizationStrategy := .fixed
+  emitRemarks : Option String := none
 
 private def parseBoolLiteral (flagName : String) (value : String) : Except String Bool :=
   match value with
@@ -30,19 +36,44 @@ private def parseTokens (tokens : List String) (state : PartialCliOptions) : Exc
       match parseBoolLiteral "--optimize" value with
       | .ok parsed => parseTokens rest { state with optimize := parsed }
       | .error err => .error err
+  | "--optimize-strategy" :: value :: rest =>
+      match OptimizationStrategy.parse value with
+      | .ok parsed => parseTokens rest { state with optimizeStrategy := parsed }
+      | .error err => .error err
+  | "--emit-remarks" :: value :: rest => parseTokens rest { state with emitRemarks := some value }
   | "--module" :: [] => .error "missing value for --module"
   | "--out" :: [] => .error "missing value for --out"
   | "--optimize" :: [] => .error "missing value for --optimize"
+  | "--optimize-strategy" :: [] => .error "missing value for --optimize-strategy"
+  | "--emit-remarks" :: [] => .error "missing value for --emit-remarks"
   | unknown :: _ => .error s!"unknown argument: {unknown}"
 
 def usage : String :=
   String.intercalate "\n"
     [
       "Usage:",
-      "  lake exe leancairo-sierra-gen --module <LeanModule> --out <Directory> [--optimize true|false]",
+      "  lake exe leancairo-sierra-gen --module <LeanModule> --out <Directory> [--optimize true|false] [--optimize-strategy fixed|cost-driven] [--emit-remarks <File>]",
       "",
       "Requirements:",
       "  <LeanModule> must define: def contract : ContractSpec",
+      "",
+      "Optimization strategies:",
+      "  fixed        apply the default verified pass pipeline to every function",
+      "  cost-driven  score candidate pass pipelines per function with the static Sierra cost model,",
+      "               keep the cheapest and write optimization-report.json",
+      "",
+      "Remarks:",
+      "  --emit-remarks <File> writes one JSON Lines record per function and pass application",
+      "",
+      "Server mode:",
+      "  lake exe leancairo-sierra-gen --serve",
+      "  reads one request per stdin line, {\"id\": ..., \"args\": [<arguments above>]}, and writes one",
+      "  JSON line per request with its status; each module is built and imported once per server",
+      "",
+      "Batch mode:",
+      "  lake exe leancairo-sierra-gen --batch <Manifest.json> [--summary <File>]",
+      "  compiles every entry of {\"entries\": [{\"id\": ..., \"args\": [<arguments above>]}]} in one process,",
+      "  importing all modules once; --summary writes per-entry status and timing as JSON",
       ""
     ]
 
@@ -64,6 +95,8 @@ def parseCliOptions (args : List String) : Except String CliOptions := do
         moduleName := moduleName
         outDir := outDir
         optimize := parsed.optimize
+        optimizeStrategy := parsed.optimizeStrategy
+        emitRemarks := parsed.emitRemarks
       }
 
 end LeanCairo.SierraCLI
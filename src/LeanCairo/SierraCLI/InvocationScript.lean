@@ -19,6 +19,11 @@ private def escapeLeanStringLiteral (value : String) : String :=
 private def boolLiteral (value : Bool) : String :=
   if value then "true" else "false"
 
+private def optionalPathLiteral (value : Option String) : String :=
+  match value with
+  | some path => s!"(some \"{escapeLeanStringLiteral path}\")"
+  | none => "none"
+
 private def toTempSafeName (value : String) : String :=
   String.ofList <| value.toList.map (fun c => if c.isAlphanum then c else '_')
 
@@ -30,13 +35,15 @@ private def moduleRootTarget (moduleName : String) : String :=
 private def renderInvocationScript (options : CliOptions) : String :=
   let escapedOutDir := escapeLeanStringLiteral options.outDir
   let optimizeLiteral := boolLiteral options.optimize
+  let remarksLiteral := optionalPathLiteral options.emitRemarks
+  let strategyLiteral := LeanCairo.Pipeline.Sierra.OptimizationStrategy.toLeanExpr options.optimizeStrategy
   String.intercalate "\n"
     [
       "import LeanCairo.Pipeline.Sierra.EntryPoint",
       s!"import {options.moduleName}",
       "",
       "#eval",
-      s!"  LeanCairo.Pipeline.Sierra.generateSierraProjectCheckedWithOptions {options.moduleName}.contract \"{escapedOutDir}\" {optimizeLiteral}",
+      s!"  LeanCairo.Pipeline.Sierra.generateSierraProjectCheckedWithStrategy {options.moduleName}.contract \"{escapedOutDir}\" {optimizeLiteral} {strategyLiteral} {remarksLiteral}",
       ""
     ]
 
@@ -1,12 +1,28 @@
 import LeanCairo.SierraCLI.Arguments
 import LeanCairo.SierraCLI.InvocationScript
+import LeanCairo.SierraCLI.Server
 
 open LeanCairo.SierraCLI
+open LeanCairo.Pipeline
 
 def main (args : List String) : IO UInt32 := do
   if args.contains "--help" then
     IO.println usage
     return 0
+  if args == ["--serve"] then
+    return (← serveCompileRequests runResidentInvocation)
+  match parseBatchArgs args with
+  | some (.ok (manifest, summary?)) =>
+      try
+        return (← runCompileBatch runResidentInvocation manifest summary?)
+      catch ex =>
+        IO.eprintln s!"error: {ex.toString}"
+        return 1
+  | some (.error err) =>
+      IO.eprintln s!"error: {err}"
+      IO.eprintln usage
+      return 1
+  | none => pure ()
   match parseCliOptions args with
   | .error err =>
       IO.eprintln s!"error: {err}"
@@ -0,0 +1,20 @@
+import LeanCairo.Pipeline.Resident
+import LeanCairo.Pipeline.Sierra.EntryPoint
+import LeanCairo.SierraCLI.Arguments
+
+namespace LeanCairo.SierraCLI
+
+open LeanCairo.Pipeline
+
+/-- One `--serve` request: the same options as a command line, compiled in-process. -/
+def runResidentInvocation (cache : ContractCache) (args : List String) : IO ContractCache := do
+  let options <-
+    match parseCliOptions args with
+    | .ok options => pure options
+    | .error err => throw <| IO.userError err
+  let (spec, cache) <- cache.load options.moduleName
+  LeanCairo.Pipeline.Sierra.generateSierraProjectCheckedWithStrategy
+    spec options.outDir options.optimize options.optimizeStrategy options.emitRemarks
+  pure cache
+
+end LeanCairo.SierraCLI
@@ -0,0 +1,103 @@
+import LeanCairo.Compiler.Semantics.MapEval
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Semantics
+open LeanCairo.Core.Domain
+
+private def assertCondition (ok : Bool) (message : String) : IO Unit := do
+  if ok then
+    pure ()
+  else
+    throw <| IO.userError message
+
+private def chainName (index : Nat) : String :=
+  s!"v{index}"
+
+/--
+`v(i+1) := x + v(i)` nested `remaining` deep. Every level reads the entry variable `x`, which the
+closure-backed context only reaches after walking every binding made above it.
+-/
+private def accumulateChainFrom (index : Nat) : Nat -> IRExpr .u128
+  | 0 => .var (chainName index)
+  | remaining + 1 =>
+      .letE (chainName (index + 1)) .u128 (.addU128 (.var "x") (.var (chainName index)))
+        (accumulateChainFrom (index + 1) remaining)
+
+private def chainContext : EvalContext :=
+  {
+    u128Vars := fun name =>
+      if name = "x" then 3
+      else if name = "v0" then 5
+      else 0
+  }
+
+/-- The same name bound in three domains, read back from each. -/
+private def collisionExpr : IRExpr .bool :=
+  .letE "shared" .felt252 (.litFelt252 42)
+    (.letE "shared" .bool (.litBool true)
+      (.letE "shared" .u128 (.litU128 9)
+        (.ite (.var "shared")
+          (.ite (.eq (.var "shared" : IRExpr .felt252) (.litFelt252 42))
+            (.eq (.var "shared" : IRExpr .u128) (.litU128 9))
+            (.litBool false))
+          (.litBool false))))
+
+private def writerFunction : IRFuncSpec :=
+  {
+    name := "accumulate"
+    args := [{ name := "x", ty := .u128 }]
+    ret := .u128
+    body := accumulateChainFrom 0 16
+    mutability := .externalMutable
+    writes :=
+      [
+        { field := "total", ty := .u128, value := .addU128 (.storageRead "total") (.var "x") },
+        { field := "seen", ty := .bool, value := .litBool true },
+        { field := "total", ty := .u128, value := .addU128 (.storageRead "total") (.litU128 100) }
+      ]
+  }
+
+#eval do
+  let mapCtx := MapEvalContext.ofContext chainContext
+
+  for depth in [0, 1, 7, 64, 256] do
+    let expr := accumulateChainFrom 0 depth
+    let observed := evalExprMap mapCtx expr
+    assertCondition (observed = evalExpr chainContext expr)
+      s!"map evaluator diverged from evalExpr at depth {depth}"
+    assertCondition (observed = 5 + 3 * depth)
+      s!"unexpected chain value at depth {depth}: {observed}"
+
+  -- Deep enough that the closure-backed evaluator would walk ~8M bindings.
+  let deepDepth := 4096
+  assertCondition (evalExprMap mapCtx (accumulateChainFrom 0 deepDepth) = 5 + 3 * deepDepth)
+    "map evaluator returned the wrong value for the deep chain"
+
+  assertCondition (evalExprMap mapCtx collisionExpr = evalExpr chainContext collisionExpr)
+    "map evaluator diverged from evalExpr on same-name bindings across domains"
+  assertCondition (evalExprMap mapCtx collisionExpr)
+    "same-name bindings across domains must stay isolated"
+
+  -- Bindings shadow the entry context only in their own domain.
+  let bound := mapCtx.bindVar .u8 "x" 200
+  assertCondition (bound.readVar .u8 "x" = 200) "u8 binding should be readable from u8 domain"
+  assertCondition (bound.readVar .u128 "x" = 3) "u8 binding must not shadow the u128 entry value"
+  let unsupported := mapCtx.bindVar (.array .u128) "x" ()
+  assertCondition (unsupported.readVar .u128 "x" = 3) "unsupported bindings must be no-ops"
+
+  let storageCtx : EvalContext :=
+    { chainContext with u128Storage := fun name => if name = "total" then 11 else 0 }
+  let mapOutcome := evalFuncMap (MapEvalContext.ofContext storageCtx) writerFunction
+  let outcome := evalFunc storageCtx writerFunction
+  assertCondition (decide (mapOutcome.result = outcome.result))
+    "function result diverged between the map and closure evaluators"
+  for field in ["total", "seen", "missing"] do
+    assertCondition
+      (mapOutcome.postCtx.readStorage .u128 field = EvalContext.readStorage outcome.postCtx .u128 field)
+      s!"u128 storage '{field}' diverged after writes"
+    assertCondition
+      (mapOutcome.postCtx.readStorage .bool field = EvalContext.readStorage outcome.postCtx .bool field)
+      s!"bool storage '{field}' diverged after writes"
+  -- Writes read the entry snapshot, so the last write to `total` wins over the first.
+  let total := mapOutcome.postCtx.readStorage .u128 "total"
+  assertCondition (total = 111) s!"unexpected post-write total: {total}"
@@ -0,0 +1,85 @@
+import LeanCairo.Compiler.Optimize.IRSpec
+import LeanCairo.Compiler.Optimize.Remarks
+import LeanCairo.Pipeline.Sierra.Remarks
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
+open LeanCairo.Pipeline.Sierra
+
+private def assertCondition (ok : Bool) (message : String) : IO Unit := do
+  if ok then
+    pure ()
+  else
+    throw <| IO.userError message
+
+private def literalChainExpr : IRExpr .u128 :=
+  .letE "width" .u128 (.litU128 3)
+    (.letE "scaled" .u128 (.mulU128 (.var "width") (.litU128 4))
+      (.addU128 (.mulU128 (.var "lhs") (.litU128 2)) (.var "scaled")))
+
+private def fixtureFunction : IRFuncSpec :=
+  {
+    name := "literalChain"
+    args := [{ name := "lhs", ty := .u128 }]
+    ret := .u128
+    body := literalChainExpr
+  }
+
+private def fixtureContract : IRContractSpec :=
+  {
+    contractName := "RemarksFixture"
+    functions := [fixtureFunction]
+  }
+
+#eval do
+  assertCondition (exprNodeCount literalChainExpr = 11)
+    s!"unexpected node count: {exprNodeCount literalChainExpr}"
+
+  let (remarks, traced) := tracePasses optimizerPasses fixtureFunction
+  assertCondition (remarks.map (·.pass) = optimizerPasses.map (·.name))
+    s!"unexpected remark passes: {remarks.map (·.pass)}"
+  assertCondition ((remarks.head?.map (·.nodesBefore)) = some 11)
+    "first remark does not start from the input function"
+  -- Constant propagation folds both literal bindings away.
+  assertCondition ((remarks.head?.map (·.nodesAfter)) = some 5)
+    s!"unexpected constant propagation remark: {repr remarks.head?}"
+  assertCondition (reprStr traced.body = reprStr (optimizeIRFuncSpec fixtureFunction).body)
+    "tracing passes one at a time diverged from the composed pipeline"
+  let chained := (remarks.zip remarks.tail).all (fun (prev, next) => prev.nodesAfter = next.nodesBefore)
+  assertCondition chained "remark node counts do not chain"
+
+  let (unoptimized, _) := tracePasses [] fixtureFunction
+  assertCondition (unoptimized.map (·.pass) = ["none"]) "an empty pipeline must still report the function"
+
+  let lines := (renderRemarksJsonLines fixtureContract (fun _ => optimizerPasses)).splitOn "\n"
+  assertCondition (lines.length = optimizerPasses.length + 1 && lines.getLast? = some "")
+    s!"expected one JSON line per pass application, got {lines.length}"
+  match Lean.Json.parse (lines.headD "") with
+  | .error err => throw <| IO.userError s!"remark line is not JSON: {err}"
+  | .ok record =>
+      assertCondition ((record.getObjValAs? String "function").toOption = some "literalChain")
+        "remark record is missing the function name"
+      assertCondition ((record.getObjValAs? Nat "sierra_statements").toOption.isSome)
+        "remark record is missing the Sierra statement count"
+
+  -- Each record carries the statistics of the function as its own pass left it.
+  let traced := tracePassSpecs optimizerPasses fixtureFunction
+  assertCondition ((traced.map (·.fst)) = remarks) "tracePassSpecs and tracePasses disagree on remarks"
+  for (line, (remark, next)) in lines.zip traced do
+    match Lean.Json.parse line with
+    | .error err => throw <| IO.userError s!"remark line is not JSON: {err}"
+    | .ok record =>
+        let gas := (record.getObjVal? "static_cost" >>= (·.getObjValAs? Nat "gas")).toOption
+        assertCondition (gas = some (funcSierraCost next).gas)
+          s!"{remark.pass} record does not carry the static cost after that pass"
+        assertCondition ((record.getObjValAs? Nat "sierra_statements").toOption = sierraStatementCount? next)
+          s!"{remark.pass} record does not carry the Sierra statement count after that pass"
+
+  -- Pipelines are looked up by position, so two functions sharing a name keep their own passes.
+  let twins : IRContractSpec := { fixtureContract with functions := [fixtureFunction, fixtureFunction] }
+  let twinLines :=
+    (renderRemarksJsonLines twins (fun idx => if idx = 0 then [] else optimizerPasses)).splitOn "\n"
+  assertCondition (twinLines.length = 1 + optimizerPasses.length + 1)
+    s!"functions sharing a name did not keep their own pipelines: {twinLines.length} lines"
+  assertCondition ((twinLines.headD "").contains "\"pass\":\"none\"")
+    "the first of two same-named functions lost its empty pipeline"
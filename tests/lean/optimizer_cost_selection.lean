@@ -0,0 +1,105 @@
+import LeanCairo.Compiler.Optimize.CostModel
+import LeanCairo.Compiler.Optimize.Selection
+import LeanCairo.Compiler.Semantics.ContractEval
+
+open LeanCairo.Compiler.IR
+open LeanCairo.Compiler.Optimize
+open LeanCairo.Compiler.Semantics
+open LeanCairo.Core.Domain
+
+private def assertCondition (ok : Bool) (message : String) : IO Unit := do
+  if ok then
+    pure ()
+  else
+    throw <| IO.userError message
+
+private def addExpr : IRExpr .u128 :=
+  .addU128 (.var "lhs") (.var "rhs")
+
+private def wideMulExpr : IRExpr .u128 :=
+  .mulU128 (.var "lhs") (.var "rhs")
+
+private def narrowMulExpr : IRExpr .u128 :=
+  .letE "small" .u128 (.litU128 3) (.mulU128 (.var "small") (.litU128 5))
+
+private def literalChainExpr : IRExpr .u128 :=
+  .letE "width" .u128 (.litU128 3)
+    (.letE "scaled" .u128 (.mulU128 (.var "width") (.litU128 4))
+      (.addU128 (.mulU128 (.var "lhs") (.litU128 2)) (.var "scaled")))
+
+private def fixtureFunction (name : String) (body : IRExpr .u128) : IRFuncSpec :=
+  {
+    name := name
+    args := [{ name := "lhs", ty := .u128 }, { name := "rhs", ty := .u128 }]
+    ret := .u128
+    body := body
+  }
+
+private def fixtureContract : IRContractSpec :=
+  {
+    contractName := "CostSelectionFixture"
+    functions :=
+      [
+        fixtureFunction "identity" (.var "lhs"),
+        fixtureFunction "literalChain" literalChainExpr,
+        fixtureFunction "wideMul" wideMulExpr
+      ]
+  }
+
+private def selectionFixtureContext : EvalContext :=
+  {
+    u128Vars := fun name =>
+      if name = "lhs" then IntegerDomains.pow2 128 - 1
+      else if name = "rhs" then 7
+      else 0
+  }
+
+#eval do
+  assertCondition (pipelineCandidatesContractCheck matches .ok _)
+    "candidate pipelines are missing legality metadata"
+  assertCondition ((pipelineCandidates.map (·.label)).head? = some "fixed")
+    "the fixed pipeline must be the first candidate"
+  assertCondition (pipelineCandidates.any (fun candidate => candidate.passes.isEmpty))
+    "the empty pipeline must be a candidate"
+
+  -- Unit prices follow `sierra_static_gas_v1`.
+  assertCondition (exprSierraCost RangeEnv.empty addExpr = ({ steps := 6, rangeChecks := 1 } : SierraCost))
+    s!"unexpected u128 add cost: {repr (exprSierraCost RangeEnv.empty addExpr)}"
+  assertCondition (exprSierraCost RangeEnv.empty wideMulExpr = ({ steps := 17, rangeChecks := 4 } : SierraCost))
+    s!"unexpected guarantee-route mul cost: {repr (exprSierraCost RangeEnv.empty wideMulExpr)}"
+  -- Both operands are known to be small, so the emitter takes the felt252 route.
+  assertCondition (exprSierraCost RangeEnv.empty narrowMulExpr = ({ steps := 15, rangeChecks := 3 } : SierraCost))
+    s!"unexpected felt-route mul cost: {repr (exprSierraCost RangeEnv.empty narrowMulExpr)}"
+  assertCondition ((SierraCost.mk 6 1).gas = 670) "unexpected step/range-check weights"
+
+  let decisions := selectIRContractDecisions fixtureContract
+  assertCondition (decisions.map (·.functionName) = ["identity", "literalChain", "wideMul"])
+    s!"unexpected decision order: {decisions.map (·.functionName)}"
+  for decision in decisions do
+    assertCondition (decision.candidates.length = pipelineCandidates.length)
+      s!"decision for {decision.functionName} does not score every candidate"
+    assertCondition (decision.candidates.all (fun score => decision.chosenCost.gas ≤ score.cost.gas))
+      s!"decision for {decision.functionName} did not keep the cheapest candidate"
+    assertCondition (decision.chosenCost.gas ≤ decision.inputCost.gas)
+      s!"decision for {decision.functionName} regressed its unoptimized input"
+
+  -- Every candidate ties on a bare variable, and ties keep the fixed pipeline.
+  assertCondition ((decisions.head?.map (·.chosen)) = some "fixed")
+    s!"ties did not keep the fixed pipeline: {repr decisions.head?}"
+  -- Constant propagation folds the literals and turns `lhs * 2` into a doubling.
+  let chainDecision := decisions[1]?
+  assertCondition ((chainDecision.map (·.chosenCost)) = some ({ steps := 13, rangeChecks := 2 } : SierraCost))
+    s!"unexpected literal-chain cost: {repr chainDecision}"
+
+  let selected := selectIRContract fixtureContract
+  assertCondition (selected.functions.length = fixtureContract.functions.length)
+    "selectIRContract changed function count"
+  for (before, after) in fixtureContract.functions.zip selected.functions do
+    assertCondition (after.name = before.name) "selectIRContract reordered functions"
+    let resultBefore := (evalFunc selectionFixtureContext before).result
+    let resultAfter := (evalFunc selectionFixtureContext after).result
+    assertCondition (decide (resultBefore = resultAfter))
+      s!"selected pipeline changed the result of {before.name}"
+  for (fnSpec, decision) in selected.functions.zip decisions do
+    assertCondition (funcSierraCost fnSpec = decision.chosenCost)
+      s!"selected body of {fnSpec.name} does not carry the reported cost"
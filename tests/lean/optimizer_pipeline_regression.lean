@@ -29,6 +29,29 @@ private def u256Expr : IRExpr .u256 :=
     (.mulU256 (.var (ty := .u256) "x") (.var (ty := .u256) "x"))
     (.litU256 1)
 
+private def qlogExpr : IRExpr .u256 :=
+  let z : IRExpr .u256 := .var "z"
+  let z2 : IRExpr .u256 := .mulU256 z z
+  let diff : IRExpr .u256 := .subU256 (.mulU256 z2 z2) z2
+  .addU256 diff diff
+
+private def literalChainExpr : IRExpr .u128 :=
+  .letE "width" .u128 (.litU128 3)
+    (.letE "scaled" .u128 (.mulU128 (.var "width") (.litU128 4))
+      (.addU128 (.mulU128 (.var "lhs") (.litU128 2)) (.var "scaled")))
+
+private def compoundScaleExpr : IRExpr .u128 :=
+  .mulU128 (.addU128 (.var "lhs") (.var "rhs")) (.litU128 4)
+
+private def wrappingLiteralExpr : IRExpr .u128 :=
+  .addU128 (.litU128 (IntegerDomains.pow2 128 - 1)) (.litU128 1)
+
+private def deadOverflowExpr : IRExpr .u128 :=
+  .letE "unused" .u128 (.addU128 (.var "lhs") (.var "rhs")) (.var "lhs")
+
+private def deadFeltExpr : IRExpr .u128 :=
+  .letE "unused" .felt252 (.mulFelt252 (.var "a") (.litFelt252 3)) (.var "lhs")
+
 private def boolExpr : IRExpr .bool :=
   .ite
     (.eq (.var (ty := .u128) "lhs") (.var (ty := .u128) "rhs"))
@@ -42,7 +65,7 @@ private def optimizerFixtureContext : EvalContext :=
       if name = "lhs" then IntegerDomains.pow2 128 - 1
       else if name = "rhs" then IntegerDomains.pow2 128 - 1
       else 0
-    u256Vars := fun name => if name = "x" then 9 else 0
+    u256Vars := fun name => if name = "x" then 9 else if name = "z" then 7 else 0
   }
 
 private def fixtureFunction : IRFuncSpec :=
@@ -62,7 +85,7 @@ private def fixtureContract : IRContractSpec :=
 
 #eval do
   let passNames := optimizerPasses.map (fun (pass : VerifiedExprPass) => pass.name)
-  assertCondition (passNames = ["algebraic-fold", "canonicalize"])
+  assertCondition (passNames = ["constant-propagation", "algebraic-fold", "canonicalize", "global-value-numbering"])
     s!"unexpected optimizer pass stack order: {passNames}"
 
   let feltBefore := evalExpr optimizerFixtureContext feltExpr
@@ -77,6 +100,37 @@ private def fixtureContract : IRContractSpec :=
   let u256After := evalExpr optimizerFixtureContext (optimizeExprPipeline u256Expr)
   assertCondition (u256Before = u256After) "u256 optimizer pipeline changed semantics"
 
+  let qlogBefore := evalExpr optimizerFixtureContext qlogExpr
+  let qlogAfter := evalExpr optimizerFixtureContext (optimizeExprPipeline qlogExpr)
+  assertCondition (qlogBefore = qlogAfter) "gvn optimizer pipeline changed semantics"
+  -- `diff` is hoisted first; `z * z` is then shared by the remaining square and the subtrahend.
+  assertCondition (exprBinders (gvnExpr qlogExpr) = [gvnTempName 1, gvnTempName 0])
+    s!"unexpected gvn binders: {exprBinders (gvnExpr qlogExpr)}"
+
+  let chainBefore := evalExpr optimizerFixtureContext literalChainExpr
+  let chainAfter := evalExpr optimizerFixtureContext (optimizeExprPipeline literalChainExpr)
+  assertCondition (chainBefore = chainAfter) "constant propagation changed semantics"
+  -- `width` and `scaled` fold away; `lhs * 2` becomes a doubling.
+  assertCondition
+    (constPropExpr literalChainExpr =
+      .addU128 (.addU128 (.var "lhs") (.var "lhs")) (.litU128 12))
+    s!"unexpected constant propagation result: {repr (constPropExpr literalChainExpr)}"
+  -- Doubling copies its operand, so only variables are strength-reduced.
+  assertCondition
+    (constPropExpr (.mulU128 (.var "lhs") (.litU128 4)) =
+      .addU128 (.addU128 (.var "lhs") (.var "lhs")) (.addU128 (.var "lhs") (.var "lhs")))
+    "a variable times 4 should become two doublings"
+  assertCondition (constPropExpr compoundScaleExpr = compoundScaleExpr)
+    s!"a compound operand must stay a multiplication: {repr (constPropExpr compoundScaleExpr)}"
+  -- A sum that wraps at 2^128 is left to the runtime.
+  assertCondition (constPropExpr wrappingLiteralExpr = wrappingLiteralExpr)
+    "constant propagation folded a wrapping u128 sum"
+  -- An unused binding that may overflow keeps its runtime panic; one that cannot panic is dropped.
+  assertCondition (constPropExpr deadOverflowExpr = deadOverflowExpr)
+    "constant propagation dropped a binding that can overflow"
+  assertCondition (constPropExpr deadFeltExpr = .var "lhs")
+    s!"unexpected dead felt252 binding result: {repr (constPropExpr deadFeltExpr)}"
+
   let boolBefore := evalExpr optimizerFixtureContext boolExpr
   let boolAfter := evalExpr optimizerFixtureContext (optimizeExprPipeline boolExpr)
   assertCondition (boolBefore = boolAfter) "bool optimizer pipeline changed semantics"
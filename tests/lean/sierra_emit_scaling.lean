@@ -0,0 +1,123 @@
+import LeanCairo.Backend.Sierra.Emit.Subset.Function
+
+open Lean
+open LeanCairo.Backend.Sierra.Emit.Subset
+open LeanCairo.Compiler.IR
+open LeanCairo.Core.Domain
+
+private def assertCondition (ok : Bool) (message : String) : IO Unit := do
+  if ok then
+    pure ()
+  else
+    throw <| IO.userError message
+
+private def chainName (index : Nat) : String :=
+  s!"v{index}"
+
+/-- `v(i+1) := x + v(i)` nested `remaining` deep: every level reads the parameter `x` under all lets. -/
+private def accumulateChainFrom (index : Nat) : Nat -> IRExpr .felt252
+  | 0 => .var (chainName index)
+  | remaining + 1 =>
+      .letE (chainName (index + 1)) .felt252 (.addFelt252 (.var "x") (.var (chainName index)))
+        (accumulateChainFrom (index + 1) remaining)
+
+private def termName (index : Nat) : String :=
+  s!"t{index}"
+
+private def sumTerms : Nat -> IRExpr .felt252
+  | 0 => .litFelt252 0
+  | count + 1 => .addFelt252 (sumTerms count) (.var (termName count))
+
+/-- `t(i) := x * i` for every `i`, all live until a final sum, so the environment holds `count` lets. -/
+private def wideTermsFrom (index : Nat) (count : Nat) : Nat -> IRExpr .felt252
+  | 0 => sumTerms count
+  | remaining + 1 =>
+      .letE (termName index) .felt252 (.mulFelt252 (.var "x") (.litFelt252 (Int.ofNat (index + 1))))
+        (wideTermsFrom (index + 1) count remaining)
+
+private def chainFunction (depth : Nat) : IRFuncSpec :=
+  {
+    name := s!"chain{depth}"
+    args := [{ name := "x", ty := .felt252 }, { name := chainName 0, ty := .felt252 }]
+    ret := .felt252
+    body := accumulateChainFrom 0 depth
+  }
+
+private def wideFunction (count : Nat) : IRFuncSpec :=
+  {
+    name := s!"wide{count}"
+    args := [{ name := "x", ty := .felt252 }]
+    ret := .felt252
+    body := wideTermsFrom 0 count count
+  }
+
+private def emitOrThrow (fnSpec : IRFuncSpec) : IO EmittedFunction :=
+  match emitFunction 0 fnSpec with
+  | .ok emitted => pure emitted
+  | .error err => throw <| IO.userError s!"emission failed for {fnSpec.name}: {err}"
+
+private def distinctKeys (decls : List (String × Json)) : Bool :=
+  (decls.map Prod.fst).eraseDups.length = decls.length
+
+/--
+Emits `shape size` for each size, checking declarations and reporting wall time. Timing is printed
+only: it depends on the machine, so the assertions stay on deterministic statement counts.
+-/
+private def measureShape (label : String) (shape : Nat -> IRFuncSpec) (sizes : List Nat) :
+    IO (List (Nat × Nat)) := do
+  let mut rows : List (Nat × Nat) := []
+  for size in sizes do
+    let startNs <- IO.monoNanosNow
+    let emitted <- emitOrThrow (shape size)
+    let statementCount := emitted.statements.length
+    let elapsedMs := ((← IO.monoNanosNow) - startNs) / 1000000
+    assertCondition (distinctKeys emitted.typeDecls) s!"{label} {size}: duplicate type declarations"
+    assertCondition (distinctKeys emitted.libfuncDecls) s!"{label} {size}: duplicate libfunc declarations"
+    IO.println s!"{label} size={size} statements={statementCount} elapsed_ms={elapsedMs}"
+    rows := rows ++ [(size, statementCount)]
+  pure rows
+
+/-- Sizes double, so an affine statement count has equal second differences up to the doubling. -/
+private def checkAffineGrowth (label : String) (rows : List (Nat × Nat)) : IO Unit := do
+  match rows with
+  | (_, s1) :: (_, s2) :: (_, s3) :: _ =>
+      assertCondition (s3 - s2 = 2 * (s2 - s1))
+        s!"{label}: statement count is not affine in body size ({s1}, {s2}, {s3})"
+  | _ => pure ()
+
+#eval do
+  let sizes := [250, 500, 1000, 2000]
+
+  let chainRows <- measureShape "let-chain" chainFunction sizes
+  checkAffineGrowth "let-chain" chainRows
+
+  let wideRows <- measureShape "wide-env" wideFunction sizes
+  checkAffineGrowth "wide-env" wideRows
+
+  -- Declarations are deduplicated: the chain only ever needs felt252 store/dup/add.
+  let small <- emitOrThrow (chainFunction 4)
+  let large <- emitOrThrow (chainFunction 1000)
+  assertCondition (small.typeDecls.map Prod.fst = large.typeDecls.map Prod.fst)
+    "type declarations should not grow with chain depth"
+  assertCondition (small.libfuncDecls.map Prod.fst = large.libfuncDecls.map Prod.fst)
+    "libfunc declarations should not grow with chain depth"
+
+  -- Same-named lets shadow and restore correctly with the indexed environment.
+  let shadowed : IRFuncSpec :=
+    {
+      name := "shadowed"
+      args := [{ name := "x", ty := .felt252 }]
+      ret := .felt252
+      body :=
+        .letE "y" .felt252 (.addFelt252 (.var "x") (.var "x"))
+          (.addFelt252
+            (.letE "y" .felt252 (.mulFelt252 (.var "y") (.var "y")) (.var "y"))
+            (.var "x"))
+    }
+  let _ <- emitOrThrow shadowed
+  let unbound : IRFuncSpec := { shadowed with name := "unbound", body := .var "missing" }
+  match emitFunction 0 unbound with
+  | .ok _ => throw <| IO.userError "unbound variable should be rejected"
+  | .error err =>
+      assertCondition (err = "unbound variable 'missing' in function 'unbound'")
+        s!"unexpected unbound-variable error: {err}"
@@ -0,0 +1,102 @@
+import LeanCairo.Backend.Sierra.Emit.Subset.Function
+
+open Lean
+open LeanCairo.Backend.Sierra.Emit.Subset
+open LeanCairo.Compiler.IR
+open LeanCairo.Core.Domain
+
+private def assertCondition (ok : Bool) (message : String) : IO Unit := do
+  if ok then
+    pure ()
+  else
+    throw <| IO.userError message
+
+private def u128Function (name : String) (body : IRExpr .u128) : IRFuncSpec :=
+  {
+    name := name
+    args := [{ name := "lhs", ty := .u128 }, { name := "rhs", ty := .u128 }]
+    ret := .u128
+    body := body
+  }
+
+private def feltFunction (name : String) : IRFuncSpec :=
+  {
+    name := name
+    args := [{ name := "x", ty := .felt252 }]
+    ret := .felt252
+    body := .mulFelt252 (.var "x") (.addFelt252 (.var "x") (.litFelt252 3))
+  }
+
+/-- Overflowing adds, both multiplication routes and a felt function, so branch targets and
+declarations differ between functions. -/
+private def kernel (idx : Nat) : IRFuncSpec :=
+  match idx % 4 with
+  | 0 => u128Function s!"add_{idx}" (.addU128 (.addU128 (.var "lhs") (.var "rhs")) (.litU128 idx))
+  | 1 => u128Function s!"mul_{idx}" (.mulU128 (.var "lhs") (.var "rhs"))
+  | 2 =>
+      u128Function s!"narrow_{idx}"
+        (.letE "small" .u128 (.litU128 idx) (.subU128 (.mulU128 (.var "small") (.litU128 7)) (.var "lhs")))
+  | _ => feltFunction s!"felt_{idx}"
+
+private def fixtureContract (count : Nat) : IRContractSpec :=
+  {
+    contractName := "ParallelEmissionFixture"
+    functions := (List.range count).map kernel
+  }
+
+private def insertSequential (decls : List (String × Json)) (extra : List (String × Json)) :
+    List (String × Json) :=
+  extra.foldl (fun acc entry => if acc.any (·.fst = entry.fst) then acc else acc ++ [entry]) decls
+
+/-- The sequential reference: each function emitted directly at its absolute entry point. -/
+private def renderSequential (spec : IRContractSpec) : Except EmitError String := do
+  let mut entryPoint := 0
+  let mut funcs : List Json := []
+  let mut statements : List Json := []
+  let mut typeDecls : List (String × Json) := []
+  let mut libDecls : List (String × Json) := []
+  for fnSpec in spec.functions do
+    let emitted <- emitFunction entryPoint fnSpec
+    entryPoint := entryPoint + emitted.statements.length
+    funcs := funcs ++ [emitted.funcJson]
+    statements := statements ++ emitted.statements
+    typeDecls := insertSequential typeDecls emitted.typeDecls
+    libDecls := insertSequential libDecls emitted.libfuncDecls
+  let programJson :=
+    Json.mkObj
+      [
+        ("version", Json.num (JsonNumber.fromNat 1)),
+        ("type_declarations", Json.arr (typeDecls.map Prod.snd).toArray),
+        ("libfunc_declarations", Json.arr (libDecls.map Prod.snd).toArray),
+        ("statements", Json.arr statements.toArray),
+        ("funcs", Json.arr funcs.toArray)
+      ]
+  pure (toString programJson)
+
+#eval do
+  for count in [1, 4, 33] do
+    let spec := fixtureContract count
+    match renderSubsetProgramJson spec, renderSequential spec with
+    | .ok linked, .ok sequential =>
+        assertCondition (linked = sequential)
+          s!"linked parallel emission differs from sequential emission for {count} functions"
+    | .error err, _ => throw <| IO.userError s!"parallel emission failed: {err}"
+    | _, .error err => throw <| IO.userError s!"sequential emission failed: {err}"
+
+  -- The first failing function in source order is reported, as before.
+  let broken : IRFuncSpec :=
+    { name := "broken", args := [], ret := .u128, body := .storageRead "slot" }
+  let spec := { fixtureContract 3 with functions := (fixtureContract 3).functions ++ [broken, broken] }
+  match renderSubsetProgramJson spec with
+  | .ok _ => throw <| IO.userError "expected emission of a storage read to fail"
+  | .error err =>
+      assertCondition ((err.splitOn "storage reads").length > 1)
+        s!"unexpected emission error: {err}"
+
+  let statement := invocationStmtBranchesJson (Json.str "lib")
+    [] [(fallthroughTargetJson, []), (statementTargetJson 4, [])]
+  assertCondition
+    (toString (relocateStatementJson 10 statement) ==
+      toString (invocationStmtBranchesJson (Json.str "lib") []
+        [(fallthroughTargetJson, []), (statementTargetJson 14, [])]))
+    "relocation must shift statement targets and keep fallthrough targets"
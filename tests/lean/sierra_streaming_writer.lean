@@ -0,0 +1,109 @@
+import LeanCairo.Backend.Sierra.Emit.Subset.Stream
+
+open Lean
+open LeanCairo.Backend.Sierra.Emit.Subset
+open LeanCairo.Compiler.IR
+open LeanCairo.Core.Domain
+
+private def assertCondition (ok : Bool) (message : String) : IO Unit := do
+  if ok then
+    pure ()
+  else
+    throw <| IO.userError message
+
+private def u128Function (name : String) (body : IRExpr .u128) : IRFuncSpec :=
+  {
+    name := name
+    args := [{ name := "lhs", ty := .u128 }, { name := "rhs", ty := .u128 }]
+    ret := .u128
+    body := body
+  }
+
+/-- Overflowing adds, both multiplication routes and a felt function, so later functions relocate. -/
+private def kernel (idx : Nat) : IRFuncSpec :=
+  match idx % 3 with
+  | 0 => u128Function s!"add_{idx}" (.addU128 (.addU128 (.var "lhs") (.var "rhs")) (.litU128 idx))
+  | 1 => u128Function s!"mul_{idx}" (.mulU128 (.var "lhs") (.var "rhs"))
+  | _ =>
+      {
+        name := s!"felt_{idx}"
+        args := [{ name := "x", ty := .felt252 }]
+        ret := .felt252
+        body := .mulFelt252 (.var "x") (.addFelt252 (.var "x") (.litFelt252 3))
+      }
+
+private def fixtureContract (count : Nat) : IRContractSpec :=
+  {
+    contractName := "StreamingWriterFixture"
+    functions := (List.range count).map kernel
+  }
+
+private def streamToString (write : IO.FS.Stream -> IO Unit) : IO String := do
+  let buffer <- IO.mkRef ({} : IO.FS.Stream.Buffer)
+  write (IO.FS.Stream.ofBuffer buffer)
+  pure (String.fromUTF8! (← buffer.get).data)
+
+/-- Keys out of order, an empty array and object, escapes, DEL and a non-ASCII character. -/
+private def escapeSample : Json :=
+  Json.mkObj
+    [
+      ("zeta", Json.arr #[Json.num (JsonNumber.fromNat 1), Json.null, Json.bool true]),
+      ("alpha", Json.str "quote\" backslash\\ newline\n tab\t bell\u0007 delete\u007f e-acuteé"),
+      ("empty", Json.arr #[]),
+      ("nested", Json.mkObj [("b", Json.mkObj []), ("a", Json.num (JsonNumber.fromNat 2))])
+    ]
+
+private def expectedEscapeSample : String :=
+  String.intercalate "\n"
+    [
+      "{",
+      "  \"alpha\": \"quote\\\" backslash\\\\ newline\\n tab\\t bell\\u0007 delete\\u007f e-acute\\u00e9\",",
+      "  \"empty\": [],",
+      "  \"nested\": {",
+      "    \"a\": 2,",
+      "    \"b\": {}",
+      "  },",
+      "  \"zeta\": [",
+      "    1,",
+      "    null,",
+      "    true",
+      "  ]",
+      "}"
+    ]
+
+#eval do
+  let rendered := canonicalJsonString 0 escapeSample
+  assertCondition (rendered = expectedEscapeSample)
+    s!"canonical rendering does not match json.dumps:\n{rendered}"
+
+  let outDir : System.FilePath := ".artifacts" / "sierra_streaming_writer"
+  IO.FS.createDirAll outDir
+  IO.FS.writeFile (outDir / "escape_sample.json") escapeSample.compress
+  IO.FS.writeFile (outDir / "escape_sample_canonical.json") rendered
+
+  for count in [1, 7, 24] do
+    let spec := fixtureContract count
+    let program <-
+      match linkSubsetProgram spec with
+      | .ok program => pure program
+      | .error err => throw <| IO.userError s!"linking failed for {count} functions: {err}"
+    let streamed <- streamToString (fun out => writeLinkedSubsetProgram out program)
+    assertCondition (streamed.startsWith "{\n  \"funcs\": [\n")
+      s!"streamed program for {count} functions must open with the funcs array"
+    assertCondition (streamed.endsWith "\n  \"version\": 1\n}\n")
+      s!"streamed program for {count} functions must close with the version field"
+    -- The reference tree-built rendering; the gate checks the stream is its canonical form.
+    match renderSubsetProgramJson spec with
+    | .ok reference => IO.FS.writeFile (outDir / s!"reference_{count}.json") reference
+    | .error err => throw <| IO.userError s!"reference rendering failed: {err}"
+    let path := outDir / s!"streamed_{count}.json"
+    IO.FS.withFile path .write (fun handle => writeSubsetProgram (IO.FS.Stream.ofHandle handle) spec)
+    assertCondition ((← IO.FS.readFile path) = streamed)
+      s!"file and buffer streams differ for {count} functions"
+
+  -- Shape errors surface before anything is written.
+  match linkSubsetProgram { contractName := "Empty", functions := [] } with
+  | .ok _ => throw <| IO.userError "a contract without functions must be rejected"
+  | .error err =>
+      assertCondition (err = "Sierra subset backend requires at least one function")
+        s!"unexpected empty-contract error: {err}"